@@ -0,0 +1,102 @@
+# Intent classifier: transformers pipeline vs int8 ONNX Runtime with micro-batching.
+#
+# Usage (needs transformers + torch for the pipeline, onnxruntime for ONNX):
+#   python -m utiles.classifier_export                    # once, writes models/intent_onnx
+#   python benchmarks/intent_classifier_bench.py [--requests 400] [--concurrency 8]
+#
+# For each backend it reports load time, sequential single-request p50/p99 latency
+# and throughput with `concurrency` threads calling predict() at once. The result
+# cache is disabled (unique utterances) so every request reaches the model.
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.classifier import DEFAULT_ONNX_DIR, RubyIntentClassifier
+
+TEMPLATES = [
+    "open {app}", "play {song} on youtube", "what is the weather in {city}", "set volume to {n} percent",
+    "close {app}", "search the web for {topic}", "what time is it in {city}", "take a screenshot",
+    "tell me the latest news about {topic}", "calculate {n} times {m}", "remind me about {topic} at {n} pm",
+]
+FILL = {
+    "app": ["chrome", "notepad", "spotify", "vs code", "calculator"],
+    "song": ["believer", "vaathi coming", "arabic kuthu", "shape of you"],
+    "city": ["chennai", "coimbatore", "kochi", "delhi"],
+    "topic": ["cricket", "ai models", "elections", "stock market"],
+}
+
+
+def utterances(n, seed=3):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        text = rng.choice(TEMPLATES).format(
+            n=rng.randint(1, 100), m=rng.randint(1, 100), **{k: rng.choice(v) for k, v in FILL.items()}
+        )
+        out.append(f"{text} #{i}")  # unique, so the result cache never answers
+    return out
+
+
+def load(backend):
+    start = time.perf_counter()
+    onnx_dir = DEFAULT_ONNX_DIR if backend == "onnx" else "/nonexistent"
+    clf = RubyIntentClassifier(onnx_dir=onnx_dir, cache_size=1, fallback=False)
+    while clf.loading:
+        time.sleep(0.01)
+    if clf.stats()["backend"] != backend:
+        raise RuntimeError(f"{backend} backend did not load")
+    return clf, time.perf_counter() - start
+
+
+def bench(backend, texts, concurrency):
+    clf, load_s = load(backend)
+    clf.predict("warm up")
+
+    latencies = []
+    for text in texts[: len(texts) // 2]:
+        start = time.perf_counter()
+        clf.predict(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    rest = texts[len(texts) // 2:]
+    chunks = [rest[i::concurrency] for i in range(concurrency)]
+    threads = [threading.Thread(target=lambda c=c: [clf.predict(t) for t in c]) for c in chunks]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "p50": float(np.percentile(latencies, 50)),
+        "p99": float(np.percentile(latencies, 99)),
+        "throughput": len(rest) / elapsed,
+        "avg_batch": clf.stats()["batching"]["avg_batch"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the intent classifier backends.")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--backends", nargs="+", default=["transformers", "onnx"], choices=["transformers", "onnx"])
+    args = parser.parse_args()
+
+    texts = utterances(args.requests)
+    print(f"{'backend':<14}{'load s':>8}{'p50 ms':>9}{'p99 ms':>9}{'req/s':>9}{'avg batch':>11}")
+    for backend in args.backends:
+        r = bench(backend, texts, args.concurrency)
+        print(f"{r['backend']:<14}{r['load_s']:>8.2f}{r['p50']:>9.2f}{r['p99']:>9.2f}{r['throughput']:>9.1f}{r['avg_batch']:>11}")
+
+
+if __name__ == "__main__":
+    main()
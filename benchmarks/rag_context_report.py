@@ -0,0 +1,78 @@
+# Tokens saved by RubyRAG context packing on the fixture corpus in test/fixtures/rag_corpus.
+#
+# Usage:
+#   python benchmarks/rag_context_report.py [--k 4] [--budget 300]
+#
+# Chunks are split exactly like RubyRAG does (600 chars, 80 overlap) and retrieved with
+# a keyword-overlap score so the report runs offline. For each query it compares the
+# old "joined with ---" context against pack_context (merge, dedupe, budget).
+import argparse
+import glob
+import os
+import re
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from utiles.rag_context import pack_context
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), '..', 'test', 'fixtures', 'rag_corpus')
+QUERIES = [
+    "What is the minimum attendance and how does condonation work?",
+    "When are the GPU workstations and laboratories open?",
+    "What are the project phases and internship rules?",
+    "How are marks split between internal assessment and end semester examination?",
+    "When does the route 1 bus leave Gandhipuram and when is the late bus?",
+    "How much does a bus pass cost and where do I renew it?",
+    "How do I wake Ruby and change its language?",
+    "How does the knowledge base store documents?",
+]
+STOPWORDS = set("a an and are at be between do does for from how i in is it of on or the to what when where which with".split())
+
+
+def load_chunks(chunk_size=600, chunk_overlap=80):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True)
+    docs = []
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            docs.append(Document(page_content=f.read(), metadata={"source": os.path.basename(path)}))
+    return splitter.split_documents(docs)
+
+
+def terms(text):
+    return {w for w in re.findall(r"\w+", text.lower()) if w not in STOPWORDS}
+
+
+def keyword_retrieve(chunks, query, k):
+    query_terms = terms(query)
+    scored = sorted(chunks, key=lambda c: len(query_terms & terms(c.page_content)), reverse=True)[:k]
+    return [
+        Document(page_content=c.page_content, metadata={**c.metadata, "score": len(query_terms & terms(c.page_content))})
+        for c in scored
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report tokens saved by RubyRAG context packing.")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--budget", type=int, default=None, help="Token budget handed to pack_context.")
+    args = parser.parse_args()
+
+    chunks = load_chunks()
+    print(f"{len(chunks)} chunks from {CORPUS_DIR}\n")
+    total_raw = total_packed = 0
+    for query in QUERIES:
+        stats = pack_context(keyword_retrieve(chunks, query, args.k), token_budget=args.budget)
+        total_raw += stats["raw_tokens"]
+        total_packed += stats["tokens"]
+        print(f"{stats['raw_tokens']:>5} -> {stats['tokens']:>5} tokens  (saved {stats['tokens_saved']:>4}, "
+              f"{stats['passages']} passages)  {query}")
+    print(f"\nTotal: {total_raw} -> {total_packed} tokens, saved {total_raw - total_packed} "
+          f"({100 * (total_raw - total_packed) / total_raw:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
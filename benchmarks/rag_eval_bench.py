@@ -0,0 +1,304 @@
+# Offline evaluation and performance benchmark of RubyRAG.
+#
+# Usage:
+#   python benchmarks/rag_eval_bench.py                          # 200 docs x 20 passages, 500 queries
+#   python benchmarks/rag_eval_bench.py --docs 50 --queries 100 --index-type hnsw
+#   python benchmarks/rag_eval_bench.py --no-save --compare benchmarks/results/<earlier run>.json
+#
+# A seeded generator writes a corpus of made-up facts (opening times, rooms, fees, ...
+# of invented labs, hostels and bus routes) plus one labeled question per sampled fact.
+# RubyRAG runs with the deterministic HashingEmbeddings, so no API key or network is
+# needed and two runs on the same commit retrieve the same chunks.
+#
+# Reported: ingestion throughput, on-disk index size, store open time, cold (empty
+# caches) and warm (cached) query latency p50/p95/p99, recall@k and MRR. Each run is
+# written to benchmarks/results/ as JSON and compared with the previous run of the
+# same configuration, so regressions show up between commits.
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.rag_embeddings import HashingEmbeddings
+from utiles.rag_utiles import RubyRAG
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+SYLLABLES = ["ka", "ri", "ven", "to", "mal", "su", "dra", "pel", "ix", "or", "an", "bel", "zu", "thi", "no", "gar"]
+KINDS = ["lab", "hostel", "bus route", "course", "club", "canteen", "workshop", "library wing"]
+# (fact template, question template, value generator)
+ATTRIBUTES = [
+    ("The opening time of the {name} is {value}.", "What is the opening time of the {name}?",
+     lambda r: f"{r.randint(6, 11)}:{r.choice(['00', '15', '30', '45'])} AM"),
+    ("The contact person for the {name} is {value}.", "Who is the contact person for the {name}?",
+     lambda r: f"{r.choice(['Dr.', 'Prof.', 'Mr.', 'Ms.'])} {r.choice(['Priya', 'Arun', 'Meena', 'Karthik', 'Divya', 'Suresh'])} {r.choice('KRSMV')}"),
+    ("The {name} is located in room {value}.", "Which room is the {name} located in?",
+     lambda r: f"{r.choice('ABCD')}-{r.randint(100, 499)}"),
+    ("The fee for the {name} is Rs {value} per semester.", "What is the fee for the {name} per semester?",
+     lambda r: str(r.randrange(500, 20000, 250))),
+    ("The {name} can hold {value} people at a time.", "How many people can the {name} hold at a time?",
+     lambda r: str(r.randint(10, 400))),
+]
+FILLER = [
+    "Students should carry their identity card at all times.",
+    "Requests are processed by the department office on working days.",
+    "Changes are announced on the notice board and in the student portal.",
+    "During examinations the schedule may be revised without notice.",
+    "Please contact the help desk if the information here is out of date.",
+    "Visitors must sign the register at the entrance.",
+    "Facilities are closed on public holidays.",
+    "Feedback can be submitted through the monthly survey.",
+]
+
+
+def make_corpus(out_dir, n_docs, passages_per_doc, n_queries, seed=11):
+    """
+    Write n_docs text files of fact passages and return labeled queries.
+
+    Returns:
+        List[dict]: {"query": str, "fact": str} where fact is the sentence a relevant chunk contains.
+    """
+    rng = random.Random(seed)
+    n_entities = max(1, n_docs * passages_per_doc // 3)  # ~3 facts per entity, spread over documents
+    names = set()
+    while len(names) < n_entities:
+        words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize() for _ in range(2)]
+        names.add(f"{' '.join(words)} {rng.choice(KINDS)}")
+    names = sorted(names)
+
+    facts = []
+    os.makedirs(out_dir, exist_ok=True)
+    for d in range(n_docs):
+        passages = []
+        for _ in range(passages_per_doc):
+            name = rng.choice(names)
+            fact_tpl, question_tpl, value = rng.choice(ATTRIBUTES)
+            fact = fact_tpl.format(name=name, value=value(rng))
+            passages.append(" ".join([fact] + rng.sample(FILLER, rng.randint(2, 4))))
+            facts.append({"query": question_tpl.format(name=name), "fact": fact})
+        with open(os.path.join(out_dir, f"doc_{d:04d}.txt"), "w", encoding="utf-8") as f:
+            f.write("\n\n".join(passages) + "\n")
+
+    # A question whose answer appears twice (same name + attribute drawn again) keeps the first fact
+    unique = {}
+    for item in facts:
+        unique.setdefault(item["query"], item)
+    return rng.sample(list(unique.values()), min(n_queries, len(unique)))
+
+
+def percentiles(samples_ms):
+    values = np.asarray(samples_ms)
+    return {
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "mean": round(float(values.mean()), 3),
+    }
+
+
+def dir_size(path):
+    sizes = {}
+    for root, _, files in os.walk(path):
+        for name in files:
+            full = os.path.join(root, name)
+            sizes[os.path.relpath(full, path)] = os.path.getsize(full)
+    return sizes
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args, workdir):
+    corpus_dir = os.path.join(workdir, "corpus")
+    db_path = os.path.join(workdir, "db")
+    labeled = make_corpus(corpus_dir, args.docs, args.passages, args.queries, args.seed)
+    files = sorted(glob.glob(os.path.join(corpus_dir, "*.txt")))
+    corpus_bytes = sum(os.path.getsize(path) for path in files)
+    embeddings = HashingEmbeddings(dim=args.dim)
+
+    def open_rag():
+        # Caches sized to hold every question, so the warm pass measures hits only
+        cache_size = max(512, len(labeled))
+        return RubyRAG(
+            db_path=db_path,
+            index_type=args.index_type,
+            embeddings=embeddings,
+            query_cache_size=cache_size,
+            result_cache_size=cache_size,
+        )
+
+    # Ingestion (RubyRAG prints a line per file; keep the report readable)
+    with contextlib.redirect_stdout(io.StringIO()):
+        rag = open_rag()
+        start = time.perf_counter()
+        for path in files:
+            rag.add_documents(path)
+        ingest_s = time.perf_counter() - start
+        chunks = rag.vectorstore.count
+        index_type = rag.vectorstore.spec["type"]
+        rag.close()
+
+    sizes = dir_size(db_path)
+
+    # Cold: a freshly opened store with empty caches; warm: the same questions again (cache hits)
+    max_k = max(args.k)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        rag = open_rag()
+        open_ms = (time.perf_counter() - start) * 1000
+    cold, warm, ranks = [], [], []
+    for item in labeled:
+        start = time.perf_counter()
+        docs = rag.retrieve(item["query"], k=max_k, use_hf_rerank=False)
+        cold.append((time.perf_counter() - start) * 1000)
+        rank = next((i for i, doc in enumerate(docs, 1) if item["fact"] in doc.page_content), None)
+        ranks.append(rank)
+    for item in labeled:
+        start = time.perf_counter()
+        rag.retrieve(item["query"], k=max_k, use_hf_rerank=False)
+        warm.append((time.perf_counter() - start) * 1000)
+    rag.close()
+
+    quality = {f"recall@{k}": round(sum(1 for r in ranks if r is not None and r <= k) / len(ranks), 4) for k in args.k}
+    quality[f"mrr@{max_k}"] = round(sum(1.0 / r for r in ranks if r is not None) / len(ranks), 4)
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "config": {
+            "docs": args.docs,
+            "passages_per_doc": args.passages,
+            "queries": len(labeled),
+            "dim": args.dim,
+            "index_type": args.index_type,
+            "seed": args.seed,
+        },
+        "ingestion": {
+            "files": len(files),
+            "chunks": chunks,
+            "corpus_mb": round(corpus_bytes / 2**20, 3),
+            "seconds": round(ingest_s, 3),
+            "chunks_per_s": round(chunks / ingest_s, 1),
+            "mb_per_s": round(corpus_bytes / 2**20 / ingest_s, 3),
+        },
+        "index": {
+            "type": index_type,
+            "total_mb": round(sum(sizes.values()) / 2**20, 3),
+            "files_kb": {name: round(size / 1024, 1) for name, size in sorted(sizes.items())},
+        },
+        "latency_ms": {
+            "open": round(open_ms, 3),
+            "first_query": round(cold[0], 3),
+            "cold": percentiles(cold),
+            "warm": percentiles(warm),
+        },
+        "quality": quality,
+    }
+
+
+def latest_result(config, exclude=None):
+    """Most recent saved run with the same configuration, or None."""
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "rag_eval_*.json")), reverse=True):
+        if path == exclude:
+            continue
+        with open(path, encoding="utf-8") as f:
+            result = json.load(f)
+        if result.get("config") == config:
+            return path, result
+    return None
+
+
+def compare(current, previous):
+    """Print metric changes against an earlier run."""
+    rows = [
+        ("ingestion chunks/s", current["ingestion"]["chunks_per_s"], previous["ingestion"]["chunks_per_s"], True),
+        ("index MB", current["index"]["total_mb"], previous["index"]["total_mb"], False),
+        ("open ms", current["latency_ms"]["open"], previous["latency_ms"]["open"], False),
+        ("cold p50 ms", current["latency_ms"]["cold"]["p50"], previous["latency_ms"]["cold"]["p50"], False),
+        ("cold p99 ms", current["latency_ms"]["cold"]["p99"], previous["latency_ms"]["cold"]["p99"], False),
+        ("warm p50 ms", current["latency_ms"]["warm"]["p50"], previous["latency_ms"]["warm"]["p50"], False),
+    ]
+    rows += [(name, value, previous["quality"].get(name), True) for name, value in current["quality"].items()]
+    print(f"\nChange vs {previous['commit']} ({previous['timestamp']}):")
+    for name, now, before, higher_is_better in rows:
+        if before is None:
+            continue
+        delta = now - before
+        pct = f"{100 * delta / before:+.1f}%" if before else "n/a"
+        worse = delta < 0 if higher_is_better else delta > 0
+        flag = "  <-- worse" if worse and abs(delta) > 0.1 * abs(before) else ""
+        print(f"  {name:<20} {before:>10} -> {now:<10} {pct}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline RubyRAG evaluation and performance benchmark.")
+    parser.add_argument("--docs", type=int, default=200, help="Generated documents.")
+    parser.add_argument("--passages", type=int, default=20, help="Fact passages per document.")
+    parser.add_argument("--queries", type=int, default=500, help="Labeled questions to run.")
+    parser.add_argument("--dim", type=int, default=512, help="HashingEmbeddings dimension.")
+    parser.add_argument("--index-type", default="auto", help="RubyRAG index_type (see rag_index.INDEX_TYPES).")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 10], help="Cut-offs for recall@k.")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--workdir", default=None, help="Keep the corpus and store here (default: temp dir).")
+    parser.add_argument("--compare", default=None, help="Result JSON to compare with (default: latest same-config run).")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the result JSON.")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="rag_eval_")
+    try:
+        if os.path.exists(os.path.join(workdir, "db")):
+            shutil.rmtree(os.path.join(workdir, "db"))
+        result = run(args, workdir)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    ing, idx, lat = result["ingestion"], result["index"], result["latency_ms"]
+    print(f"Corpus: {ing['files']} files, {ing['chunks']} chunks, {ing['corpus_mb']} MB  (commit {result['commit']})")
+    print(f"Ingestion: {ing['seconds']} s  ({ing['chunks_per_s']} chunks/s, {ing['mb_per_s']} MB/s)")
+    print(f"Index: {idx['type']}, {idx['total_mb']} MB on disk")
+    print(f"Open: {lat['open']} ms, first query: {lat['first_query']} ms")
+    for name in ("cold", "warm"):
+        p = lat[name]
+        print(f"{name.capitalize():<5} query ms: p50 {p['p50']}  p95 {p['p95']}  p99 {p['p99']}  mean {p['mean']}")
+    print("Quality: " + "  ".join(f"{name} {value}" for name, value in result["quality"].items()))
+
+    saved = None
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        saved = os.path.join(RESULTS_DIR, f"rag_eval_{stamp}_{result['commit']}.json")
+        with open(saved, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nSaved {saved}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(result, json.load(f))
+    else:
+        previous = latest_result(result["config"], exclude=saved)
+        if previous:
+            compare(result, previous[1])
+
+
+if __name__ == "__main__":
+    main()
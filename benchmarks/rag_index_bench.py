@@ -0,0 +1,94 @@
+# Benchmark of the RubyRAG index tiers on synthetic vectors.
+#
+# Usage:
+#   python benchmarks/rag_index_bench.py                      # 10k / 100k / 1M, dim 128
+#   python benchmarks/rag_index_bench.py --sizes 10000 --dim 768 --types flat hnsw ivf_sq8
+#
+# For every corpus size it reports, per index type: memory (serialized index size),
+# build time (train + add), p50/p99 single-query latency and recall@k against exact search.
+import argparse
+import json
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles import rag_index
+
+
+def make_corpus(n, dim, n_queries, seed=7):
+    """Clustered gaussian vectors (closer to real embeddings than uniform noise)."""
+    rng = np.random.default_rng(seed)
+    n_clusters = max(8, int(np.sqrt(n)))
+    centers = rng.normal(size=(n_clusters, dim)).astype("float32")
+    labels = rng.integers(0, n_clusters, size=n)
+    vectors = centers[labels] + 0.35 * rng.normal(size=(n, dim)).astype("float32")
+    picks = rng.integers(0, n, size=n_queries)
+    queries = vectors[picks] + 0.1 * rng.normal(size=(n_queries, dim)).astype("float32")
+    return np.ascontiguousarray(vectors, dtype="float32"), np.ascontiguousarray(queries, dtype="float32")
+
+
+def bench_type(vectors, queries, truth, index_type, k):
+    spec = rag_index.choose_index_spec(len(vectors), vectors.shape[1], index_type)
+    start = time.perf_counter()
+    index = rag_index.build_index(vectors, spec)
+    index.add(vectors)
+    build_s = time.perf_counter() - start
+
+    latencies = []
+    found = []
+    threads = faiss.omp_get_max_threads()
+    faiss.omp_set_num_threads(1)  # single-query latency, not batch throughput
+    for q in queries:
+        t0 = time.perf_counter()
+        _, ids = index.search(q[None, :], k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        found.append(ids[0])
+    faiss.omp_set_num_threads(threads)
+    recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+
+    return {
+        "type": spec["type"],
+        "factory": spec["factory"],
+        "memory_mb": round(len(faiss.serialize_index(index)) / 1e6, 2),
+        "build_s": round(build_s, 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        f"recall@{k}": round(float(recall), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RubyRAG index tiers on synthetic vectors.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", default=["flat", "auto"], choices=rag_index.INDEX_TYPES)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.sizes:
+        vectors, queries = make_corpus(n, args.dim, args.queries)
+        _, truth = faiss.knn(queries, vectors, args.k)
+        for index_type in args.types:
+            row = {"n": n, "dim": args.dim, **bench_type(vectors, queries, truth, index_type, args.k)}
+            results.append(row)
+            print(
+                f"{n:>9,} {row['type']:<8} {row['factory']:<16} mem {row['memory_mb']:>9.2f} MB  "
+                f"build {row['build_s']:>8.2f} s  p50 {row['p50_ms']:>7.3f} ms  "
+                f"p99 {row['p99_ms']:>7.3f} ms  recall@{args.k} {row[f'recall@{args.k}']:.3f}"
+            )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# Peak memory of RubyRAG PDF ingestion: whole-file load vs the streaming pipeline.
+#
+# Usage:
+#   python benchmarks/rag_ingest_memory.py                    # 2000-page generated PDF
+#   python benchmarks/rag_ingest_memory.py --pages 500 --chars 4000
+#
+# A plain-text PDF is generated by hand (no PDF library needed), then each mode runs in
+# its own process so peak RSS is not shared between them:
+#   load    the old path: PyPDFLoader.load() -> split everything -> embed everything -> add
+#   stream  RubyRAG.add_documents: page by page, bounded batches, one save at the end
+# Embeddings come from the offline HashingEmbeddings.
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+WORDS = (
+    "student attendance laboratory semester examination department project internship bus route "
+    "timetable hostel library course credits assessment marks faculty schedule workshop canteen "
+    "notice portal register identity card holiday survey advisor syllabus elective practical"
+).split()
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages, chars_per_page, seed=5):
+    """Write an uncompressed PDF with `pages` pages of random prose (Helvetica, 90-char lines)."""
+    rng = random.Random(seed)
+    offsets = []
+    with open(path, "wb") as f:
+        def obj(num, body):
+            offsets.append((num, f.tell()))
+            f.write(f"{num} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        font_id, pages_id = 3, 2
+        page_ids = [4 + 2 * i for i in range(pages)]
+        obj(1, f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode())
+        kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+        obj(pages_id, f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+        obj(font_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        for i, pid in enumerate(page_ids):
+            text = f"Page {i + 1}. " + " ".join(rng.choice(WORDS) for _ in range(chars_per_page // 8))
+            lines = [text[j:j + 90] for j in range(0, len(text), 90)]
+            stream = "BT /F1 9 Tf 11 TL 40 800 Td " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+            obj(pid, (f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 595 842] "
+                      f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {pid + 1} 0 R >>").encode())
+            obj(pid + 1, f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+        xref = f.tell()
+        offsets.sort()
+        f.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+        for _, offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def run_mode(mode, pdf_path, db_path):
+    """Ingest pdf_path once in this process and return its measurements."""
+    import numpy as np
+    from langchain_community.document_loaders import PyPDFLoader
+    from utiles import rag_index
+    from utiles.rag_embeddings import HashingEmbeddings
+    from utiles.rag_store import RagStore
+    from utiles.rag_utiles import RubyRAG
+
+    rag = RubyRAG(db_path=db_path, embeddings=HashingEmbeddings())
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "load":
+        docs = rag.text_splitter.split_documents(PyPDFLoader(pdf_path).load())
+        vectors = np.asarray(rag.embedding_model.embed_documents([d.page_content for d in docs]), dtype="float32")
+        store = RagStore.create(db_path, rag_index.choose_index_spec(len(vectors), vectors.shape[1]))
+        store.add(vectors, docs)
+        chunks = store.count
+        store.close()
+    else:
+        rag.add_documents(pdf_path)
+        chunks = rag.vectorstore.count
+    seconds = time.perf_counter() - start
+    rag.close()
+    return {
+        "mode": mode,
+        "chunks": chunks,
+        "seconds": round(seconds, 2),
+        "baseline_mb": round(baseline, 1),
+        "peak_mb": round(peak_rss_mb(), 1),
+        "growth_mb": round(peak_rss_mb() - baseline, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of RubyRAG PDF ingestion.")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--chars", type=int, default=3000, help="Approximate characters per page.")
+    parser.add_argument("--modes", nargs="+", default=["load", "stream"], choices=["load", "stream"])
+    parser.add_argument("--run", nargs=3, metavar=("MODE", "PDF", "DB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        import contextlib
+        with contextlib.redirect_stdout(sys.stderr):
+            result = run_mode(*args.run)
+        print(json.dumps(result))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="rag_ingest_")
+    try:
+        pdf_path = os.path.join(workdir, "manual.pdf")
+        write_pdf(pdf_path, args.pages, args.chars)
+        print(f"Generated {args.pages}-page PDF ({os.path.getsize(pdf_path) / 2**20:.1f} MB)\n")
+        print(f"{'mode':<8}{'chunks':>8}{'seconds':>9}{'baseline MB':>13}{'peak MB':>9}{'growth MB':>11}")
+        for mode in args.modes:
+            db_path = os.path.join(workdir, f"db_{mode}")
+            out = subprocess.run(
+                [sys.executable, __file__, "--run", mode, pdf_path, db_path],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{r['mode']:<8}{r['chunks']:>8}{r['seconds']:>9}{r['baseline_mb']:>13}{r['peak_mb']:>9}{r['growth_mb']:>11}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
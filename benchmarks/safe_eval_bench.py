@@ -0,0 +1,91 @@
+# Calculator throughput: eval() (the old calculator) vs utiles/safe_eval.py.
+#
+# Usage:
+#   python benchmarks/safe_eval_bench.py [--count 20000] [--repeat 0.5]
+#
+# 1. A batch of generated expressions (arithmetic, powers, functions), where a
+#    --repeat fraction repeats earlier ones, as a conversation does. The
+#    evaluator is measured cold (new compile cache) and warm (same batch again).
+# 2. Aggregates over one 10,000-number list literal: eval() with Python's sum
+#    and a hand-written mean, vs the evaluator's numpy sum/mean/std.
+# Results that differ from eval() are counted (none expected beyond float rounding).
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.safe_eval import SafeEvaluator
+
+TEMPLATES = [
+    "{a} + {b} * {c}",
+    "({a} - {b}) / {c}",
+    "{a} ** 2 + {b} ** 2",
+    "sqrt({a}) * {c}",
+    "{a} * ({b} + {c}) - {a} // {c}",
+    "round({a} / {c}, 2)",
+    "log({a}) + sin({b})",
+    "{a} % {c} + {b}",
+]
+# Python names the old eval() needed for the function templates
+LEGACY_GLOBALS = {"sqrt": math.sqrt, "log": math.log, "sin": math.sin}
+
+
+def make_batch(count: int, repeat: float, seed: int = 7):
+    rng = random.Random(seed)
+    batch = []
+    for _ in range(count):
+        if batch and rng.random() < repeat:
+            batch.append(rng.choice(batch))
+        else:
+            batch.append(rng.choice(TEMPLATES).format(a=rng.randint(1, 9999), b=rng.randint(1, 999), c=rng.randint(1, 99)))
+    return batch
+
+
+def timed(fn, batch):
+    start = time.perf_counter()
+    results = [fn(expression) for expression in batch]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=20000, help="Expressions in the batch")
+    parser.add_argument("--repeat", type=float, default=0.5, help="Fraction of repeated expressions")
+    args = parser.parse_args()
+
+    batch = make_batch(args.count, args.repeat)
+    evaluator = SafeEvaluator(cache_entries=args.count)
+    legacy_time, legacy = timed(lambda e: eval(e, dict(LEGACY_GLOBALS)), batch)
+    cold_time, cold = timed(evaluator.evaluate, batch)
+    warm_time, _ = timed(evaluator.evaluate, batch)
+    mismatches = sum(not math.isclose(a, b, rel_tol=1e-9) for a, b in zip(legacy, cold))
+    print(f"Batch of {len(batch):,} expressions ({args.repeat:.0%} repeats, {len(set(batch)):,} distinct)")
+    for name, seconds in (("eval()", legacy_time), ("safe, cold cache", cold_time), ("safe, warm cache", warm_time)):
+        print(f"  {name:18}{seconds * 1000:>9.1f} ms  {len(batch) / seconds:>12,.0f} expr/s")
+    print(f"  results differing from eval(): {mismatches}")
+
+    numbers = [random.Random(1).uniform(0, 1000) for _ in range(10000)]
+    literal = "[" + ", ".join(f"{n:.3f}" for n in numbers) + "]"
+    print(f"\nAggregates over a {len(numbers):,}-number list ({len(literal) / 1024:.0f} KB of text), 20 runs each:")
+    cases = [
+        ("sum, eval()", lambda: eval(f"sum({literal})")),
+        ("mean, eval()", lambda: eval(f"sum({literal}) / len({literal})", {"len": len, "sum": sum})),
+        ("sum, safe cold", lambda: SafeEvaluator().evaluate(f"sum({literal})")),
+        ("sum, safe warm", lambda: evaluator.evaluate(f"sum({literal})")),
+        ("mean, safe warm", lambda: evaluator.evaluate(f"mean({literal})")),
+        ("std, safe warm", lambda: evaluator.evaluate(f"std({literal})")),
+    ]
+    for name, fn in cases:
+        fn()
+        start = time.perf_counter()
+        for _ in range(20):
+            fn()
+        print(f"  {name:18}{(time.perf_counter() - start) / 20 * 1000:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
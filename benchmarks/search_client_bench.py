@@ -0,0 +1,73 @@
+# Latency and request count of web searches, before and after the shared SearchClient.
+#
+# Usage:
+#   python benchmarks/search_client_bench.py [--latency 0.4]
+#
+# No network: both sides answer from the recorded responses in
+# test/fixtures/search_responses.json, and every backend request sleeps
+# --latency seconds in place of the round trip to DuckDuckGo.
+#   before  one request per web_search call, one call after another (what the
+#           model did for a comparison), nothing cached
+#   after   the comparison as one multi_search (queries run at once), then the
+#           same session again with results cached
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.search_client import RateLimiter, RecordedBackend, SearchClient
+
+RECORDING = os.path.join(os.path.dirname(__file__), "..", "test", "fixtures", "search_responses.json")
+# One conversation: a comparison, a fact, a repeat of the comparison's first query and the weather
+SESSION = [
+    ["iphone 15 price in india", "pixel 8 price in india", "galaxy s24 price in india"],
+    ["who won the world cup in 2011"],
+    ["iPhone 15 price in India"],
+    ["chennai weather today"],
+]
+
+
+def run_before(latency: float):
+    backend = RecordedBackend(RECORDING, latency=latency)
+    start = time.perf_counter()
+    for turn in SESSION:
+        for query in turn:
+            backend.text(query, 4)
+    return time.perf_counter() - start, len(backend.calls)
+
+
+def run_after(client: SearchClient):
+    start = time.perf_counter()
+    for turn in SESSION:
+        if len(turn) > 1:
+            client.multi_search(turn, max_results=4)
+        else:
+            client.text(turn[0], max_results=4)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.4, help="Simulated seconds per DuckDuckGo request")
+    args = parser.parse_args()
+
+    before, before_requests = run_before(args.latency)
+    backend = RecordedBackend(RECORDING, latency=args.latency)
+    # The default rate limit (2/s, burst 4) is kept: it is part of the cost
+    client = SearchClient(backend=backend, limiter=RateLimiter())
+    cold = run_after(client)
+    cold_requests = len(backend.calls)
+    warm = run_after(client)
+
+    print(f"Simulated request latency: {args.latency * 1000:.0f} ms, {sum(len(t) for t in SESSION)} searches")
+    print(f"{'':24}{'time':>10}{'requests':>10}")
+    print(f"{'before (sequential)':24}{before:>9.2f}s{before_requests:>10}")
+    print(f"{'after, cold cache':24}{cold:>9.2f}s{cold_requests:>10}")
+    print(f"{'after, warm cache':24}{warm:>9.2f}s{len(backend.calls) - cold_requests:>10}")
+    print(f"Rate limiter waited {client.limiter.waited:.2f}s; cache: {client.stats()['text_cache']}")
+
+
+if __name__ == "__main__":
+    main()
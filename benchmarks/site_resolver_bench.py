@@ -0,0 +1,119 @@
+# Speed and decisions of web_navigation's site resolution (utiles/site_resolver.py).
+#
+# Usage:
+#   python benchmarks/site_resolver_bench.py
+#
+# Times compiling the sites config and resolving a set of requests (matching plus
+# URL building, Chrome is never launched), next to the previous implementation,
+# which rebuilt its mapping and walked a chain of substring checks on every call.
+# Requests where the two disagree are listed.
+import os
+import sys
+import time
+import urllib.parse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.site_resolver import SiteResolver
+
+REQUESTS = [
+    ("amazon", "laptop"), ("flipkart", ""), ("youtube", "lofi beats"), ("book a bus ticket", ""),
+    ("book train ticket", ""), ("google book train ticket", ""), ("book movie tickets", ""),
+    ("book a hotel", "ooty"), ("buy clothes", ""), ("shop", "shoes"), ("watch video", ""),
+    ("search", "python tutorials"), ("gold rate", ""), ("official", "anna university"),
+    ("facebook", ""), ("wikipedia", "chennai"), ("maps", "marina beach"), ("github", ""),
+    ("youtube.com", ""), ("ரயில் டிக்கெட் முன்பதிவு", ""), ("thangam vilai", ""), ("துணி வாங்க", ""),
+    ("perunthu tiket", ""), ("insta", "travel"), ("google maps", "ooty"), ("search on amazon", "earbuds"),
+    ("myntra shopping", "kurta"),
+]
+
+
+def legacy_resolve(site_name: str, search_query: str = "") -> str:
+    """URL chosen by the previous web_navigation (without opening it)."""
+    encoded_query = urllib.parse.quote(search_query) if search_query else ""
+    mapping = {
+        "redbus": {"base": "https://www.redbus.in", "search": "https://www.google.com/search?q=redbus+"},
+        "chatgpt": {"base": "https://chatgpt.com", "search": "https://chatgpt.com"},
+        "whatsapp": {"base": "https://web.whatsapp.com", "search": "https://web.whatsapp.com"},
+        "instagram": {"base": "https://www.instagram.com", "search": "https://www.instagram.com/explore/tags/"},
+        "irctc": {"base": "https://www.irctc.co.in", "search": "https://www.google.com/search?q=irctc+"},
+        "gemini": {"base": "https://gemini.google.com", "search": "https://gemini.google.com"},
+        "maps": {"base": "https://www.google.com/maps", "search": "https://www.google.com/maps/search/"},
+        "linkedin": {"base": "https://www.linkedin.com", "search": "https://www.linkedin.com/search/results/all/?keywords="},
+        "amazon": {"base": "https://www.amazon.in", "search": "https://www.amazon.in/s?k="},
+        "flipkart": {"base": "https://www.flipkart.com", "search": "https://www.flipkart.com/search?q="},
+        "spotify": {"base": "https://open.spotify.com", "search": "https://open.spotify.com/search/"},
+        "wikipedia": {"base": "https://www.wikipedia.org", "search": "https://en.wikipedia.org/wiki/"},
+        "college": {"base": "https://www.google.com/search?q=official+college+website", "search": "https://www.google.com/search?q="},
+        "makemytrip": {"base": "https://www.makemytrip.com", "search": "https://www.makemytrip.com/hotels/hotel-listing/?city="},
+        "bookmyshow": {"base": "https://in.bookmyshow.com", "search": "https://in.bookmyshow.com/explore/movies-"},
+        "myntra": {"base": "https://www.myntra.com", "search": "https://www.myntra.com/"},
+        "google": {"base": "https://www.google.com", "search": "https://www.google.com/search?q="},
+        "youtube": {"base": "https://www.youtube.com", "search": "https://www.youtube.com/results?search_query="},
+        "facebook": {"base": "https://www.facebook.com", "search": "https://www.facebook.com/search/top/?q="},
+        "twitter": {"base": "https://www.twitter.com", "search": "https://twitter.com/search?q="},
+        "reddit": {"base": "https://www.reddit.com", "search": "https://www.reddit.com/search/?q="},
+    }
+    clean_site = site_name.lower().strip()
+    if "." in clean_site and " " not in clean_site:
+        return clean_site if clean_site.startswith(("http://", "https://")) else f"https://{clean_site}"
+    if "ticket" in clean_site or "book" in clean_site:
+        if "bus" in clean_site: clean_site = "redbus"
+        elif "train" in clean_site: clean_site = "irctc"
+        elif "movie" in clean_site: clean_site = "bookmyshow"
+        elif "hotel" in clean_site or "flight" in clean_site: clean_site = "makemytrip"
+    if "product" in clean_site or "shop" in clean_site or "buy" in clean_site:
+        if "cloth" in clean_site: clean_site = "myntra"
+        elif "flipkart" in clean_site: clean_site = "flipkart"
+        else: clean_site = "amazon"
+    if "search" in clean_site or "find" in clean_site or "google" in clean_site:
+        clean_site = "google"
+    if "video" in clean_site or "watch" in clean_site:
+        clean_site = "youtube"
+    is_official_request = "official" in clean_site or "official" in search_query.lower()
+    is_rate_request = any(k in clean_site or k in search_query.lower() for k in ["gold", "silver", "rate", "price"])
+    if is_official_request and clean_site not in mapping:
+        search_term = f"{site_name} {search_query}".strip()
+        if "official website" not in search_term.lower():
+            search_term += " official website"
+        return f"https://www.google.com/search?q={urllib.parse.quote(search_term)}"
+    if is_rate_request and clean_site not in mapping:
+        search_term = f"{site_name} {search_query}".strip()
+        if "today" not in search_term.lower():
+            search_term += " rate today"
+        return f"https://www.google.com/search?q={urllib.parse.quote(search_term)}"
+    config = mapping.get(clean_site)
+    if config:
+        return f"{config['search']}{encoded_query}" if search_query else config["base"]
+    search_term = f"{search_query} on {site_name}" if search_query else site_name
+    return f"https://www.google.com/search?q={urllib.parse.quote(search_term)}"
+
+
+def time_per_call(fn, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for site_name, query in REQUESTS:
+            fn(site_name, query)
+    return (time.perf_counter() - start) / (repeat * len(REQUESTS)) * 1e6
+
+
+def main():
+    start = time.perf_counter()
+    resolver = SiteResolver()
+    compile_ms = (time.perf_counter() - start) * 1000
+    print(f"Compiled {len(resolver.sites)} sites and {len(resolver._term_index)} terms in {compile_ms:.2f} ms")
+
+    legacy_us = time_per_call(legacy_resolve)
+    resolver_us = time_per_call(lambda s, q: resolver.resolve(s, q))
+    print(f"Per request: legacy {legacy_us:.1f} us, resolver {resolver_us:.1f} us")
+
+    print("\nDecisions that changed:")
+    for site_name, query in REQUESTS:
+        old, decision = legacy_resolve(site_name, query), resolver.resolve(site_name, query)
+        if old != decision["url"]:
+            label = f"{site_name!r} + {query!r}" if query else repr(site_name)
+            print(f"  {label:40} {old}\n  {'':40} -> {decision['url']}  ({decision['kind']}, {decision['score']:.2f})")
+
+
+if __name__ == "__main__":
+    main()
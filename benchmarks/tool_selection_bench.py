@@ -0,0 +1,149 @@
+# Prompt size and accuracy of per-turn tool pre-selection (utiles/tool_selector.py).
+#
+# Usage:
+#   python benchmarks/tool_selection_bench.py
+#   python benchmarks/tool_selection_bench.py --live 10     # also time real brain calls (needs an API key)
+#
+# For each labeled utterance it compares the tool schemas sent with all tools vs the
+# selected ones (tokens estimated at ~4 characters each, the schemas are what the
+# brain serializes into the request), checks the expected tool was kept, and times
+# the selection itself. --live sends the first N utterances to the configured brain
+# both ways and reports the end-to-end latency.
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.api_brain import tools_to_schemas
+from utiles.classifier import RubyIntentClassifier
+from utiles.rag_context import estimate_tokens
+from utiles.tool_selector import ToolSelector
+
+# (utterance, tools any of which should be offered; () for small talk)
+LABELED = [
+    ("play believer song on youtube", ("youtube_video_player",)),
+    ("put on some relaxing music", ("youtube_video_player", "web_navigation")),
+    ("what's the latest news in india", ("get_latest_news", "web_search")),
+    ("who won the world cup in 2011", ("web_search",)),
+    ("what is 234 times 17", ("calculator",)),
+    ("calculate 18 percent of 4500", ("calculator",)),
+    ("what does the manual say about attendance", ("query_document",)),
+    ("turn on the led on the arduino", ("arduino_serial_communication",)),
+    ("where am i right now", ("get_current_location",)),
+    ("open notepad", ("open_system_app",)),
+    ("launch visual studio code", ("open_system_app",)),
+    ("close spotify", ("close_application",)),
+    ("kill the chrome process", ("close_application",)),
+    ("increase the volume", ("system_control", "pc_automation")),
+    ("set brightness to 40", ("system_control", "pc_automation")),
+    ("which windows are open", ("list_open_windows",)),
+    ("what am i watching in chrome", ("get_chrome_activity",)),
+    ("how much battery do i have", ("get_system_health",)),
+    ("is the cpu usage high", ("get_system_health",)),
+    ("run git status in the terminal", ("run_terminal_command",)),
+    ("list the files in my downloads folder", ("file_operation",)),
+    ("copy notes.txt to the desktop", ("file_operation",)),
+    ("find my resume pdf", ("file_search",)),
+    ("will it rain in chennai today", ("get_weather",)),
+    ("weather in coimbatore", ("get_weather",)),
+    ("lock my computer", ("pc_automation",)),
+    ("take a screenshot", ("pc_automation",)),
+    ("switch to tamil", ("switch_language",)),
+    ("what languages do you know", ("get_available_languages",)),
+    ("what apps do i use the most", ("get_frequently_used",)),
+    ("open youtube.com", ("web_navigation",)),
+    ("search amazon for wireless earbuds", ("web_navigation", "web_search")),
+    ("go to github", ("web_navigation",)),
+    ("hello ruby", ()),
+    ("thank you so much", ()),
+    ("how are you doing today", ()),
+    ("tell me something interesting about octopuses", ("web_search",)),
+]
+
+
+def load_tools():
+    """Ruby's default tool list (as in Ruby.__init__), built without a Ruby instance."""
+    from utiles.ruby_tools import (
+        YouTubeVideoPlayerTool, GetAvailableLanguagesTool, SwitchLanguageTool, GetLatestNewsTool, DuckDuckGoSearchTool,
+    )
+    from utiles.toolbox import calculator, query_document, arduino_serial_communication
+    from utiles.pc_tools import (
+        get_current_location, list_open_windows, open_system_app, system_control, web_navigation,
+        get_system_health, get_system_trend, get_top_processes, run_terminal_command, record_user_activity,
+        get_frequently_used, close_application, pc_automation, file_operation, file_search, get_weather, get_chrome_activity,
+    )
+    return [
+        YouTubeVideoPlayerTool(None), GetAvailableLanguagesTool(None), SwitchLanguageTool(None),
+        GetLatestNewsTool(), DuckDuckGoSearchTool(), calculator, query_document, arduino_serial_communication,
+        get_current_location, list_open_windows, open_system_app, system_control, web_navigation,
+        get_system_health, get_system_trend, get_top_processes, run_terminal_command, record_user_activity,
+        get_frequently_used, close_application, pc_automation, file_operation, file_search, get_weather, get_chrome_activity,
+    ]
+
+
+def schema_tokens(tools):
+    return estimate_tokens(json.dumps(tools_to_schemas(tools)))
+
+
+def live(tools, selector, utterances):
+    from langchain_core.messages import HumanMessage, SystemMessage
+    from utiles.api_brain import get_brain
+    from utiles.prompt import system_prompt
+    brain = get_brain()
+    timings = {"all": [], "selected": []}
+    for text in utterances:
+        messages = [SystemMessage(content=system_prompt), HumanMessage(content=text)]
+        selector.reset()
+        for mode, offered in (("all", tools), ("selected", selector.select(text))):
+            start = time.perf_counter()
+            brain.invoke({"messages": messages, "tools": offered})
+            timings[mode].append(time.perf_counter() - start)
+    for mode, values in timings.items():
+        print(f"  live {mode:<9} p50 {np.percentile(values, 50):.2f} s  mean {np.mean(values):.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tool pre-selection.")
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--live", type=int, default=0, help="Utterances to send to the real brain.")
+    args = parser.parse_args()
+
+    try:
+        tools = load_tools()
+    except ImportError as e:
+        sys.exit(f"Could not import Ruby's tools ({e}); install the requirements for this platform first.")
+    classifier = RubyIntentClassifier(onnx_dir="/nonexistent")  # fallback model unless transformers is installed
+    selector = ToolSelector(tools, top_n=args.top_n, classifier=classifier)
+    all_tokens = schema_tokens(tools)
+
+    sent_tokens, sent_counts, latencies, hits, fallbacks = [], [], [], 0, 0
+    for text, expected in LABELED:
+        selector.reset()  # each utterance starts a conversation
+        selected = selector.select(text)
+        info = selector.last_selection
+        names = set(info["tools"])
+        ok = not expected or bool(names & set(expected))
+        hits += ok
+        fallbacks += info["fallback"]
+        sent_tokens.append(schema_tokens(selected))
+        sent_counts.append(len(selected))
+        latencies.append(info["ms"])
+        mark = "ok  " if ok else "MISS"
+        print(f"{mark} {len(selected):>2} tools  {info['intent']:<15} {text}")
+
+    print(f"\nUtterances: {len(LABELED)}, tools available: {len(tools)} ({all_tokens} schema tokens)")
+    print(f"Tools sent: mean {np.mean(sent_counts):.1f}, schema tokens mean {np.mean(sent_tokens):.0f} "
+          f"({100 * (1 - np.mean(sent_tokens) / all_tokens):.1f}% fewer)")
+    print(f"Expected tool offered: {hits}/{len(LABELED)}, full-set fallbacks: {fallbacks}")
+    print(f"Selection latency: p50 {np.percentile(latencies, 50):.2f} ms, p99 {np.percentile(latencies, 99):.2f} ms")
+    if args.live:
+        live(tools, selector, [text for text, _ in LABELED[:args.live]])
+
+
+if __name__ == "__main__":
+    main()
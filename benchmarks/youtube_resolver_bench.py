@@ -0,0 +1,106 @@
+# youtube_video_player lookup cost, before and after utiles/youtube_resolver.py.
+#
+# Usage:
+#   python benchmarks/youtube_resolver_bench.py [--full 2.0] [--flat 0.5]
+#
+# Part 1 measures what can be measured offline: building a yt_dlp.YoutubeDL with
+# the tool's old options, which the old code did on every request.
+#
+# Part 2 replays a session of play requests against RecordedExtractor
+# (test/fixtures/youtube_search.json). Network time is simulated:
+#   --full  one "ytsearch1" extraction with formats resolved (old code)
+#   --flat  one flat "ytsearch5" extraction (resolver)
+# Three cases are compared:
+#   before    new extractor, full extraction for every request
+#   after     one extractor, flat search, cached repeats
+#   prefetch  as after, with the search started when the request is heard
+#             and a confirmation round trip of --confirm seconds before the tool call
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.youtube_resolver import FLAT_OPTIONS, RecordedExtractor, YouTubeResolver
+
+RECORDING = os.path.join(os.path.dirname(__file__), "..", "test", "fixtures", "youtube_search.json")
+# The old tool's options
+LEGACY_OPTIONS = {
+    "quiet": True, "default_search": "ytsearch1", "format": "best[ext=mp4]/best", "noplaylist": True,
+    "skip_download": True, "extract_flat": False, "js_runtimes": {"node": {}},
+    "youtube_include_dash_manifest": False, "extractor_args": {"youtube": {"player_client": ["android"]}},
+    "no_warnings": True,
+}
+# (what the user said, what the model passed to the tool)
+SESSION = [
+    ("play believer song", "Believer"),
+    ("play some lofi beats", "lofi beats"),
+    ("play arabic kuthu", "Arabic Kuthu"),
+    ("play believer again", "believer"),
+    ("python tutorial for beginners video", "python tutorial for beginners"),
+    ("play vaathi coming", "Vaathi Coming"),
+    ("play arabic kuthu once more", "arabic kuthu"),
+]
+
+
+def construct_cost(repeat: int = 20) -> float:
+    import yt_dlp
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with yt_dlp.YoutubeDL(LEGACY_OPTIONS):
+            pass
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_before(args) -> list:
+    times = []
+    for _, query in SESSION:
+        start = time.perf_counter()
+        extractor = RecordedExtractor(RECORDING, params=LEGACY_OPTIONS, init_cost=args.init,
+                                      full_latency=args.full)
+        info = extractor.extract_info(f"ytsearch1:{query}", download=False)
+        info["entries"][0]["original_url"]
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_after(args, prefetch: bool) -> list:
+    resolver = YouTubeResolver(extractor_factory=lambda: RecordedExtractor(
+        RECORDING, params=FLAT_OPTIONS, init_cost=args.init, flat_latency=args.flat))
+    times = []
+    for heard, query in SESSION:
+        if prefetch:
+            resolver.prefetch([heard])
+            time.sleep(args.confirm)  # the model asks "shall I play it?"
+        start = time.perf_counter()
+        resolver.resolve(query)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--init", type=float, default=None, help="Extractor construction seconds (default: measured)")
+    parser.add_argument("--full", type=float, default=2.0, help="Simulated full extraction seconds")
+    parser.add_argument("--flat", type=float, default=0.5, help="Simulated flat search seconds")
+    parser.add_argument("--confirm", type=float, default=1.0, help="Seconds between the request and the tool call")
+    args = parser.parse_args()
+
+    measured = construct_cost()
+    print(f"yt_dlp.YoutubeDL construction (measured, median of 20): {measured * 1000:.1f} ms")
+    if args.init is None:
+        args.init = measured
+    print(f"Simulated: full extraction {args.full:.2f}s, flat search {args.flat:.2f}s, "
+          f"confirmation {args.confirm:.2f}s, {len(SESSION)} requests")
+    print(f"{'':12}{'total':>9}{'median':>9}{'max':>9}  (time inside the tool call)")
+    for name, times in (("before", run_before(args)), ("after", run_after(args, False)),
+                        ("prefetch", run_after(args, True))):
+        print(f"{name:12}{sum(times):>8.2f}s{statistics.median(times):>8.2f}s{max(times):>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+// Ruby tab telemetry: pushes tab/URL/media-state deltas to the Ruby server over one
+// WebSocket (ws://127.0.0.1:5001/ws/tabs). Protocol: see utiles/tab_state.py.
+//
+// On connect (and whenever the server asks with {"type": "resync"}) a full snapshot
+// is sent; after that only deltas, numbered by seq so the server can spot a gap.
+
+const RUBY_URL = 'ws://127.0.0.1:5001/ws/tabs';
+const PING_MS = 20000;          // keeps the service worker and the socket alive
+const MAX_BACKOFF_MS = 30000;
+
+let socket = null;
+let seq = 0;
+let backoff = 1000;
+let pingTimer = null;
+
+function tabInfo(tab) {
+    return {
+        tab_id: tab.id,
+        window_id: tab.windowId,
+        url: tab.url || tab.pendingUrl || '',
+        title: tab.title || '',
+        active: tab.active,
+        audible: !!tab.audible,
+        muted: !!(tab.mutedInfo && tab.mutedInfo.muted),
+    };
+}
+
+function setStatus(connected) {
+    chrome.storage.local.set({ rubyConnected: connected });
+}
+
+function send(message) {
+    if (!socket || socket.readyState !== WebSocket.OPEN) {
+        return false;
+    }
+    socket.send(JSON.stringify(message));
+    return true;
+}
+
+function sendDelta(message) {
+    // Deltas sent while disconnected are dropped; the snapshot on reconnect covers them
+    if (socket && socket.readyState === WebSocket.OPEN) {
+        seq += 1;
+        send({ ...message, seq });
+    }
+}
+
+async function sendSnapshot() {
+    const tabs = await chrome.tabs.query({});
+    seq += 1;
+    send({ type: 'snapshot', seq, tabs: tabs.map(tabInfo) });
+}
+
+function connect() {
+    if (socket && (socket.readyState === WebSocket.OPEN || socket.readyState === WebSocket.CONNECTING)) {
+        return;
+    }
+    socket = new WebSocket(RUBY_URL);
+
+    socket.onopen = () => {
+        backoff = 1000;
+        setStatus(true);
+        clearInterval(pingTimer);
+        pingTimer = setInterval(() => send({ type: 'ping' }), PING_MS);
+    };
+
+    socket.onmessage = (event) => {
+        let message;
+        try {
+            message = JSON.parse(event.data);
+        } catch (e) {
+            return;
+        }
+        if (message.type === 'resync') {
+            sendSnapshot();
+        }
+    };
+
+    socket.onclose = () => {
+        setStatus(false);
+        clearInterval(pingTimer);
+        socket = null;
+        setTimeout(connect, backoff);
+        backoff = Math.min(backoff * 2, MAX_BACKOFF_MS);
+    };
+
+    socket.onerror = () => {
+        // onclose follows and schedules the reconnect
+    };
+}
+
+chrome.tabs.onCreated.addListener((tab) => sendDelta({ type: 'upsert', tab: tabInfo(tab) }));
+
+chrome.tabs.onUpdated.addListener((tabId, changeInfo, tab) => {
+    if ('url' in changeInfo || 'title' in changeInfo || 'audible' in changeInfo || 'mutedInfo' in changeInfo) {
+        sendDelta({ type: 'upsert', tab: tabInfo(tab) });
+    }
+});
+
+chrome.tabs.onRemoved.addListener((tabId) => sendDelta({ type: 'remove', tab_id: tabId }));
+
+chrome.tabs.onActivated.addListener(({ tabId, windowId }) => {
+    sendDelta({ type: 'activate', tab_id: tabId, window_id: windowId });
+});
+
+chrome.tabs.onReplaced.addListener((addedTabId, removedTabId) => {
+    sendDelta({ type: 'remove', tab_id: removedTabId });
+    chrome.tabs.get(addedTabId).then((tab) => sendDelta({ type: 'upsert', tab: tabInfo(tab) }));
+});
+
+// Play/pause state reported by media.js in each page
+chrome.runtime.onMessage.addListener((message, sender) => {
+    if (message && message.type === 'media' && sender.tab) {
+        sendDelta({ type: 'media', tab_id: sender.tab.id, media: message.media });
+    }
+});
+
+chrome.runtime.onStartup.addListener(connect);
+chrome.runtime.onInstalled.addListener(connect);
+connect();
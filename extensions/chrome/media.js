@@ -0,0 +1,36 @@
+// Reports play/pause of <video>/<audio> elements on the page to background.js,
+// with the Media Session title when the site sets one (YouTube, Spotify, Hotstar...).
+
+(() => {
+    let last = '';
+
+    function report(element) {
+        const metadata = navigator.mediaSession && navigator.mediaSession.metadata;
+        const media = {
+            playing: !element.paused && !element.ended,
+            paused: element.paused && !element.ended && element.currentTime > 0,
+            title: (metadata && metadata.title) || document.title,
+            artist: (metadata && metadata.artist) || '',
+            kind: element.tagName.toLowerCase(),
+        };
+        const key = JSON.stringify(media);
+        if (key === last) {
+            return;
+        }
+        last = key;
+        try {
+            chrome.runtime.sendMessage({ type: 'media', media });
+        } catch (e) {
+            // Extension reloaded; this page's script is orphaned
+        }
+    }
+
+    // Media events don't bubble, so listen in the capture phase
+    for (const name of ['play', 'playing', 'pause', 'ended', 'emptied']) {
+        document.addEventListener(name, (event) => {
+            if (event.target instanceof HTMLMediaElement) {
+                report(event.target);
+            }
+        }, true);
+    }
+})();
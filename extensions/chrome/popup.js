@@ -7,3 +7,10 @@ document.getElementById('talk-ruby').addEventListener('click', async () => {
     alert("Ruby is listening! You can talk to her now.");
     window.open('http://localhost:5001', '_blank');
 });
+
+// Tab sync status from background.js
+chrome.storage.local.get('rubyConnected', ({ rubyConnected }) => {
+    const status = document.getElementById('status');
+    status.textContent = rubyConnected ? 'Tab sync: Connected' : 'Tab sync: Ruby server not running';
+    status.style.color = rubyConnected ? '#00ff88' : '#ff5a5a';
+});
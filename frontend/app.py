@@ -71,7 +71,7 @@ def main():
 
     font = pygame.font.SysFont("Arial", 22)
 
-    ruby = Ruby()
+    ruby = Ruby(background_services=True)
     worker = RubyWorker(ruby)
     worker.start()
     pulse_circle = PulseCircle(center=(WIDTH // 2, HEIGHT // 2))
@@ -1,5 +1,6 @@
 from flask import Flask, render_template, request, jsonify
 from flask_socketio import SocketIO, emit
+from flask_sock import Sock
 import threading
 import os
 import sys
@@ -18,14 +19,19 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from ruby.ruby_mainframe import Ruby
 from utiles.stt import RubySTT
 from utiles.tts import RubyTTS
+from utiles.tab_state import get_tab_table
+from utiles.command_runner import get_command_runner
+from utiles.file_jobs import get_file_jobs
 
 import base64
 
 app = Flask(__name__)
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading', logger=True, engineio_logger=True)
+# Plain WebSocket endpoint for the Chrome extension's tab telemetry
+sock = Sock(app)
 
 # Initialize Ruby instance
-ruby = Ruby()
+ruby = Ruby(background_services=True)
 
 # Sync Ruby's state with Web UI
 def update_web_state(state):
@@ -56,6 +62,11 @@ def web_listen():
 ruby.speak = web_speak
 ruby.listen = web_listen
 
+# Stream terminal command output to the dashboard as it arrives
+get_command_runner().output_listeners.append(lambda event: socketio.emit('command_output', event))
+# Progress of background copy/move jobs
+get_file_jobs().progress_listeners.append(lambda job: socketio.emit('file_job', job))
+
 app.config['TEMPLATES_AUTO_RELOAD'] = True
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 
@@ -70,6 +81,15 @@ def add_header(response):
 def index():
     return render_template('index.html')
 
+@sock.route('/ws/tabs')
+def tab_updates(ws):
+    """Live tab/URL/media deltas from the Ruby Chrome extension (see utiles/tab_state.py)."""
+    origin = request.headers.get("Origin", "")
+    if request.remote_addr not in ("127.0.0.1", "::1") or not origin.startswith("chrome-extension://"):
+        ws.close(reason=1008, message="Only the local Ruby extension may connect")
+        return
+    get_tab_table().serve(ws)
+
 @socketio.on('connect')
 def handle_connect():
     print('Client connected')
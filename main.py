@@ -3,7 +3,7 @@ from ruby.ruby_mainframe import Ruby
 
 def main():
     # Initialize Ruby
-    ruby = Ruby()
+    ruby = Ruby(background_services=True)
     ruby.run()
 
 
@@ -3,6 +3,7 @@ from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from dotenv import load_dotenv
 import sys
 import os
+import time
 
 # Ensure utils can be imported by adding parent directory to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -10,6 +11,13 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from utiles.tts import RubyTTS
 from utiles.stt import RubySTT
 from utiles.prompt import system_prompt
+from utiles.classifier import get_classifier
+from utiles.tool_selector import ToolSelector
+from utiles.system_sampler import get_sampler
+from utiles.file_index import get_file_index
+from utiles.news_store import get_news_prefetcher
+from utiles.youtube_resolver import get_youtube_resolver
+from utiles.tool_cache import get_tool_cache
 from utiles.ruby_tools import (
     YouTubeVideoPlayerTool,
     GetAvailableLanguagesTool,
@@ -29,12 +37,15 @@ from utiles.pc_tools import (
     system_control,
     web_navigation,
     get_system_health,
+    get_system_trend,
+    get_top_processes,
     run_terminal_command,
     record_user_activity,
     get_frequently_used,
     close_application,
     pc_automation,
     file_operation,
+    file_search,
     get_weather,
     get_chrome_activity,
 )
@@ -49,7 +60,8 @@ class Ruby:
     It integrates Speech-to-Text (STT), Text-to-Speech (TTS), and the AI
     brain logic to handle user interactions and tool execution.
     """
-    def __init__(self, tts=None, model=None, system_prompt=system_prompt, tools=[], stt=None):
+    def __init__(self, tts=None, model=None, system_prompt=system_prompt, tools=[], stt=None, select_tools=True,
+                 background_services=False):
         """
         Initialize the Ruby agent.
 
@@ -59,6 +71,10 @@ class Ruby:
             system_prompt: System instructions for the agent.
             tools: List of additional tools.
             stt: RubySTT instance (optional).
+            select_tools: Send the brain only the tools relevant to each utterance
+                (utiles/tool_selector.py) instead of all of them.
+            background_services: Start the system sampler, file indexer and news prefetcher
+                now (the app entry points do). Otherwise each starts when a tool first needs it.
         """
         self.ruby_state = "Idle"
         self.system_prompt = system_prompt
@@ -79,15 +95,30 @@ class Ruby:
                         system_control,                 # Volume/System control
                         web_navigation,                 # Navigate to websites (Chrome Focus)
                         get_system_health,              # Check CPU/Battery
+                        get_system_trend,               # CPU/RAM/IO averages over recent minutes
+                        get_top_processes,              # Heaviest processes by CPU/RAM
                         run_terminal_command,           # Execute terminal commands
                         record_user_activity,           # Log user actions
                         get_frequently_used,            # Suggest popular actions
                         close_application,              # Close running apps
                         pc_automation,                  # System automation (Minimize, Lock, etc.)
                         file_operation,                 # File management (List, Info, Copy)
+                        file_search,                    # Find files by name from the file index
                         get_weather,                    # Weather info
                         get_chrome_activity,            # NEW: Identify what is playing in Chrome/JioHotstar
                     ] + tools
+        if background_services:
+            # Background CPU/RAM/IO sampling, so health tools answer instantly and have history
+            get_sampler()
+            # Background file indexing (resumes an interrupted build), so file_search answers from SQLite
+            get_file_index()
+            # Background news prefetching (default topics and the user's interests), so get_latest_news answers from SQLite
+            get_news_prefetcher()
+
+        # Per-turn tool pre-selection from the intent classifier (None sends every tool)
+        self.tool_selector = ToolSelector(self.tools, classifier=get_classifier()) if select_tools else None
+        # Tools offered, tools called (with their cache status) and timings of the last brain call
+        self.last_turn_trace = None
 
         # Initialize TTS (Text-to-Speech) — uses Edge-TTS (FREE, no key)
         if tts is None:
@@ -146,11 +177,35 @@ class Ruby:
         self.chat_history["messages"].append(HumanMessage(content=user_input))
         
         try:
+            tools = self.tool_selector.select(user_input) if self.tool_selector else self.tools
+            selection = self.tool_selector.last_selection if self.tool_selector else {}
+            # Video requests are usually confirmed before they are played: search meanwhile
+            if selection.get("intent") == "play_media" and any(t.name == "youtube_video_player" for t in tools):
+                get_youtube_resolver().prefetch([user_input])
+
             # Pass BOTH messages and tools to the brain
-            response = self.model.invoke({
-                "messages": self.chat_history["messages"],
-                "tools": self.tools
-            })
+            start = time.perf_counter()
+            tool_cache = get_tool_cache()
+            tool_cache.begin_turn()
+            try:
+                response = self.model.invoke({
+                    "messages": self.chat_history["messages"],
+                    "tools": tools
+                })
+            finally:
+                tool_calls = tool_cache.end_turn()
+            self.last_turn_trace = {
+                "intent": selection.get("intent"),
+                "confidence": selection.get("confidence"),
+                "fallback": selection.get("fallback", True),
+                "tools": [t.name for t in tools],
+                "tool_count": len(tools),
+                "total_tools": len(self.tools),
+                "selection_ms": selection.get("ms", 0.0),
+                "brain_ms": round((time.perf_counter() - start) * 1000, 1),
+                "tool_calls": tool_calls,
+                "cache_hits": sum(call["cache"] in ("hit", "stale") for call in tool_calls),
+            }
             
             ai_message = response["messages"][-1]
             self.chat_history["messages"].append(ai_message)
@@ -210,6 +265,8 @@ class Ruby:
     def reset(self):
         """Reset the conversation history to the initial system prompt."""
         self.chat_history = {"messages": [SystemMessage(content=self.system_prompt)]}
+        if self.tool_selector:
+            self.tool_selector.reset()
         self.ruby_state = "Idle"
 
     def run(self):
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.activity_store import ActivityStore, counter_keys
+
+DAY = 86400
+
+
+class TestActivityStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "activity.sqlite")
+        self.store = ActivityStore(self.path, half_life_days=7)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp)
+
+    def test_01_counts_and_keys(self):
+        """Test Case 1: Recording updates the activity, item, site and query counters"""
+        print("\n[Test 1] Verifying counters...")
+        for _ in range(3):
+            self.store.record("Web Navigation", "amazon: laptop")
+        self.store.record("Web Search", "Weather Chennai")
+        self.assertEqual(self.store.top("item", 1)[0]["key"], "amazon: laptop")
+        self.assertEqual(self.store.top("item", 1)[0]["count"], 3)
+        self.assertEqual(self.store.top("site", 1)[0]["key"], "amazon")
+        queries = {row["key"]: row["count"] for row in self.store.top("query", 5)}
+        self.assertEqual(queries, {"laptop": 3, "weather chennai": 1})
+        self.assertEqual(counter_keys("Web Navigation", "Direct URL: https://x.org")["site"], "https://x.org")
+        self.assertEqual(self.store.recent(1)[0]["details"], "Weather Chennai")
+        with self.assertRaises(ValueError):
+            self.store.top("apps")
+
+    def test_02_decay_prefers_recent_use(self):
+        """Test Case 2: Decayed scores rank recent use above older, more frequent use"""
+        print("\n[Test 2] Verifying time decay...")
+        now = time.time()
+        for i in range(5):
+            self.store.record("Web Search", "old favourite", ts=now - 60 * DAY - i)
+        for i in range(2):
+            self.store.record("Web Search", "new habit", ts=now - i)
+        self.assertEqual(self.store.top("item", 1)[0]["key"], "new habit")
+        self.assertEqual(self.store.top("item", 1, by="count")[0]["key"], "old favourite")
+        old = [r for r in self.store.top("item", 2) if r["key"] == "old favourite"][0]
+        self.assertAlmostEqual(old["score"], 5 * 0.5 ** (60 / 7), places=3)
+
+    def test_03_legacy_import_runs_once(self):
+        """Test Case 3: user_history.txt is imported once and survives reopening"""
+        print("\n[Test 3] Verifying legacy import...")
+        legacy = os.path.join(self.tmp, "user_history.txt")
+        with open(legacy, "w") as f:
+            f.write("2024-01-02 10:00:00 | Web Search | cricket score\n")
+            f.write("2024-01-03 11:00:00 | Web Search | cricket score\n")
+            f.write("garbage line\n")
+        self.assertEqual(self.store.import_legacy(legacy), 2)
+        self.assertEqual(self.store.import_legacy(legacy), 0)
+        self.store.close()
+        self.store = ActivityStore(self.path)
+        self.assertEqual(self.store.half_life_days, 7)
+        self.assertEqual(self.store.import_legacy(legacy), 0)
+        top = self.store.top("query", 1)[0]
+        self.assertEqual((top["key"], top["count"]), ("cricket score", 2))
+        mode = self.store._db.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import json
+import shutil
+import threading
+import time
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.classifier import MicroBatcher, RubyIntentClassifier
+
+
+class FakeOnnxModel:
+    """Stands in for OnnxIntentModel; labels by keyword and records batch sizes."""
+    labels = ["play_media", "open_app"]
+
+    def __init__(self, model_dir, threads=None):
+        self.batches = []
+
+    def predict_batch(self, texts):
+        self.batches.append(len(texts))
+        time.sleep(0.005)  # a forward pass costs about the same for 1 or 8 texts
+        return [("play_media" if "play" in t.lower() else "open_app", 0.9) for t in texts]
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_01_concurrent_calls_share_a_batch(self):
+        """Test Case 1: Concurrent submissions are answered from one batched call"""
+        print("\n[Test 1] Verifying micro-batching...")
+        calls = []
+        batcher = MicroBatcher(lambda items: calls.append(list(items)) or [i * 2 for i in items], max_wait_ms=50)
+        results = [None] * 8
+        def worker(i):
+            results[i] = batcher(i, timeout=2)
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [i * 2 for i in range(8)])
+        self.assertLess(len(calls), 8)
+        self.assertEqual(sorted(i for batch in calls for i in batch), list(range(8)))
+
+    def test_02_errors_reach_every_caller(self):
+        """Test Case 2: A failing batch raises in each waiting caller"""
+        print("\n[Test 2] Verifying error propagation...")
+        def fail(items):
+            raise ValueError("model crashed")
+        batcher = MicroBatcher(fail, max_wait_ms=1)
+        with self.assertRaises(ValueError):
+            batcher("x", timeout=2)
+
+
+class TestRubyIntentClassifier(unittest.TestCase):
+    def setUp(self):
+        self.onnx_dir = "test_intent_onnx"
+        os.makedirs(self.onnx_dir, exist_ok=True)
+        open(os.path.join(self.onnx_dir, "model.onnx"), "wb").close()
+        self.patcher = patch("utiles.classifier.OnnxIntentModel", FakeOnnxModel)
+        self.patcher.start()
+        self.log_path = os.path.join(self.onnx_dir, "disagreements.jsonl")
+        self.clf = RubyIntentClassifier(onnx_dir=self.onnx_dir, max_wait_ms=20, disagreement_log=self.log_path)
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.onnx_dir)
+
+    def test_01_onnx_loads_synchronously(self):
+        """Test Case 1: With an exported artifact the classifier is ready immediately"""
+        print("\n[Test 1] Verifying ONNX load...")
+        self.assertFalse(self.clf.loading)
+        self.assertEqual(self.clf.stats()["backend"], "onnx")
+        self.assertEqual(self.clf.predict("Play some music"), "play_media")
+
+    def test_02_result_cache(self):
+        """Test Case 2: Repeated utterances skip the model"""
+        print("\n[Test 2] Verifying result cache...")
+        self.clf.predict("open chrome")
+        self.clf.predict("  Open Chrome ")
+        self.assertEqual(self.clf.backend.batches, [1])
+        self.assertEqual(self.clf.stats()["cache"]["hits"], 1)
+
+    def test_03_concurrent_predict_is_batched(self):
+        """Test Case 3: Concurrent predict calls run as one forward pass"""
+        print("\n[Test 3] Verifying batched predict...")
+        texts = [f"open app {i}" for i in range(6)]
+        threads = [threading.Thread(target=self.clf.predict, args=(t,)) for t in texts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sum(self.clf.backend.batches), 6)
+        self.assertLess(len(self.clf.backend.batches), 6)
+
+    def test_04_fallback_while_loading(self):
+        """Test Case 4: The shipped fallback model answers before the transformer is ready"""
+        print("\n[Test 4] Verifying fallback model...")
+        clf = RubyIntentClassifier(onnx_dir="/nonexistent", disagreement_log=self.log_path)
+        clf.loading = True  # the transformers pipeline would still be loading
+        clf.pipe = None
+        result = clf.classify("close chrome")
+        self.assertEqual(result["source"], "fallback")
+        self.assertEqual(result["label"], "close_app")
+        self.assertEqual(clf.classify("")["label"], "unknown")
+
+    def test_05_disagreements_are_logged(self):
+        """Test Case 5: Utterances where the two models differ are written to the log"""
+        print("\n[Test 5] Verifying disagreement log...")
+        self.assertEqual(self.clf.predict("play believer on youtube"), "play_media")  # both agree
+        self.assertEqual(self.clf.predict("what is the weather in chennai"), "open_app")  # fallback says weather
+        self.assertEqual(self.clf.stats()["disagreements"], 1)
+        with open(self.log_path, encoding="utf-8") as f:
+            record = json.loads(f.read().splitlines()[0])
+        self.assertEqual((record["transformer"], record["fallback"]), ("open_app", "weather"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import sys
+import os
+import time
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.command_runner import CommandRunner, OutputCapture, format_result
+
+PY = f'"{sys.executable}" -c'
+
+
+class TestOutputCapture(unittest.TestCase):
+    def test_01_head_and_tail_are_kept(self):
+        """Test Case 1: Capped output keeps the start and end and reports the cut"""
+        print("\n[Test 1] Verifying output capping...")
+        capture = OutputCapture(limit=30, head_fraction=1 / 3)
+        for i in range(100):
+            capture.write(f"line {i:03d}\n")
+        text = capture.text()
+        self.assertTrue(text.startswith("line 000\nl"))
+        self.assertTrue(text.endswith("line 099\n"))
+        self.assertTrue(capture.truncated)
+        self.assertEqual(capture.dropped_chars, 900 - 30)
+        self.assertIn("870 characters", text)
+        self.assertIn("900 characters / 100 lines in total", text)
+
+        small = OutputCapture(limit=100)
+        small.write("hello\n")
+        self.assertEqual(small.text(), "hello\n")
+
+
+class TestCommandRunner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.runner = CommandRunner(max_concurrent=4)
+
+    def test_02_output_exit_code_and_streaming(self):
+        """Test Case 2: stdout, stderr and exit code are captured and streamed to listeners"""
+        print("\n[Test 2] Verifying a normal run...")
+        events = []
+        self.runner.output_listeners.append(events.append)
+        try:
+            result = self.runner.run(f"{PY} \"import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)\"")
+        finally:
+            self.runner.output_listeners.remove(events.append)
+        self.assertEqual(result["exit_code"], 3)
+        self.assertEqual(result["stdout"].strip(), "out")
+        self.assertEqual(result["stderr"].strip(), "err")
+        self.assertFalse(result["timed_out"])
+        streamed = "".join(e.get("text", "") for e in events if e["job"] == result["job"])
+        self.assertIn("out", streamed)
+        self.assertEqual(events[-1]["event"], "end")
+        self.assertIn("Exit code: 3", format_result(result))
+
+    def test_03_timeout_kills_the_tree(self):
+        """Test Case 3: A timed-out command and its children are killed"""
+        print("\n[Test 3] Verifying timeouts...")
+        if sys.platform == "win32":
+            self.skipTest("uses a POSIX shell")
+        start = time.perf_counter()
+        result = self.runner.run("echo started; sleep 30 & sleep 30", timeout=0.5)
+        self.assertTrue(result["timed_out"])
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertIn("started", result["stdout"])
+        self.assertIn("timed out", format_result(result))
+
+    def test_04_output_cap_and_concurrency(self):
+        """Test Case 4: Huge output is capped and commands run concurrently"""
+        print("\n[Test 4] Verifying output cap and concurrency...")
+        result = self.runner.run(f"{PY} \"print('x' * 200000)\"", max_output=1000)
+        self.assertTrue(result["truncated"])
+        self.assertLess(len(result["stdout"]), 1200)
+        self.assertEqual(result["output_chars"], 200001)
+
+        start = time.perf_counter()
+        futures = [self.runner.submit(f"{PY} \"import time; time.sleep(0.5)\"") for _ in range(3)]
+        results = [f.result() for f in futures]
+        self.assertTrue(all(r["exit_code"] == 0 for r in results))
+        self.assertLess(time.perf_counter() - start, 1.4)
+
+    def test_05_listeners_get_capped_output(self):
+        """Test Case 5: Listeners stop getting output at the cap and get one truncation event"""
+        print("\n[Test 5] Verifying the streaming cap...")
+        events = []
+        self.runner.output_listeners.append(events.append)
+        try:
+            result = self.runner.run(f"{PY} \"import sys; [sys.stdout.write('y' * 4096) for _ in range(500)]\"",
+                                     max_output=1000)
+        finally:
+            self.runner.output_listeners.remove(events.append)
+        job = [e for e in events if e["job"] == result["job"]]
+        self.assertEqual(sum(len(e.get("text", "")) for e in job), 1000)
+        self.assertEqual([e["stream"] for e in job if e.get("event") == "truncated"], ["stdout"])
+        self.assertLess(len(job), 10)
+        self.assertEqual(result["output_chars"], 4096 * 500)
+
+    def test_06_background_child_does_not_hold_the_result(self):
+        """Test Case 6: A background child keeping the pipes open does not count as a timeout"""
+        print("\n[Test 6] Verifying background children...")
+        if sys.platform == "win32":
+            self.skipTest("uses a POSIX shell")
+        start = time.perf_counter()
+        result = self.runner.run("sleep 30 & echo hi", timeout=5)
+        self.assertFalse(result["timed_out"])
+        self.assertEqual(result["exit_code"], 0)
+        self.assertEqual(result["stdout"].strip(), "hi")
+        self.assertLess(time.perf_counter() - start, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.dir_listing import list_directory, parse_filter, parse_sort
+
+
+class TestDirListing(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        now = time.time()
+        for i in range(30):
+            ext = ("pdf", "txt", "jpg")[i % 3]
+            path = os.path.join(self.dir, f"file{i:02d}.{ext}")
+            with open(path, "wb") as f:
+                f.write(b"x" * (i * 100))
+            os.utime(path, (now - i * 86400, now - i * 86400))  # file00 newest
+        os.makedirs(os.path.join(self.dir, "Photos"))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_01_page_and_summary(self):
+        """Test Case 1: One page is returned with a summary of the whole folder"""
+        print("\n[Test 1] Verifying paging and summary...")
+        result = list_directory(self.dir, limit=5)
+        self.assertEqual([e["name"] for e in result["entries"]], ["file00.pdf", "file01.txt", "file02.jpg", "file03.pdf", "file04.txt"])
+        self.assertIsNotNone(result["next_cursor"])
+        summary = result["summary"]
+        self.assertEqual((summary["dirs"], summary["files"]), (1, 30))
+        self.assertEqual(summary["total_size"], sum(i * 100 for i in range(30)))
+        self.assertEqual(summary["by_ext"]["pdf"], {"count": 10, "size": sum(i * 100 for i in range(0, 30, 3))})
+
+    def test_02_cursor_walks_every_entry_once(self):
+        """Test Case 2: Following cursors visits each entry once, in order, even if entries change"""
+        print("\n[Test 2] Verifying keyset pagination...")
+        seen, cursor = [], None
+        while True:
+            result = list_directory(self.dir, sort="size", limit=7, cursor=cursor)
+            seen += [e["name"] for e in result["entries"]]
+            cursor = result["next_cursor"]
+            if len(seen) == 7:
+                os.remove(os.path.join(self.dir, "file29.jpg"))  # already shown: nothing shifts
+            if not cursor:
+                break
+        self.assertEqual(seen[:3], ["file29.jpg", "file28.txt", "file27.pdf"])  # largest first
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), 31)
+        self.assertEqual(parse_sort("-size"), ("size", False))
+
+    def test_03_filters(self):
+        """Test Case 3: Type, glob, size and age filters are applied while scanning"""
+        print("\n[Test 3] Verifying filters...")
+        pdfs = list_directory(self.dir, **parse_filter("*.PDF files"))
+        self.assertEqual(pdfs["matched"], 10)
+        self.assertEqual(pdfs["scanned"], 31)
+        big_recent = list_directory(self.dir, sort="date", **parse_filter(">1KB newer:15d"))
+        self.assertEqual([e["name"] for e in big_recent["entries"]], [f"file{i:02d}.{('pdf', 'txt', 'jpg')[i % 3]}" for i in range(11, 15)])
+        dirs = list_directory(self.dir, **parse_filter("dirs"))
+        self.assertEqual([e["name"] for e in dirs["entries"]], ["Photos"])
+
+    def test_04_file_operation_list(self):
+        """Test Case 4: file_operation lists a page and hands out the cursor"""
+        print("\n[Test 4] Verifying the file_operation list action...")
+        from utiles.pc_tools import file_operation
+        reply = file_operation.invoke({"action": "list", "path": self.dir, "filter": "*.txt"})
+        self.assertIn("10 entries matching the filter", reply)
+        self.assertIn("file01.txt", reply)
+        self.assertNotIn("file00.pdf", reply)
+        self.assertNotIn("cursor=", reply)
+
+
+if __name__ == '__main__':
+    unittest.main()
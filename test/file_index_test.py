@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.file_index import FileIndex, split_name
+
+
+class TestFileIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp, "home")
+        self.files = {
+            "Documents/MyResume2024.pdf": "resume",
+            "Documents/cover_letter.docx": "letter",
+            "Documents/old/resume_draft.txt": "draft of my resume with python experience",
+            "Downloads/invoice-march.pdf": "invoice",
+            "Downloads/holiday/beach.jpg": "jpg",
+            "Downloads/.git/config": "hidden",
+        }
+        for rel, text in self.files.items():
+            path = os.path.join(self.root, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+        self.db = os.path.join(self.tmp, "index.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def names(self, index, query, **kwargs):
+        return [r["name"] for r in index.search(query, **kwargs)]
+
+    def test_01_build_and_search(self):
+        """Test Case 1: The index finds files by name tokens, prefixes and extension"""
+        print("\n[Test 1] Verifying build and ranked search...")
+        self.assertEqual(split_name("MyResume2024.pdf"), ({"my", "resume", "2024", "myresume2024"}, "pdf"))
+        index = FileIndex(self.db, [self.root])
+        index.build()
+        self.assertEqual(self.names(index, "find my resume pdf")[0], "MyResume2024.pdf")
+        self.assertEqual(set(self.names(index, "resu")), {"MyResume2024.pdf", "resume_draft.txt"})
+        self.assertEqual(self.names(index, "resume", ext="txt"), ["resume_draft.txt"])
+        self.assertEqual(self.names(index, "march invoice"), ["invoice-march.pdf"])
+        self.assertEqual(self.names(index, "holiday", dirs=True), ["holiday"])
+        self.assertEqual(self.names(index, "config"), [])  # hidden directories are skipped
+
+    def test_02_build_resumes(self):
+        """Test Case 2: An interrupted build continues from its pending directories"""
+        print("\n[Test 2] Verifying resumable build...")
+        index = FileIndex(self.db, [self.root], workers=2)
+        index.build(max_dirs=1)
+        self.assertGreater(index.stats()["pending"], 0)
+        index._db.close()
+
+        resumed = FileIndex(self.db, [self.root], workers=2)
+        resumed.build()
+        stats = resumed.stats()
+        self.assertEqual(stats["pending"], 0)
+        self.assertEqual(stats["dirs"], 5)  # home, Documents, old, Downloads, holiday
+        self.assertEqual(stats["entries"], 9)
+
+    def test_03_incremental_rescan(self):
+        """Test Case 3: A rescan only re-lists changed directories and applies adds, renames and deletes"""
+        print("\n[Test 3] Verifying incremental updates...")
+        index = FileIndex(self.db, [self.root], content=True)
+        index.build()
+        self.assertEqual(index.rescan(), 0)
+        self.assertIn("resume_draft.txt", self.names(index, "python"))  # content index
+
+        docs = os.path.join(self.root, "Documents")
+        time.sleep(0.01)  # distinct directory mtimes
+        os.rename(os.path.join(docs, "cover_letter.docx"), os.path.join(docs, "motivation_letter.docx"))
+        os.makedirs(os.path.join(docs, "taxes"))
+        with open(os.path.join(docs, "taxes", "form16.pdf"), "w") as f:
+            f.write("form")
+        shutil.rmtree(os.path.join(self.root, "Downloads", "holiday"))
+
+        relisted = index.rescan()
+        self.assertEqual(relisted, 4)  # Documents, Downloads, the deleted holiday and the new taxes folder
+        self.assertEqual(self.names(index, "letter"), ["motivation_letter.docx"])
+        self.assertEqual(self.names(index, "form16"), ["form16.pdf"])
+        self.assertEqual(self.names(index, "beach"), [])
+        self.assertEqual(index.stats()["dirs"], 5)
+
+    def test_04_file_search_tool(self):
+        """Test Case 4: file_search lists ranked matches with paths"""
+        print("\n[Test 4] Verifying the file_search tool...")
+        from utiles import pc_tools
+        index = FileIndex(self.db, [self.root])
+        index.build()
+        with patch.object(pc_tools, "get_file_index", return_value=index):
+            reply = pc_tools.file_search.invoke({"query": "resume pdf"})
+            missing = pc_tools.file_search.invoke({"query": "tax return"})
+        self.assertIn(os.path.join(self.root, "Documents", "MyResume2024.pdf"), reply.splitlines()[1])
+        self.assertEqual(missing, "No files found matching 'tax return'.")
+
+
+if __name__ == '__main__':
+    unittest.main()
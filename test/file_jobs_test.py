@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles import file_jobs
+from utiles.file_jobs import FileJobManager
+
+
+class TestFileJobs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmp, "project")
+        for rel, size in (("a.bin", 3000), ("docs/b.txt", 10), ("docs/deep/c.bin", 5000)):
+            path = os.path.join(self.src, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(os.urandom(size))
+        self.dest = os.path.join(self.tmp, "backup")
+        os.makedirs(self.dest)
+        self.manager = FileJobManager()
+        self.events = []
+        self.manager.progress_listeners.append(self.events.append)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_01_copy_tree_with_progress(self):
+        """Test Case 1: A tree copy runs in the background and reports exact progress"""
+        print("\n[Test 1] Verifying background copy...")
+        with patch.object(file_jobs, "CHUNK_SIZE", 1024), patch.object(file_jobs, "PROGRESS_INTERVAL", 0):
+            job = self.manager.submit("copy", self.src, self.dest)
+            done = self.manager.wait(job["id"], timeout=10)
+        self.assertEqual(done["status"], "done")
+        self.assertEqual(done["dst"], os.path.join(self.dest, "project"))
+        self.assertEqual((done["total_files"], done["done_files"]), (3, 3))
+        self.assertEqual(done["done_bytes"], 8010)
+        with open(os.path.join(self.src, "docs/deep/c.bin"), "rb") as a, open(os.path.join(done["dst"], "docs/deep/c.bin"), "rb") as b:
+            self.assertEqual(a.read(), b.read())
+        progress = [e["done_bytes"] for e in self.events if e["status"] == "running"]
+        self.assertGreater(len(progress), 3)
+        self.assertEqual(progress, sorted(progress))
+        self.assertEqual(self.events[-1]["status"], "done")
+
+    def test_02_move_across_devices(self):
+        """Test Case 2: A move that can't be renamed is copied, then the source is deleted"""
+        print("\n[Test 2] Verifying copy-then-delete moves...")
+        with patch.object(file_jobs.os, "rename", side_effect=OSError("cross-device link")):
+            job = self.manager.submit("move", self.src, os.path.join(self.dest, "moved"))
+            done = self.manager.wait(job["id"], timeout=10)
+        self.assertEqual(done["status"], "done")
+        self.assertFalse(os.path.exists(self.src))
+        self.assertTrue(os.path.isfile(os.path.join(self.dest, "moved", "docs", "b.txt")))
+        with self.assertRaises(ValueError):
+            self.manager.submit("copy", self.dest, os.path.join(self.dest, "moved"))  # into itself
+
+    def test_03_cancel(self):
+        """Test Case 3: Cancelling stops a job between chunks"""
+        print("\n[Test 3] Verifying cancellation...")
+        started = []
+
+        def cancel_on_first_progress(job):
+            if job["status"] == "running" and job["done_bytes"] and not started:
+                started.append(job["id"])
+                self.manager.cancel(job["id"])
+
+        self.manager.progress_listeners.append(cancel_on_first_progress)
+        with patch.object(file_jobs, "CHUNK_SIZE", 256), patch.object(file_jobs, "PROGRESS_INTERVAL", 0):
+            job = self.manager.submit("copy", self.src, self.dest)
+            done = self.manager.wait(job["id"], timeout=10)
+        self.assertEqual(done["status"], "cancelled")
+        self.assertLess(done["done_bytes"], 8010)
+        self.assertFalse(self.manager.cancel(job["id"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
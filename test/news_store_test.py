@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.news_store import NewsPrefetcher, NewsStore
+
+NOW = 1_800_000_000.0  # 2027-01-15
+
+
+def story(title, url, hours_ago=1, source="Wire"):
+    published = NOW - hours_ago * 3600
+    return {"title": title, "body": f"{title}. More inside.", "url": url, "source": source,
+            "date": datetime.fromtimestamp(published, timezone.utc).isoformat()}
+
+
+class FakeNewsClient:
+    def __init__(self):
+        self.responses = {}
+        self.calls = []
+        self.fail = False
+
+    def news(self, query, max_results=5):
+        self.calls.append(query)
+        if self.fail:
+            raise RuntimeError("network down")
+        return [dict(r) for r in self.responses.get(query.lower(), [])][:max_results]
+
+
+class TestNewsStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = NewsStore(os.path.join(self.tmp.name, "news.sqlite"))
+        self.client = FakeNewsClient()
+        self.now = [NOW]
+        self.prefetcher = NewsPrefetcher(self.store, client=self.client, interests=lambda: ["ipl auction"],
+                                         topics=("tech news",), clock=lambda: self.now[0])
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_01_ingest_dedupes_by_url_and_title(self):
+        """Test Case 1: The same story by URL or by a near-identical title is stored once"""
+        print("\n[Test 1] Verifying story deduplication...")
+        added = self.store.ingest("Tech News", [
+            story("ISRO tests reusable launch vehicle landing", "https://www.thehindu.com/isro-rlv/?utm_source=ddg", 2),
+            story("ISRO tests reusable launch vehicle landing", "https://thehindu.com/isro-rlv", 2),  # same URL
+            story("ISRO successfully tests its reusable launch vehicle landing", "https://ndtv.com/isro", 1),  # same story
+            story("UPI crosses 20 billion monthly transactions", "https://et.com/upi", 3),
+        ], now=NOW)
+        self.assertEqual(added, 2)
+        later = NOW + 600
+        added = self.store.ingest("tech news", [
+            story("UPI crosses 20 billion monthly transactions", "https://et.com/upi", 3),
+            story("Chennai gets a semiconductor design centre", "https://mint.com/chip", 0.5),
+        ], now=later)
+        self.assertEqual(added, 1)
+        headlines = self.store.headlines("tech news", 10)
+        self.assertEqual([h["url"] for h in headlines],
+                         ["https://mint.com/chip", "https://www.thehindu.com/isro-rlv/?utm_source=ddg", "https://et.com/upi"])
+        upi = headlines[2]
+        self.assertEqual((upi["first_seen"], upi["last_seen"]), (NOW, later))
+        self.assertAlmostEqual(upi["published"], NOW - 3 * 3600)
+        self.assertEqual(self.store.topic("tech news")["refreshed_at"], later)
+
+    def test_02_fresh_data_is_answered_without_a_fetch(self):
+        """Test Case 2: Fresh stories come from the store; stale ones trigger a live fetch"""
+        print("\n[Test 2] Verifying store-first answers...")
+        self.client.responses["tech news"] = [story("Headline one", "https://a.com/1")]
+        first = self.prefetcher.headlines("Tech News")
+        self.assertEqual((first["source"], len(self.client.calls)), ("live", 1))
+        self.now[0] += 60
+        second = self.prefetcher.headlines("tech news")
+        self.assertEqual((second["source"], len(self.client.calls)), ("store", 1))
+        self.assertEqual(second["stories"][0]["title"], "Headline one")
+
+        self.now[0] += self.prefetcher.fresh_for
+        self.client.fail = True
+        stale = self.prefetcher.headlines("tech news")
+        self.assertEqual((stale["source"], len(self.client.calls)), ("stale", 2))
+        self.assertEqual(self.store.topic("tech news")["error"], "network down")
+        with self.assertRaises(RuntimeError):
+            self.prefetcher.headlines("never fetched")
+
+    def test_03_prefetch_covers_defaults_interests_and_requests(self):
+        """Test Case 3: The prefetcher refreshes default, interest and requested topics when due"""
+        print("\n[Test 3] Verifying scheduled refreshes...")
+        self.store.mark_requested("Chennai rains", now=NOW - 86400)
+        self.store.mark_requested("old topic", now=NOW - 30 * 86400)
+        self.assertEqual(self.prefetcher.topics(), ["tech news", "ipl auction", "chennai rains"])
+        self.client.responses["ipl auction"] = [story("Auction date announced", "https://c.com/ipl")]
+        self.assertEqual(self.prefetcher.refresh_due(), {"tech news": 0, "ipl auction": 1, "chennai rains": 0})
+        self.now[0] += 60
+        self.assertEqual(self.prefetcher.refresh_due(), {})  # nothing due yet
+        self.now[0] += self.prefetcher.interval
+        self.assertEqual(len(self.prefetcher.refresh_due()), 3)
+        self.assertEqual(len(self.client.calls), 6)
+
+    def test_04_news_tool_reads_the_store(self):
+        """Test Case 4: get_latest_news answers from prefetched headlines"""
+        print("\n[Test 4] Verifying the news tool...")
+        from utiles.ruby_tools import GetLatestNewsTool
+        self.client.responses["latest technology news india today"] = [story("Prefetched headline", "https://d.com/1")]
+        self.prefetcher.default_topics = ["latest technology news India today"]
+        self.prefetcher.refresh_due()
+        calls = len(self.client.calls)
+        with patch("utiles.ruby_tools.get_news_prefetcher", return_value=self.prefetcher):
+            text = GetLatestNewsTool().invoke({"query": ""})
+        self.assertIn("Prefetched headline", text)
+        self.assertEqual(len(self.client.calls), calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
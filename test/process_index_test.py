@@ -0,0 +1,138 @@
+import unittest
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+import psutil
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.process_index import ProcessIndex, normalize
+
+# Parent starts a child, both optionally ignoring SIGTERM, then sleep
+APP_SCRIPT = """
+import signal, subprocess, sys, time
+if sys.argv[1] == "stubborn":
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+if len(sys.argv) < 3:
+    subprocess.Popen([sys.executable, __file__, sys.argv[1], "child"])
+time.sleep(60)
+"""
+
+# Launcher starts a child under a different executable name and records its PID
+LAUNCHER_SCRIPT = """
+import subprocess, sys, time
+child = subprocess.Popen([sys.argv[1], "-c", "import time; time.sleep(60)"])
+with open(sys.argv[2], "w") as f:
+    f.write(str(child.pid))
+time.sleep(60)
+"""
+
+
+def table_row(pid, name, ppid, create_time=1.0):
+    return {"pid": pid, "name": name, "ppid": ppid, "create_time": create_time}
+
+
+class TestProcessIndex(unittest.TestCase):
+    def test_01_normalize_and_aliases(self):
+        """Test Case 1: Names are normalized and aliases resolve to executables"""
+        print("\n[Test 1] Verifying normalization and aliases...")
+        self.assertEqual(normalize("C:\\Program Files\\Code.EXE".replace("\\", "/")), "code")
+        index = ProcessIndex(aliases={"VS Code": ["Code.exe"]})
+        index.update([table_row(10, "Code.exe", 1), table_row(11, "code.exe", 10), table_row(12, "notepad.exe", 1)])
+        self.assertEqual(index.lookup("vs  code"), {10, 11})
+        self.assertEqual(index.lookup("Notepad"), {12})
+        self.assertEqual(index.roots("vs code"), {10})
+        self.assertEqual(index.suggestions("note"), ["notepad"])
+
+    def test_02_incremental_update(self):
+        """Test Case 2: Updates only apply what changed, including reused PIDs"""
+        print("\n[Test 2] Verifying incremental updates...")
+        index = ProcessIndex(aliases={})
+        index.update([table_row(10, "chrome", 1), table_row(11, "chrome", 10), table_row(12, "chrome", 11)])
+        self.assertEqual(index.tree(10), [10, 11, 12])
+        index.update([table_row(10, "chrome", 1), table_row(12, "spotify", 1, create_time=2.0)])
+        self.assertEqual(index.lookup("chrome"), {10})
+        self.assertEqual(index.lookup("spotify"), {12})
+        self.assertEqual(index.tree(10), [10])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "process names from symlinks are Linux-specific")
+    def test_03_terminate_tree_graceful_then_forceful(self):
+        """Test Case 3: terminate() closes the whole tree and kills what ignores SIGTERM"""
+        print("\n[Test 3] Verifying tree termination...")
+        tmp = tempfile.mkdtemp()
+        try:
+            exe = os.path.join(tmp, "rubytestapp")
+            os.symlink(sys.executable, exe)
+            script = os.path.join(tmp, "app.py")
+            with open(script, "w") as f:
+                f.write(APP_SCRIPT)
+            index = ProcessIndex(aliases={"ruby test app": ["rubytestapp"]})
+            for mode, field in (("polite", "terminated"), ("stubborn", "killed")):
+                parent = subprocess.Popen([exe, script, mode])
+                deadline = time.time() + 5
+                while time.time() < deadline:
+                    index.refresh()
+                    if len(index.lookup("ruby test app")) == 2:
+                        break
+                    time.sleep(0.05)
+                result = index.terminate("ruby test app", timeout=1)
+                self.assertEqual(result["found"], 2)
+                self.assertEqual(result[field], 2)
+                self.assertIsNotNone(parent.poll())
+                self.assertEqual(index.lookup("ruby test app"), set())
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_04_tree_follows_only_named_children(self):
+        """Test Case 4: tree() with names does not walk into other apps"""
+        print("\n[Test 4] Verifying name-filtered trees...")
+        index = ProcessIndex(aliases={})
+        index.update([table_row(10, "explorer", 1), table_row(11, "notepad", 10),
+                      table_row(12, "explorer", 10), table_row(13, "explorer", 11)])
+        self.assertEqual(sorted(index.tree(10)), [10, 11, 12, 13])
+        self.assertEqual(sorted(index.tree(10, ["explorer"])), [10, 12])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "process names from symlinks are Linux-specific")
+    def test_05_terminate_spares_children_of_other_apps(self):
+        """Test Case 5: Closing a launcher leaves the apps it started running"""
+        print("\n[Test 5] Verifying unrelated children survive...")
+        tmp = tempfile.mkdtemp()
+        child_pid = None
+        try:
+            exe = os.path.join(tmp, "rubytestlauncher")
+            os.symlink(sys.executable, exe)
+            script = os.path.join(tmp, "launcher.py")
+            pid_file = os.path.join(tmp, "child.pid")
+            with open(script, "w") as f:
+                f.write(LAUNCHER_SCRIPT)
+            parent = subprocess.Popen([exe, script, sys.executable, pid_file])
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                if os.path.exists(pid_file) and os.path.getsize(pid_file):
+                    break
+                time.sleep(0.05)
+            with open(pid_file) as f:
+                child_pid = int(f.read())
+            index = ProcessIndex(aliases={"launcher": ["rubytestlauncher"]})
+            result = index.terminate("launcher", timeout=1)
+            self.assertEqual(result["found"], 1)
+            self.assertEqual(result["terminated"], 1)
+            self.assertIsNotNone(parent.wait(timeout=5))
+            self.assertTrue(psutil.pid_exists(child_pid))
+            self.assertNotEqual(psutil.Process(child_pid).status(), psutil.STATUS_ZOMBIE)
+        finally:
+            if child_pid is not None:
+                try:
+                    psutil.Process(child_pid).kill()
+                except psutil.NoSuchProcess:
+                    pass
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import shutil
+import time
+import zlib
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.embeddings import Embeddings
+
+from utiles.cache_utiles import LRUCache
+
+
+class CountingEmbeddings(Embeddings):
+    """Offline bag-of-words embedder that counts query embeddings."""
+    def __init__(self, **kwargs):
+        self.query_calls = 0
+
+    def _embed(self, text):
+        vec = [0.0] * 32
+        for word in text.lower().split():
+            vec[zlib.crc32(word.strip("?.,").encode()) % 32] += 1.0
+        return vec
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return self._embed(text)
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_01_eviction_and_stats(self):
+        """Test Case 1: LRU eviction, hit ratio and saved time"""
+        print("\n[Test 1] Verifying LRU cache...")
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1, cost=0.5)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # "a" becomes most recent
+        cache.put("c", 3)                    # evicts "b"
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+        self.assertEqual(stats["saved_seconds"], 0.5)
+
+    def test_02_ttl(self):
+        """Test Case 2: Entries expire after their TTL"""
+        print("\n[Test 2] Verifying TTL...")
+        cache = LRUCache(maxsize=4, ttl=0.05)
+        cache.put("k", "v")
+        self.assertEqual(cache.get("k"), "v")
+        time.sleep(0.08)
+        self.assertIsNone(cache.get("k"))
+
+
+class TestRubyRAGCache(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_rag_cache_db"
+        self.test_docs_path = "test_rag_cache_docs"
+        os.makedirs(self.test_docs_path, exist_ok=True)
+        self.first_file = os.path.join(self.test_docs_path, "first.txt")
+        self.second_file = os.path.join(self.test_docs_path, "second.txt")
+        with open(self.first_file, "w", encoding="utf-8") as f:
+            f.write("Ruby supports English, Malayalam, and Tamil languages.\n")
+        with open(self.second_file, "w", encoding="utf-8") as f:
+            f.write("Ruby languages list now also includes Hindi.\n")
+
+        self.patcher = patch('utiles.rag_utiles.GoogleGenerativeAIEmbeddings', CountingEmbeddings)
+        self.patcher.start()
+        from utiles.rag_utiles import RubyRAG
+        self.rag = RubyRAG(db_path=self.test_db_path, chunk_size=100, chunk_overlap=10)
+
+    def tearDown(self):
+        self.patcher.stop()
+        if self.rag.vectorstore is not None:
+            self.rag.vectorstore.close()
+        for path in (self.test_db_path, self.test_docs_path):
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def test_01_query_embedding_cache(self):
+        """Test Case 1: Repeated questions are embedded once"""
+        print("\n[Test 1] Verifying query embedding cache...")
+        self.rag.add_documents(self.first_file)
+        self.rag.query("What languages does Ruby support?", use_hf_rerank=False)
+        self.rag.query("  what LANGUAGES does ruby support? ", use_hf_rerank=False)
+        self.assertEqual(self.rag.embedding_model.query_calls, 1)
+        stats = self.rag.cache_stats()
+        self.assertEqual(stats["query_embeddings"]["hits"], 1)
+        self.assertEqual(stats["results"]["hits"], 1)
+
+    def test_02_results_invalidate_on_add(self):
+        """Test Case 2: Adding documents invalidates cached results"""
+        print("\n[Test 2] Verifying result invalidation...")
+        self.rag.add_documents(self.first_file)
+        before = self.rag.query("Ruby languages", k=2, use_hf_rerank=False)
+        self.assertNotIn("Hindi", before)
+        self.rag.add_documents(self.second_file)
+        after = self.rag.query("Ruby languages", k=2, use_hf_rerank=False)
+        self.assertIn("Hindi", after)
+        self.assertEqual(self.rag.cache_stats()["results"]["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
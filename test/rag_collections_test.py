@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import shutil
+import zlib
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.embeddings import Embeddings
+
+
+class WordEmbeddings(Embeddings):
+    """Offline bag-of-words embedder."""
+    def __init__(self, **kwargs):
+        pass
+
+    def _embed(self, text):
+        vec = [0.0] * 32
+        for word in text.lower().split():
+            vec[zlib.crc32(word.strip("?.,").encode()) % 32] += 1.0
+        return vec
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+class TestRagCollections(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_rag_collections_db"
+        self.test_docs_path = "test_rag_collections_docs"
+        os.makedirs(self.test_docs_path, exist_ok=True)
+        self.files = {}
+        for name, text in {
+            "manual.txt": "Lab timings are 8:30 AM to 6:00 PM on working days.\n",
+            "timetable.txt": "Route 12 bus timings: departs 7:45 AM from the main gate.\n",
+            "tamil.txt": "ஆய்வகம் காலை 8:30 மணிக்கு திறக்கும். Lab timings.\n",
+        }.items():
+            self.files[name] = os.path.join(self.test_docs_path, name)
+            with open(self.files[name], "w", encoding="utf-8") as f:
+                f.write(text)
+
+        self.patcher = patch('utiles.rag_utiles.GoogleGenerativeAIEmbeddings', WordEmbeddings)
+        self.patcher.start()
+        from utiles.rag_utiles import RubyRAG
+        self.RubyRAG = RubyRAG
+        self.rag = RubyRAG(db_path=self.test_db_path, chunk_size=200, chunk_overlap=10)
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.rag.close()
+        for path in (self.test_db_path, self.test_docs_path):
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def test_01_collections_are_separate(self):
+        """Test Case 1: A query only searches the collection it names"""
+        print("\n[Test 1] Verifying collection isolation...")
+        self.rag.add_documents(self.files["manual.txt"], collection="manuals")
+        self.rag.add_documents(self.files["timetable.txt"], collection="timetables")
+        self.assertTrue(os.path.exists(os.path.join(self.test_db_path, "collections", "manuals", "index.faiss")))
+        self.assertIsNone(self.rag.vectorstore)
+
+        manuals = self.rag.query("bus timings", collection="manuals", use_hf_rerank=False)
+        self.assertIn("Lab timings", manuals)
+        self.assertNotIn("Route 12", manuals)
+        timetables = self.rag.query("lab timings", collection="timetables", use_hf_rerank=False)
+        self.assertIn("Route 12", timetables)
+        with self.assertRaises(RuntimeError):
+            self.rag.query("lab timings", use_hf_rerank=False)
+
+        reopened = self.RubyRAG(db_path=self.test_db_path)
+        self.assertEqual([c["name"] for c in reopened.list_collections()], ["manuals", "timetables"])
+        reopened.close()
+
+    def test_02_metadata_filters(self):
+        """Test Case 2: Chunks carry source/language metadata usable as filters"""
+        print("\n[Test 2] Verifying metadata filters...")
+        self.rag.add_documents(self.files["manual.txt"])
+        self.rag.add_documents(self.files["tamil.txt"])
+        docs = self.rag.retrieve("Lab timings", k=2, use_hf_rerank=False)
+        self.assertEqual({doc.metadata["language"] for doc in docs}, {"en", "ta"})
+        self.assertTrue(all(doc.metadata["ingested_at"] for doc in docs))
+
+        tamil = self.rag.query("Lab timings", use_hf_rerank=False, filters={"language": "ta"})
+        self.assertIn("ஆய்வகம்", tamil)
+        self.assertNotIn("working days", tamil)
+        manual = self.rag.query("Lab timings", use_hf_rerank=False, filters={"source": "manual"})
+        self.assertNotIn("ஆய்வகம்", manual)
+
+    def test_03_invalid_collection_name(self):
+        """Test Case 3: Collection names cannot escape the database folder"""
+        print("\n[Test 3] Verifying collection names...")
+        with self.assertRaises(ValueError):
+            self.rag.add_documents(self.files["manual.txt"], collection="../outside")
+
+
+if __name__ == "__main__":
+    unittest.main()
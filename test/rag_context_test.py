@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from utiles.rag_context import pack_context, estimate_tokens
+
+TEXT = (
+    "Every student must maintain a minimum attendance of 75 percent in each course. "
+    "Attendance is recorded in the first ten minutes of every class. "
+    "Students below 65 percent must apply for condonation with a medical certificate. "
+    "Condonation requests are reviewed by the Head of Department every Friday. "
+    "The laboratories are open from 8:30 AM to 6:00 PM on working days."
+)
+
+
+class TestRagContext(unittest.TestCase):
+    def setUp(self):
+        """Overlapping chunks of one source, the way RubyRAG splits them."""
+        splitter = RecursiveCharacterTextSplitter(chunk_size=120, chunk_overlap=40, add_start_index=True)
+        self.chunks = splitter.split_documents([Document(page_content=TEXT, metadata={"source": "manual.txt"})])
+        for rank, chunk in enumerate(self.chunks):
+            chunk.metadata["score"] = -rank
+
+    def test_01_merge_overlapping_chunks(self):
+        """Test Case 1: Overlapping neighbours become one passage without repeated text"""
+        print("\n[Test 1] Verifying overlap merge...")
+        self.assertGreater(len(self.chunks), 2)
+        packed = pack_context(self.chunks)
+        self.assertEqual(packed["passages"], 1)
+        self.assertEqual(packed["context"], f"[Context 1]\n{TEXT}")
+        self.assertGreater(packed["tokens_saved"], 0)
+
+    def test_02_merge_without_offsets(self):
+        """Test Case 2: Chunks from old stores (no start_index) merge on shared text"""
+        print("\n[Test 2] Verifying text-overlap merge...")
+        for chunk in self.chunks:
+            del chunk.metadata["start_index"]
+        packed = pack_context(list(reversed(self.chunks)))
+        self.assertEqual(packed["passages"], 1)
+        self.assertIn("Friday", packed["context"])
+        self.assertEqual(packed["context"].count("minimum attendance"), 1)
+
+    def test_03_near_duplicates(self):
+        """Test Case 3: Near-duplicate passages from different sources are dropped"""
+        print("\n[Test 3] Verifying near-duplicate removal...")
+        docs = [
+            Document(page_content=TEXT, metadata={"source": "a.pdf", "score": 0.9}),
+            Document(page_content=TEXT.replace("Friday", "Friday."), metadata={"source": "b.pdf", "score": 0.5}),
+            Document(page_content="Bus passes are issued per semester.", metadata={"source": "c.txt", "score": 0.7}),
+        ]
+        packed = pack_context(docs)
+        self.assertEqual(packed["passages"], 2)
+        # Ordered by score: the duplicate kept is the best-scoring one
+        self.assertTrue(packed["context"].startswith(f"[Context 1]\n{TEXT}"))
+        self.assertIn("[Context 2]\nBus passes", packed["context"])
+
+    def test_04_token_budget(self):
+        """Test Case 4: Context never exceeds the token budget"""
+        print("\n[Test 4] Verifying token budget...")
+        docs = [Document(page_content=f"Passage {i}. " + "word " * 60, metadata={"source": f"{i}.txt"}) for i in range(5)]
+        for budget in (40, 100, 250):
+            packed = pack_context(docs, token_budget=budget)
+            self.assertLessEqual(estimate_tokens(packed["context"]), budget)
+            self.assertGreater(packed["passages"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
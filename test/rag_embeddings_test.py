@@ -0,0 +1,44 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.rag_embeddings import HashingEmbeddings
+
+
+class TestHashingEmbeddings(unittest.TestCase):
+    def setUp(self):
+        self.embeddings = HashingEmbeddings(dim=128)
+
+    def test_01_deterministic(self):
+        """Test Case 1: Same text gives the same unit vector, in every instance"""
+        print("\n[Test 1] Verifying determinism...")
+        text = "The GPU lab opens at 8:30 AM."
+        first = np.array(self.embeddings.embed_query(text))
+        second = np.array(HashingEmbeddings(dim=128).embed_documents([text])[0])
+        self.assertEqual(first.shape, (128,))
+        np.testing.assert_array_equal(first, second)
+        self.assertAlmostEqual(float(np.linalg.norm(first)), 1.0, places=5)
+
+    def test_02_lexical_similarity(self):
+        """Test Case 2: A question is closer to the passage that shares its words"""
+        print("\n[Test 2] Verifying similarity...")
+        query = np.array(self.embeddings.embed_query("When does the GPU lab open?"))
+        docs = np.array(self.embeddings.embed_documents([
+            "Route 12 bus leaves the main gate at 7:45 AM.",
+            "The GPU lab open hours are 8:30 AM to 6 PM.",
+        ]))
+        self.assertEqual(int(np.argmax(docs @ query)), 1)
+
+    def test_03_empty_text(self):
+        """Test Case 3: Text without words embeds to a zero vector instead of failing"""
+        print("\n[Test 3] Verifying empty text...")
+        self.assertEqual(self.embeddings.embed_query("the of ?"), [0.0] * 128)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import shutil
+
+import numpy as np
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles import rag_index
+
+
+class TestRagIndex(unittest.TestCase):
+    def setUp(self):
+        """Synthetic clustered vectors so the tests run offline."""
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(32, 32)).astype("float32")
+        self.vectors = (centers[rng.integers(0, 32, 4000)] + 0.3 * rng.normal(size=(4000, 32))).astype("float32")
+        self.test_db_path = "test_rag_index_db"
+
+    def tearDown(self):
+        if os.path.exists(self.test_db_path):
+            shutil.rmtree(self.test_db_path)
+
+    def test_01_auto_tiers(self):
+        """Test Case 1: Automatic index choice by corpus size"""
+        print("\n[Test 1] Verifying automatic tiers...")
+        self.assertEqual(rag_index.choose_index_spec(500, 768)["type"], "flat")
+        self.assertEqual(rag_index.choose_index_spec(50_000, 768)["type"], "hnsw")
+        self.assertEqual(rag_index.choose_index_spec(500_000, 768)["type"], "ivf_sq8")
+        spec = rag_index.choose_index_spec(2_000_000, 768)
+        self.assertEqual(spec["type"], "ivf_pq")
+        self.assertEqual(768 % int(spec["factory"].split("PQ")[1]), 0)
+        with self.assertRaises(ValueError):
+            rag_index.choose_index_spec(10, 8, "annoy")
+
+    def test_02_trained_index_recall(self):
+        """Test Case 2: Trained IVF / HNSW indexes find the exact neighbour"""
+        print("\n[Test 2] Verifying trained index search...")
+        for index_type in ("ivf", "ivf_sq8", "hnsw"):
+            spec = rag_index.choose_index_spec(len(self.vectors), 32, index_type)
+            index = rag_index.build_index(self.vectors, spec)
+            index.add(self.vectors)
+            rag_index.set_search_params(index, nprobe=spec["nlist"], ef_search=128)
+            _, ids = index.search(self.vectors[:20], 1)
+            self.assertGreaterEqual((ids[:, 0] == np.arange(20)).mean(), 0.9, index_type)
+
+    def test_03_rebuild_from_flat(self):
+        """Test Case 3: Migrating a flat index keeps every vector in place"""
+        print("\n[Test 3] Verifying flat -> IVF rebuild...")
+        flat = rag_index.build_index(self.vectors, rag_index.choose_index_spec(0, 32, "flat"))
+        flat.add(self.vectors)
+        spec = rag_index.choose_index_spec(len(self.vectors), 32, "ivf")
+        rebuilt = rag_index.rebuild_index(flat, spec)
+        self.assertEqual(rebuilt.ntotal, flat.ntotal)
+        np.testing.assert_allclose(rag_index.reconstruct_vectors(rebuilt)[:5], self.vectors[:5], rtol=1e-5)
+
+    def test_04_needs_rebuild(self):
+        """Test Case 4: Rebuilds only happen for automatic indexes crossing a tier"""
+        print("\n[Test 4] Verifying rebuild policy...")
+        spec = rag_index.choose_index_spec(100, 768)
+        self.assertFalse(rag_index.needs_rebuild(spec, 5_000))
+        self.assertTrue(rag_index.needs_rebuild(spec, 20_000))
+        self.assertFalse(rag_index.needs_rebuild(spec, 20_000, index_type="flat"))
+
+    def test_05_small_corpus_falls_back_to_flat(self):
+        """Test Case 5: A fixed IVF type on a corpus too small to train it uses flat until it can be trained"""
+        print("\n[Test 5] Verifying the small-corpus fallback...")
+        for index_type, n in (("ivf", 10), ("ivf_sq8", 10), ("ivf_pq", 200)):
+            spec = rag_index.choose_index_spec(n, 32, index_type)
+            self.assertEqual(spec["type"], "flat", index_type)
+            index = rag_index.build_index(self.vectors[:n], spec)
+            index.add(self.vectors[:n])
+            _, ids = index.search(self.vectors[:3], 1)
+            self.assertEqual(ids[:, 0].tolist(), [0, 1, 2])
+            self.assertFalse(rag_index.needs_rebuild(spec, n, index_type))
+            self.assertTrue(rag_index.needs_rebuild(spec, len(self.vectors), index_type))
+            grown = rag_index.choose_index_spec(len(self.vectors), 32, index_type)
+            self.assertEqual(grown["type"], index_type)
+            self.assertFalse(rag_index.needs_rebuild(grown, len(self.vectors), index_type))
+        self.assertEqual(rag_index.min_training_vectors(10, "ivf_pq"), 256)
+        self.assertEqual(rag_index.min_training_vectors(10, "hnsw"), 0)
+
+    def test_06_params_roundtrip(self):
+        """Test Case 6: Index parameters are persisted"""
+        print("\n[Test 6] Verifying parameter persistence...")
+        self.assertIsNone(rag_index.load_index_params(self.test_db_path))
+        spec = rag_index.choose_index_spec(200_000, 64)
+        rag_index.save_index_params(self.test_db_path, spec)
+        self.assertEqual(rag_index.load_index_params(self.test_db_path), spec)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import shutil
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+
+from utiles.rag_embeddings import HashingEmbeddings
+from benchmarks.rag_ingest_memory import write_pdf
+
+
+class BatchRecordingEmbeddings(HashingEmbeddings):
+    """HashingEmbeddings that records the size of every embedding batch."""
+    def __init__(self):
+        super().__init__(dim=64)
+        self.batches = []
+
+    def embed_documents(self, texts):
+        self.batches.append(len(texts))
+        return super().embed_documents(texts)
+
+
+class TestStreamingIngestion(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_rag_ingest_db"
+        self.test_docs_path = "test_rag_ingest_docs"
+        os.makedirs(self.test_docs_path, exist_ok=True)
+        from utiles.rag_utiles import RubyRAG
+        self.embeddings = BatchRecordingEmbeddings()
+        self.rag = RubyRAG(db_path=self.test_db_path, chunk_size=200, chunk_overlap=20, embeddings=self.embeddings)
+
+    def tearDown(self):
+        self.rag.close()
+        for path in (self.test_db_path, self.test_docs_path):
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def test_01_pdf_pages_in_bounded_batches(self):
+        """Test Case 1: A PDF is embedded in batches no larger than batch_size"""
+        print("\n[Test 1] Verifying batched PDF ingestion...")
+        pdf_path = os.path.join(self.test_docs_path, "manual.pdf")
+        write_pdf(pdf_path, pages=30, chars_per_page=1200)
+        self.rag.add_documents(pdf_path, batch_size=16)
+
+        self.assertGreater(len(self.embeddings.batches), 3)
+        self.assertLessEqual(max(self.embeddings.batches), 16)
+        store = self.rag.vectorstore
+        self.assertEqual(store.count, sum(self.embeddings.batches))
+        self.assertGreater(len(store.filter_ids({"page": 29})), 0)
+        first = store.get_documents([0])[0]
+        self.assertEqual(first.metadata["page"], 0)
+        self.assertTrue(first.page_content.startswith("Page 1."))
+
+    def test_02_text_blocks_match_whole_file(self):
+        """Test Case 2: Reading text in blocks gives the same chunks and offsets as one read"""
+        print("\n[Test 2] Verifying block-wise text reading...")
+        text_path = os.path.join(self.test_docs_path, "notes.txt")
+        paragraphs = [f"Paragraph {i}. " + "The lab schedule is posted weekly. " * 4 for i in range(40)]
+        text = "\n\n".join(paragraphs)
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+        whole = self.rag.text_splitter.split_documents([Document(page_content=text)])
+        with patch("utiles.rag_utiles.TEXT_BLOCK_CHARS", 700):
+            self.assertGreater(len(list(self.rag._iter_pages(text_path))), 5)
+            streamed = self.rag._load_documents(text_path)
+        self.assertEqual([c.page_content for c in streamed], [c.page_content for c in whole])
+        for chunk in streamed:
+            start = chunk.metadata["start_index"]
+            self.assertEqual(text[start:start + len(chunk.page_content)], chunk.page_content)
+
+    def test_03_text_without_line_breaks_is_bounded(self):
+        """Test Case 3: A file with no line breaks is still read in bounded blocks"""
+        print("\n[Test 3] Verifying block flushing without line breaks...")
+        text_path = os.path.join(self.test_docs_path, "minified.txt")
+        text = "word " * 2000 + "x" * 3000
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+        with patch("utiles.rag_utiles.TEXT_BLOCK_CHARS", 700):
+            pages = list(self.rag._iter_pages(text_path))
+        self.assertGreater(len(pages), 10)
+        self.assertLessEqual(max(len(p.page_content) for p in pages), 1400)
+        self.assertEqual("".join(p.page_content for p in pages), text)
+        for page in pages:
+            offset = page.metadata["offset"]
+            self.assertEqual(text[offset:offset + len(page.page_content)], page.page_content)
+
+    def test_04_interrupted_ingestion_is_dropped(self):
+        """Test Case 4: Batches written before a crash are discarded on reopen"""
+        print("\n[Test 4] Verifying crash safety...")
+        first = os.path.join(self.test_docs_path, "first.txt")
+        with open(first, "w", encoding="utf-8") as f:
+            f.write("Ruby supports Tamil and Malayalam.\n")
+        self.rag.add_documents(first)
+        self.assertEqual(self.rag.vectorstore.count, 1)
+
+        pdf_path = os.path.join(self.test_docs_path, "manual.pdf")
+        write_pdf(pdf_path, pages=10, chars_per_page=1200)
+        with patch.object(self.rag.vectorstore, "save", side_effect=RuntimeError("disk full")):
+            with self.assertRaises(RuntimeError):
+                self.rag.add_documents(pdf_path, batch_size=8)
+        self.rag.close()
+
+        from utiles.rag_utiles import RubyRAG
+        self.rag = RubyRAG(db_path=self.test_db_path, embeddings=self.embeddings)
+        self.assertEqual(self.rag.vectorstore.count, 1)
+
+    def test_05_new_store_after_interrupted_first_ingest(self):
+        """Test Case 5: A store whose first ingest never saved can be created and filled again"""
+        print("\n[Test 5] Verifying re-creation after an interrupted first ingest...")
+        from utiles import rag_index
+        from utiles.rag_store import RagStore
+        spec = rag_index.choose_index_spec(3, 64, "flat")
+        docs = [Document(page_content=f"chunk {i}", metadata={"source": "a.txt"}) for i in range(3)]
+        vectors = self.embeddings.embed_documents([d.page_content for d in docs])
+
+        store = RagStore.create(self.test_db_path, spec)
+        store.add(vectors, docs, save=False)
+        store.close()
+        reopened = RagStore.open(self.test_db_path)
+        self.assertEqual(reopened.count, 0)
+        reopened.close()
+
+        store = RagStore.create(self.test_db_path, spec)
+        store.add(vectors, docs)
+        self.assertEqual(store.count, 3)
+        self.assertEqual(store.get_documents([2])[0].page_content, "chunk 2")
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import shutil
+
+import numpy as np
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from utiles import rag_index
+from utiles.rag_store import RagStore, is_legacy_store, migrate_legacy_store
+
+
+class FixedEmbeddings(Embeddings):
+    """Stand-in embedder; the store tests pass vectors explicitly."""
+    def embed_documents(self, texts):
+        return [[0.0] * 16 for _ in texts]
+
+    def embed_query(self, text):
+        return [0.0] * 16
+
+
+class TestRagStore(unittest.TestCase):
+    def setUp(self):
+        """Random vectors and matching chunks, no embedding service needed."""
+        self.test_db_path = "test_rag_store_db"
+        rng = np.random.default_rng(1)
+        self.vectors = rng.normal(size=(300, 16)).astype("float32")
+        self.docs = [
+            Document(
+                page_content=f"chunk {i}",
+                metadata={"source": "manual.pdf" if i % 2 else "fixture.txt", "page": i // 10, "n": i,
+                          "language": "ta" if i % 3 == 0 else "en",
+                          "ingested_at": "2025-01-01T10:00:00" if i < 150 else "2025-03-01T10:00:00"},
+            )
+            for i in range(300)
+        ]
+
+    def tearDown(self):
+        if os.path.exists(self.test_db_path):
+            shutil.rmtree(self.test_db_path)
+
+    def _create(self, index_type="flat"):
+        store = RagStore.create(self.test_db_path, rag_index.choose_index_spec(len(self.vectors), 16, index_type))
+        store.add(self.vectors[:200], self.docs[:200])
+        store.add(self.vectors[200:], self.docs[200:])
+        return store
+
+    def test_01_layout(self):
+        """Test Case 1: Native layout, no pickle"""
+        print("\n[Test 1] Verifying on-disk layout...")
+        self._create().close()
+        files = set(os.listdir(self.test_db_path))
+        self.assertTrue({"header.json", "vectors.f32", "index.faiss", "docstore.sqlite"} <= files)
+        self.assertNotIn("index.pkl", files)
+        self.assertEqual(os.path.getsize(os.path.join(self.test_db_path, "vectors.f32")), 300 * 16 * 4)
+
+    def test_02_reopen_and_search(self):
+        """Test Case 2: Reopened store finds chunks and materializes only those"""
+        print("\n[Test 2] Verifying reopen + lazy fetch...")
+        self._create().close()
+        store = RagStore.open(self.test_db_path)
+        self.assertEqual(store.count, 300)
+        hits = store.search(self.vectors[250], k=3)
+        self.assertEqual(hits[0][0], 250)
+        docs = store.get_documents([row_id for row_id, _ in hits])
+        self.assertEqual(len(docs), 3)
+        self.assertEqual(docs[0].page_content, "chunk 250")
+        self.assertEqual(docs[0].metadata["n"], 250)
+        store.close()
+
+    def test_03_quantized_refine(self):
+        """Test Case 3: Quantized indexes are re-ranked with exact vectors"""
+        print("\n[Test 3] Verifying exact re-ranking...")
+        store = self._create("ivf_sq8")
+        for row in (5, 123, 299):
+            hits = store.search(self.vectors[row], k=1, nprobe=64)
+            self.assertEqual(hits[0][0], row)
+            self.assertAlmostEqual(hits[0][1], 0.0, places=4)
+        store.close()
+
+    def test_04_rebuild(self):
+        """Test Case 4: Rebuilding to another layout keeps the rows"""
+        print("\n[Test 4] Verifying rebuild from vectors.f32...")
+        store = self._create()
+        store.rebuild(rag_index.choose_index_spec(300, 16, "hnsw"))
+        store.close()
+        store = RagStore.open(self.test_db_path)
+        self.assertEqual(store.spec["type"], "hnsw")
+        self.assertEqual(store.search(self.vectors[42], k=1)[0][0], 42)
+        store.close()
+
+    def test_05_recover_interrupted_add(self):
+        """Test Case 5: Rows written after the last header are dropped on open"""
+        print("\n[Test 5] Verifying crash recovery...")
+        self._create().close()
+        with open(os.path.join(self.test_db_path, "vectors.f32"), "ab") as f:
+            f.write(b"\0" * 64)
+        store = RagStore.open(self.test_db_path)
+        self.assertEqual(len(store.vectors), 300)
+        self.assertEqual(os.path.getsize(os.path.join(self.test_db_path, "vectors.f32")), 300 * 16 * 4)
+        store.close()
+
+    def test_06_migrate_legacy_pickle_store(self):
+        """Test Case 6: Old FAISS.save_local folders are converted in place"""
+        print("\n[Test 6] Verifying legacy migration...")
+        from langchain_community.vectorstores import FAISS
+        pairs = [(doc.page_content, vec.tolist()) for doc, vec in zip(self.docs, self.vectors)]
+        legacy = FAISS.from_embeddings(pairs, FixedEmbeddings(), metadatas=[doc.metadata for doc in self.docs])
+        legacy.save_local(self.test_db_path)
+        self.assertTrue(is_legacy_store(self.test_db_path))
+
+        store = migrate_legacy_store(self.test_db_path, FixedEmbeddings())
+        self.assertFalse(os.path.exists(os.path.join(self.test_db_path, "index.pkl")))
+        self.assertFalse(is_legacy_store(self.test_db_path))
+        self.assertEqual(store.count, 300)
+        self.assertEqual(store.get_documents([store.search(self.vectors[7], k=1)[0][0]])[0].page_content, "chunk 7")
+        store.close()
+
+    def test_07_filtered_search(self):
+        """Test Case 7: Filtered search only returns matching chunks"""
+        print("\n[Test 7] Verifying metadata filters...")
+        filters = {"source": "manual", "language": "ta", "ingested_after": "2025-02-01"}
+        expected = [i for i in range(150, 300) if i % 2 and i % 3 == 0]
+        for index_type in ("flat", "hnsw", "ivf_sq8"):
+            store = self._create(index_type)
+            self.assertEqual(store.filter_ids(filters).tolist(), expected)
+            # Small matches are scored exactly; EXACT_FILTER_MAX=0 forces the restricted index search
+            for exact_max in (20_000, 0):
+                with patch("utiles.rag_store.EXACT_FILTER_MAX", exact_max):
+                    hits = store.search(self.vectors[4], k=5, nprobe=64, filters=filters)
+                self.assertEqual(len(hits), 5)
+                self.assertTrue(all(row_id in expected for row_id, _ in hits), index_type)
+                hit = store.search(self.vectors[201], k=1, nprobe=64, filters=filters)[0][0]
+                self.assertEqual(hit, 201)
+            self.assertEqual(store.search(self.vectors[0], k=3, filters={"page": 99}), [])
+            self.assertEqual(store.filter_ids({"ingested_before": "2025-01-01"}).tolist(), list(range(150)))
+            store.close()
+            shutil.rmtree(self.test_db_path)
+
+    def test_08_upgrade_v1_docstore(self):
+        """Test Case 8: Stores without filter columns are upgraded on open"""
+        print("\n[Test 8] Verifying v1 upgrade...")
+        import json
+        import sqlite3
+        self._create().close()
+        db = sqlite3.connect(os.path.join(self.test_db_path, "docstore.sqlite"))
+        db.execute("CREATE TABLE old AS SELECT id, content, metadata FROM chunks")
+        db.execute("DROP TABLE chunks")
+        db.execute("ALTER TABLE old RENAME TO chunks")
+        db.commit()
+        db.close()
+        header_path = os.path.join(self.test_db_path, "header.json")
+        with open(header_path) as f:
+            header = json.load(f)
+        header["version"] = 1
+        with open(header_path, "w") as f:
+            json.dump(header, f)
+
+        store = RagStore.open(self.test_db_path)
+        self.assertEqual(store.header["version"], 2)
+        self.assertEqual(len(store.filter_ids({"language": "ta"})), 100)
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import sys
+import os
+import time
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.safe_eval import CalculationError, SafeEvaluator, calculate
+
+
+class TestSafeEval(unittest.TestCase):
+    def setUp(self):
+        self.evaluator = SafeEvaluator()
+
+    def calc(self, text):
+        return calculate(text, evaluator=self.evaluator)
+
+    def test_01_arithmetic_and_notation(self):
+        """Test Case 1: Arithmetic, functions, percentages and everyday notation"""
+        print("\n[Test 1] Verifying expressions...")
+        cases = {
+            "2 + 3 * (4 - 1)": "11",
+            "7 / 2": "3.5",
+            "7 // 2 + 7 % 3": "4",
+            "2^10": "1024",
+            "3 × 4 ÷ 2": "6",
+            "18% of 4500": "810",
+            "250 + 10%": "275",
+            "1200 - 25%": "900",
+            "sqrt(16) + log(1000, 10) + factorial(5)": "127",
+            "round(pi, 4)": "3.1416",
+            "1/3": "0.333333333333",
+            "2 ** 100": "1267650600228229401496703205376",
+            "what is 12 * 12 =": None,  # words are not expressions
+        }
+        for expression, expected in cases.items():
+            if expected is None:
+                with self.assertRaises(CalculationError):
+                    self.calc(expression)
+            else:
+                self.assertEqual(self.calc(expression), expected, expression)
+
+    def test_02_lists_and_aggregates(self):
+        """Test Case 2: Lists are numpy arrays with vectorized aggregates"""
+        print("\n[Test 2] Verifying list operations...")
+        numbers = list(range(1, 10001))
+        self.assertEqual(self.calc(f"sum({numbers})"), "50005000")
+        self.assertEqual(self.calc(f"mean({numbers})"), "5000.5")
+        self.assertEqual(self.calc("median([5, 1, -3, 9])"), "3")
+        self.assertEqual(self.calc("std([2, 4, 4, 4, 5, 5, 7, 9])"), "2")
+        self.assertEqual(self.calc("max(3, [7, 2], 5)"), "7")
+        self.assertEqual(self.calc("[1, 2, 3] * 2 + 1"), "[3, 5, 7]")
+        self.assertEqual(self.calc("sum(range(1, 101))"), "5050")
+        self.assertEqual(self.calc("sqrt([4, 9, 16])"), "[2, 3, 4]")
+        self.assertTrue(self.calc("range(100)").endswith(", ... (100 values)]"))
+        # Unit conversions
+        self.assertEqual(self.calc("5 km to miles"), "5 km = 3.10685596119 miles")
+        self.assertEqual(self.calc("98.6 F in C"), "98.6 F = 37 C")
+        self.assertEqual(self.calc("2 GB to MB"), "2 GB = 2048 MB")
+        self.assertEqual(self.calc("5km into m"), "5 km = 5000 m")
+        self.assertEqual(self.calc("212°F to °C"), "212 °F = 100 °C")
+        with self.assertRaises(CalculationError):
+            self.calc("10 kg to km")
+
+    def test_03_unsafe_input_is_rejected(self):
+        """Test Case 3: Anything outside the whitelist is refused before it runs"""
+        print("\n[Test 3] Verifying the whitelist...")
+        for expression in ("__import__('os').system('echo hi')", "().__class__.__bases__", "open('x')",
+                           "(lambda: 1)()", "[x for x in (1, 2)]", "'a' * 3", "x + 1", "[1, 2][0]",
+                           "sum(start=1)", "1 if 1 else 2", "1 < 2", "True + 1"):
+            with self.assertRaises(CalculationError, msg=expression):
+                self.evaluator.evaluate(expression)
+
+    def test_04_limits_and_cache(self):
+        """Test Case 4: Exponent, size and time limits hold and compiled expressions are cached"""
+        print("\n[Test 4] Verifying limits and the compile cache...")
+        for expression in ("9 ** 99999", "2 ** 10000 * 2 ** 10000", "factorial(5000)", "range(10 ** 9)",
+                           "comb(10 ** 6, 500000)"):
+            with self.assertRaises(CalculationError, msg=expression):
+                self.evaluator.evaluate(expression)
+        with self.assertRaises(ZeroDivisionError):
+            self.evaluator.evaluate("1 / 0")
+        slow = SafeEvaluator(time_limit=0.0)
+        with self.assertRaises(CalculationError):
+            slow.evaluate("sum(range(1000)) ** 2")
+
+        evaluator = SafeEvaluator()
+        for _ in range(3):
+            evaluator.evaluate("sum([1, 2, 3]) * 4")
+        self.assertEqual(evaluator.stats()["hits"], 2)
+        from utiles.toolbox import calculator
+        self.assertEqual(calculator.invoke({"query": "15% of 200"}), "30")
+        self.assertTrue(calculator.invoke({"query": "__import__('os')"}).startswith("Calculator Error:"))
+
+    def test_05_pathological_input_is_fast(self):
+        """Test Case 5: Long letter, digit and space runs are rejected or parsed in linear time"""
+        print("\n[Test 5] Verifying parsing cost on pathological input...")
+        for text in ("1 " + "a" * 20000 + " to x", "1" * 20000 + "x", "1 +" + " " * 20000 + "x%",
+                     "5" + " km" * 5000 + " to m"):
+            start = time.perf_counter()
+            with self.assertRaises(CalculationError):
+                self.calc(text)
+            self.assertLess(time.perf_counter() - start, 1.0, msg=text[:20])
+        start = time.perf_counter()
+        with self.assertRaises(CalculationError):
+            self.calc("a" * 1_000_001)
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+    def test_06_long_chains_and_real_results(self):
+        """Test Case 6: Long flat chains evaluate and complex results are refused"""
+        print("\n[Test 6] Verifying long chains and real results...")
+        self.assertEqual(self.calc("+".join(str(i) for i in range(10_000))), str(sum(range(10_000))))
+        self.assertEqual(self.calc("-".join(["1"] * 5000)), "-4998")
+        self.assertEqual(self.calc(" + ".join(f"{i}*2" for i in range(3000)) + " - 1e-1*10"), str(2 * sum(range(3000)) - 1))
+        self.assertEqual(self.calc("*".join(["2"] * 500) + " / 2**499 + 1"), "3")
+        self.assertEqual(self.calc("*".join(["1"] * 150) + " + 1"), "2")
+        with self.assertRaises(CalculationError):
+            self.calc("(-8)**(1/3)")
+        self.assertEqual(self.calc("cbrt(-8)"), "-2")
+
+
+if __name__ == '__main__':
+    unittest.main()
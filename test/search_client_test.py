@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.news_store import NewsPrefetcher, NewsStore
+from utiles.search_client import RateLimiter, RecordedBackend, SearchClient, SearchError, canonical_url
+
+RECORDING = os.path.join(os.path.dirname(__file__), "fixtures", "search_responses.json")
+COMPARISON = ["iphone 15 price in india", "pixel 8 price in india", "galaxy s24 price in india"]
+
+
+class TestSearchClient(unittest.TestCase):
+    def make_client(self, latency=0.0, **kwargs):
+        self.backend = RecordedBackend(RECORDING, latency=latency)
+        return SearchClient(backend=self.backend, limiter=RateLimiter(rate=1000, burst=1000), **kwargs)
+
+    def test_01_results_are_cached_by_normalized_query(self):
+        """Test Case 1: Repeated searches are answered from the TTL cache"""
+        print("\n[Test 1] Verifying the result cache...")
+        client = self.make_client()
+        first = client.text("Chennai weather today", max_results=2)
+        again = client.text("  chennai   WEATHER today ", max_results=2)
+        self.assertEqual(first, again)
+        self.assertEqual(len(self.backend.calls), 1)
+        first[0]["title"] = "changed"  # callers get copies
+        self.assertNotEqual(client.text("chennai weather today", max_results=2)[0]["title"], "changed")
+        self.assertEqual(client.news("cricket")[0]["source"], "ESPNcricinfo")
+        self.assertEqual(client.stats()["text_cache"]["hits"], 2)
+
+    def test_02_multi_search_runs_concurrently_and_dedupes(self):
+        """Test Case 2: multi_search fans out and merges results by canonical URL"""
+        print("\n[Test 2] Verifying multi-query fan-out...")
+        client = self.make_client(latency=0.2)
+        start = time.perf_counter()
+        results = client.multi_search(COMPARISON + ["iPhone 15 price in India"], max_results=4)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 0.5)  # three 0.2 s requests in parallel, the repeat is dropped
+        self.assertEqual(len(self.backend.calls), 3)
+        # Every query's top result comes first
+        self.assertEqual([r["title"].split(" Price")[0] for r in results[:3]],
+                         ["Apple iPhone 15", "Google Pixel 8", "Samsung Galaxy S24"])
+        shared = [r for r in results if r["title"].startswith("iPhone 15 vs Pixel 8")]
+        self.assertEqual(len(shared), 1)
+        self.assertEqual(shared[0]["queries"], COMPARISON[:2])
+        self.assertEqual(len(results), 10)
+        self.assertEqual(canonical_url("https://www.Example.com/a/?utm_source=x&id=2#top"), "example.com/a?id=2")
+
+    def test_03_rate_limiting(self):
+        """Test Case 3: The token bucket spaces requests and a rate-limit error starts a cool-down"""
+        print("\n[Test 3] Verifying rate limiting...")
+        now = [0.0]
+        slept = []
+
+        def sleep(seconds):
+            slept.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(rate=2, burst=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(4):
+            limiter.acquire()
+        self.assertEqual(slept, [0.5, 0.5])
+
+        client = self.make_client()
+        with patch.object(self.backend, "text", side_effect=RuntimeError("202 Ratelimit")), \
+                patch.object(self.backend, "is_rate_limit", return_value=True):
+            with self.assertRaises(RuntimeError):
+                client.text("who won the world cup in 2011")
+        with self.assertRaises(SearchError):
+            client.text("who won the world cup in 2011")
+        self.assertEqual(client.stats()["errors"], 1)
+
+    def test_04_tools_use_the_shared_client(self):
+        """Test Case 4: web_search and get_latest_news go through the shared client"""
+        print("\n[Test 4] Verifying the tools...")
+        from utiles.ruby_tools import DuckDuckGoSearchTool, GetLatestNewsTool
+        client = self.make_client()
+        with tempfile.TemporaryDirectory() as tmp:
+            prefetcher = NewsPrefetcher(NewsStore(os.path.join(tmp, "news.sqlite")), client=client, interests=lambda: [])
+            with patch("utiles.ruby_tools.get_search_client", return_value=client), \
+                    patch("utiles.ruby_tools.get_news_prefetcher", return_value=prefetcher):
+                single = DuckDuckGoSearchTool().invoke({"query": "who won the world cup in 2011"})
+                compared = DuckDuckGoSearchTool().invoke({"queries": COMPARISON})
+                as_text = DuckDuckGoSearchTool().invoke({"queries": '["iphone 15 price in india"; "pixel 8 price in india"]'})
+                news = GetLatestNewsTool().invoke({"query": ""})
+            prefetcher.store.close()
+        self.assertIn("India won the final", single)
+        self.assertIn("Samsung Galaxy S24", compared)
+        self.assertEqual(compared.count("which one to buy"), 1)
+        self.assertIn("Google Pixel 8", as_text)
+        self.assertIn("ISRO", news)
+        self.assertEqual(len(self.backend.calls), 5)  # the last two searches were cached
+
+
+if __name__ == '__main__':
+    unittest.main()
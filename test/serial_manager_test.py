@@ -0,0 +1,151 @@
+import unittest
+import sys
+import os
+import select
+import threading
+import time
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.serial_manager import SerialConnectionManager
+
+if sys.platform != "win32":
+    import pty
+    import tty
+
+
+class FakeArduino:
+    """Pseudo-terminal loopback: answers each line with "OK <line>" (or stays silent for "QUIET", or always)."""
+    def __init__(self, banner=b"READY\n", replies=True):
+        self.master, slave = pty.openpty()
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+        self._slave = slave  # keep the pty alive until the manager opens it
+        self.reads = []
+        self.lines = []
+        self.banner = banner
+        self.replies = replies
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        buffer = b""
+        time.sleep(0.2)  # the board resets when the port opens, then prints its banner
+        if self.banner:
+            os.write(self.master, self.banner)
+        while not self._stop.is_set():
+            if not select.select([self.master], [], [], 0.05)[0]:
+                continue
+            try:
+                chunk = os.read(self.master, 1024)
+            except OSError:
+                return
+            if not chunk:
+                return
+            self.reads.append(chunk)
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                self.lines.append(line.decode())
+                if self.replies and line != b"QUIET":
+                    os.write(self.master, b"OK " + line + b"\n")
+
+    def unplug(self):
+        # Stop the reader first: a thread blocked in read() would keep the master end open
+        self._stop.set()
+        self._thread.join()
+        os.close(self.master)
+        os.close(self._slave)
+
+
+@unittest.skipIf(sys.platform == "win32", "needs a POSIX pseudo-terminal")
+class TestSerialConnectionManager(unittest.TestCase):
+    def setUp(self):
+        self.device = FakeArduino()
+        self.manager = SerialConnectionManager(port_finder=lambda: self.device.port, reset_wait=1.0, reply_timeout=0.5)
+
+    def tearDown(self):
+        self.manager.close()
+
+    def test_01_replies_are_correlated(self):
+        """Test Case 1: Each command gets its own reply over one open connection"""
+        print("\n[Test 1] Verifying command/response correlation...")
+        banner = []
+        self.manager.line_listeners.append(banner.append)
+        start = time.perf_counter()
+        self.assertEqual(self.manager.send("LED ON"), "OK LED ON")
+        self.assertEqual(self.manager.send("LED OFF"), "OK LED OFF")
+        self.assertLess(time.perf_counter() - start, 1.0)  # the banner ended the reset wait early
+        self.assertEqual(banner, ["READY"])
+        self.assertEqual(self.manager.connected_port, self.device.port)
+
+    def test_02_rapid_commands_are_batched(self):
+        """Test Case 2: Concurrent commands share writes and still get the right replies"""
+        print("\n[Test 2] Verifying batching...")
+        self.manager.connect()
+        futures = [self.manager.send_async(f"SERVO {i}") for i in range(20)]
+        replies = [f.result(2) for f in futures]
+        self.assertEqual(replies, [f"OK SERVO {i}" for i in range(20)])
+        self.assertLess(self.manager.stats["writes"], 20)
+
+    def test_03_timeout_does_not_shift_replies(self):
+        """Test Case 3: A command without a reply times out and later replies stay matched"""
+        print("\n[Test 3] Verifying reply timeouts...")
+        with self.assertRaises(TimeoutError):
+            self.manager.send("QUIET", timeout=0.2)
+        self.assertIsNone(self.manager.send("BEEP", expect_reply=False))
+        self.assertEqual(self.manager.send("PING"), "OK PING")
+
+    def test_04_reconnects_after_unplug(self):
+        """Test Case 4: Unplugging fails waiting commands and the manager reconnects to the new port"""
+        print("\n[Test 4] Verifying reconnect...")
+        self.assertEqual(self.manager.send("A"), "OK A")
+        self.device.unplug()
+        deadline = time.time() + 3
+        while self.manager.connected and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertFalse(self.manager.connected)
+
+        self.device = FakeArduino()  # plugged back in, on a new port name
+        deadline = time.time() + 5
+        while not self.manager.connected and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertTrue(self.manager.connected)
+        self.assertEqual(self.manager.send("B"), "OK B")
+        self.assertEqual(self.manager.stats["reconnects"], 1)
+
+    def test_05_silent_sketch_is_learned(self):
+        """Test Case 5: Auto mode probes once, then stops waiting on a sketch that never replies"""
+        print("\n[Test 5] Verifying fire-and-forget sketches...")
+        self.manager.close()
+        self.device.unplug()
+        self.device = FakeArduino(replies=False)
+        self.manager = SerialConnectionManager(port_finder=lambda: self.device.port, reset_wait=1.0,
+                                               reply_timeout=2.0, probe_timeout=0.2)
+        self.manager.connect()
+        start = time.perf_counter()
+        self.assertIsNone(self.manager.send("LED ON", expect_reply=None))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertFalse(self.manager.sketch_replies)
+        start = time.perf_counter()
+        for i in range(5):
+            self.assertIsNone(self.manager.send(f"SERVO {i}", expect_reply=None))
+        self.assertLess(time.perf_counter() - start, 0.5)
+        deadline = time.time() + 2
+        while len(self.device.lines) < 6 and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.device.lines, ["LED ON"] + [f"SERVO {i}" for i in range(5)])
+
+    def test_06_replying_sketch_is_learned(self):
+        """Test Case 6: Auto mode returns the replies of a sketch that sends them"""
+        print("\n[Test 6] Verifying replying sketches in auto mode...")
+        self.assertEqual(self.manager.send("LED ON", expect_reply=None), "OK LED ON")
+        self.assertTrue(self.manager.sketch_replies)
+        with self.assertRaises(TimeoutError):
+            self.manager.send("QUIET", expect_reply=None, timeout=0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
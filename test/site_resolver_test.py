@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.site_resolver import AhoCorasick, SiteResolver
+
+
+class TestSiteResolver(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.resolver = SiteResolver()
+
+    def test_01_matcher_finds_overlapping_patterns(self):
+        """Test Case 1: Aho-Corasick finds every pattern occurrence, overlaps included"""
+        print("\n[Test 1] Verifying the matcher...")
+        hits = AhoCorasick(["he", "she", "his", "hers"]).find("ushers")
+        self.assertEqual(sorted(hits), [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")])
+        # Whole words only, '*' terms also match longer words
+        found = self.resolver.match("Buy Clothes on facebook")
+        self.assertEqual(found["cloth*"], "clothes")
+        self.assertNotIn("book*", found)
+
+    def test_02_priorities_decide(self):
+        """Test Case 2: Specific rules beat generic ones regardless of word order"""
+        print("\n[Test 2] Verifying rule priorities...")
+        cases = {
+            "book a bus ticket": "redbus",
+            "google book train ticket": "irctc",
+            "google maps": "maps",  # used to go to google
+            "search on amazon": "amazon",  # used to go to google
+            "myntra shopping": "myntra",  # used to go to amazon
+            "buy clothes": "myntra",
+            "shop": "amazon",
+            "watch videos": "youtube",
+            "book my show": "bookmyshow",
+            "ரயில் டிக்கெட் முன்பதிவு": "irctc",
+            "perunthu tiket": "redbus",
+        }
+        for spoken, site in cases.items():
+            decision = self.resolver.resolve(spoken)
+            self.assertEqual((decision["kind"], decision["site"]), ("site", site), spoken)
+        self.assertEqual(self.resolver.resolve("movie")["kind"], "fallback")  # no booking context
+
+    def test_03_urls(self):
+        """Test Case 3: Search templates, direct URLs, searches and the fallback build the right URLs"""
+        print("\n[Test 3] Verifying URL building...")
+        self.assertEqual(self.resolver.resolve("Amazon", "wireless earbuds")["url"], "https://www.amazon.in/s?k=wireless%20earbuds")
+        self.assertEqual(self.resolver.resolve("chatgpt", "hello")["url"], "https://chatgpt.com")
+        self.assertEqual(self.resolver.resolve("youtube.com")["url"], "https://youtube.com")
+        rate = self.resolver.resolve("gold", "chennai")
+        self.assertEqual((rate["kind"], rate["site"], rate["search_term"]), ("search", "rate", "gold chennai rate today"))
+        self.assertEqual(self.resolver.resolve("thangam vilai", "indru")["search_term"], "thangam vilai indru")
+        official = self.resolver.resolve("anna university", "official website")
+        self.assertEqual(official["search_term"], "anna university official website")
+        fallback = self.resolver.resolve("github", "ruby")
+        self.assertEqual(fallback["url"], "https://www.google.com/search?q=ruby%20on%20github")
+
+    def test_04_web_navigation_uses_decision(self):
+        """Test Case 4: web_navigation opens the resolved URL and reports it"""
+        print("\n[Test 4] Verifying web_navigation...")
+        from utiles import pc_tools
+        with patch.object(pc_tools, "_open_in_chrome") as open_url, patch.object(pc_tools, "_record_activity_internal"):
+            reply = pc_tools.web_navigation.invoke({"site_name": "flipkart", "search_query": "phone"})
+        open_url.assert_called_once_with("https://www.flipkart.com/search?q=phone")
+        self.assertEqual(reply, "Navigating to flipkart to search for 'phone'.")
+
+
+if __name__ == '__main__':
+    unittest.main()
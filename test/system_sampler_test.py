@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import time
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.system_sampler import SystemSampler
+
+
+class TestSystemSampler(unittest.TestCase):
+    def test_01_ring_buffer_keeps_latest_samples(self):
+        """Test Case 1: The ring buffer keeps only the newest `history` samples"""
+        print("\n[Test 1] Verifying ring buffer...")
+        sampler = SystemSampler(history=3)
+        cpu = iter([[10.0], [20.0], [30.0], [40.0], [50.0]])
+        with patch("utiles.system_sampler.psutil.cpu_percent", side_effect=lambda percpu: next(cpu)):
+            for _ in range(5):
+                sampler.sample()
+        self.assertEqual(sampler.latest(wait=0)["cpu"], 50.0)
+        trend = sampler.trend("cpu", seconds=60)
+        self.assertEqual(trend["samples"], 3)
+        self.assertEqual((trend["min"], trend["max"], trend["avg"]), (30.0, 50.0, 40.0))
+
+    def test_02_trend_window_and_missing_sensors(self):
+        """Test Case 2: Trends only cover the requested window and skip missing readings"""
+        print("\n[Test 2] Verifying trend windows...")
+        sampler = SystemSampler(history=10)
+        with patch("utiles.system_sampler.psutil.sensors_battery", return_value=None):
+            sampler.sample()
+            sampler._times[0] -= 3600  # pretend the first sample is an hour old
+            sampler.sample()
+        self.assertEqual(sampler.trend("ram", seconds=600)["samples"], 1)
+        self.assertEqual(sampler.trend("ram", seconds=7200)["samples"], 2)
+        self.assertIsNone(sampler.trend("battery")["avg"])
+        with self.assertRaises(ValueError):
+            sampler.trend("gpu")
+
+    def test_03_background_thread_and_processes(self):
+        """Test Case 3: The thread fills samples and the process table lists this process"""
+        print("\n[Test 3] Verifying background sampling and top processes...")
+        sampler = SystemSampler(interval=0.05, process_interval=0.05)
+        scans = []
+        sampler.scan_listeners.append(scans.append)
+        self.assertIsNone(sampler.latest(wait=0))
+        sampler.start()
+        try:
+            self.assertIsNotNone(sampler.latest(wait=2))
+            deadline = time.time() + 2
+            while not scans and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            sampler.stop()
+        self.assertTrue(scans)
+        self.assertIn(os.getpid(), [p["pid"] for p in sampler.processes()])
+        top = sampler.top_processes(3, by="rss")
+        self.assertEqual(len(top), min(3, len(sampler.processes())))
+        self.assertGreaterEqual(top[0]["rss"], top[-1]["rss"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import json
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.tab_state import TabTable
+
+SNAPSHOT = {
+    "type": "snapshot", "seq": 1, "tabs": [
+        {"tab_id": 1, "window_id": 10, "url": "https://www.youtube.com/watch?v=x", "title": "Believer - YouTube", "active": True},
+        {"tab_id": 2, "window_id": 10, "url": "https://mail.google.com", "title": "Inbox", "active": False},
+    ],
+}
+
+
+class FakeSocket:
+    """flask-sock style socket replaying queued messages."""
+    def __init__(self, messages):
+        self.incoming = [json.dumps(m) for m in messages]
+        self.sent = []
+
+    def receive(self):
+        return self.incoming.pop(0) if self.incoming else None
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+
+class TestTabTable(unittest.TestCase):
+    def test_01_snapshot_and_deltas(self):
+        """Test Case 1: Snapshot then deltas keep the table exact"""
+        print("\n[Test 1] Verifying tab deltas...")
+        table = TabTable()
+        table.apply(SNAPSHOT)
+        table.apply({"type": "upsert", "seq": 2, "tab": {"tab_id": 3, "window_id": 10, "url": "https://hotstar.com", "title": "Hotstar"}})
+        table.apply({"type": "activate", "seq": 3, "tab_id": 3, "window_id": 10})
+        table.apply({"type": "media", "seq": 4, "tab_id": 1, "media": {"playing": True, "title": "Believer"}})
+        table.apply({"type": "remove", "seq": 5, "tab_id": 2})
+        self.assertEqual(sorted(t["tab_id"] for t in table.tabs()), [1, 3])
+        self.assertEqual([t["tab_id"] for t in table.active_tabs()], [3])
+        self.assertEqual([t["tab_id"] for t in table.playing()], [1])
+        self.assertEqual([t["tab_id"] for t in table.find("hotstar")], [3])
+
+    def test_02_gap_requests_resync(self):
+        """Test Case 2: A missed delta asks for a snapshot and ignores deltas until then"""
+        print("\n[Test 2] Verifying resync on gaps...")
+        table = TabTable()
+        self.assertEqual(table.apply({"type": "remove", "seq": 7, "tab_id": 1}), {"type": "resync"})
+        table.apply(SNAPSHOT)
+        self.assertEqual(table.apply({"type": "remove", "seq": 5, "tab_id": 1}), {"type": "resync"})
+        self.assertEqual(table.apply({"type": "remove", "seq": 2, "tab_id": 1}), {"type": "resync"})
+        self.assertEqual(len(table.tabs()), 2)
+        self.assertEqual(table.apply({"type": "ping"}), {"type": "pong"})
+
+    def test_03_serve_and_chrome_tool(self):
+        """Test Case 3: A connection fills the table, the tool reads it, and disconnecting clears it"""
+        print("\n[Test 3] Verifying the socket loop and get_chrome_activity...")
+        from utiles import pc_tools
+        table = TabTable()
+        seen = {}
+
+        class Socket(FakeSocket):
+            def receive(inner):
+                if not inner.incoming and "tool" not in seen:
+                    with patch("utiles.pc_tools.get_tab_table", return_value=table):
+                        seen["tool"] = pc_tools.get_chrome_activity.invoke({})
+                return super().receive()
+
+        ws = Socket([SNAPSHOT, {"type": "media", "seq": 2, "tab_id": 1, "media": {"playing": True, "title": "Believer"}},
+                     "not a dict"])
+        table.serve(ws)
+        self.assertEqual(ws.sent[0], {"type": "resync"})
+        self.assertIn("Believer - YouTube", seen["tool"])
+        self.assertIn("playing: Believer", seen["tool"])
+        self.assertFalse(table.connected)
+        self.assertEqual(table.tabs(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
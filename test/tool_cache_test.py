@@ -0,0 +1,136 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.tools import tool
+
+from utiles.tool_cache import ToolCache, cacheable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_tools():
+    calls = {"weather": 0, "open": 0}
+
+    @cacheable(ttl=60, stale_ttl=300, key=lambda args: args.get("city", "").strip().lower())
+    @tool
+    def weather(city: str = "") -> str:
+        """Weather for a city."""
+        calls["weather"] += 1
+        if city == "nowhere":
+            return "Weather Error: unknown city"
+        return f"{city.strip()}: sunny #{calls['weather']}"
+
+    @tool
+    def open_app(name: str) -> str:
+        """Opens an app (side effect)."""
+        calls["open"] += 1
+        return f"opened {name}"
+
+    return weather, open_app, calls
+
+
+class TestToolCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ToolCache(clock=self.clock)
+        self.weather, self.open_app, self.calls = make_tools()
+
+    def test_01_fresh_hits_and_uncached_tools(self):
+        """Test Case 1: Declared tools answer from the cache; undeclared tools always run"""
+        print("\n[Test 1] Verifying hits and opt-in caching...")
+        first = self.cache.execute(self.weather, {"city": "Chennai"})
+        self.assertEqual(self.cache.execute(self.weather, {"city": " chennai "}), first)  # same key
+        self.assertEqual(self.calls["weather"], 1)
+        self.cache.execute(self.open_app, {"name": "notepad"})
+        self.cache.execute(self.open_app, {"name": "notepad"})
+        self.assertEqual(self.calls["open"], 2)
+        # Errors are not stored
+        self.cache.execute(self.weather, {"city": "nowhere"})
+        self.cache.execute(self.weather, {"city": "nowhere"})
+        self.assertEqual(self.calls["weather"], 3)
+        self.assertEqual(self.cache.stats["errors_not_cached"], 2)
+
+    def test_02_stale_while_revalidate(self):
+        """Test Case 2: Stale results are served at once and refreshed in the background"""
+        print("\n[Test 2] Verifying stale-while-revalidate...")
+        self.assertEqual(self.cache.execute(self.weather, {"city": "Madurai"}), "Madurai: sunny #1")
+        self.clock.now += 120  # past ttl, within stale_ttl
+        self.assertEqual(self.cache.execute(self.weather, {"city": "Madurai"}), "Madurai: sunny #1")
+        deadline = time.time() + 5
+        while self.cache.stats["refreshes"] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.cache.execute(self.weather, {"city": "Madurai"}), "Madurai: sunny #2")
+        self.clock.now += 1000  # past stale_ttl: a blocking miss
+        self.assertEqual(self.cache.execute(self.weather, {"city": "Madurai"}), "Madurai: sunny #3")
+        self.assertEqual(self.cache.stats["stale"], 1)
+
+    def test_03_lru_and_single_flight(self):
+        """Test Case 3: The LRU drops the oldest entry and concurrent misses share one run"""
+        print("\n[Test 3] Verifying LRU eviction and single-flight...")
+        cache = ToolCache(max_entries=2, clock=self.clock)
+        for city in ("a", "b", "a", "c"):  # "b" is least recently used when "c" arrives
+            cache.execute(self.weather, {"city": city})
+        self.assertEqual(self.calls["weather"], 3)
+        cache.execute(self.weather, {"city": "a"})
+        cache.execute(self.weather, {"city": "b"})
+        self.assertEqual(self.calls["weather"], 4)
+
+        gate = threading.Event()
+        slow_calls = []
+
+        @cacheable(ttl=60)
+        @tool
+        def slow(query: str) -> str:
+            """Slow lookup."""
+            slow_calls.append(query)
+            gate.wait(5)
+            return "done"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.execute(slow, {"query": "x"}))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        gate.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, ["done"] * 4)
+        self.assertEqual(len(slow_calls), 1)
+
+    def test_04_turn_trace(self):
+        """Test Case 4: Calls made during a turn are recorded with their cache status"""
+        print("\n[Test 4] Verifying the per-turn trace...")
+        self.cache.execute(self.weather, {"city": "Salem"})
+        self.cache.begin_turn()
+        self.cache.execute(self.weather, {"city": "Salem"})
+        self.cache.execute(self.open_app, {"name": "calc"})
+        calls = self.cache.end_turn()
+        self.assertEqual([(c["tool"], c["cache"]) for c in calls], [("weather", "hit"), ("open_app", "uncached")])
+        self.assertEqual(self.cache.end_turn(), [])
+
+    def test_05_web_search_keys(self):
+        """Test Case 5: web_search keys split a string of queries like the tool does"""
+        print("\n[Test 5] Verifying web_search cache keys...")
+        from utiles.ruby_tools import DuckDuckGoSearchTool
+        search = DuckDuckGoSearchTool()
+        key = lambda args: self.cache.key_for(search, args)
+        self.assertNotEqual(key({"queries": "dog bites man"}), key({"queries": "man bites dog"}))
+        self.assertEqual(key({"queries": "pixel 8 price; iPhone 15 price"}),
+                         key({"queries": ["iphone 15  price", "pixel 8 price"]}))
+        self.assertEqual(key({"query": "Dog bites man"}), key({"queries": "dog bites man"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.tool_selector import ToolSelector, map_intent
+
+TOOLS = [
+    SimpleNamespace(name="youtube_video_player", description="Play a song or video on YouTube."),
+    SimpleNamespace(name="web_search", description="Search the web for current information."),
+    SimpleNamespace(name="calculator", description="Evaluate a mathematical expression."),
+    SimpleNamespace(name="get_weather", description="Current weather and forecast for a city."),
+    SimpleNamespace(name="open_system_app", description="Open an application installed on the computer."),
+    SimpleNamespace(name="close_application", description="Close a running application."),
+    SimpleNamespace(name="file_operation", description="List, copy, move or inspect files and folders."),
+    SimpleNamespace(name="get_system_health", description="CPU, memory and battery status."),
+]
+
+
+class FixedClassifier:
+    """Returns the same intent for every utterance."""
+    def __init__(self, label, confidence):
+        self.result = {"label": label, "confidence": confidence, "source": "fallback"}
+
+    def classify(self, text):
+        return self.result
+
+
+class TestToolSelector(unittest.TestCase):
+    def names(self, tools):
+        return [t.name for t in tools]
+
+    def test_01_confident_intent_selects_its_tools(self):
+        """Test Case 1: A confident intent picks its tools plus the safety set"""
+        print("\n[Test 1] Verifying intent-driven selection...")
+        selector = ToolSelector(TOOLS, top_n=3, classifier=FixedClassifier("weather", 0.9))
+        names = self.names(selector.select("will it rain in chennai today"))
+        self.assertIn("get_weather", names)
+        self.assertIn("web_search", names)
+        self.assertLess(len(names), len(TOOLS))
+        self.assertFalse(selector.last_selection["fallback"])
+        self.assertEqual(selector.last_selection["intent"], "weather")
+
+    def test_02_similarity_without_classifier(self):
+        """Test Case 2: Without a classifier, tools are picked by similarity alone"""
+        print("\n[Test 2] Verifying similarity-only selection...")
+        selector = ToolSelector(TOOLS, top_n=3)
+        names = self.names(selector.select("play believer song on youtube"))
+        self.assertIn("youtube_video_player", names)
+        self.assertNotIn("file_operation", names)
+
+    def test_03_small_talk_keeps_clear_matches(self):
+        """Test Case 3: Small talk sends the safety tools plus tools it clearly matches"""
+        print("\n[Test 3] Verifying small talk...")
+        selector = ToolSelector(TOOLS, classifier=FixedClassifier("small_talk", 0.8))
+        self.assertEqual(self.names(selector.select("hello ruby how are you")), ["web_search"])
+        names = self.names(selector.select("hi ruby, what's the weather and forecast in chennai"))
+        self.assertIn("get_weather", names)
+        self.assertLess(len(names), len(TOOLS))
+
+    def test_04_low_confidence_falls_back_to_all_tools(self):
+        """Test Case 4: No confident intent and no good match sends every tool"""
+        print("\n[Test 4] Verifying full-set fallback...")
+        selector = ToolSelector(TOOLS, classifier=FixedClassifier("unknown", 0.0))
+        self.assertEqual(self.names(selector.select("zxqv plorb")), self.names(TOOLS))
+        self.assertTrue(selector.last_selection["fallback"])
+
+        # A confident label that maps to no intent counts as no intent
+        selector = ToolSelector(TOOLS, classifier=FixedClassifier("calendar_set", 0.95))
+        self.assertEqual(self.names(selector.select("zxqv plorb")), self.names(TOOLS))
+        self.assertTrue(selector.last_selection["fallback"])
+
+    def test_05_original_order_and_classifier_errors(self):
+        """Test Case 5: Selection keeps tool order and survives a failing classifier"""
+        print("\n[Test 5] Verifying order and error handling...")
+        class Broken:
+            def classify(self, text):
+                raise RuntimeError("model crashed")
+        selector = ToolSelector(TOOLS, top_n=4, classifier=Broken())
+        selected = self.names(selector.select("copy the report file to the documents folder"))
+        self.assertIn("file_operation", selected)
+        order = self.names(TOOLS)
+        self.assertEqual(selected, sorted(selected, key=order.index))
+
+    def test_06_confirmation_keeps_previous_tools(self):
+        """Test Case 6: A short confirmation keeps the tools offered on the previous turn"""
+        print("\n[Test 6] Verifying follow-up turns...")
+        class ByText:
+            def classify(self, text):
+                if "play" in text:
+                    return {"label": "play_media", "confidence": 0.9}
+                return {"label": "weather", "confidence": 0.5}
+        selector = ToolSelector(TOOLS, top_n=2, classifier=ByText())
+        self.assertIn("youtube_video_player", self.names(selector.select("play believer song on youtube")))
+        for follow_up in ("yes please", "do it", "the second one"):
+            self.assertIn("youtube_video_player", self.names(selector.select(follow_up)), msg=follow_up)
+            self.assertTrue(selector.last_selection["follow_up"])
+        self.assertNotIn("youtube_video_player", self.names(selector.select("will it rain in chennai today")))
+
+        selector.select("play believer song on youtube")
+        selector.reset()
+        self.assertNotIn("youtube_video_player", self.names(selector.select("do it")))
+
+    def test_07_transformer_labels_map_to_intents(self):
+        """Test Case 7: Labels of the transformer model are mapped to the tool intents"""
+        print("\n[Test 7] Verifying label mapping...")
+        self.assertEqual(map_intent("weather"), "weather")
+        self.assertEqual(map_intent("play_music"), "play_media")
+        self.assertEqual(map_intent("weather_query"), "weather")
+        self.assertEqual(map_intent("qa_maths"), "calculate")
+        self.assertEqual(map_intent("iot_hue_lightoff"), "hardware")
+        self.assertEqual(map_intent("general_greet"), "small_talk")
+        self.assertIsNone(map_intent("calendar_set"))
+
+        selector = ToolSelector(TOOLS, top_n=2, classifier=FixedClassifier("weather_query", 0.9))
+        self.assertIn("get_weather", self.names(selector.select("is it going to be hot tomorrow")))
+        self.assertEqual(selector.last_selection["intent"], "weather")
+        self.assertEqual(selector.last_selection["label"], "weather_query")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.window_state import FakeBackend, Win32Backend, WindowStateService, detect_backend, window
+
+WINDOWS = [
+    window(1, "YouTube - Google Chrome", 100, "chrome.exe"),
+    window(2, "notes.txt - Notepad", 200, "notepad.exe"),
+    window(3, "New Tab", 101, "chrome.exe"),
+]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestWindowStateService(unittest.TestCase):
+    def test_01_reads_come_from_the_cache(self):
+        """Test Case 1: Repeated reads do not enumerate windows again"""
+        print("\n[Test 1] Verifying cached reads...")
+        backend = FakeBackend(WINDOWS)
+        service = WindowStateService(backend)
+        for _ in range(50):
+            service.titles()
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(service.titles(), ["YouTube - Google Chrome", "notes.txt - Notepad", "New Tab"])
+        self.assertEqual([w["handle"] for w in service.chrome_windows()], [1, 3])
+
+    def test_02_events_refresh_the_cache(self):
+        """Test Case 2: Backend events refresh the cache without waiting for the timer"""
+        print("\n[Test 2] Verifying event-driven refresh...")
+        backend = FakeBackend(WINDOWS, events=True)
+        service = WindowStateService(backend, safety_interval=60).start()
+        try:
+            self.assertTrue(service.events)
+            service.titles()
+            backend.set_windows(WINDOWS[:1])
+            self.assertTrue(wait_for(lambda: service.titles() == ["YouTube - Google Chrome"]))
+        finally:
+            service.stop()
+
+    def test_03_polling_without_events(self):
+        """Test Case 3: Backends without events are polled on the refresh interval"""
+        print("\n[Test 3] Verifying timer refresh...")
+        backend = FakeBackend(WINDOWS, events=False)
+        service = WindowStateService(backend, refresh_interval=0.05).start()
+        try:
+            self.assertFalse(service.events)
+            backend.windows = []
+            self.assertTrue(wait_for(lambda: service.windows() == []))
+            self.assertGreater(service.stats()["refreshes"], 0)
+        finally:
+            service.stop()
+
+    def test_04_tools_and_headless_detection(self):
+        """Test Case 4: pc_tools imports anywhere and its tools answer from the service"""
+        print("\n[Test 4] Verifying the window tools...")
+        with patch.dict(os.environ, {}, clear=True), patch("utiles.window_state.sys.platform", "linux"):
+            self.assertIsNone(detect_backend())
+
+        from utiles import pc_tools
+        service = WindowStateService(FakeBackend(WINDOWS))
+        with patch("utiles.pc_tools.get_window_service", return_value=service):
+            self.assertIn("notes.txt - Notepad", pc_tools.list_open_windows.invoke({}))
+            chrome = pc_tools.get_chrome_activity.invoke({})
+            self.assertIn("YouTube - Google Chrome", chrome)
+            self.assertNotIn("Notepad", chrome)
+        with patch("utiles.pc_tools.get_window_service", return_value=None):
+            self.assertIn("not supported", pc_tools.list_open_windows.invoke({}))
+
+    def test_05_win32_events_only_for_listed_windows(self):
+        """Test Case 5: Tooltip, child-window and hidden-window events don't trigger a refresh"""
+        print("\n[Test 5] Verifying the Win32 event filter...")
+        # hwnd -> (visible, title, ex_style, root); 30 is a tooltip, 40 a child control, 50 hidden
+        fake = {10: (True, "Editor", 0, 10), 30: (True, "Tip", Win32Backend.WS_EX_TOOLWINDOW, 30),
+                40: (True, "OK", 0, 10), 50: (False, "", 0, 50)}
+        backend = Win32Backend.__new__(Win32Backend)
+        backend._gui = SimpleNamespace(
+            IsWindowVisible=lambda h: fake[h][0], GetWindowText=lambda h: fake[h][1],
+            GetWindowLong=lambda h, index: fake[h][2],
+            EnumWindows=lambda callback, extra: [callback(h, extra) for h in (10, 30, 50)],
+        )
+        backend._process = SimpleNamespace(GetWindowThreadProcessId=lambda h: (0, 0))
+        backend._root = lambda h: fake[h][3]
+        backend._listed_handles = set()
+        with patch.dict(sys.modules, {"psutil": SimpleNamespace(Process=lambda pid: SimpleNamespace(name=lambda: ""))}):
+            self.assertEqual([w["handle"] for w in backend.list_windows()], [10])
+
+        namechange, hide, destroy = Win32Backend.EVENT_OBJECT_NAMECHANGE, Win32Backend.EVENT_OBJECT_HIDE, Win32Backend.EVENT_OBJECT_DESTROY
+        self.assertTrue(backend._relevant(namechange, 10, 0, 0))
+        self.assertTrue(backend._relevant(Win32Backend.EVENT_SYSTEM_FOREGROUND, 30, 0, 0))
+        for hwnd in (30, 40, 50):
+            self.assertFalse(backend._relevant(namechange, hwnd, 0, 0), hwnd)
+        self.assertFalse(backend._relevant(namechange, 10, -4, 0))  # not OBJID_WINDOW
+        fake[10] = (False, "Editor", 0, 10)
+        self.assertTrue(backend._relevant(hide, 10, 0, 0))  # was listed, now hidden
+        del fake[10]
+        self.assertTrue(backend._relevant(destroy, 10, 0, 0))
+        self.assertFalse(backend._relevant(destroy, 99, 0, 0))  # unknown and gone
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add project root to path to ensure modules are found
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utiles.youtube_resolver import FLAT_OPTIONS, RecordedExtractor, YouTubeResolver, query_key, title_key, video_id_from_url
+
+RECORDING = os.path.join(os.path.dirname(__file__), "fixtures", "youtube_search.json")
+
+
+class TestYouTubeResolver(unittest.TestCase):
+    def setUp(self):
+        self.built = []
+
+        def factory():
+            extractor = RecordedExtractor(RECORDING, params=FLAT_OPTIONS, flat_latency=0.05)
+            self.built.append(extractor)
+            return extractor
+
+        self.resolver = YouTubeResolver(extractor_factory=factory)
+
+    def searches(self):
+        return sum(len(e.calls) for e in self.built)
+
+    def test_01_flat_search_and_cache(self):
+        """Test Case 1: Queries resolve with one flat search on one extractor and are cached"""
+        print("\n[Test 1] Verifying cached resolutions...")
+        video = self.resolver.resolve("Believer")
+        self.assertEqual(video["url"], "https://www.youtube.com/watch?v=7wtfhZwyrcc")
+        self.assertEqual(video["title"], "Imagine Dragons - Believer (Official Music Video)")
+        self.assertEqual(self.resolver.resolve("believer song on YouTube")["id"], "7wtfhZwyrcc")
+        self.assertEqual(len(self.resolver.search("believer")), 3)  # all top results are kept
+        self.resolver.resolve("lofi beats")
+        self.assertEqual(self.searches(), 2)
+        self.assertEqual(len(self.built), 1)  # the extractor is reused
+        self.assertEqual(self.built[0].calls[0], "ytsearch5:Believer")
+        self.assertIsNone(self.resolver.resolve("no such video anywhere"))
+
+    def test_02_urls_and_keys(self):
+        """Test Case 2: YouTube URLs skip the search; filler words don't change the cache key"""
+        print("\n[Test 2] Verifying URL handling and query keys...")
+        for url in ("https://www.youtube.com/watch?v=7wtfhZwyrcc", "https://youtu.be/7wtfhZwyrcc?t=10",
+                    "youtube.com/shorts/7wtfhZwyrcc", "https://www.youtube.com/watch?list=x&v=7wtfhZwyrcc"):
+            self.assertEqual(video_id_from_url(url), "7wtfhZwyrcc")
+        self.assertEqual(self.resolver.resolve("https://youtu.be/7wtfhZwyrcc")["id"], "7wtfhZwyrcc")
+        self.assertEqual(self.searches(), 0)
+        self.assertEqual(query_key("Vaathi Coming video on YouTube please"), "vaathi coming")
+        self.assertEqual(title_key("Can you play Vaathi Coming video on YouTube please"), "vaathi coming")
+        self.assertEqual(title_key("play"), "play")  # nothing but the request: kept whole
+        # Words that belong to titles are kept
+        for a, b in (("In the End", "the end"), ("Love Me", "love"), ("Believer official video", "believer"),
+                     ("play songs for me", "songs"), ("watch me", "me"), ("Play Date", "date")):
+            self.assertNotEqual(query_key(a), query_key(b), msg=a)
+
+    def test_03_prefetch_warms_the_cache(self):
+        """Test Case 3: A prefetched request answers the later tool call without a search"""
+        print("\n[Test 3] Verifying prefetch...")
+        self.resolver.prefetch(["play arabic kuthu song on youtube", "play arabic kuthu song on youtube"])
+        video = self.resolver.resolve("Arabic Kuthu")  # waits for the running prefetch, no second search
+        self.assertEqual(video["id"], "KUN5Uf9mObQ")
+        self.assertEqual(self.searches(), 1)
+        self.assertEqual(self.built[0].calls[0], "ytsearch5:play arabic kuthu song on youtube")  # the request as given
+        self.resolver.prefetch(["arabic kuthu"])  # already cached: nothing queued
+        time.sleep(0.1)
+        self.assertEqual(self.searches(), 1)
+        # The title only stands in for the request's own tool call, then "me" is its own search
+        self.resolver.prefetch(["watch me"])
+        self.resolver.resolve("watch me")
+        self.resolver.resolve("me")
+        self.assertEqual(self.built[0].calls[1:], ["ytsearch5:watch me", "ytsearch5:me"])
+
+    def test_04_errors_reset_the_extractor(self):
+        """Test Case 4: An extractor error is not cached and the next call builds a fresh instance"""
+        print("\n[Test 4] Verifying error handling and the tool...")
+        self.resolver.resolve("believer")
+        with patch.object(self.built[0], "extract_info", side_effect=RuntimeError("HTTP 429")):
+            with self.assertRaises(RuntimeError):
+                self.resolver.resolve("lofi beats")
+        self.assertEqual(self.resolver.resolve("lofi beats")["id"], "jfKfPfyJRdk")
+        self.assertEqual(len(self.built), 2)
+
+        from utiles.ruby_tools import YouTubeVideoPlayerTool
+        ruby = SimpleNamespace(ruby_state="Idle")
+        with patch("utiles.ruby_tools.get_youtube_resolver", return_value=self.resolver), \
+                patch("webbrowser.open") as open_url:
+            reply = YouTubeVideoPlayerTool(ruby).invoke({"query": "believer"})
+        open_url.assert_called_once_with("https://www.youtube.com/watch?v=7wtfhZwyrcc")
+        self.assertIn("Imagine Dragons - Believer", reply)
+        self.assertEqual(ruby.ruby_state, "Playing Video")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,224 @@
+# SQLite activity history for the "Frequently Used" tools.
+#
+# Every recorded activity is appended to the events table, and the counters table
+# keeps one row per (kind, key) that is updated in the same transaction:
+#   activity  the activity type ("Web Search", "Web Navigation", ...)
+#   item      the details string (what get_frequently_used has always listed)
+#   site      the site of a navigation ("amazon" from "amazon: laptop")
+#   query     the search text of a search or site search
+#
+# Besides the plain count, each counter keeps a time-decayed score with a
+# configurable half-life, stored as log(sum(exp(rate * t_i))). Ranking by that
+# column gives the same order as the decayed score at any moment (the
+# exp(-rate * now) factor is common to all keys), so "top N" is an index scan
+# that does not depend on how much history there is, and the column never
+# overflows. The old user_history.txt is imported once, on first open.
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "user_activity.sqlite")
+# Written by earlier versions of pc_tools (relative to the working directory)
+LEGACY_HISTORY_FILE = "user_history.txt"
+LEGACY_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+HALF_LIFE_DAYS = 14.0
+
+COUNTER_KINDS = ("activity", "item", "site", "query")
+
+
+def _logaddexp(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    hi, lo = max(a, b), min(a, b)
+    return hi + math.log1p(math.exp(lo - hi))
+
+
+def counter_keys(activity_type: str, details: str) -> dict:
+    """The counter keys one activity contributes to, by kind."""
+    keys = {"activity": activity_type.strip(), "item": details.strip()}
+    kind = activity_type.lower()
+    if "navigation" in kind:
+        site, _, query = details.partition(":")
+        site = site.strip()
+        query = query.strip()
+        if site.lower() == "direct url":
+            site, query = query, ""
+        keys["site"] = site.lower()
+        if query and query.lower() != "home":
+            keys["query"] = query.lower()
+    elif "search" in kind:
+        keys["query"] = details.strip().lower()
+    return {kind: key for kind, key in keys.items() if key}
+
+
+class ActivityStore:
+    """
+    Append-only activity log with incrementally maintained, time-decayed counters.
+
+    Safe to share between threads; writes are serialized on one WAL-mode connection.
+    """
+    def __init__(self, path: str = DEFAULT_DB, half_life_days: float = HALF_LIFE_DAYS):
+        """
+        Args:
+            path (str): SQLite database file (created if missing).
+            half_life_days (float): Age at which an activity counts half as much in scores.
+                Fixed when the database is created; the stored scores depend on it.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.create_function("logaddexp", 2, _logaddexp, deterministic=True)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY,
+                ts REAL NOT NULL,
+                activity_type TEXT NOT NULL,
+                details TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS counters (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                log_score REAL NOT NULL,
+                last_ts REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            );
+            CREATE INDEX IF NOT EXISTS counters_by_score ON counters (kind, log_score DESC);
+            CREATE INDEX IF NOT EXISTS counters_by_count ON counters (kind, count DESC);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+        self._db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('half_life_days', ?)", (str(half_life_days),))
+        self._db.commit()
+        stored = float(self._db.execute("SELECT value FROM meta WHERE key = 'half_life_days'").fetchone()[0])
+        if stored != half_life_days:
+            print(f"{path} was created with a {stored:g}-day half-life; using that instead of {half_life_days:g}.")
+        self.half_life_days = stored
+        self.rate = math.log(2) / (stored * 86400)
+
+    def _add(self, ts: float, activity_type: str, details: str):
+        self._db.execute(
+            "INSERT INTO events (ts, activity_type, details) VALUES (?, ?, ?)", (ts, activity_type, details)
+        )
+        self._db.executemany(
+            """
+            INSERT INTO counters (kind, key, count, log_score, last_ts) VALUES (?, ?, 1, ?, ?)
+            ON CONFLICT (kind, key) DO UPDATE SET
+                count = count + 1,
+                log_score = logaddexp(log_score, excluded.log_score),
+                last_ts = max(last_ts, excluded.last_ts)
+            """,
+            [(kind, key, self.rate * ts, ts) for kind, key in counter_keys(activity_type, details).items()],
+        )
+
+    def record(self, activity_type: str, details: str, ts: Optional[float] = None):
+        """
+        Append one activity and update its counters.
+
+        Args:
+            activity_type (str): e.g. "Web Search".
+            details (str): e.g. the search text or "amazon: laptop".
+            ts (float, optional): Unix time of the activity (default: now).
+        """
+        with self._lock:
+            self._add(time.time() if ts is None else ts, activity_type, details)
+            self._db.commit()
+
+    def top(self, kind: str = "item", n: int = 3, by: str = "score") -> List[dict]:
+        """
+        Most used keys of one counter kind.
+
+        Args:
+            kind (str): One of COUNTER_KINDS.
+            n (int): How many to return.
+            by (str): "score" (time-decayed) or "count" (all-time).
+
+        Returns:
+            List[dict]: key, count, score (decayed count as of now) and last_used (Unix time).
+        """
+        if kind not in COUNTER_KINDS:
+            raise ValueError(f"Unknown counter kind '{kind}' (expected one of {', '.join(COUNTER_KINDS)})")
+        column = {"score": "log_score", "count": "count"}.get(by)
+        if column is None:
+            raise ValueError("by must be 'score' or 'count'")
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT key, count, log_score, last_ts FROM counters WHERE kind = ? ORDER BY {column} DESC LIMIT ?",
+                (kind, n),
+            ).fetchall()
+        now = self.rate * time.time()
+        return [
+            {"key": key, "count": count, "score": math.exp(log_score - now), "last_used": last_ts}
+            for key, count, log_score, last_ts in rows
+        ]
+
+    def recent(self, n: int = 10) -> List[dict]:
+        """The n latest activities, newest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT ts, activity_type, details FROM events ORDER BY id DESC LIMIT ?", (n,)
+            ).fetchall()
+        return [{"ts": ts, "activity_type": t, "details": d} for ts, t, d in rows]
+
+    def import_legacy(self, history_file: str = LEGACY_HISTORY_FILE) -> int:
+        """
+        Import a user_history.txt ("time | type | details" lines) once.
+
+        The import is recorded in the meta table, so calling this again for the
+        same file does nothing. Unparseable lines are skipped.
+
+        Returns:
+            int: Activities imported.
+        """
+        if not os.path.exists(history_file):
+            return 0
+        marker = f"imported:{os.path.abspath(history_file)}"
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM meta WHERE key = ?", (marker,)).fetchone():
+                return 0
+            imported = 0
+            with open(history_file, encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    parts = [p.strip() for p in line.split("|", 2)]
+                    if len(parts) != 3:
+                        continue
+                    try:
+                        ts = datetime.strptime(parts[0], LEGACY_TIME_FORMAT).timestamp()
+                    except ValueError:
+                        continue
+                    self._add(ts, parts[1], parts[2])
+                    imported += 1
+            self._db.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (marker, str(imported)))
+            self._db.commit()
+        print(f"Imported {imported} activities from {history_file} into {self.path}")
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# Singleton instance
+_store = None
+_store_lock = threading.Lock()
+
+def get_activity_store() -> ActivityStore:
+    """Shared store at DEFAULT_DB, importing user_history.txt the first time."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ActivityStore()
+            try:
+                _store.import_legacy()
+            except Exception as e:
+                print(f"Could not import {LEGACY_HISTORY_FILE}: {e}")
+    return _store
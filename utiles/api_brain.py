@@ -1,9 +1,62 @@
 import os
 from dotenv import load_dotenv
 
+from utiles.search_client import get_search_client
+from utiles.tool_cache import run_tool
+
 load_dotenv()
 
 
+def _json_type(spec) -> dict:
+    """Plain JSON schema type of an inferred tool argument ("Optional[List[str]]" -> array of strings)."""
+    spec = spec if isinstance(spec, dict) else {}
+    options = [o for o in spec.get("anyOf", [spec]) if o.get("type") not in (None, "null")]
+    if not options:
+        return {"type": "string"}
+    chosen = {"type": options[0]["type"]}
+    if "items" in options[0]:
+        chosen["items"] = options[0]["items"]
+    return chosen
+
+
+def tools_to_schemas(tools):
+    """
+    Convert LangChain tools to OpenAI-style function schemas (also used by Groq).
+
+    Tools whose schema cannot be built are skipped with a printed error.
+    """
+    schemas = []
+    for t in tools:
+        # Handle both langchain Tools and BaseTools
+        try:
+            properties = {}
+            required = []
+
+            if hasattr(t, "args_schema") and t.args_schema:
+                schema = t.args_schema.schema()
+                properties = schema.get("properties", {})
+                required = schema.get("required", [])
+            elif hasattr(t, "args") and t.args:
+                # Fallback for simpler tools (arguments inferred from _run)
+                properties = {k: _json_type(v) for k, v in t.args.items()}
+
+            schemas.append({
+                "type": "function",
+                "function": {
+                    "name": t.name,
+                    "description": t.description,
+                    "parameters": {
+                        "type": "object",
+                        "properties": properties,
+                        "required": required
+                    }
+                }
+            })
+        except Exception as te:
+            print(f"Tool Schema Error ({t.name}): {te}")
+    return schemas
+
+
 class GeminiBrain:
     """
     Hugging Face Llama-3.1 Brain (Replaced Gemini).
@@ -151,37 +204,7 @@ class GroqBrain:
             client = Groq(api_key=self.groq_key)
 
             # Convert tools to Groq format
-            groq_tools = []
-            for t in tools:
-                # Handle both langchain Tools and BaseTools
-                try:
-                    name = t.name
-                    description = t.description
-                    properties = {}
-                    required = []
-                    
-                    if hasattr(t, "args_schema") and t.args_schema:
-                        schema = t.args_schema.schema()
-                        properties = schema.get("properties", {})
-                        required = schema.get("required", [])
-                    elif hasattr(t, "args") and t.args:
-                        # Fallback for simpler tools
-                        properties = {k: {"type": "string"} for k in t.args}
-                    
-                    groq_tools.append({
-                        "type": "function",
-                        "function": {
-                            "name": name,
-                            "description": description,
-                            "parameters": {
-                                "type": "object",
-                                "properties": properties,
-                                "required": required
-                            }
-                        }
-                    })
-                except Exception as te:
-                    print(f"Tool Schema Error ({t.name}): {te}")
+            groq_tools = tools_to_schemas(tools)
 
             # Build messages
             groq_messages = []
@@ -214,7 +237,8 @@ class GroqBrain:
                     tool_to_use = next((t for t in tools if t.name == function_name), None)
                     if tool_to_use:
                         print(f"DEBUG BRAIN: Executing Tool -> {function_name}({function_args})")
-                        observation = tool_to_use.invoke(function_args)
+                        # Through the tool cache: read-only tools may answer from a recent result
+                        observation = run_tool(tool_to_use, function_args)
                         groq_messages.append({
                             "tool_call_id": tool_call.id,
                             "role": "tool",
@@ -267,11 +291,9 @@ class GroqBrain:
     def _ddg_chat_response(self, query):
         """Use DuckDuckGo AI Chat as a completely FREE LLM fallback (No API key needed)."""
         try:
-            from duckduckgo_search import DDGS
-            with DDGS() as ddgs:
-                # model: 'gpt-4o-mini', 'claude-3-haiku', 'llama-3.1-70b', 'mixtral-8x7b'
-                # gpt-4o-mini is standard and fast
-                response = ddgs.chat(query, model='gpt-4o-mini')
+            # model: 'gpt-4o-mini', 'claude-3-haiku', 'llama-3.1-70b', 'mixtral-8x7b'
+            # gpt-4o-mini is standard and fast
+            response = get_search_client().chat(query, model='gpt-4o-mini')
             if response:
                 return self._wrap_response(response)
             
@@ -284,9 +306,7 @@ class GroqBrain:
     def _ddg_search_response(self, query):
         """Use DuckDuckGo search as a secondary fallback."""
         try:
-            from duckduckgo_search import DDGS
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=3))
+            results = get_search_client().text(query, max_results=3)
             if results:
                 snippets = []
                 for r in results:
@@ -324,35 +344,7 @@ class OpenRouterBrain:
         tools = data.get("tools", [])
         
         # Convert tools to OpenAI format
-        openai_tools = []
-        for t in tools:
-            try:
-                name = t.name
-                description = t.description
-                properties = {}
-                required = []
-                
-                if hasattr(t, "args_schema") and t.args_schema:
-                    schema = t.args_schema.schema()
-                    properties = schema.get("properties", {})
-                    required = schema.get("required", [])
-                elif hasattr(t, "args") and t.args:
-                    properties = {k: {"type": "string"} for k in t.args}
-                
-                openai_tools.append({
-                    "type": "function",
-                    "function": {
-                        "name": name,
-                        "description": description,
-                        "parameters": {
-                            "type": "object",
-                            "properties": properties,
-                            "required": required
-                        }
-                    }
-                })
-            except Exception as te:
-                print(f"Tool Schema Error ({t.name}): {te}")
+        openai_tools = tools_to_schemas(tools)
 
         # Build messages
         formatted_messages = []
@@ -385,7 +377,8 @@ class OpenRouterBrain:
                     tool_to_use = next((t for t in tools if t.name == function_name), None)
                     if tool_to_use:
                         print(f"DEBUG OPENROUTER: Executing Tool -> {function_name}({function_args})")
-                        observation = tool_to_use.invoke(function_args)
+                        # Through the tool cache: read-only tools may answer from a recent result
+                        observation = run_tool(tool_to_use, function_args)
                         formatted_messages.append({
                             "tool_call_id": tool_call.id,
                             "role": "tool",
@@ -0,0 +1,90 @@
+# Small in-process caches shared by Ruby's utilities.
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with an optional time-to-live.
+
+    Each entry remembers how long it took to produce (the `cost` passed to put),
+    so stats() can report the time saved by hits as well as the hit ratio.
+    """
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize (int): Maximum number of entries before the least recently used is evicted.
+            ttl (float, optional): Seconds an entry stays valid. None keeps entries until evicted.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (counting a hit) or default (counting a miss)."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+                del self._data[key]
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[1]
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, cost: float = 0.0):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key.
+            value: Value to cache.
+            cost (float): Seconds it took to compute value, credited to saved_seconds on each hit.
+        """
+        with self._lock:
+            self._data[key] = (value, cost, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value, or compute, time and cache it."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            start = time.perf_counter()
+            value = compute()
+            self.put(key, value, cost=time.perf_counter() - start)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> dict:
+        """Hit/miss counters, hit ratio and seconds saved by hits."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 4),
+        }
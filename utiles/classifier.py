@@ -1,16 +1,197 @@
+import json
+import os
 import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from utiles.cache_utiles import LRUCache
+from utiles.intent_fallback import get_fallback_model
+
+# Output of utiles/classifier_export.py: int8 ONNX model + tokenizer + config.json (labels)
+DEFAULT_ONNX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "intent_onnx")
+ONNX_MODEL_FILE = "model.onnx"
+MAX_SEQ_LEN = 64
+# Fallback answers below this confidence are reported as "unknown"
+FALLBACK_MIN_CONFIDENCE = 0.3
+# Utterances where the fallback and transformer models disagree (retraining material)
+DISAGREEMENT_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "intent_disagreements.jsonl")
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into one batched call.
+
+    The first caller opens a batch; callers arriving within max_wait_ms (or until
+    max_batch items are queued) join it, and fn runs once for all of them.
+    """
+    def __init__(self, fn: Callable[[List], List], max_batch: int = 32, max_wait_ms: float = 4.0):
+        """
+        Args:
+            fn (Callable): Takes a list of items and returns a list of results, in order.
+            max_batch (int): Largest batch handed to fn.
+            max_wait_ms (float): How long the first item waits for company.
+        """
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._pending = []
+        self._cond = threading.Condition()
+        self.batches = 0
+        self.items = 0
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def submit(self, item) -> Future:
+        future = Future()
+        with self._cond:
+            self._pending.append((item, future))
+            self._cond.notify()
+        return future
+
+    def __call__(self, item, timeout: Optional[float] = None):
+        return self.submit(item).result(timeout)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = time.monotonic() + self.max_wait
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = self.fn([item for item, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class OnnxIntentModel:
+    """
+    Sequence classifier served by ONNX Runtime from an exported, int8-quantized artifact.
+
+    Needs only onnxruntime and tokenizers at runtime (no torch).
+    """
+    def __init__(self, model_dir: str, threads: Optional[int] = None):
+        """
+        Args:
+            model_dir (str): Folder written by utiles/classifier_export.py.
+            threads (int, optional): ONNX Runtime intra-op threads (default: runtime's choice).
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, ONNX_MODEL_FILE), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(MAX_SEQ_LEN)
+        self.tokenizer.enable_padding()
+        with open(os.path.join(model_dir, "config.json"), encoding="utf-8") as f:
+            id2label = json.load(f)["id2label"]
+        self.labels = [id2label[str(i)] for i in range(len(id2label))]
+
+    def predict_batch(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """(label, probability) for each text."""
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype="int64"),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype="int64"),
+        }
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype="int64")
+        logits = self.session.run(None, feeds)[0]
+        probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        return [(self.labels[i], float(p[i])) for p, i in zip(probs, probs.argmax(axis=1))]
+
 
 class RubyIntentClassifier:
     """
     Classifier for determining user intent using the qnlbnsl/ai_voice_assistant model.
+
+    If an exported ONNX artifact exists (see utiles/classifier_export.py) it is loaded
+    directly, which takes milliseconds; otherwise the transformers pipeline is loaded
+    in a background thread as before. Concurrent predict() calls are micro-batched
+    into one forward pass, and repeated utterances are answered from an LRU cache.
+
+    Until the transformer is ready, predictions come from the shipped char-n-gram
+    model (utiles/intent_fallback.py), which loads in milliseconds. Afterwards both
+    run, and utterances where they disagree are appended to DISAGREEMENT_LOG.
     """
-    def __init__(self, model_name="qnlbnsl/ai_voice_assistant"):
+    def __init__(
+        self,
+        model_name="qnlbnsl/ai_voice_assistant",
+        onnx_dir: str = DEFAULT_ONNX_DIR,
+        max_batch: int = 32,
+        max_wait_ms: float = 4.0,
+        cache_size: int = 1024,
+        fallback: bool = True,
+        disagreement_log: str = DISAGREEMENT_LOG,
+    ):
+        """
+        Args:
+            model_name (str): Hugging Face model for the transformers pipeline.
+            onnx_dir (str): Folder of the exported ONNX model.
+            max_batch (int): Largest micro-batch.
+            max_wait_ms (float): How long a request waits for others to batch with.
+            cache_size (int): Utterances kept in the result cache.
+            fallback (bool): Answer from the fallback model while the transformer loads.
+            disagreement_log (str): JSONL file for fallback/transformer disagreements.
+        """
         self.pipe = None
+        self.backend = None
         self.loading = True
         self.model_name = model_name
+        self.onnx_dir = onnx_dir
+        self.cache = LRUCache(maxsize=cache_size)
+        self.batcher = MicroBatcher(self._predict_batch, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        self.fallback = get_fallback_model() if fallback else None
+        self.disagreement_log = disagreement_log
+        self.disagreements = 0
+        self._log_lock = threading.Lock()
+        self._shared_labels = None
+
+        if os.path.exists(os.path.join(onnx_dir, ONNX_MODEL_FILE)) and self._load_onnx():
+            return
         # Start loading in a background thread
         threading.Thread(target=self._load_model, daemon=True).start()
 
+    def _load_onnx(self) -> bool:
+        try:
+            start = time.perf_counter()
+            self.backend = OnnxIntentModel(self.onnx_dir)
+            self.loading = False
+            print(f"✅ Intent Classifier Loaded (ONNX int8, {(time.perf_counter() - start) * 1000:.0f} ms).")
+            return True
+        except Exception as e:
+            print(f"❌ Failed to load ONNX Intent Classifier, falling back to transformers: {e}")
+            return False
+
     def _load_model(self):
         try:
             from transformers import pipeline
@@ -22,22 +203,95 @@ class RubyIntentClassifier:
             print(f"❌ Failed to load Intent Classifier: {e}")
             self.loading = False
 
+    def _predict_batch(self, texts: List[str]) -> List[Tuple[str, float]]:
+        if self.backend is not None:
+            return self.backend.predict_batch(texts)
+        return [(result['label'], float(result['score'])) for result in self.pipe(texts)]
+
+    @property
+    def ready(self) -> bool:
+        """Whether the transformer model is loaded and answering."""
+        return not self.loading and (self.backend is not None or bool(self.pipe))
+
+    def _transformer_labels(self) -> set:
+        if self.backend is not None:
+            return set(self.backend.labels)
+        return set(self.pipe.model.config.id2label.values())
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def classify(self, text: str) -> dict:
+        """
+        Label an utterance.
+
+        Returns:
+            dict: label, confidence (0-1) and source ("transformer", "fallback" or None).
+        """
+        if not self.ready:
+            if self.fallback is None:
+                return {"label": "unknown", "confidence": 0.0, "source": None}
+            label, confidence = self.fallback.predict([text])[0]
+            if confidence < FALLBACK_MIN_CONFIDENCE:
+                label = "unknown"
+            return {"label": label, "confidence": confidence, "source": "fallback"}
+
+        key = self._normalize(text)
+        result = self.cache.get(key)
+        if result is None:
+            try:
+                start = time.perf_counter()
+                result = self.batcher(text)
+                self.cache.put(key, result, cost=time.perf_counter() - start)
+                if self.fallback is not None:
+                    self._check_disagreement(text, result[0])
+            except Exception:
+                return {"label": "unknown", "confidence": 0.0, "source": None}
+        return {"label": result[0], "confidence": result[1], "source": "transformer"}
+
     def predict(self, text):
-        if self.loading or not self.pipe:
-            return "unknown"
+        return self.classify(text)["label"]
+
+    def _check_disagreement(self, text: str, label: str):
+        """Log the utterance if the fallback model would have answered differently."""
+        if self._shared_labels is None:
+            self._shared_labels = bool(set(self.fallback.labels) & self._transformer_labels())
+            if not self._shared_labels:
+                print("Intent fallback labels differ from the transformer's; "
+                      "run `python -m utiles.intent_fallback --distill` to align them.")
+        if not self._shared_labels:
+            return
+        fallback_label, confidence = self.fallback.predict([text])[0]
+        if fallback_label == label:
+            return
+        self.disagreements += 1
+        print(f"Intent disagreement: '{text}' transformer={label} fallback={fallback_label} ({confidence:.2f})")
+        record = {"text": text, "transformer": label, "fallback": fallback_label, "fallback_confidence": round(confidence, 3)}
         try:
-            results = self.pipe(text)
-            if results:
-                return results[0]['label']
-            return "unknown"
-        except Exception:
-            return "unknown"
+            with self._log_lock, open(self.disagreement_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Could not write {self.disagreement_log}: {e}")
+
+    def stats(self) -> dict:
+        """Backend in use, micro-batch sizes, result-cache hit ratio and fallback disagreements."""
+        return {
+            "backend": "onnx" if self.backend is not None else ("transformers" if self.pipe else None),
+            "fallback": self.fallback is not None,
+            "disagreements": self.disagreements,
+            "batching": self.batcher.stats(),
+            "cache": self.cache.stats(),
+        }
 
 # Singleton instance
 _classifier = None
 
-def get_intent(text):
+def get_classifier() -> RubyIntentClassifier:
     global _classifier
     if _classifier is None:
         _classifier = RubyIntentClassifier()
-    return _classifier.predict(text)
+    return _classifier
+
+def get_intent(text):
+    return get_classifier().predict(text)
@@ -0,0 +1,77 @@
+# Export the intent classifier to an int8-quantized ONNX artifact for RubyIntentClassifier.
+#
+# Usage (needs torch, transformers and onnxruntime; run once per model update):
+#   python -m utiles.classifier_export
+#   python -m utiles.classifier_export --model qnlbnsl/ai_voice_assistant --out models/intent_onnx
+#
+# Writes <out>/model.onnx (dynamic int8 weights), tokenizer.json and config.json (labels).
+import argparse
+import os
+import shutil
+import tempfile
+
+from utiles.classifier import DEFAULT_ONNX_DIR, MAX_SEQ_LEN, ONNX_MODEL_FILE
+
+
+def export(model_name: str, out_dir: str, opset: int = 17) -> str:
+    """
+    Export a Hugging Face sequence classifier to ONNX and quantize its weights to int8.
+
+    Args:
+        model_name (str): Hugging Face model id or local folder.
+        out_dir (str): Folder to write the artifact to.
+        opset (int): ONNX opset version.
+
+    Returns:
+        str: Path of the quantized model.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    os.makedirs(out_dir, exist_ok=True)
+
+    sample = tokenizer(["open youtube and play music"], return_tensors="pt", truncation=True, max_length=MAX_SEQ_LEN)
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fp32_path = os.path.join(tmp, "model_fp32.onnx")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in input_names),
+                fp32_path,
+                input_names=input_names,
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=opset,
+            )
+        out_path = os.path.join(out_dir, ONNX_MODEL_FILE)
+        quantize_dynamic(fp32_path, out_path, weight_type=QuantType.QInt8)
+        fp32_mb = os.path.getsize(fp32_path) / 2**20
+
+    # tokenizer.json (fast tokenizer) and config.json (id2label) are all the runtime reads
+    tokenizer.save_pretrained(out_dir)
+    model.config.save_pretrained(out_dir)
+    if not os.path.exists(os.path.join(out_dir, "tokenizer.json")):
+        shutil.rmtree(out_dir)
+        raise RuntimeError(f"{model_name} has no fast tokenizer; tokenizer.json is required")
+    print(f"Exported {model_name}: {fp32_mb:.1f} MB fp32 -> {os.path.getsize(out_path) / 2**20:.1f} MB int8 at {out_path}")
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the intent classifier to int8 ONNX.")
+    parser.add_argument("--model", default="qnlbnsl/ai_voice_assistant")
+    parser.add_argument("--out", default=DEFAULT_ONNX_DIR)
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+    export(args.model, args.out, args.opset)
+
+
+if __name__ == "__main__":
+    main()
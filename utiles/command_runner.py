@@ -0,0 +1,278 @@
+# Managed shell command execution for run_terminal_command.
+#
+# Commands run as asyncio subprocesses on one background event loop, so several
+# can run at once while the calling tools just block on their own result. Each
+# command gets:
+#   - a wall-clock timeout, after which its whole process tree is killed
+#     (process group on POSIX, psutil tree walk on Windows), politely first;
+#   - an output cap: the first and last parts of stdout/stderr are kept and the
+#     middle is replaced by a note saying how much was cut;
+#   - incremental output: chunks are passed to the output listeners as they
+#     arrive (the web dashboard streams them to the browser), up to the same cap
+#     per stream, followed by one "truncated" event.
+import asyncio
+import codecs
+import itertools
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+DEFAULT_TIMEOUT = 60.0
+# Characters kept per stream (head + tail)
+MAX_OUTPUT_CHARS = 6000
+HEAD_FRACTION = 1 / 3
+# Grace period between the polite signal and the kill
+KILL_GRACE = 2.0
+# How long to keep reading pipes after the shell exits (background children may hold them open)
+DRAIN_TIMEOUT = 0.5
+# How often to check whether the shell has exited (its pipes may outlive it)
+EXIT_POLL = 0.02
+MAX_CONCURRENT = 4
+READ_CHUNK = 4096
+
+
+class OutputCapture:
+    """Keeps the head and tail of a stream within a character budget and counts what was dropped."""
+    def __init__(self, limit: int = MAX_OUTPUT_CHARS, head_fraction: float = HEAD_FRACTION):
+        self.head_limit = int(limit * head_fraction)
+        self.tail_limit = limit - self.head_limit
+        self._head = []
+        self._head_len = 0
+        self._tail = deque()
+        self._tail_len = 0
+        self.total_chars = 0
+        self.total_lines = 0
+        self.dropped_chars = 0
+        self.dropped_lines = 0
+
+    def write(self, text: str):
+        self.total_chars += len(text)
+        self.total_lines += text.count("\n")
+        if self._head_len < self.head_limit:
+            take = text[:self.head_limit - self._head_len]
+            self._head.append(take)
+            self._head_len += len(take)
+            text = text[len(take):]
+        if not text:
+            return
+        self._tail.append(text)
+        self._tail_len += len(text)
+        while self._tail_len > self.tail_limit:
+            first = self._tail[0]
+            excess = self._tail_len - self.tail_limit
+            cut = first if len(first) <= excess else first[:excess]
+            if cut is first:
+                self._tail.popleft()
+            else:
+                self._tail[0] = first[excess:]
+            self._tail_len -= len(cut)
+            self.dropped_chars += len(cut)
+            self.dropped_lines += cut.count("\n")
+
+    @property
+    def truncated(self) -> bool:
+        return self.dropped_chars > 0
+
+    def text(self) -> str:
+        head, tail = "".join(self._head), "".join(self._tail)
+        if not self.truncated:
+            return head + tail
+        note = (f"\n[... {self.dropped_chars:,} characters ({self.dropped_lines:,} lines) omitted; "
+                f"{self.total_chars:,} characters / {self.total_lines:,} lines in total ...]\n")
+        return head + note + tail
+
+
+def _kill_tree(proc, sig_name: str):
+    """Send SIGTERM ("term") or SIGKILL ("kill") to the process and all its descendants."""
+    if sys.platform != "win32":
+        try:
+            os.killpg(proc.pid, signal.SIGTERM if sig_name == "term" else signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        return
+    import psutil
+    try:
+        parent = psutil.Process(proc.pid)
+        procs = parent.children(recursive=True) + [parent]
+    except psutil.NoSuchProcess:
+        return
+    for p in procs:
+        try:
+            p.terminate() if sig_name == "term" else p.kill()
+        except psutil.Error:
+            pass
+
+
+async def _wait_exit(proc, timeout: float) -> bool:
+    """
+    Wait for the process itself to exit; False if it is still running after timeout.
+
+    Unlike proc.wait(), this does not also wait for the pipes to close, which a
+    background child ("sleep 30 &") keeps open after the shell is gone.
+    """
+    deadline = time.monotonic() + timeout
+    while proc.returncode is None:
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(EXIT_POLL)
+    return True
+
+
+class CommandRunner:
+    """
+    Runs shell commands concurrently on a private asyncio loop with time and output limits.
+
+    run() is synchronous (for tools); it blocks only its caller.
+    """
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT):
+        """
+        Args:
+            max_concurrent (int): Commands allowed to run at once; later ones wait their turn.
+        """
+        self.max_concurrent = max_concurrent
+        self.output_listeners: List[Callable[[dict], None]] = []  # called with each output event
+        self.running = {}  # job id -> {"command", "pid", "started"}
+        self._ids = itertools.count(1)
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = None
+        ready = threading.Event()
+
+        def run_loop():
+            asyncio.set_event_loop(self._loop)
+            self._semaphore = asyncio.Semaphore(max_concurrent)
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run_loop, name="command-runner", daemon=True).start()
+        ready.wait()
+
+    def _emit(self, event: dict):
+        for listener in list(self.output_listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"Command output listener error: {e}")
+
+    async def _read(self, job_id: int, stream_name: str, stream, capture: OutputCapture, max_output: int):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        streamed, truncated = 0, False
+        while True:
+            chunk = await stream.read(READ_CHUNK)
+            if not chunk:
+                text = decoder.decode(b"", final=True)
+            else:
+                text = decoder.decode(chunk)
+            if text:
+                capture.write(text)
+                # Listeners get at most max_output characters per stream, then one truncation notice
+                if streamed < max_output:
+                    shown = text[:max_output - streamed]
+                    streamed += len(shown)
+                    self._emit({"job": job_id, "stream": stream_name, "text": shown})
+                    text = text[len(shown):]
+                if text and not truncated:
+                    truncated = True
+                    self._emit({"job": job_id, "stream": stream_name, "event": "truncated", "limit": max_output})
+            if not chunk:
+                return
+
+    async def _run(self, job_id: int, command: str, timeout: float, max_output: int, cwd: Optional[str]) -> dict:
+        async with self._semaphore:
+            started = time.perf_counter()
+            kwargs = {}
+            if sys.platform == "win32":
+                kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+            else:
+                kwargs["start_new_session"] = True  # own process group, so the whole tree can be signalled
+            proc = await asyncio.create_subprocess_shell(
+                command, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE, cwd=cwd, **kwargs,
+            )
+            self.running[job_id] = {"command": command, "pid": proc.pid, "started": time.time()}
+            self._emit({"job": job_id, "event": "start", "command": command, "pid": proc.pid})
+
+            stdout, stderr = OutputCapture(max_output), OutputCapture(max_output)
+            readers = [
+                asyncio.ensure_future(self._read(job_id, "stdout", proc.stdout, stdout, max_output)),
+                asyncio.ensure_future(self._read(job_id, "stderr", proc.stderr, stderr, max_output)),
+            ]
+            timed_out = not await _wait_exit(proc, timeout)
+            if timed_out:
+                _kill_tree(proc, "term")
+                await _wait_exit(proc, KILL_GRACE)
+                _kill_tree(proc, "kill")
+                await _wait_exit(proc, KILL_GRACE)
+            if timed_out and sys.platform != "win32":
+                _kill_tree(proc, "kill")  # stragglers that ignored SIGTERM after the shell exited
+            _, pending = await asyncio.wait(readers, timeout=DRAIN_TIMEOUT)
+            for reader in pending:
+                reader.cancel()
+
+            result = {
+                "job": job_id,
+                "command": command,
+                "exit_code": proc.returncode,
+                "timed_out": timed_out,
+                "duration": round(time.perf_counter() - started, 3),
+                "stdout": stdout.text(),
+                "stderr": stderr.text(),
+                "truncated": stdout.truncated or stderr.truncated,
+                "output_chars": stdout.total_chars + stderr.total_chars,
+            }
+            self.running.pop(job_id, None)
+            self._emit({"job": job_id, "event": "end", "exit_code": proc.returncode, "timed_out": timed_out})
+            return result
+
+    def submit(self, command: str, timeout: float = DEFAULT_TIMEOUT, max_output: int = MAX_OUTPUT_CHARS,
+               cwd: Optional[str] = None):
+        """Start a command and return a concurrent.futures.Future of its result dict."""
+        job_id = next(self._ids)
+        return asyncio.run_coroutine_threadsafe(self._run(job_id, command, timeout, max_output, cwd), self._loop)
+
+    def run(self, command: str, timeout: float = DEFAULT_TIMEOUT, max_output: int = MAX_OUTPUT_CHARS,
+            cwd: Optional[str] = None) -> dict:
+        """
+        Run a shell command and wait for it.
+
+        Args:
+            command (str): Shell command line.
+            timeout (float): Seconds before the command's process tree is killed.
+            max_output (int): Characters kept per stream (head and tail).
+            cwd (str, optional): Working directory.
+
+        Returns:
+            dict: job, command, exit_code, timed_out, duration, stdout, stderr,
+                truncated and output_chars (before truncation).
+        """
+        return self.submit(command, timeout, max_output, cwd).result()
+
+
+def format_result(result: dict) -> str:
+    """Tool-facing summary of a run() result."""
+    parts = []
+    if result["timed_out"]:
+        parts.append(f"Command timed out after {result['duration']:.0f} s and was stopped (partial output below).")
+    output = result["stdout"]
+    if result["stderr"].strip():
+        output = f"{output}\n[stderr]\n{result['stderr']}" if output.strip() else result["stderr"]
+    parts.append(f"Command Output:\n{output}" if output.strip() else "Command produced no output.")
+    if result["exit_code"] not in (0, None) and not result["timed_out"]:
+        parts.append(f"Exit code: {result['exit_code']}")
+    return "\n".join(parts)
+
+
+# Singleton instance
+_runner = None
+_runner_lock = threading.Lock()
+
+def get_command_runner() -> CommandRunner:
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = CommandRunner()
+    return _runner
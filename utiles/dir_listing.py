@@ -0,0 +1,236 @@
+# Paged directory listing for file_operation(action="list").
+#
+# One os.scandir pass per page: entries are filtered as they stream past (type,
+# glob, size, mtime), counted into a summary (folders, files, total size, size
+# by extension), and only the best `limit` entries for the requested order are
+# kept in a heap, so a 50k-entry folder never becomes a 50k-line string.
+#
+# Pagination is keyset-based: the cursor carries the sort order and the sort key
+# of the last entry shown, and the next page is the `limit` entries after that
+# key. Entries added or removed between pages don't shift or repeat the rest.
+import base64
+import fnmatch
+import heapq
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Optional
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Extensions shown in the summary (largest total size first)
+SUMMARY_EXTENSIONS = 8
+# Natural direction of each sort: names A-Z, largest and newest first
+SORTS = {"name": False, "type": False, "size": True, "mtime": True}
+SORT_ALIASES = {"date": "mtime", "modified": "mtime", "time": "mtime", "ext": "type", "extension": "type"}
+_SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3, "tb": 1024 ** 4}
+_AGE_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _sort_key(entry: dict, sort: str) -> tuple:
+    name = entry["name"].lower()
+    if sort == "size":
+        return (entry["size"], name)
+    if sort == "mtime":
+        return (entry["mtime"], name)
+    if sort == "type":
+        return (0 if entry["is_dir"] else 1, entry["ext"], name)
+    return (name, entry["name"])
+
+
+def encode_cursor(sort: str, descending: bool, key: tuple, offset: int) -> str:
+    data = json.dumps({"s": sort, "d": descending, "k": list(key), "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Raises:
+        ValueError: Not a cursor produced by list_directory.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {"sort": data["s"], "descending": bool(data["d"]), "key": tuple(data["k"]), "offset": int(data["o"])}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid listing cursor: {e}")
+
+
+def parse_sort(sort: str):
+    """(sort key, descending) from "name", "size", "-size" (reversed), "date", ..."""
+    sort = (sort or "name").strip().lower()
+    flip = sort.startswith("-")
+    sort = sort.lstrip("-+")
+    sort = SORT_ALIASES.get(sort, sort)
+    if sort not in SORTS:
+        raise ValueError(f"Unknown sort '{sort}' (use name, size, mtime or type)")
+    return sort, SORTS[sort] != flip
+
+
+def parse_filter(text: str) -> dict:
+    """
+    list_directory keyword arguments from a filter string, e.g. "*.pdf >10MB newer:7d files".
+
+    Words: a glob pattern, "files" / "dirs", ">SIZE" / "<SIZE" (B, KB, MB, GB),
+    "newer:AGE" / "older:AGE" (m, h, d, w).
+    """
+    kwargs = {}
+    for word in (text or "").split():
+        low = word.lower()
+        size = re.fullmatch(r"([<>])(\d+(?:\.\d+)?)([kmgt]?b)?", low)
+        age = re.fullmatch(r"(newer|older):(\d+(?:\.\d+)?)([mhdw])", low)
+        if low in ("files", "file"):
+            kwargs["kind"] = "file"
+        elif low in ("dirs", "dir", "folders", "folder"):
+            kwargs["kind"] = "dir"
+        elif size:
+            value = float(size.group(2)) * _SIZE_UNITS[size.group(3) or "b"]
+            kwargs["min_size" if size.group(1) == ">" else "max_size"] = value
+        elif age:
+            cutoff = time.time() - float(age.group(2)) * _AGE_UNITS[age.group(3)]
+            kwargs["modified_after" if age.group(1) == "newer" else "modified_before"] = cutoff
+        else:
+            kwargs["pattern"] = word
+    return kwargs
+
+
+def list_directory(
+    path: str,
+    sort: str = "name",
+    limit: int = PAGE_SIZE,
+    cursor: Optional[str] = None,
+    kind: Optional[str] = None,
+    pattern: Optional[str] = None,
+    min_size: Optional[float] = None,
+    max_size: Optional[float] = None,
+    modified_after: Optional[float] = None,
+    modified_before: Optional[float] = None,
+) -> dict:
+    """
+    One page of a directory listing, with a summary of every matching entry.
+
+    Args:
+        path (str): Directory to list.
+        sort (str): name, size, mtime or type; a leading "-" reverses the natural order.
+        limit (int): Entries per page.
+        cursor (str, optional): next_cursor of the previous page (its order wins over sort).
+        kind (str, optional): "file" or "dir".
+        pattern (str, optional): Case-insensitive glob on the name ("*.pdf").
+        min_size / max_size (float, optional): File size bounds in bytes (folders are excluded).
+        modified_after / modified_before (float, optional): mtime bounds (Unix time).
+
+    Returns:
+        dict: path, sort, descending, offset (entries before this page), entries (name,
+            is_dir, size, mtime, ext), next_cursor (None on the last page), matched,
+            scanned, errors and summary (dirs, files, total_size, by_ext {ext: {count, size}}).
+
+    Raises:
+        NotADirectoryError / FileNotFoundError: path is not a directory.
+        ValueError: Bad sort or cursor.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    if cursor:
+        state = decode_cursor(cursor)
+        sort, descending, after, offset = state["sort"], state["descending"], state["key"], state["offset"]
+    else:
+        sort, descending = parse_sort(sort)
+        after, offset = None, 0
+    pattern = pattern.lower() if pattern else None
+    size_filter = min_size is not None or max_size is not None
+
+    summary = {"dirs": 0, "files": 0, "total_size": 0, "by_ext": {}}
+    matched = scanned = errors = 0
+
+    def candidates():
+        nonlocal matched, scanned, errors
+        with os.scandir(path) as it:
+            for de in it:
+                scanned += 1
+                try:
+                    is_dir = de.is_dir()
+                    st = de.stat()
+                except OSError:
+                    errors += 1
+                    continue
+                if kind == "file" and is_dir or kind == "dir" and not is_dir:
+                    continue
+                if pattern and not fnmatch.fnmatchcase(de.name.lower(), pattern):
+                    continue
+                size = 0 if is_dir else st.st_size
+                if size_filter and (is_dir or (min_size is not None and size < min_size)
+                                    or (max_size is not None and size > max_size)):
+                    continue
+                if modified_after is not None and st.st_mtime < modified_after:
+                    continue
+                if modified_before is not None and st.st_mtime > modified_before:
+                    continue
+                ext = "" if is_dir else os.path.splitext(de.name)[1].lower().lstrip(".")
+                matched += 1
+                if is_dir:
+                    summary["dirs"] += 1
+                else:
+                    summary["files"] += 1
+                    summary["total_size"] += size
+                    bucket = summary["by_ext"].setdefault(ext, {"count": 0, "size": 0})
+                    bucket["count"] += 1
+                    bucket["size"] += size
+                entry = {"name": de.name, "is_dir": is_dir, "size": size, "mtime": st.st_mtime, "ext": ext}
+                key = _sort_key(entry, sort)
+                if after is not None and (key <= after if not descending else key >= after):
+                    continue
+                yield key, entry
+
+    # Only the best limit + 1 entries after the cursor are kept (the extra one says whether there is a next page)
+    select = heapq.nlargest if descending else heapq.nsmallest
+    page = select(limit + 1, candidates(), key=lambda item: item[0])
+    more = len(page) > limit
+    page = page[:limit]
+    next_cursor = encode_cursor(sort, descending, page[-1][0], offset + len(page)) if more else None
+    return {
+        "path": os.path.abspath(path),
+        "sort": sort,
+        "descending": descending,
+        "offset": offset,
+        "entries": [entry for _, entry in page],
+        "next_cursor": next_cursor,
+        "matched": matched,
+        "scanned": scanned,
+        "errors": errors,
+        "summary": summary,
+    }
+
+
+def format_listing(result: dict) -> str:
+    """Tool-facing text of a list_directory() page."""
+    summary = result["summary"]
+    filtered = " matching the filter" if result["matched"] != result["scanned"] else ""
+    lines = [f"{result['path']}: {result['matched']:,} entries{filtered} "
+             f"({summary['dirs']:,} folders, {summary['files']:,} files, {format_size(summary['total_size'])})"]
+    if result["offset"] == 0 and summary["by_ext"]:
+        top = sorted(summary["by_ext"].items(), key=lambda item: -item[1]["size"])[:SUMMARY_EXTENSIONS]
+        lines.append("By type: " + ", ".join(
+            f"{ext or '(none)'} {v['count']:,} ({format_size(v['size'])})" for ext, v in top))
+    if not result["entries"]:
+        lines.append("No entries.")
+        return "\n".join(lines)
+    order = {"name": "name", "type": "type", "size": "size", "mtime": "date modified"}[result["sort"]]
+    first = result["offset"] + 1
+    lines.append(f"Showing {first:,}-{first + len(result['entries']) - 1:,} by {order}"
+                 f"{' (descending)' if result['descending'] else ''}:")
+    for entry in result["entries"]:
+        modified = datetime.fromtimestamp(entry["mtime"]).strftime('%Y-%m-%d %H:%M')
+        if entry["is_dir"]:
+            lines.append(f"[DIR] {entry['name']}/  ({modified})")
+        else:
+            lines.append(f"{entry['name']}  ({format_size(entry['size'])}, {modified})")
+    if result["next_cursor"]:
+        lines.append(f'More entries: call again with cursor="{result["next_cursor"]}".')
+    return "\n".join(lines)
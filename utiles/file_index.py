@@ -0,0 +1,473 @@
+# SQLite index of local files for the file_search tool.
+#
+# The index covers the configured roots (RUBY_FILE_ROOTS, os.pathsep-separated,
+# else the usual home folders) and stores, per file, its path, name, extension,
+# size and mtime, plus an inverted index of name tokens ("MyResume_2024.pdf" ->
+# my, resume, 2024, myresume_2024) so a search is a few index range scans.
+# With content=True, text files up to MAX_CONTENT_BYTES are also indexed in an
+# FTS5 table.
+#
+#   build     directories are listed in parallel (os.scandir in a thread pool) and
+#             written in batches. The directories still to list are kept in the
+#             pending table, so an interrupted build resumes where it stopped.
+#   updates   each indexed directory's mtime is stored; a rescan re-lists only the
+#             directories whose mtime changed (entries added, removed or renamed).
+#             With watchdog installed, file system events mark their directories
+#             dirty and they are re-listed within a second; without it, rescans
+#             run every RESCAN_INTERVAL. A full rescan (which also catches files
+#             edited in place) runs every FULL_RESCAN_INTERVAL.
+import math
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "file_index.sqlite")
+ROOTS_ENV = "RUBY_FILE_ROOTS"
+HOME_FOLDERS = ("Desktop", "Documents", "Downloads", "Pictures", "Music", "Videos", "OneDrive")
+# Directory names never descended into (hidden directories are skipped too)
+SKIP_DIRS = {"node_modules", "__pycache__", "venv", "site-packages", "AppData", "$RECYCLE.BIN", "System Volume Information"}
+WORKERS = 8
+# Directories listed and committed per build step
+BATCH_DIRS = 256
+RESCAN_INTERVAL = 600.0
+FULL_RESCAN_INTERVAL = 6 * 3600.0
+# Events are collected this long before their directories are re-listed
+WATCH_DEBOUNCE = 1.0
+TEXT_EXTENSIONS = {
+    "txt", "md", "rst", "csv", "tsv", "json", "yaml", "yml", "xml", "html", "htm", "log", "ini", "cfg",
+    "py", "js", "ts", "java", "c", "cpp", "h", "cs", "go", "rs", "rb", "php", "sh", "bat", "ps1", "sql", "tex",
+}
+MAX_CONTENT_BYTES = 256 * 1024
+# Words in spoken requests that say nothing about the file ("find my resume pdf")
+STOPWORDS = {"a", "an", "the", "my", "me", "find", "search", "show", "where", "is", "are", "file", "files",
+             "folder", "for", "of", "named", "called", "locate", "get", "open", "with", "in", "on", "to", "that"}
+# Rows read per query word; prefixes matching more names than this only rank the first ones
+MAX_WORD_MATCHES = 5000
+
+_WORDS = re.compile(r"\w+")
+# camelCase / letter-digit boundaries: "MyResume2024" -> My, Resume, 2024
+_PARTS = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+|[^\W\d_A-Za-z]+")
+
+
+def default_roots() -> List[str]:
+    """RUBY_FILE_ROOTS if set, else the existing standard folders of the home directory (or home itself)."""
+    if os.environ.get(ROOTS_ENV):
+        return [os.path.abspath(os.path.expanduser(p)) for p in os.environ[ROOTS_ENV].split(os.pathsep) if p]
+    home = os.path.expanduser("~")
+    roots = [os.path.join(home, name) for name in HOME_FOLDERS if os.path.isdir(os.path.join(home, name))]
+    return roots or [home]
+
+
+def split_name(name: str):
+    """(name tokens, extension) of a file name."""
+    stem, dot, ext = name.rpartition(".")
+    if not dot or not stem:
+        stem, ext = name, ""
+    tokens = {part.lower() for word in _WORDS.findall(stem) for part in _PARTS.findall(word)}
+    tokens.add(stem.lower())
+    return tokens, ext.lower()
+
+
+def _scan_dir(path: str):
+    """List one directory: (path, dir mtime, [(name, is_dir, size, mtime)]); mtime None if it is gone."""
+    try:
+        dir_mtime = os.stat(path).st_mtime
+        entries = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_symlink():
+                        continue
+                    is_dir = entry.is_dir()
+                    if is_dir and (entry.name.startswith(".") or entry.name in SKIP_DIRS):
+                        continue
+                    st = entry.stat()
+                    entries.append((entry.name, is_dir, 0 if is_dir else st.st_size, st.st_mtime))
+                except OSError:
+                    continue
+        return path, dir_mtime, entries
+    except (FileNotFoundError, NotADirectoryError):
+        return path, None, []
+    except OSError:
+        # Unreadable (permissions); keep whatever was indexed before
+        return path, False, []
+
+
+def _read_text(path: str) -> str:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read(MAX_CONTENT_BYTES)
+    except OSError:
+        return ""
+
+
+class FileIndex:
+    """
+    Incrementally maintained file name (and optionally content) index.
+
+    Safe to share between threads; writes are serialized on one WAL-mode connection.
+    """
+    def __init__(self, path: str = DEFAULT_DB, roots: Optional[Iterable[str]] = None, content: bool = False,
+                 workers: int = WORKERS):
+        """
+        Args:
+            path (str): SQLite database file (created if missing).
+            roots (Iterable[str], optional): Folders to index. Defaults to default_roots().
+            content (bool): Also index the text of small text files.
+            workers (int): Threads listing directories in parallel.
+        """
+        self.path = path
+        self.roots = [os.path.abspath(r) for r in (roots if roots is not None else default_roots())]
+        self.workers = workers
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE,
+                dir TEXT NOT NULL,
+                name TEXT NOT NULL,
+                ext TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                is_dir INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS files_by_dir ON files (dir);
+            CREATE INDEX IF NOT EXISTS files_by_ext ON files (ext, mtime DESC);
+            CREATE TABLE IF NOT EXISTS name_tokens (
+                token TEXT NOT NULL,
+                file_id INTEGER NOT NULL,
+                PRIMARY KEY (token, file_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS name_tokens_by_file ON name_tokens (file_id);
+            CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS pending (path TEXT PRIMARY KEY);
+            """
+        )
+        self.content = content
+        if content:
+            try:
+                self._db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS content USING fts5 (body)")
+            except sqlite3.OperationalError as e:
+                print(f"File content index disabled (SQLite without FTS5): {e}")
+                self.content = False
+        self._db.commit()
+
+        self.building = False
+        self.last_rescan = 0.0
+        self._dirty = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._observer = None
+
+    # --- writes (caller holds self._lock) ---
+
+    def _delete_tree(self, path: str):
+        """Remove a path and everything below it from the index."""
+        lo, hi = path + os.sep, path + chr(ord(os.sep) + 1)
+        ids = [row[0] for row in self._db.execute(
+            "SELECT id FROM files WHERE path = ? OR (path >= ? AND path < ?)", (path, lo, hi))]
+        self._db.executemany("DELETE FROM name_tokens WHERE file_id = ?", [(i,) for i in ids])
+        if self.content:
+            self._db.executemany("DELETE FROM content WHERE rowid = ?", [(i,) for i in ids])
+        self._db.execute("DELETE FROM files WHERE path = ? OR (path >= ? AND path < ?)", (path, lo, hi))
+        self._db.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (path, lo, hi))
+        self._db.execute("DELETE FROM pending WHERE path = ? OR (path >= ? AND path < ?)", (path, lo, hi))
+
+    def _apply_dir(self, path: str, dir_mtime, entries) -> List[tuple]:
+        """
+        Bring one directory's rows in line with a fresh listing.
+
+        Returns:
+            List[tuple]: (file id, path) of text files whose content must be (re)indexed.
+        """
+        if dir_mtime is None:
+            self._delete_tree(path)
+            return []
+        if dir_mtime is False:
+            self._db.execute("DELETE FROM pending WHERE path = ?", (path,))
+            return []
+        existing = {name: (fid, size, mtime) for fid, name, size, mtime in self._db.execute(
+            "SELECT id, name, size, mtime FROM files WHERE dir = ?", (path,))}
+        to_read = []
+        for name, is_dir, size, mtime in entries:
+            full = os.path.join(path, name)
+            old = existing.pop(name, None)
+            if old is not None and (old[1], old[2]) == (size, mtime):
+                continue
+            tokens, ext = split_name(name)
+            if old is None:
+                fid = self._db.execute(
+                    "INSERT INTO files (path, dir, name, ext, size, mtime, is_dir) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (full, path, name, "" if is_dir else ext, size, mtime, int(is_dir)),
+                ).lastrowid
+                self._db.executemany("INSERT OR IGNORE INTO name_tokens (token, file_id) VALUES (?, ?)",
+                                     [(t, fid) for t in tokens])
+            else:
+                fid = old[0]
+                self._db.execute("UPDATE files SET size = ?, mtime = ? WHERE id = ?", (size, mtime, fid))
+            if is_dir:
+                if not self._db.execute("SELECT 1 FROM dirs WHERE path = ?", (full,)).fetchone():
+                    self._db.execute("INSERT OR IGNORE INTO pending (path) VALUES (?)", (full,))
+            elif self.content and ext in TEXT_EXTENSIONS and size <= MAX_CONTENT_BYTES:
+                to_read.append((fid, full))
+        for name in existing:
+            self._delete_tree(os.path.join(path, name))
+        self._db.execute("INSERT OR REPLACE INTO dirs (path, mtime) VALUES (?, ?)", (path, dir_mtime))
+        self._db.execute("DELETE FROM pending WHERE path = ?", (path,))
+        return to_read
+
+    def _index_paths(self, pool: ThreadPoolExecutor, paths: List[str]):
+        """List directories in parallel and apply the listings in one transaction."""
+        listings = list(pool.map(_scan_dir, paths))
+        with self._lock:
+            to_read = []
+            for path, dir_mtime, entries in listings:
+                to_read += self._apply_dir(path, dir_mtime, entries)
+            self._db.commit()
+        if to_read:
+            texts = list(pool.map(_read_text, [p for _, p in to_read]))
+            with self._lock:
+                rows = [(fid,) for fid, _ in to_read]
+                self._db.executemany("DELETE FROM content WHERE rowid = ?", rows)
+                self._db.executemany("INSERT INTO content (rowid, body) VALUES (?, ?)",
+                                     [(fid, text) for (fid, _), text in zip(to_read, texts)])
+                self._db.commit()
+
+    # --- build and updates ---
+
+    def build(self, max_dirs: Optional[int] = None) -> int:
+        """
+        Index the roots, resuming an interrupted build.
+
+        Args:
+            max_dirs (int, optional): Stop after about this many directories (the rest stays pending).
+
+        Returns:
+            int: Directories listed.
+        """
+        with self._lock:
+            for root in self.roots:
+                if not self._db.execute("SELECT 1 FROM dirs WHERE path = ?", (root,)).fetchone():
+                    self._db.execute("INSERT OR IGNORE INTO pending (path) VALUES (?)", (root,))
+            self._db.commit()
+        return self._drain_pending(max_dirs)
+
+    def _drain_pending(self, max_dirs: Optional[int] = None) -> int:
+        done = 0
+        self.building = True
+        try:
+            with ThreadPoolExecutor(self.workers) as pool:
+                while not self._stop.is_set() and (max_dirs is None or done < max_dirs):
+                    with self._lock:
+                        batch = [row[0] for row in self._db.execute("SELECT path FROM pending LIMIT ?", (BATCH_DIRS,))]
+                    if not batch:
+                        break
+                    self._index_paths(pool, batch)
+                    done += len(batch)
+        finally:
+            self.building = False
+        return done
+
+    def rescan(self, full: bool = False) -> int:
+        """
+        Re-list the indexed directories whose mtime changed (all of them if full).
+
+        Returns:
+            int: Directories re-listed (new subdirectories included).
+        """
+        with self._lock:
+            known = self._db.execute("SELECT path, mtime FROM dirs").fetchall()
+
+        def changed(item):
+            path, mtime = item
+            try:
+                return full or os.stat(path).st_mtime != mtime
+            except OSError:
+                return True
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            stale = [path for (path, _), is_changed in zip(known, pool.map(changed, known)) if is_changed]
+            for i in range(0, len(stale), BATCH_DIRS):
+                self._index_paths(pool, stale[i:i + BATCH_DIRS])
+        self.last_rescan = time.time()
+        return len(stale) + self.build()
+
+    def mark_dirty(self, path: str):
+        """Queue the directory containing path for re-listing (file system event callback)."""
+        self._dirty.put(os.path.dirname(os.path.abspath(path)))
+
+    def _start_watching(self) -> bool:
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+        index = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type in ("opened", "closed", "closed_no_write"):
+                    return
+                index.mark_dirty(event.src_path)
+                if getattr(event, "dest_path", None):
+                    index.mark_dirty(event.dest_path)
+                if event.is_directory and event.event_type == "modified":
+                    index._dirty.put(os.path.abspath(event.src_path))
+
+        self._observer = Observer()
+        for root in self.roots:
+            if os.path.isdir(root):
+                self._observer.schedule(Handler(), root, recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+        return True
+
+    def _run(self):
+        resumed = self.build()
+        if not resumed:
+            self.rescan()
+        watching = self._start_watching()
+        last_full = time.time()
+        while not self._stop.is_set():
+            try:
+                dirty = {self._dirty.get(timeout=WATCH_DEBOUNCE)}
+            except queue.Empty:
+                dirty = set()
+            if dirty:
+                self._stop.wait(WATCH_DEBOUNCE)
+                while not self._dirty.empty():
+                    dirty.add(self._dirty.get_nowait())
+                with self._lock:
+                    known = [d for d in dirty if self._db.execute("SELECT 1 FROM dirs WHERE path = ?", (d,)).fetchone()]
+                if known:
+                    with ThreadPoolExecutor(self.workers) as pool:
+                        self._index_paths(pool, known)
+                    self._drain_pending()
+            now = time.time()
+            if now - last_full >= FULL_RESCAN_INTERVAL:
+                self.rescan(full=True)
+                last_full = now
+            elif not watching and now - self.last_rescan >= RESCAN_INTERVAL:
+                self.rescan()
+
+    def start(self):
+        """Build/resume the index and keep it updated on a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="file-indexer", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # --- queries ---
+
+    def stats(self) -> dict:
+        with self._lock:
+            files = self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            dirs = self._db.execute("SELECT COUNT(*) FROM dirs").fetchone()[0]
+            pending = self._db.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        return {"entries": files, "dirs": dirs, "pending": pending, "building": self.building,
+                "last_rescan": self.last_rescan}
+
+    def search(self, query: str, limit: int = 10, ext: Optional[str] = None, dirs: Optional[bool] = None,
+               modified_after: Optional[float] = None) -> List[dict]:
+        """
+        Ranked files whose name (or text, with the content index) matches the query.
+
+        Words match name tokens exactly or as prefixes ("resu" finds resume.pdf); a word
+        that is an indexed extension ("pdf") prefers files of that type. More matched
+        words rank higher, then exact over prefix matches, then recently modified files.
+
+        Args:
+            query (str): Free text ("resume pdf", "invoice march 2024").
+            limit (int): Maximum results.
+            ext (str, optional): Only this extension (without the dot).
+            dirs (bool, optional): True for folders only, False for files only.
+            modified_after (float, optional): Only entries modified after this Unix time.
+
+        Returns:
+            List[dict]: path, name, ext, size, mtime, is_dir and score, best first.
+        """
+        words = [w for w in (w.lower() for w in _WORDS.findall(query)) if w not in STOPWORDS]
+        if ext:
+            ext = ext.lower().lstrip(".")
+        scores = {}
+        with self._lock:
+            exts = [w for w in words if self._db.execute("SELECT 1 FROM files WHERE ext = ? LIMIT 1", (w,)).fetchone()]
+            for word in words:
+                hits = {}
+                for token, fid in self._db.execute(
+                    "SELECT token, file_id FROM name_tokens WHERE token >= ? AND token < ? LIMIT ?",
+                    (word, word + "\uffff", MAX_WORD_MATCHES),
+                ):
+                    hits[fid] = max(hits.get(fid, 0.0), 1.0 if token == word else 0.6)
+                if self.content:
+                    try:
+                        for (fid,) in self._db.execute(
+                            "SELECT rowid FROM content WHERE content MATCH ? ORDER BY rank LIMIT 200", (f'"{word}"',)
+                        ):
+                            hits[fid] = max(hits.get(fid, 0.0), 0.4)
+                    except sqlite3.OperationalError:
+                        pass
+                if word in exts:
+                    for (fid,) in self._db.execute(
+                        "SELECT id FROM files WHERE ext = ? ORDER BY mtime DESC LIMIT ?", (word, MAX_WORD_MATCHES)
+                    ):
+                        hits[fid] = max(hits.get(fid, 0.0), 0.9)
+                for fid, score in hits.items():
+                    scores[fid] = scores.get(fid, 0.0) + score
+            if not words and ext:
+                scores = {fid: 0.0 for (fid,) in self._db.execute(
+                    "SELECT id FROM files WHERE ext = ? ORDER BY mtime DESC LIMIT ?", (ext, limit))}
+
+            best = sorted(scores, key=scores.get, reverse=True)[:max(limit * 20, 200)]
+            rows = []
+            for i in range(0, len(best), 500):
+                chunk = best[i:i + 500]
+                rows += self._db.execute(
+                    f"SELECT id, path, name, ext, size, mtime, is_dir FROM files WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+
+        now = time.time()
+        results = []
+        for fid, path, name, file_ext, size, mtime, is_dir in rows:
+            if ext and file_ext != ext:
+                continue
+            if dirs is not None and bool(is_dir) != dirs:
+                continue
+            if modified_after is not None and mtime < modified_after:
+                continue
+            # Recency as a tie-breaker: up to 0.3, halving every 30 days
+            recency = 0.3 * math.exp(-max(now - mtime, 0) / (30 * 86400) * math.log(2))
+            results.append({"path": path, "name": name, "ext": file_ext, "size": size, "mtime": mtime,
+                            "is_dir": bool(is_dir), "score": round(scores[fid] + recency, 3)})
+        results.sort(key=lambda r: (-r["score"], len(r["path"])))
+        return results[:limit]
+
+
+# Singleton instance
+_index = None
+_index_lock = threading.Lock()
+
+def get_file_index() -> FileIndex:
+    """Shared index over default_roots(), built and kept current in the background."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FileIndex()
+            _index.start()
+    return _index
@@ -0,0 +1,242 @@
+# Background copy / move jobs for file_operation.
+#
+# Copying a large tree inside a tool call would block the conversation until it
+# finishes, so large copies and cross-device moves run on a small worker pool.
+# Each job first walks the source (os.scandir) to know the total files and bytes,
+# then copies in chunks, so progress is exact. Progress events go to
+# progress_listeners at most every PROGRESS_INTERVAL seconds (the web dashboard
+# shows them) and a job can be cancelled between chunks.
+#
+# A move within one file system is a rename: file_operation does it directly, and
+# a move job also tries a rename before falling back to copy-then-delete.
+import itertools
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from utiles.dir_listing import format_size
+
+MAX_JOBS = 2
+CHUNK_SIZE = 1024 * 1024
+PROGRESS_INTERVAL = 0.5
+# Files up to this size are copied inside the tool call instead of in a job
+SYNC_COPY_LIMIT = 50 * 1024 * 1024
+# Finished jobs kept for status queries
+KEEP_FINISHED = 50
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def target_path(src: str, dst: str) -> str:
+    """Where src ends up: inside dst if dst is an existing directory, else dst itself."""
+    if os.path.isdir(dst):
+        return os.path.join(dst, os.path.basename(os.path.normpath(src)))
+    return dst
+
+
+def plan_copy(src: str, dst: str):
+    """
+    ([(source file, destination file, size)], [destination dirs]) to copy src to dst.
+
+    Symlinks are recreated as links, not followed.
+    """
+    if not os.path.isdir(src) or os.path.islink(src):
+        return [(src, dst, os.lstat(src).st_size)], []
+    files, dirs, stack = [], [dst], [(src, dst)]
+    while stack:
+        current, out = stack.pop()
+        with os.scandir(current) as it:
+            for de in it:
+                target = os.path.join(out, de.name)
+                if de.is_dir(follow_symlinks=False):
+                    dirs.append(target)
+                    stack.append((de.path, target))
+                else:
+                    files.append((de.path, target, de.stat(follow_symlinks=False).st_size))
+    return files, dirs
+
+
+class FileJobManager:
+    """Runs copy and move jobs in the background and reports their progress."""
+    def __init__(self, max_jobs: int = MAX_JOBS):
+        """
+        Args:
+            max_jobs (int): Jobs running at once; later ones wait in the queue.
+        """
+        self.progress_listeners: List[Callable[[dict], None]] = []  # called with a job snapshot
+        self._jobs = {}
+        self._cancel = {}
+        self._done = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_jobs, thread_name_prefix="file-job")
+
+    def _emit(self, job: dict):
+        snapshot = dict(job)
+        for listener in list(self.progress_listeners):
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"File job listener error: {e}")
+
+    def submit(self, action: str, src: str, dst: str) -> dict:
+        """
+        Queue a copy or move of a file or directory tree.
+
+        Args:
+            action (str): "copy" or "move".
+            src (str): Existing file or directory.
+            dst (str): Destination path, or an existing directory to put src in.
+
+        Returns:
+            dict: The job (id, action, src, dst, status, ...); see get().
+        """
+        if action not in ("copy", "move"):
+            raise ValueError("action must be 'copy' or 'move'")
+        if not os.path.lexists(src):
+            raise FileNotFoundError(src)
+        src, dst = os.path.abspath(src), os.path.abspath(target_path(src, dst))
+        if os.path.isdir(src) and (dst + os.sep).startswith(src + os.sep):
+            raise ValueError("Cannot copy or move a folder into itself")
+        job = {
+            "id": next(self._ids), "action": action, "src": src, "dst": dst, "status": "queued",
+            "total_files": 0, "done_files": 0, "total_bytes": 0, "done_bytes": 0,
+            "started": None, "finished": None, "error": None,
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._cancel[job["id"]] = threading.Event()
+            self._done[job["id"]] = threading.Event()
+            finished = [j for j in self._jobs.values() if j["finished"]]
+            for old in finished[:max(0, len(finished) - KEEP_FINISHED)]:
+                del self._jobs[old["id"]]
+                self._cancel.pop(old["id"], None)
+                self._done.pop(old["id"], None)
+        self._pool.submit(self._run, job)
+        self._emit(job)
+        return dict(job)
+
+    def _copy_file(self, job: dict, src: str, dst: str, cancel: threading.Event, last_emit: List[float]):
+        if os.path.islink(src):
+            os.symlink(os.readlink(src), dst)
+            return
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            while True:
+                if cancel.is_set():
+                    raise JobCancelled()
+                chunk = fin.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                fout.write(chunk)
+                job["done_bytes"] += len(chunk)
+                if time.monotonic() - last_emit[0] >= PROGRESS_INTERVAL:
+                    last_emit[0] = time.monotonic()
+                    self._emit(job)
+        shutil.copystat(src, dst)
+
+    def _run(self, job: dict):
+        cancel = self._cancel[job["id"]]
+        job["status"] = "running"
+        job["started"] = time.time()
+        try:
+            if cancel.is_set():
+                raise JobCancelled()
+            if job["action"] == "move":
+                try:
+                    os.rename(job["src"], job["dst"])
+                    job["status"] = "done"
+                    return
+                except OSError:
+                    pass  # another file system: copy, then delete the source
+            files, dirs = plan_copy(job["src"], job["dst"])
+            job["total_files"] = len(files)
+            job["total_bytes"] = sum(size for _, _, size in files)
+            self._emit(job)
+            for d in dirs:
+                os.makedirs(d, exist_ok=True)
+            last_emit = [time.monotonic()]
+            for src, dst, _ in files:
+                self._copy_file(job, src, dst, cancel, last_emit)
+                job["done_files"] += 1
+            for d in reversed(dirs):
+                src_dir = job["src"] + d[len(job["dst"]):]
+                shutil.copystat(src_dir, d)
+            if job["action"] == "move":
+                if os.path.isdir(job["src"]) and not os.path.islink(job["src"]):
+                    shutil.rmtree(job["src"])
+                else:
+                    os.remove(job["src"])
+            job["status"] = "done"
+        except JobCancelled:
+            job["status"] = "cancelled"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            job["finished"] = time.time()
+            self._done[job["id"]].set()
+            self._emit(job)
+
+    def get(self, job_id: int) -> Optional[dict]:
+        """
+        A job's state.
+
+        Returns:
+            dict: id, action, src, dst, status (queued, running, done, failed or cancelled),
+                total_files, done_files, total_bytes, done_bytes, started, finished and error;
+                None for an unknown id.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def jobs(self) -> List[dict]:
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+    def cancel(self, job_id: int) -> bool:
+        """Stop a queued or running job after the current chunk (copied files are kept)."""
+        with self._lock:
+            event = self._cancel.get(job_id)
+            job = self._jobs.get(job_id)
+        if event is None or job["finished"]:
+            return False
+        event.set()
+        return True
+
+    def wait(self, job_id: int, timeout: Optional[float] = None) -> Optional[dict]:
+        """Block until a job finishes (for tests and scripts)."""
+        with self._lock:
+            done = self._done.get(job_id)
+        if done is not None:
+            done.wait(timeout)
+        return self.get(job_id)
+
+
+def describe_job(job: dict) -> str:
+    """One-line, tool-facing job status."""
+    text = f"Job {job['id']}: {job['action']} {job['src']} -> {job['dst']}: {job['status']}"
+    if job["total_bytes"] or job["total_files"]:
+        percent = 100 * job["done_bytes"] / job["total_bytes"] if job["total_bytes"] else 100
+        text += (f" ({job['done_files']:,}/{job['total_files']:,} files, "
+                 f"{format_size(job['done_bytes'])} of {format_size(job['total_bytes'])}, {percent:.0f}%)")
+    if job["error"]:
+        text += f" - {job['error']}"
+    return text
+
+
+# Singleton instance
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_file_jobs() -> FileJobManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = FileJobManager()
+    return _manager
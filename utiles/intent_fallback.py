@@ -0,0 +1,175 @@
+# Tiny intent model that answers while the transformer classifier is still loading.
+#
+# Char n-gram hashing features + a softmax linear layer, trained with numpy from
+# utiles/data/intent_seed.tsv. The weights ship in utiles/data/intent_fallback.npz
+# (float16, a few hundred KB) and load in milliseconds.
+#
+# Retrain after editing the seed file:
+#   python -m utiles.intent_fallback
+# Relabel the seed utterances with the transformer model first, so both models share
+# its label set (needs transformers or the exported ONNX model):
+#   python -m utiles.intent_fallback --distill
+import argparse
+import os
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SEED_FILE = os.path.join(DATA_DIR, "intent_seed.tsv")
+WEIGHTS_FILE = os.path.join(DATA_DIR, "intent_fallback.npz")
+
+N_FEATURES = 1 << 13
+NGRAM_RANGE = (2, 4)
+
+
+def featurize(texts: List[str], n_features: int = N_FEATURES) -> np.ndarray:
+    """
+    Hashed char n-gram counts (log-scaled, L2-normalized) of each text.
+
+    Words are padded with spaces so prefixes/suffixes get their own n-grams,
+    which keeps typos and Tamil/English spelling variants close together.
+    """
+    X = np.zeros((len(texts), n_features), dtype="float32")
+    for row, text in enumerate(texts):
+        padded = f" {' '.join(text.lower().split())} "
+        for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1):
+            for i in range(len(padded) - n + 1):
+                X[row, zlib.crc32(padded[i:i + n].encode("utf-8")) % n_features] += 1.0
+    X = np.log1p(X)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return X / norms
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class HashingIntentModel:
+    """Softmax classifier over hashed char n-grams."""
+    def __init__(self, labels: List[str], weights: np.ndarray, bias: np.ndarray):
+        self.labels = list(labels)
+        self.weights = weights.astype("float32")
+        self.bias = bias.astype("float32")
+
+    @classmethod
+    def train(
+        cls,
+        texts: List[str],
+        labels: List[str],
+        epochs: int = 300,
+        lr: float = 10.0,
+        l2: float = 1e-4,
+        seed: int = 0,
+    ) -> "HashingIntentModel":
+        """
+        Fit by full-batch gradient descent on the cross-entropy loss.
+
+        Args:
+            texts (List[str]): Training utterances.
+            labels (List[str]): Label of each utterance.
+            epochs (int): Gradient steps.
+            lr (float): Learning rate.
+            l2 (float): Weight decay.
+            seed (int): Seed for the initial weights.
+        """
+        names = sorted(set(labels))
+        y = np.array([names.index(label) for label in labels])
+        X = featurize(texts)
+        Y = np.eye(len(names), dtype="float32")[y]
+        rng = np.random.default_rng(seed)
+        W = rng.normal(scale=0.01, size=(X.shape[1], len(names))).astype("float32")
+        b = np.zeros(len(names), dtype="float32")
+        for _ in range(epochs):
+            grad = (_softmax(X @ W + b) - Y) / len(X)
+            W -= lr * (X.T @ grad + l2 * W)
+            b -= lr * grad.sum(axis=0)
+        return cls(names, W, b)
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        return _softmax(featurize(texts, self.weights.shape[0]) @ self.weights + self.bias)
+
+    def predict(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """(label, confidence) for each text."""
+        probs = self.predict_proba(texts)
+        return [(self.labels[i], float(p[i])) for p, i in zip(probs, probs.argmax(axis=1))]
+
+    def save(self, path: str = WEIGHTS_FILE):
+        np.savez_compressed(
+            path, labels=np.array(self.labels), weights=self.weights.astype("float16"), bias=self.bias
+        )
+
+    @classmethod
+    def load(cls, path: str = WEIGHTS_FILE) -> "HashingIntentModel":
+        data = np.load(path)
+        return cls([str(label) for label in data["labels"]], data["weights"], data["bias"])
+
+
+def load_seed(path: str = SEED_FILE) -> Tuple[List[str], List[str]]:
+    """Utterances and labels of the seed file (label<TAB>utterance, # comments)."""
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            label, text = line.split("\t", 1)
+            labels.append(label)
+            texts.append(text)
+    return texts, labels
+
+
+def cross_validate(texts: List[str], labels: List[str], folds: int = 5, seed: int = 0) -> float:
+    """Accuracy of k-fold cross-validation on the seed data."""
+    order = np.random.default_rng(seed).permutation(len(texts))
+    correct = 0
+    for fold in range(folds):
+        test = set(order[fold::folds].tolist())
+        train = [i for i in range(len(texts)) if i not in test]
+        model = HashingIntentModel.train([texts[i] for i in train], [labels[i] for i in train])
+        predicted = model.predict([texts[i] for i in sorted(test)])
+        correct += sum(label == labels[i] for (label, _), i in zip(predicted, sorted(test)))
+    return correct / len(texts)
+
+
+_model = None
+
+def get_fallback_model() -> Optional[HashingIntentModel]:
+    """Shared fallback model, or None if the weights file is missing."""
+    global _model
+    if _model is None and os.path.exists(WEIGHTS_FILE):
+        _model = HashingIntentModel.load()
+    return _model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the fallback intent model.")
+    parser.add_argument("--distill", action="store_true",
+                        help="Relabel the seed utterances with the transformer classifier first.")
+    parser.add_argument("--out", default=WEIGHTS_FILE)
+    args = parser.parse_args()
+
+    texts, labels = load_seed()
+    if args.distill:
+        import time
+        from utiles.classifier import RubyIntentClassifier
+        teacher = RubyIntentClassifier(fallback=False)
+        while teacher.loading:
+            time.sleep(0.1)
+        labels = [teacher.predict(text) for text in texts]
+        if "unknown" in labels:
+            raise RuntimeError("The transformer classifier is not available for distillation")
+
+    print(f"{len(texts)} utterances, {len(set(labels))} labels")
+    print(f"5-fold accuracy: {cross_validate(texts, labels):.3f}")
+    model = HashingIntentModel.train(texts, labels)
+    model.save(args.out)
+    print(f"Saved {args.out} ({os.path.getsize(args.out) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
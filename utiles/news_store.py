@@ -0,0 +1,358 @@
+# Prefetched news headlines for get_latest_news.
+#
+# A background thread refreshes a few topics every REFRESH_INTERVAL seconds into
+# a small SQLite store, so asking for the news is a local read:
+#   default    DEFAULT_TOPICS (what get_latest_news searches without a query)
+#   interest   the user's most frequent search queries (activity_store "query" counters)
+#   requested  topics the user asked for in the last REQUESTED_DAYS days
+#
+# Each refresh is merged into what is already stored. A story already kept for
+# the topic (same canonical URL, or a title whose words overlap by
+# TITLE_SIMILARITY or more) only has its last_seen time updated, so the same
+# story from two outlets is listed once. Stories keep their published,
+# first_seen and last_seen times, and old ones are pruned.
+#
+# get_latest_news answers from the store while a topic's data is fresher than
+# FRESH_FOR; otherwise it fetches live (and keeps the result for the next ask).
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from utiles.search_client import canonical_url, get_search_client, normalize_query
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "news_store.sqlite")
+DEFAULT_TOPICS = ("latest technology news India today",)
+REFRESH_INTERVAL = 15 * 60
+FRESH_FOR = 30 * 60
+# Interest topics: top search queries used at least INTEREST_MIN_COUNT times
+INTEREST_TOPICS = 3
+INTEREST_MIN_COUNT = 2
+REQUESTED_DAYS = 3
+STORIES_PER_FETCH = 10
+MAX_STORIES_PER_TOPIC = 50
+MAX_STORY_AGE = 3 * 86400
+TITLE_SIMILARITY = 0.6
+# First refresh after startup
+STARTUP_DELAY = 5.0
+_TITLE_STOPWORDS = {"a", "an", "the", "of", "in", "on", "to", "for", "and", "is", "at", "as", "with", "by", "from"}
+
+
+def title_words(title: str) -> frozenset:
+    return frozenset(w for w in re.findall(r"\w+", title.lower()) if w not in _TITLE_STOPWORDS)
+
+
+def similar_titles(a: frozenset, b: frozenset) -> bool:
+    """Jaccard overlap of two titles' words is at least TITLE_SIMILARITY."""
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= TITLE_SIMILARITY
+
+
+def _published(date: Optional[str], default: float) -> float:
+    # DuckDuckGo news dates are ISO 8601 ("2026-10-19T06:30:00+00:00")
+    try:
+        return datetime.fromisoformat(str(date).replace("Z", "+00:00")).timestamp()
+    except (TypeError, ValueError):
+        return default
+
+
+class NewsStore:
+    """SQLite store of headlines by topic. Safe to share between threads."""
+    def __init__(self, path: str = DEFAULT_DB):
+        """
+        Args:
+            path (str): SQLite database file (created if missing).
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS stories (
+                id INTEGER PRIMARY KEY,
+                topic TEXT NOT NULL,
+                url_key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                body TEXT NOT NULL,
+                source TEXT NOT NULL,
+                published REAL NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                UNIQUE (topic, url_key)
+            );
+            CREATE INDEX IF NOT EXISTS stories_by_topic ON stories (topic, published DESC);
+            CREATE TABLE IF NOT EXISTS topics (
+                topic TEXT PRIMARY KEY,
+                refreshed_at REAL,
+                requested_at REAL,
+                error TEXT
+            );
+            """
+        )
+        self._db.commit()
+
+    def ingest(self, topic: str, results: List[dict], now: Optional[float] = None) -> int:
+        """
+        Merge one fetch of news results into a topic and mark it refreshed.
+
+        Args:
+            topic (str): Topic (normalized here).
+            results (List[dict]): News results (title, body, url, source, date).
+            now (float, optional): Unix time of the fetch (default: now).
+
+        Returns:
+            int: Stories that were new to the topic.
+        """
+        topic = normalize_query(topic)
+        now = time.time() if now is None else now
+        added = 0
+        with self._lock:
+            known = [(row[0], row[1], title_words(row[2])) for row in self._db.execute(
+                "SELECT id, url_key, title FROM stories WHERE topic = ?", (topic,))]
+            for result in results:
+                title = (result.get("title") or "").strip()
+                url = result.get("url") or result.get("href") or ""
+                if not title:
+                    continue
+                url_key = canonical_url(url) if url else f"title:{title.lower()}"
+                words = title_words(title)
+                duplicate = next((story_id for story_id, key, known_words in known
+                                  if key == url_key or similar_titles(words, known_words)), None)
+                if duplicate is not None:
+                    self._db.execute("UPDATE stories SET last_seen = ? WHERE id = ?", (now, duplicate))
+                    continue
+                cursor = self._db.execute(
+                    """
+                    INSERT INTO stories (topic, url_key, url, title, body, source, published, first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (topic, url_key, url, title, result.get("body") or "", result.get("source") or "",
+                     _published(result.get("date"), now), now, now),
+                )
+                known.append((cursor.lastrowid, url_key, words))
+                added += 1
+            self._db.execute("DELETE FROM stories WHERE topic = ? AND published < ?", (topic, now - MAX_STORY_AGE))
+            self._db.execute(
+                """
+                DELETE FROM stories WHERE topic = ? AND id NOT IN (
+                    SELECT id FROM stories WHERE topic = ? ORDER BY published DESC LIMIT ?)
+                """,
+                (topic, topic, MAX_STORIES_PER_TOPIC),
+            )
+            self._db.execute(
+                """
+                INSERT INTO topics (topic, refreshed_at, error) VALUES (?, ?, NULL)
+                ON CONFLICT (topic) DO UPDATE SET refreshed_at = excluded.refreshed_at, error = NULL
+                """,
+                (topic, now),
+            )
+            self._db.commit()
+        return added
+
+    def mark_failed(self, topic: str, error: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO topics (topic, error) VALUES (?, ?) ON CONFLICT (topic) DO UPDATE SET error = excluded.error",
+                (normalize_query(topic), error),
+            )
+            self._db.commit()
+
+    def mark_requested(self, topic: str, now: Optional[float] = None):
+        """Remember that the user asked for a topic (it is then prefetched for REQUESTED_DAYS)."""
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT INTO topics (topic, requested_at) VALUES (?, ?)
+                ON CONFLICT (topic) DO UPDATE SET requested_at = excluded.requested_at
+                """,
+                (normalize_query(topic), time.time() if now is None else now),
+            )
+            self._db.commit()
+
+    def topic(self, topic: str) -> dict:
+        """refreshed_at, requested_at (Unix time or None), error and stories (count) of a topic."""
+        topic = normalize_query(topic)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT refreshed_at, requested_at, error FROM topics WHERE topic = ?", (topic,)).fetchone()
+            count = self._db.execute("SELECT COUNT(*) FROM stories WHERE topic = ?", (topic,)).fetchone()[0]
+        refreshed_at, requested_at, error = row or (None, None, None)
+        return {"topic": topic, "refreshed_at": refreshed_at, "requested_at": requested_at,
+                "error": error, "stories": count}
+
+    def requested_since(self, since: float) -> List[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT topic FROM topics WHERE requested_at >= ?", (since,)).fetchall()
+        return [row[0] for row in rows]
+
+    def headlines(self, topic: str, n: int = 5) -> List[dict]:
+        """
+        The newest stories of a topic.
+
+        Returns:
+            List[dict]: title, body, url, source, published, first_seen and last_seen; newest first.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                """
+                SELECT title, body, url, source, published, first_seen, last_seen FROM stories
+                WHERE topic = ? ORDER BY published DESC, id DESC LIMIT ?
+                """,
+                (normalize_query(topic), n),
+            ).fetchall()
+        columns = ("title", "body", "url", "source", "published", "first_seen", "last_seen")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def activity_interests(n: int = INTEREST_TOPICS) -> List[str]:
+    """The user's most frequent search queries (used at least INTEREST_MIN_COUNT times)."""
+    from utiles.activity_store import get_activity_store
+    return [row["key"] for row in get_activity_store().top("query", n) if row["count"] >= INTEREST_MIN_COUNT]
+
+
+class NewsPrefetcher:
+    """
+    Keeps the news store fresh on a background thread and answers headline requests.
+
+    Call start() once; headlines() then reads the store while it is fresh.
+    """
+    def __init__(self, store: NewsStore, client=None, interests: Callable[[], List[str]] = activity_interests,
+                 topics=DEFAULT_TOPICS, interval: float = REFRESH_INTERVAL, fresh_for: float = FRESH_FOR,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            store (NewsStore): Where headlines are kept.
+            client (SearchClient, optional): News source (default: the shared search client).
+            interests (Callable): Returns the user's interest topics.
+            topics: Topics always refreshed.
+            interval (float): Seconds between refreshes of a topic.
+            fresh_for (float): Age up to which stored headlines are answered without a live fetch.
+            clock (Callable): Unix time source.
+        """
+        self.store = store
+        self.client = client
+        self.interests = interests
+        self.default_topics = list(topics)
+        self.interval = interval
+        self.fresh_for = fresh_for
+        self.clock = clock
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _client(self):
+        return self.client or get_search_client()
+
+    def topics(self) -> List[str]:
+        """Topics to keep fresh: defaults, interests and recently requested topics."""
+        try:
+            interests = self.interests()
+        except Exception as e:
+            print(f"News interests error: {e}")
+            interests = []
+        requested = self.store.requested_since(self.clock() - REQUESTED_DAYS * 86400)
+        topics = {}
+        for topic in self.default_topics + list(interests) + requested:
+            topics.setdefault(normalize_query(topic), topic)
+        return list(topics.values())
+
+    def refresh(self, topic: str) -> int:
+        """
+        Fetch a topic now and merge it into the store.
+
+        Returns:
+            int: New stories.
+
+        Raises:
+            Exception: The fetch failed (also recorded on the topic).
+        """
+        try:
+            results = self._client().news(topic, max_results=STORIES_PER_FETCH)
+        except Exception as e:
+            self.store.mark_failed(topic, str(e))
+            raise
+        return self.store.ingest(topic, results, now=self.clock())
+
+    def refresh_due(self) -> dict:
+        """Refresh every topic last refreshed more than interval ago; topic -> new stories (or error)."""
+        done = {}
+        for topic in self.topics():
+            refreshed_at = self.store.topic(topic)["refreshed_at"]
+            if refreshed_at is not None and self.clock() - refreshed_at < self.interval:
+                continue
+            try:
+                done[topic] = self.refresh(topic)
+            except Exception as e:
+                print(f"News prefetch error ({topic}): {e}")
+                done[topic] = str(e)
+        return done
+
+    def headlines(self, topic: str, n: int = 5) -> dict:
+        """
+        Headlines of a topic, from the store if fresh, else fetched live.
+
+        Returns:
+            dict: stories (see NewsStore.headlines), refreshed_at, and source:
+                "store" (fresh), "live" (fetched now) or "stale" (the live fetch failed).
+
+        Raises:
+            Exception: The live fetch failed and nothing is stored for the topic.
+        """
+        self.store.mark_requested(topic, now=self.clock())
+        state = self.store.topic(topic)
+        source = "store"
+        if not state["stories"] or state["refreshed_at"] is None or self.clock() - state["refreshed_at"] >= self.fresh_for:
+            try:
+                self.refresh(topic)
+                source = "live"
+            except Exception:
+                if not state["stories"]:
+                    raise
+                source = "stale"
+        return {"stories": self.store.headlines(topic, n), "refreshed_at": self.store.topic(topic)["refreshed_at"],
+                "source": source}
+
+    def start(self) -> "NewsPrefetcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="news-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        # Checks a few times per interval; refresh_due() skips topics that are still recent
+        wait = STARTUP_DELAY
+        while not self._stop.wait(wait):
+            try:
+                self.refresh_due()
+            except Exception as e:
+                print(f"News prefetcher error: {e}")
+            wait = max(self.interval / 4, 1.0)
+
+
+# Singleton instance
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+def get_news_prefetcher() -> NewsPrefetcher:
+    """Shared, started prefetcher over the store at DEFAULT_DB."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = NewsPrefetcher(NewsStore()).start()
+    return _prefetcher
@@ -1,16 +1,22 @@
-import psutil
+import math
 import geocoder
 import subprocess
 import os
-import pyautogui
-import time
-from collections import Counter
 from langchain.tools import tool
-import win32gui
-import win32process
 import webbrowser
 import shutil
 from datetime import datetime
+from utiles.activity_store import get_activity_store
+from utiles.system_sampler import UNITS, format_rate, get_sampler
+from utiles.process_index import get_process_index
+from utiles.window_state import get_window_service
+from utiles.tab_state import get_tab_table
+from utiles.command_runner import format_result, get_command_runner
+from utiles.site_resolver import get_site_resolver
+from utiles.file_index import get_file_index
+from utiles.dir_listing import format_listing, format_size, list_directory, parse_filter
+from utiles.file_jobs import SYNC_COPY_LIMIT, describe_job, get_file_jobs, target_path
+from utiles.tool_cache import cacheable
 
 def _open_in_chrome(url: str):
     """Helper to force open a URL in Google Chrome on Windows."""
@@ -25,6 +31,8 @@ def _open_in_chrome(url: str):
     except Exception:
         webbrowser.open(url)
 
+# The IP location rarely changes; ignore the (unused) query in the key
+@cacheable(ttl=1800, stale_ttl=86400, key=lambda args: "here")
 @tool
 def get_current_location(query: str = "") -> str:
     """Gets the current physical location of the user (City, Region, Coordinates)."""
@@ -40,68 +48,82 @@ def get_current_location(query: str = "") -> str:
 def list_open_windows(query: str = "") -> str:
     """Lists all visible application windows currently open on the computer. 
     Use this to see what apps the user is currently interacting with."""
-    def callback(hwnd, windows):
-        if win32gui.IsWindowVisible(hwnd):
-            title = win32gui.GetWindowText(hwnd)
-            if title:
-                windows.append(title)
-        return True
-    
-    windows = []
-    win32gui.EnumWindows(callback, windows)
-    return "Open Windows: " + ", ".join(list(set(windows)))
+    service = get_window_service()
+    if service is None:
+        return "Listing windows is not supported on this system."
+    titles = service.titles()
+    if not titles:
+        return "No open windows found."
+    return "Open Windows: " + ", ".join(titles)
 
 @tool
 def get_chrome_activity(query: str = "") -> str:
     """Checks all open Google Chrome windows to see what websites or media (like JioHotstar, YouTube) are currently active.
     Returns the titles of all active Chrome tabs."""
-    def callback(hwnd, windows):
-        if win32gui.IsWindowVisible(hwnd):
-            title = win32gui.GetWindowText(hwnd)
-            if "google chrome" in title.lower():
-                windows.append(title)
-        return True
-    
-    tabs = []
-    win32gui.EnumWindows(callback, tabs)
+    tabs = get_tab_table()
+    if tabs.connected:
+        # Exact, live tab state pushed by the Ruby Chrome extension
+        lines = []
+        for tab in tabs.tabs():
+            media = tab.get("media") or {}
+            flags = []
+            if media.get("playing"):
+                flags.append(f"playing: {media.get('title') or 'media'}")
+            elif tab.get("audible"):
+                flags.append("playing audio")
+            elif media.get("paused"):
+                flags.append("paused")
+            if tab.get("active"):
+                flags.append("active")
+            suffix = f" [{', '.join(flags)}]" if flags else ""
+            lines.append(f"- {tab.get('title') or 'Untitled'} ({tab.get('url', '')}){suffix}")
+        if not lines:
+            return "No open Chrome tabs."
+        return "Current Chrome Tabs:\n" + "\n".join(lines)
+
+    service = get_window_service()
+    if service is None:
+        return "Checking Chrome windows is not supported on this system."
+    tabs = list(dict.fromkeys(w["title"] for w in service.chrome_windows()))
     if not tabs:
         return "No active Chrome windows found."
-    return "Current Chrome Activity: " + " | ".join(list(set(tabs)))
+    return "Current Chrome Activity: " + " | ".join(tabs)
 
 @tool
 def close_application(app_name: str) -> str:
     """Closes an application by its name (e.g., 'notepad', 'chrome', 'calculator')."""
     try:
-        app_name = app_name.lower().strip()
-        closed_count = 0
-        for proc in psutil.process_iter(['name']):
-            if app_name in proc.info['name'].lower():
-                proc.terminate()
-                closed_count += 1
-        
-        if closed_count > 0:
-            return f"Successfully closed {closed_count} instances of '{app_name}'."
-        return f"No running application found matching '{app_name}'."
+        index = get_process_index()
+        result = index.terminate(app_name)
+        if result["found"] == 0:
+            similar = index.suggestions(app_name)
+            hint = f" Running apps with similar names: {', '.join(similar)}." if similar else ""
+            return f"No running application found matching '{app_name}'.{hint}"
+
+        closed = result["terminated"] + result["killed"]
+        message = f"Successfully closed '{app_name}' ({closed} of {result['found']} processes"
+        if result["killed"]:
+            message += f", {result['killed']} force-closed after not responding"
+        message += ")."
+        if result["denied"]:
+            message += f" {result['denied']} processes could not be closed (permission denied)."
+        return message
     except Exception as e:
         return f"Error closing application: {str(e)}"
 
 @tool
 def record_user_activity(activity_type: str, details: str) -> str:
     """Records user activities like searches or bookings to build a 'Frequently Used' history."""
-    history_file = "user_history.txt"
     try:
-        with open(history_file, "a") as f:
-            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} | {activity_type} | {details}\n")
+        get_activity_store().record(activity_type, details)
         return f"Activity recorded: {activity_type}"
     except Exception as e:
         return f"Error recording activity: {str(e)}"
 
 def _record_activity_internal(activity_type: str, details: str):
     """Internal helper to avoid StructuredTool callable error."""
-    history_file = "user_history.txt"
     try:
-        with open(history_file, "a") as f:
-            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} | {activity_type} | {details}\n")
+        get_activity_store().record(activity_type, details)
     except Exception:
         pass
 
@@ -111,105 +133,28 @@ def web_navigation(site_name: str, search_query: str = "") -> str:
     Navigates to popular websites or searches for specific products on them in Google Chrome.
     Examples: site_name='amazon', search_query='laptop' -> Searches Amazon for laptops.
     """
-    import urllib.parse
-    
-    # URL encoded query
-    encoded_query = urllib.parse.quote(search_query) if search_query else ""
-    
-    # Mapping for base URLs and their search patterns
-    mapping = {
-        "redbus": {"base": "https://www.redbus.in", "search": "https://www.google.com/search?q=redbus+"},
-        "chatgpt": {"base": "https://chatgpt.com", "search": "https://chatgpt.com"},
-        "whatsapp": {"base": "https://web.whatsapp.com", "search": "https://web.whatsapp.com"},
-        "instagram": {"base": "https://www.instagram.com", "search": "https://www.instagram.com/explore/tags/"},
-        "irctc": {"base": "https://www.irctc.co.in", "search": "https://www.google.com/search?q=irctc+"},
-        "gemini": {"base": "https://gemini.google.com", "search": "https://gemini.google.com"},
-        "maps": {"base": "https://www.google.com/maps", "search": "https://www.google.com/maps/search/"},
-        "linkedin": {"base": "https://www.linkedin.com", "search": "https://www.linkedin.com/search/results/all/?keywords="},
-        "amazon": {"base": "https://www.amazon.in", "search": "https://www.amazon.in/s?k="},
-        "flipkart": {"base": "https://www.flipkart.com", "search": "https://www.flipkart.com/search?q="},
-        "spotify": {"base": "https://open.spotify.com", "search": "https://open.spotify.com/search/"},
-        "wikipedia": {"base": "https://www.wikipedia.org", "search": "https://en.wikipedia.org/wiki/"},
-        "college": {"base": "https://www.google.com/search?q=official+college+website", "search": "https://www.google.com/search?q="},
-        "makemytrip": {"base": "https://www.makemytrip.com", "search": "https://www.makemytrip.com/hotels/hotel-listing/?city="},
-        "bookmyshow": {"base": "https://in.bookmyshow.com", "search": "https://in.bookmyshow.com/explore/movies-"},
-        "myntra": {"base": "https://www.myntra.com", "search": "https://www.myntra.com/"},
-        "google": {"base": "https://www.google.com", "search": "https://www.google.com/search?q="},
-        "youtube": {"base": "https://www.youtube.com", "search": "https://www.youtube.com/results?search_query="},
-        "facebook": {"base": "https://www.facebook.com", "search": "https://www.facebook.com/search/top/?q="},
-        "twitter": {"base": "https://www.twitter.com", "search": "https://twitter.com/search?q="},
-        "reddit": {"base": "https://www.reddit.com", "search": "https://www.reddit.com/search/?q="},
-    }
-    
-    clean_site = site_name.lower().strip()
-    
-    # --- Direct URL detection ---
-    if "." in clean_site and " " not in clean_site:
-        url = clean_site if clean_site.startswith(("http://", "https://")) else f"https://{clean_site}"
-        _open_in_chrome(url)
+    decision = get_site_resolver().resolve(site_name, search_query)
+    url = decision["url"]
+    _open_in_chrome(url)
+
+    if decision["kind"] == "url":
         _record_activity_internal("Web Navigation", f"Direct URL: {url}")
         return f"Directing you to {url} in Google Chrome."
-
-    # Keyword associations
-    if "ticket" in clean_site or "book" in clean_site:
-        if "bus" in clean_site: clean_site = "redbus"
-        elif "train" in clean_site: clean_site = "irctc"
-        elif "movie" in clean_site: clean_site = "bookmyshow"
-        elif "hotel" in clean_site or "flight" in clean_site: clean_site = "makemytrip"
-    
-    if "product" in clean_site or "shop" in clean_site or "buy" in clean_site:
-        if "cloth" in clean_site: clean_site = "myntra"
-        elif "flipkart" in clean_site: clean_site = "flipkart"
-        else: clean_site = "amazon"
-
-    if "search" in clean_site or "find" in clean_site or "google" in clean_site:
-        clean_site = "google"
-    
-    if "video" in clean_site or "watch" in clean_site:
-        clean_site = "youtube"
-
-    # --- Special Logic for "Official Website" or "Rates" ---
-    is_official_request = "official" in clean_site or "official" in search_query.lower()
-    is_rate_request = any(k in clean_site or k in search_query.lower() for k in ["gold", "silver", "rate", "price"])
-
-    if is_official_request and clean_site not in mapping:
-        search_term = f"{site_name} {search_query}".strip()
-        if "official website" not in search_term.lower():
-            search_term += " official website"
-        url = f"https://www.google.com/search?q={urllib.parse.quote(search_term)}"
-        _open_in_chrome(url)
-        _record_activity_internal("Web Search", search_term)
-        return f"Redirecting you to the official website for '{site_name}'."
-
-    if is_rate_request and clean_site not in mapping:
-        search_term = f"{site_name} {search_query}".strip()
-        if "today" not in search_term.lower():
-            search_term += " rate today"
-        url = f"https://www.google.com/search?q={urllib.parse.quote(search_term)}"
-        _open_in_chrome(url)
-        _record_activity_internal("Rate Search", search_term)
-        return f"Fetching the latest '{search_term}' for you."
-
-    config = mapping.get(clean_site)
-    
-    if config:
+    if decision["kind"] == "site":
+        site = decision["site"]
+        _record_activity_internal("Web Navigation", f"{site}: {search_query if search_query else 'Home'}")
         if search_query:
-            url = f"{config['search']}{encoded_query}"
-            msg = f"Navigating to {clean_site} to search for '{search_query}'."
-        else:
-            url = config['base']
-            msg = f"Opening {clean_site} for you."
-        
-        _open_in_chrome(url)
-        _record_activity_internal("Web Navigation", f"{clean_site}: {search_query if search_query else 'Home'}")
-        return msg
-    else:
-        # Generic fallback
-        search_term = f"{search_query} on {site_name}" if search_query else site_name
-        url = f"https://www.google.com/search?q={urllib.parse.quote(search_term)}"
-        _open_in_chrome(url)
-        _record_activity_internal("Web Search", search_term)
-        return f"Searching for '{search_term}' on Google."
+            return f"Navigating to {site} to search for '{search_query}'."
+        return f"Opening {site} for you."
+    if decision["kind"] == "search" and decision["site"] == "official":
+        _record_activity_internal("Web Search", decision["search_term"])
+        return f"Redirecting you to the official website for '{site_name}'."
+    if decision["kind"] == "search":
+        _record_activity_internal("Rate Search", decision["search_term"])
+        return f"Fetching the latest '{decision['search_term']}' for you."
+    # Generic fallback
+    _record_activity_internal("Web Search", decision["search_term"])
+    return f"Searching for '{decision['search_term']}' on Google."
 
 @tool
 def open_system_app(app_name: str) -> str:
@@ -238,6 +183,7 @@ def pc_automation(command: str) -> str:
     try:
         command = command.lower().strip()
         if "minimize" in command or "desktop" in command:
+            import pyautogui
             pyautogui.hotkey('win', 'd')
             return "Toggled desktop (minimize all)."
         elif "lock" in command:
@@ -257,14 +203,22 @@ def pc_automation(command: str) -> str:
         return f"Automation Error: {str(e)}"
 
 @tool
-def file_operation(action: str, path: str, new_path: str = "") -> str:
-    """Performs file operations. Actions: 'list', 'delete', 'move', 'copy', 'info'."""
+def file_operation(action: str, path: str, new_path: str = "", sort: str = "name", filter: str = "", cursor: str = "") -> str:
+    """Performs file operations. Actions: 'list', 'delete', 'move', 'copy', 'info', 'status'.
+    'list' returns one page of entries plus a summary of the folder. sort: name, size (largest first), date (newest first) or type; prefix '-' to reverse.
+    filter: words like '*.pdf', 'files', 'dirs', '>10MB', '<1KB', 'newer:7d', 'older:30d'. For the next page pass the cursor from the previous reply with the same filter.
+    Large copies and moves run in the background; 'status' with path = job id (or empty) reports their progress."""
     try:
+        if action == "status":
+            jobs = get_file_jobs()
+            if path.strip():
+                job = jobs.get(int(path.strip()))
+                return describe_job(job) if job else f"No file job {path}."
+            return "\n".join(describe_job(job) for job in jobs.jobs()) or "No file jobs."
         path = os.path.abspath(path)
         if action == "list":
             if os.path.isdir(path):
-                files = os.listdir(path)
-                return f"Files in {path}:\n" + "\n".join(files[:20])
+                return format_listing(list_directory(path, sort=sort, cursor=cursor or None, **parse_filter(filter)))
             return "Path is not a directory."
         elif action == "delete":
             if os.path.isfile(path):
@@ -274,12 +228,22 @@ def file_operation(action: str, path: str, new_path: str = "") -> str:
                 shutil.rmtree(path)
                 return f"Directory {path} deleted."
             return "File not found."
-        elif action == "copy":
-            if not new_path: return "New path required for copy."
-            if os.path.isfile(path):
-                shutil.copy2(path, new_path)
-                return f"Copied {path} to {new_path}"
-            return "Source is not a file."
+        elif action in ("copy", "move"):
+            if not new_path: return f"New path required for {action}."
+            if not os.path.exists(path): return "Source not found."
+            target = target_path(path, os.path.abspath(new_path))
+            if action == "copy" and os.path.isfile(path) and os.path.getsize(path) <= SYNC_COPY_LIMIT:
+                shutil.copy2(path, target)
+                return f"Copied {path} to {target}"
+            if action == "move":
+                try:
+                    os.rename(path, target)
+                    return f"Moved {path} to {target}"
+                except OSError:
+                    pass  # another drive: copy and delete in the background
+            job = get_file_jobs().submit(action, path, target)
+            return (f"Started background {action} job {job['id']}: {path} -> {job['dst']}. "
+                    f"Use file_operation(action='status', path='{job['id']}') to check progress.")
         elif action == "info":
             stats = os.stat(path)
             size = stats.st_size
@@ -289,6 +253,28 @@ def file_operation(action: str, path: str, new_path: str = "") -> str:
     except Exception as e:
         return f"File Op Error: {str(e)}"
 
+@tool
+def file_search(query: str, limit: int = 10) -> str:
+    """Finds files and folders on this PC by name, e.g. 'resume pdf', 'invoice march', 'project report'. Returns the best matches with full paths, size and date."""
+    try:
+        index = get_file_index()
+        results = index.search(query, limit=max(1, min(int(limit), 50)))
+        stats = index.stats()
+        note = ""
+        if stats["building"] or stats["pending"]:
+            note = f"\n(The file index is still being built: {stats['entries']:,} entries so far.)"
+        if not results:
+            return f"No files found matching '{query}'.{note}"
+        lines = []
+        for i, r in enumerate(results, 1):
+            modified = datetime.fromtimestamp(r["mtime"]).strftime('%Y-%m-%d')
+            detail = "folder" if r["is_dir"] else format_size(r["size"])
+            lines.append(f"{i}. {r['path']} ({detail}, modified {modified})")
+        return f"Files matching '{query}':\n" + "\n".join(lines) + note
+    except Exception as e:
+        return f"File Search Error: {str(e)}"
+
+@cacheable(ttl=600, stale_ttl=3600, key=lambda args: " ".join(args.get("city", "").lower().split()))
 @tool
 def get_weather(city: str = "") -> str:
     """Gets the current weather for a city or the user's current location."""
@@ -318,6 +304,8 @@ def get_weather(city: str = "") -> str:
 def system_control(action: str) -> str:
     """Controls system settings. Actions: 'volume_up', 'volume_down', 'mute', 'brightness_up', 'brightness_down', 'sleep', 'settings'."""
     try:
+        if action in ("volume_up", "volume_down", "mute"):
+            import pyautogui
         if action == "volume_up":
             for _ in range(5): pyautogui.press("volumeup")
             return "Increased volume."
@@ -351,44 +339,74 @@ def system_control(action: str) -> str:
 def get_system_health(query: str = "") -> str:
     """Checks the computer's health: CPU usage, RAM levels, and Battery percentage."""
     try:
-        cpu = psutil.cpu_percent(interval=1)
-        ram = psutil.virtual_memory().percent
-        battery = psutil.sensors_battery()
-        bat_str = f"{battery.percent}% {'(Charging)' if battery.power_plugged else '(Not Charging)'}" if battery else "Not available"
-        
+        # Latest background sample, so the tool answers instantly
+        sample = get_sampler().latest()
+        if sample is None:
+            return "System health data is not available yet, please try again in a moment."
+        if math.isnan(sample["battery"]):
+            bat_str = "Not available"
+        else:
+            bat_str = f"{sample['battery']:.0f}% {'(Charging)' if sample['battery_plugged'] else '(Not Charging)'}"
+
         return (f"System Health Update:\n"
-                f"- CPU Usage: {cpu}%\n"
-                f"- RAM Usage: {ram}%\n"
+                f"- CPU Usage: {sample['cpu']:.1f}% (per core: {', '.join(f'{c:.0f}' for c in sample['per_core'])})\n"
+                f"- RAM Usage: {sample['ram']:.1f}%\n"
+                f"- Disk I/O: read {format_rate(sample['disk_read'])}, write {format_rate(sample['disk_write'])}\n"
+                f"- Network: down {format_rate(sample['net_recv'])}, up {format_rate(sample['net_sent'])}\n"
                 f"- Battery: {bat_str}")
     except Exception as e:
         return f"Could not fetch system health: {str(e)}"
 
 @tool
-def run_terminal_command(command: str) -> str:
-    """Executes a terminal command safely and returns the output. Use for tasks like checking directory contents or running simple scripts."""
+def get_system_trend(metric: str = "cpu", minutes: float = 10) -> str:
+    """Average, minimum and maximum of a system metric over the last few minutes,
+    e.g. "CPU average over the last 10 minutes".
+    metric: one of cpu, ram, disk_read, disk_write, net_sent, net_recv, battery."""
+    try:
+        trend = get_sampler().trend(metric.lower().strip(), minutes * 60)
+        if trend["avg"] is None:
+            return f"No {metric} samples in the last {minutes:g} minutes yet."
+        if UNITS[trend["metric"]] == "%":
+            fmt = lambda v: f"{v:.1f}%"
+        else:
+            fmt = format_rate
+        covered = trend["seconds"] / 60
+        return (f"{trend['metric']} over the last {covered:.1f} minutes ({trend['samples']} samples): "
+                f"average {fmt(trend['avg'])}, min {fmt(trend['min'])}, max {fmt(trend['max'])}, now {fmt(trend['latest'])}")
+    except Exception as e:
+        return f"Could not compute trend: {str(e)}"
+
+@tool
+def get_top_processes(sort_by: str = "cpu", count: int = 5) -> str:
+    """Lists the processes using the most CPU (sort_by='cpu') or memory (sort_by='memory')."""
     try:
-        result = subprocess.check_output(command, shell=True, text=True, stderr=subprocess.STDOUT)
-        return f"Command Output:\n{result}"
+        by = "rss" if sort_by.lower().strip() in ("memory", "ram", "rss", "mem") else "cpu"
+        processes = get_sampler().top_processes(count, by)
+        lines = [f"- {p['name']} (PID {p['pid']}): CPU {p['cpu']:.1f}%, RAM {p['rss'] / 2**20:.0f} MB" for p in processes]
+        return f"Top processes by {'memory' if by == 'rss' else 'CPU'}:\n" + "\n".join(lines)
+    except Exception as e:
+        return f"Could not list processes: {str(e)}"
+
+@tool
+def run_terminal_command(command: str, timeout: int = 60) -> str:
+    """Executes a terminal command safely and returns the output. Use for tasks like checking directory contents or running simple scripts.
+    The command is stopped after `timeout` seconds; long output is shortened to its beginning and end."""
+    try:
+        result = get_command_runner().run(command, timeout=max(1, min(int(timeout), 600)))
+        return format_result(result)
     except Exception as e:
         return f"Error running command: {str(e)}"
 
 @tool
 def get_frequently_used(query: str = "") -> str:
     """Analyzes history to find and suggest frequently used sites, apps, or searches."""
-    history_file = "user_history.txt"
-    if not os.path.exists(history_file):
-        return "No history found yet. Start using Ruby to see suggestions!"
     try:
-        with open(history_file, "r") as f:
-            lines = f.readlines()
-        
-        activities = [line.split("|")[2].strip() for line in lines if "|" in line]
-        top_activities = Counter(activities).most_common(3)
-        
+        # Ranked by recency-weighted use, read from the store's counters (no history scan)
+        top_activities = get_activity_store().top("item", 3)
         if not top_activities:
-            return "Not enough data for suggestions."
-            
-        suggestions = [f"- {act[0]} ({act[1]} times)" for act in top_activities]
+            return "No history found yet. Start using Ruby to see suggestions!"
+
+        suggestions = [f"- {act['key']} ({act['count']} times)" for act in top_activities]
         return "Your Frequently Used Activities:\n" + "\n".join(suggestions)
     except Exception as e:
         return f"Error reading history: {str(e)}"
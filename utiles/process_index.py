@@ -0,0 +1,256 @@
+# Name -> PID index of running processes for close_application and app lookups.
+#
+# The index maps normalized executable names ("Code.exe" -> "code") to PIDs and
+# keeps each PID's children, so finding an app and its process tree is a couple
+# of dict lookups. It is updated incrementally: from the system sampler's process
+# scans when one is running, and on demand by diffing psutil.pids() against the
+# known PIDs, which only queries processes that appeared since the last update.
+#
+# Spoken names are resolved through utiles/data/app_aliases.json ("vs code" ->
+# code, code-insiders); names that are not aliases are matched as executable names.
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+import psutil
+
+ALIASES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "app_aliases.json")
+# How long terminate() waits after the polite request before killing
+TERMINATE_TIMEOUT = 3.0
+
+
+def normalize(name: str) -> str:
+    """Case-, extension- and separator-insensitive form of an app or executable name."""
+    name = os.path.basename(name.strip().lower())
+    if name.endswith(".exe"):
+        name = name[:-4]
+    return re.sub(r"[\s_]+", " ", name).strip()
+
+
+def load_aliases(path: str = ALIASES_FILE) -> Dict[str, List[str]]:
+    """Alias file as {normalized alias: [normalized executable names]}."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {normalize(alias): [normalize(n) for n in names] for alias, names in data.items() if not alias.startswith("_")}
+
+
+def _exited(proc: psutil.Process) -> bool:
+    """Whether a process is gone; zombies (exited, not yet reaped by their parent) count as gone."""
+    try:
+        return not proc.is_running() or proc.status() == psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return True
+
+
+class ProcessIndex:
+    """
+    Incrementally maintained index of running processes by executable name.
+
+    Entries are keyed by (pid, create_time), so a reused PID is never mistaken
+    for the process that used to own it.
+    """
+    def __init__(self, aliases: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Args:
+            aliases (dict, optional): Spoken name -> executable names. Defaults to ALIASES_FILE.
+        """
+        self.aliases = load_aliases() if aliases is None else {
+            normalize(a): [normalize(n) for n in names] for a, names in aliases.items()
+        }
+        self._lock = threading.RLock()
+        self._procs = {}  # pid -> {"name", "ppid", "create_time"}
+        self._by_name = defaultdict(set)
+        self._children = defaultdict(set)
+        self.updated_at = 0.0
+
+    def add_alias(self, alias: str, names: Iterable[str]):
+        """Map a spoken name to one or more executable names."""
+        self.aliases[normalize(alias)] = [normalize(n) for n in names]
+
+    def _add(self, pid: int, name: str, ppid: Optional[int], create_time: float):
+        self._procs[pid] = {"name": normalize(name), "ppid": ppid, "create_time": create_time}
+        self._by_name[normalize(name)].add(pid)
+        if ppid is not None:
+            self._children[ppid].add(pid)
+
+    def _remove(self, pid: int):
+        entry = self._procs.pop(pid, None)
+        if entry is None:
+            return
+        pids = self._by_name.get(entry["name"])
+        if pids is not None:
+            pids.discard(pid)
+            if not pids:
+                del self._by_name[entry["name"]]
+        if entry["ppid"] is not None:
+            siblings = self._children.get(entry["ppid"])
+            if siblings is not None:
+                siblings.discard(pid)
+                if not siblings:
+                    del self._children[entry["ppid"]]
+
+    def update(self, table: List[dict]):
+        """
+        Apply a full process table (e.g. SystemSampler.scan_processes output).
+
+        Only processes that appeared, exited or changed identity are touched.
+        """
+        current = {p["pid"]: p for p in table}
+        with self._lock:
+            # create_time 0.0 means the scan was denied it; keep the entry in that case
+            for pid in [pid for pid, entry in self._procs.items()
+                        if pid not in current or current[pid]["create_time"] not in (0.0, entry["create_time"])]:
+                self._remove(pid)
+            for pid, p in current.items():
+                if pid not in self._procs:
+                    self._add(pid, p["name"], p["ppid"], p["create_time"])
+            self.updated_at = time.monotonic()
+
+    def refresh(self):
+        """Bring the index up to date by diffing psutil.pids() against the known PIDs."""
+        pids = set(psutil.pids())
+        with self._lock:
+            for pid in set(self._procs) - pids:
+                self._remove(pid)
+            for pid in pids - set(self._procs):
+                try:
+                    proc = psutil.Process(pid)
+                    with proc.oneshot():
+                        if proc.status() == psutil.STATUS_ZOMBIE:
+                            continue
+                        self._add(pid, proc.name(), proc.ppid(), proc.create_time())
+                except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+                    continue
+            self.updated_at = time.monotonic()
+
+    def names_for(self, app_name: str) -> List[str]:
+        """Executable names an app name refers to (its alias entry, or itself)."""
+        key = normalize(app_name)
+        return self.aliases.get(key, [key])
+
+    def lookup(self, app_name: str) -> Set[int]:
+        """PIDs of every process of the app."""
+        with self._lock:
+            return set().union(*(self._by_name.get(n, set()) for n in self.names_for(app_name)))
+
+    def tree(self, pid: int, names: Optional[Iterable[str]] = None) -> List[int]:
+        """
+        pid followed by its descendants.
+
+        Args:
+            pid (int): Root of the tree.
+            names (iterable, optional): Only follow children with one of these executable
+                names; other children and everything below them are left out.
+        """
+        names = None if names is None else set(names)
+        with self._lock:
+            out, seen, stack = [], set(), [pid]
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                out.append(current)
+                for child in self._children.get(current, ()):
+                    if names is None or self._procs.get(child, {}).get("name") in names:
+                        stack.append(child)
+            return out
+
+    def roots(self, app_name: str) -> Set[int]:
+        """The app's processes whose parent is not one of the app's processes (e.g. Chrome's browser process)."""
+        pids = self.lookup(app_name)
+        with self._lock:
+            return {pid for pid in pids if self._procs[pid]["ppid"] not in pids}
+
+    def suggestions(self, app_name: str, limit: int = 3) -> List[str]:
+        """Running executable names containing app_name, for "did you mean" replies."""
+        key = normalize(app_name)
+        with self._lock:
+            return sorted(n for n in self._by_name if key and key in n)[:limit]
+
+    def terminate(self, app_name: str, timeout: float = TERMINATE_TIMEOUT) -> dict:
+        """
+        Close every process of an app: terminate, wait, then kill what is left.
+
+        Only processes whose own executable name belongs to the app are touched, so
+        closing a launcher such as explorer or a terminal leaves the apps started
+        from it running.
+
+        Args:
+            app_name (str): Spoken app name or executable name.
+            timeout (float): Seconds to wait for a graceful exit before killing.
+
+        Returns:
+            dict: found (processes matched, incl. same-name children), terminated (exited politely),
+                killed (needed a kill) and denied (could not be signalled) counts.
+        """
+        self.refresh()
+        targets, seen = [], set()
+        own = os.getpid()
+        names = self.names_for(app_name)
+        with self._lock:
+            for root in self.roots(app_name):
+                for pid in self.tree(root, names):
+                    entry = self._procs.get(pid)
+                    if entry is None or pid == own or pid in seen:
+                        continue
+                    seen.add(pid)
+                    try:
+                        proc = psutil.Process(pid)
+                        if not entry["create_time"] or proc.create_time() == entry["create_time"]:
+                            targets.append(proc)
+                    except psutil.NoSuchProcess:
+                        continue
+        result = {"found": len(targets), "terminated": 0, "killed": 0, "denied": 0}
+        if not targets:
+            return result
+
+        # Children first, so parents don't respawn them or leave orphans
+        signalled = []
+        for proc in reversed(targets):
+            try:
+                proc.terminate()
+                signalled.append(proc)
+            except psutil.NoSuchProcess:
+                result["terminated"] += 1
+            except psutil.AccessDenied:
+                result["denied"] += 1
+        gone, alive = psutil.wait_procs(signalled, timeout=timeout)
+        alive = [proc for proc in alive if not _exited(proc)]
+        result["terminated"] += len(signalled) - len(alive)
+        for proc in alive:
+            try:
+                proc.kill()
+                result["killed"] += 1
+            except psutil.NoSuchProcess:
+                result["terminated"] += 1
+            except psutil.AccessDenied:
+                result["denied"] += 1
+        psutil.wait_procs(alive, timeout=timeout)
+        with self._lock:
+            for proc in signalled:
+                if _exited(proc):
+                    self._remove(proc.pid)
+        return result
+
+
+# Singleton instance
+_index = None
+_index_lock = threading.Lock()
+
+def get_process_index() -> ProcessIndex:
+    """Shared index, kept current by the system sampler's process scans."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from utiles.system_sampler import get_sampler
+            _index = ProcessIndex()
+            _index.refresh()
+            get_sampler().scan_listeners.append(_index.update)
+    return _index
@@ -0,0 +1,193 @@
+# Context assembly for RubyRAG: merge overlapping chunks, drop near-duplicates,
+# order by score and fill the caller's token budget.
+import math
+import re
+import zlib
+from typing import Callable, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+# MinHash settings for near-duplicate detection
+NUM_PERMUTATIONS = 64
+SHINGLE_WORDS = 3
+DUPLICATE_THRESHOLD = 0.8
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(2024)
+# Coefficients below 2**32 keep (a * crc32 + b) inside uint64
+_PERM_A = _rng.integers(1, 1 << 32, NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, NUM_PERMUTATIONS, dtype=np.uint64)
+
+# Chunks whose offsets are at most this far apart (the separator the splitter cut on) count as adjacent
+ADJACENT_GAP = 2
+# Overlaps shorter than this are treated as coincidence when chunk offsets are unknown
+MIN_TEXT_OVERLAP = 20
+# A passage that does not fit is cut to the remaining budget only if at least this many tokens remain
+MIN_PARTIAL_TOKENS = 32
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), used when no tokenizer is given."""
+    return math.ceil(len(text) / 4)
+
+
+def format_passage(i: int, text: str) -> str:
+    return f"[Context {i}]\n{text}"
+
+
+def _passage(doc: Document, rank: int) -> dict:
+    meta = doc.metadata
+    start = meta.get("start_index")
+    return {
+        "text": doc.page_content,
+        "score": meta.get("score", -rank),
+        "group": (meta.get("source"), meta.get("page")),
+        "start": start,
+        "end": None if start is None else start + len(doc.page_content),
+    }
+
+
+def _text_overlap(a: str, b: str) -> int:
+    """Length of the longest suffix of a that is a prefix of b (0 if shorter than MIN_TEXT_OVERLAP)."""
+    for size in range(min(len(a), len(b)), MIN_TEXT_OVERLAP - 1, -1):
+        if a.endswith(b[:size]):
+            return size
+    return 0
+
+
+def merge_adjacent(passages: List[dict]) -> List[dict]:
+    """
+    Merge chunks of the same source/page that overlap or touch.
+
+    Uses the splitter's start_index when available and falls back to matching
+    the text overlap between chunk ends otherwise.
+    """
+    merged = []
+    groups = {}
+    for p in passages:
+        groups.setdefault(p["group"], []).append(p)
+
+    for group in groups.values():
+        positioned = sorted((p for p in group if p["start"] is not None), key=lambda p: p["start"])
+        current = None
+        for p in positioned:
+            if current is not None and p["start"] <= current["end"] + ADJACENT_GAP:
+                if p["start"] > current["end"]:
+                    current["text"] += "\n" + p["text"]
+                    current["end"] = p["end"]
+                elif p["end"] > current["end"]:
+                    current["text"] += p["text"][current["end"] - p["start"]:]
+                    current["end"] = p["end"]
+                current["score"] = max(current["score"], p["score"])
+            else:
+                current = dict(p)
+                merged.append(current)
+
+        unpositioned = [dict(p) for p in group if p["start"] is None]
+        changed = True
+        while changed:
+            changed = False
+            for a in unpositioned:
+                for b in unpositioned:
+                    if a is b:
+                        continue
+                    size = _text_overlap(a["text"], b["text"])
+                    if size:
+                        a["text"] += b["text"][size:]
+                        a["score"] = max(a["score"], b["score"])
+                        unpositioned.remove(b)
+                        changed = True
+                        break
+                if changed:
+                    break
+        merged.extend(unpositioned)
+    return merged
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature over word shingles of a passage."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_WORDS:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = np.array([zlib.crc32(s.encode("utf-8")) for s in shingles], dtype=np.uint64)
+    return ((hashes[:, None] * _PERM_A + _PERM_B) % _PRIME).min(axis=0)
+
+
+def remove_near_duplicates(passages: List[dict], threshold: float = DUPLICATE_THRESHOLD) -> List[dict]:
+    """Keep the best-scoring passage of every group whose estimated Jaccard similarity >= threshold."""
+    kept, signatures = [], []
+    for p in sorted(passages, key=lambda p: p["score"], reverse=True):
+        sig = minhash_signature(p["text"])
+        if any(np.mean(sig == other) >= threshold for other in signatures):
+            continue
+        kept.append(p)
+        signatures.append(sig)
+    return kept
+
+
+def _truncate(text: str, max_tokens: int, count_tokens: Callable[[str], int]) -> str:
+    """Cut text to fit max_tokens, preferring a sentence end, else a word boundary."""
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    cut = text[:low]
+    sentence_end = max(cut.rfind(". "), cut.rfind(".\n"))
+    if sentence_end > len(cut) // 2:
+        return cut[:sentence_end + 1]
+    return cut.rsplit(" ", 1)[0] if " " in cut else cut
+
+
+def pack_context(
+    docs: List[Document],
+    token_budget: Optional[int] = None,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+    duplicate_threshold: float = DUPLICATE_THRESHOLD,
+) -> dict:
+    """
+    Build the prompt context from retrieved chunks.
+
+    Args:
+        docs (List[Document]): Retrieved chunks, best first. metadata["score"] (higher is
+            better) orders them when present; otherwise their rank does.
+        token_budget (int, optional): Maximum tokens of context. None means no limit.
+        count_tokens (Callable): Token counter; defaults to estimate_tokens.
+        duplicate_threshold (float): MinHash similarity above which a passage is dropped.
+
+    Returns:
+        dict: context (str), passages (int), tokens (int), raw_tokens (tokens the chunks
+            would take joined as-is) and tokens_saved.
+    """
+    raw = "\n\n---\n\n".join(format_passage(i, doc.page_content) for i, doc in enumerate(docs, 1))
+    passages = [_passage(doc, rank) for rank, doc in enumerate(docs)]
+    passages = remove_near_duplicates(merge_adjacent(passages), duplicate_threshold)
+
+    parts, used = [], 0
+    for p in passages:
+        separator = count_tokens("\n\n") if parts else 0
+        block = format_passage(len(parts) + 1, p["text"])
+        tokens = count_tokens(block)
+        if token_budget is not None and used + separator + tokens > token_budget:
+            remaining = token_budget - used - separator - count_tokens(format_passage(len(parts) + 1, ""))
+            if remaining >= MIN_PARTIAL_TOKENS:
+                block = format_passage(len(parts) + 1, _truncate(p["text"], remaining, count_tokens))
+                parts.append(block)
+                used += separator + count_tokens(block)
+            break
+        parts.append(block)
+        used += separator + tokens
+
+    context = "\n\n".join(parts)
+    raw_tokens = count_tokens(raw)
+    return {
+        "context": context,
+        "passages": len(parts),
+        "tokens": count_tokens(context),
+        "raw_tokens": raw_tokens,
+        "tokens_saved": raw_tokens - count_tokens(context),
+    }
@@ -0,0 +1,55 @@
+# Deterministic local embedder for RubyRAG: runs offline, used by tests and benchmarks.
+import re
+import zlib
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Function words carry no topic; hashing them only adds noise shared by every text
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i in is it its of on or "
+    "the this to was what when where which who why will with".split()
+)
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Signed feature hashing of word unigrams and bigrams (stopwords removed) into a
+    fixed-size, L2-normalized vector.
+
+    Same text, same vector, on every machine and run: no model download, no API key.
+    Quality is lexical (close to TF matching), which is enough to exercise retrieval
+    end to end and to compare index settings between commits.
+    """
+    def __init__(self, dim: int = 512, bigrams: bool = True):
+        """
+        Args:
+            dim (int): Vector dimension.
+            bigrams (bool): Also hash adjacent word pairs (helps multi-word names).
+        """
+        self.dim = dim
+        self.bigrams = bigrams
+
+    def _features(self, text: str) -> List[str]:
+        words = [w for w in re.findall(r"\w+", text.lower()) if w not in STOPWORDS]
+        features = list(words)
+        if self.bigrams:
+            features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        return features
+
+    def _embed(self, text: str) -> List[float]:
+        vec = np.zeros(self.dim, dtype="float32")
+        for feature in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            vec[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+        return vec.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
@@ -0,0 +1,219 @@
+# Index selection, training and tuning helpers for the RubyRAG FAISS store.
+import json
+import math
+import os
+from typing import Optional
+
+import faiss
+import numpy as np
+
+INDEX_PARAMS_FILE = "index_params.json"
+INDEX_TYPES = ("auto", "flat", "hnsw", "ivf", "ivf_sq8", "ivf_pq")
+# Index types whose distances are approximate (lossy vector codes).
+QUANTIZED_TYPES = ("ivf_sq8", "ivf_pq")
+
+# Corpus size limits used by the automatic index choice.
+FLAT_MAX_VECTORS = 10_000
+HNSW_MAX_VECTORS = 100_000
+SQ8_MAX_VECTORS = 1_000_000
+
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 64
+# Training points an 8-bit PQ codebook needs (one per centroid)
+PQ_MIN_TRAINING = 256
+
+
+def _choose_nlist(n_vectors: int) -> int:
+    """Number of IVF cells: a power of two near 4 * sqrt(n), with >= 39 points per cell."""
+    nlist = 2 ** round(math.log2(max(1.0, 4 * math.sqrt(n_vectors))))
+    while nlist > 16 and n_vectors < 39 * nlist:
+        nlist //= 2
+    return max(1, min(nlist, 65536))
+
+
+def _pq_subquantizers(dim: int) -> int:
+    """Largest divisor of dim that keeps at least 4 dimensions per sub-quantizer (max 64)."""
+    for m in range(min(64, dim // 4), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def min_training_vectors(n_vectors: int, index_type: str) -> int:
+    """Fewest vectors an index of this type, sized for n_vectors, can be trained on (0: no training)."""
+    if not index_type.startswith("ivf"):
+        return 0
+    nlist = _choose_nlist(n_vectors)  # k-means needs at least one point per cell
+    return max(nlist, PQ_MIN_TRAINING) if index_type == "ivf_pq" else nlist
+
+
+def choose_index_spec(n_vectors: int, dim: int, index_type: str = "auto") -> dict:
+    """
+    Pick the FAISS index layout for a corpus.
+
+    Args:
+        n_vectors (int): Number of vectors the index will hold.
+        dim (int): Embedding dimension.
+        index_type (str): One of INDEX_TYPES. "auto" picks by corpus size:
+            flat below 10k vectors, HNSW below 100k, IVF-SQ8 below 1M, IVF-PQ above.
+            A fixed IVF type on a corpus too small to train it (see min_training_vectors)
+            falls back to flat, with a warning, until the corpus grows.
+
+    Returns:
+        dict: Index spec (type, factory string and default search parameters).
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}'. Use one of {INDEX_TYPES}.")
+
+    if index_type == "auto":
+        if n_vectors < FLAT_MAX_VECTORS:
+            index_type = "flat"
+        elif n_vectors < HNSW_MAX_VECTORS:
+            index_type = "hnsw"
+        elif n_vectors < SQ8_MAX_VECTORS:
+            index_type = "ivf_sq8"
+        else:
+            index_type = "ivf_pq"
+    elif n_vectors < min_training_vectors(n_vectors, index_type):
+        print(f"⚠️ {n_vectors} vectors are too few to train a '{index_type}' index "
+              f"(needs {min_training_vectors(n_vectors, index_type)}); using a flat index for now.")
+        index_type = "flat"
+
+    spec = {
+        "type": index_type,
+        "dim": dim,
+        "built_for": n_vectors,
+        "nlist": None,
+        "nprobe": None,
+        "ef_search": None,
+    }
+    if index_type == "flat":
+        spec["factory"] = "Flat"
+    elif index_type == "hnsw":
+        spec["factory"] = f"HNSW{HNSW_M}"
+        spec["ef_search"] = HNSW_EF_SEARCH
+    else:
+        nlist = _choose_nlist(n_vectors)
+        codec = {"ivf": "Flat", "ivf_sq8": "SQ8", "ivf_pq": f"PQ{_pq_subquantizers(dim)}"}[index_type]
+        spec["factory"] = f"IVF{nlist},{codec}"
+        spec["nlist"] = nlist
+        spec["nprobe"] = min(nlist, max(8, nlist // 16))
+    return spec
+
+
+def build_index(vectors: np.ndarray, spec: dict, train_size: Optional[int] = None, seed: int = 1234):
+    """
+    Create an empty index from a spec and train it on a sample of the vectors.
+
+    The vectors are only used for training; callers add them afterwards so that
+    ids stay aligned with their own docstore.
+
+    Args:
+        vectors (np.ndarray): float32 matrix of shape (n, dim); may be a memory map,
+            only the training sample is read.
+        spec (dict): Spec from choose_index_spec.
+        train_size (int, optional): Training sample size. Defaults to 64 points per IVF cell
+            (at least 20k, at most the whole corpus).
+        seed (int): Seed for the training sample.
+
+    Returns:
+        faiss.Index: A trained, empty index.
+    """
+    index = faiss.index_factory(spec["dim"], spec["factory"], faiss.METRIC_L2)
+
+    if spec["type"] == "hnsw":
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+
+    if not index.is_trained:
+        if train_size is None:
+            train_size = max(64 * (spec["nlist"] or 1), 20_000)
+        train_size = min(train_size, len(vectors))
+        if train_size < len(vectors):
+            rng = np.random.default_rng(seed)
+            sample = vectors[np.sort(rng.choice(len(vectors), train_size, replace=False))]
+        else:
+            sample = vectors
+        index.train(np.ascontiguousarray(sample, dtype="float32"))
+        spec["train_size"] = int(train_size)
+
+    set_search_params(index, spec.get("nprobe"), spec.get("ef_search"))
+    return index
+
+
+def set_search_params(index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """Apply query-time parameters (IVF nprobe, HNSW efSearch) where the index supports them."""
+    params = faiss.ParameterSpace()
+    if nprobe and faiss.try_extract_index_ivf(index) is not None:
+        params.set_index_parameter(index, "nprobe", int(nprobe))
+    if ef_search and _find_hnsw(index) is not None:
+        params.set_index_parameter(index, "efSearch", int(ef_search))
+
+
+def selector_params(index, selector, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """Per-query search parameters restricting the search to the ids accepted by selector."""
+    if faiss.try_extract_index_ivf(index) is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=int(nprobe or 1))
+    if _find_hnsw(index) is not None:
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=int(ef_search or HNSW_EF_SEARCH))
+    return faiss.SearchParameters(sel=selector)
+
+
+def _find_hnsw(index):
+    try:
+        return faiss.downcast_index(index).hnsw
+    except AttributeError:
+        return None
+
+
+def needs_rebuild(spec: dict, n_vectors: int, index_type: str = "auto") -> bool:
+    """
+    Whether an index built from spec should be rebuilt for the current corpus size.
+
+    Automatic indexes are rebuilt when the corpus crosses into another size tier,
+    or when an IVF index has grown 4x past the size its cells were sized for. A
+    fixed IVF type that fell back to flat is rebuilt once it can be trained.
+    """
+    if index_type != "auto":
+        return (spec["type"] == "flat" and index_type != "flat"
+                and n_vectors >= min_training_vectors(n_vectors, index_type))
+    if choose_index_spec(n_vectors, spec["dim"])["type"] != spec["type"]:
+        return True
+    return spec["nlist"] is not None and n_vectors > 4 * spec["built_for"]
+
+
+def reconstruct_vectors(index) -> np.ndarray:
+    """
+    Read every stored vector back out of an index.
+
+    Exact for flat, HNSW and IVF-Flat indexes; SQ8/PQ indexes return their
+    quantized approximation.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def rebuild_index(index, spec: dict):
+    """Build and fill a new index laid out by spec with the vectors of an existing one."""
+    vectors = reconstruct_vectors(index)
+    new_index = build_index(vectors, spec)
+    new_index.add(vectors)
+    return new_index
+
+
+def save_index_params(db_path: str, spec: dict):
+    """Persist the index spec next to the FAISS files."""
+    os.makedirs(db_path, exist_ok=True)
+    with open(os.path.join(db_path, INDEX_PARAMS_FILE), "w", encoding="utf-8") as f:
+        json.dump(spec, f, indent=2)
+
+
+def load_index_params(db_path: str) -> Optional[dict]:
+    """Load a saved index spec, or None for stores written before index tiers existed."""
+    path = os.path.join(db_path, INDEX_PARAMS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,401 @@
+# Native, pickle-free on-disk store for RubyRAG.
+#
+# A store folder holds:
+#   header.json      versioned header: format, dimension, row count, index spec, generation
+#   vectors.f32      raw float32 vectors, row i belongs to chunk i (memory-mapped)
+#   index.faiss      FAISS index over the same rows (memory-mapped where FAISS allows)
+#   docstore.sqlite  chunk text and metadata keyed by row id, fetched lazily per query;
+#                    source/page/language/ingested_at are also columns for filtered search
+#
+# Opening a store only reads the header and maps the files, so load time does not
+# depend on the size of the docstore. Only the chunks a query returns are materialized.
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+from utiles import rag_index
+
+FORMAT_NAME = "ruby-rag"
+FORMAT_VERSION = 2  # v2: metadata filter columns in the docstore (v1 stores are upgraded on open)
+
+HEADER_FILE = "header.json"
+VECTORS_FILE = "vectors.f32"
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.sqlite"
+
+# Rows added to a rebuilt index per batch, so rebuilds never load the whole vector file.
+REBUILD_BATCH = 65_536
+# Quantized indexes return this many times k candidates, re-ranked exactly from vectors.f32.
+REFINE_FACTOR = 4
+# Filtered searches matching at most this many rows are scored exactly on just those rows;
+# larger matches search the index restricted to the matching ids.
+EXACT_FILTER_MAX = 20_000
+
+# Chunk metadata copied into indexed docstore columns, usable as search filters.
+FILTER_COLUMNS = ("source", "page", "language", "ingested_at")
+
+
+class RagStore:
+    """
+    FAISS index + raw vectors + SQLite docstore, laid out as described above.
+    Use RagStore.open / RagStore.create rather than the constructor.
+    """
+    def __init__(self, path: str, header: dict):
+        self.path = path
+        self.header = header
+        self._index = None
+        self._index_writable = False
+        self._vectors = None
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(os.path.join(path, DOCSTORE_FILE), check_same_thread=False)
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        """Create the chunks table, adding and back-filling filter columns on v1 docstores."""
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "id INTEGER PRIMARY KEY, content TEXT NOT NULL, metadata TEXT, "
+                "source TEXT, page INTEGER, language TEXT, ingested_at TEXT)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(chunks)")}
+            for column in FILTER_COLUMNS:
+                if column not in columns:
+                    self._db.execute(f"ALTER TABLE chunks ADD COLUMN {column}")
+                    self._db.execute(f"UPDATE chunks SET {column} = json_extract(metadata, '$.{column}')")
+                self._db.execute(f"CREATE INDEX IF NOT EXISTS chunks_{column} ON chunks ({column})")
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Whether path holds a native store."""
+        return os.path.exists(os.path.join(path, HEADER_FILE))
+
+    @classmethod
+    def open(cls, path: str) -> "RagStore":
+        """
+        Open an existing store.
+
+        Raises:
+            RuntimeError: If the header is missing or written by an unknown format version.
+        """
+        with open(os.path.join(path, HEADER_FILE), "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("format") != FORMAT_NAME or header.get("version", 0) > FORMAT_VERSION:
+            raise RuntimeError(f"Unsupported RAG store format in {path}: {header.get('format')} v{header.get('version')}")
+        store = cls(path, header)
+        store._recover()
+        if header["version"] < FORMAT_VERSION:
+            header["version"] = FORMAT_VERSION
+            store.save()
+        return store
+
+    @classmethod
+    def create(cls, path: str, spec: dict, name: Optional[str] = None) -> "RagStore":
+        """
+        Create an empty store whose index is laid out by spec (see rag_index.choose_index_spec).
+        Anything left in the folder by an earlier, interrupted ingest is cleared and a
+        count-0 header is written, so later opens drop rows that were never saved.
+
+        Args:
+            path (str): Store folder.
+            spec (dict): Index spec.
+            name (str, optional): Collection name recorded in the header.
+        """
+        os.makedirs(path, exist_ok=True)
+        open(os.path.join(path, VECTORS_FILE), "wb").close()
+        header = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "name": name,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "dim": spec["dim"],
+            "count": 0,
+            "generation": 0,
+            "index": spec,
+        }
+        store = cls(path, header)
+        with store._db:
+            store._db.execute("DELETE FROM chunks")
+        store.save()
+        return store
+
+    @property
+    def count(self) -> int:
+        return self.header["count"]
+
+    @property
+    def dim(self) -> int:
+        return self.header["dim"]
+
+    @property
+    def generation(self) -> int:
+        """Bumped on every add or rebuild; caches key on it to drop stale results."""
+        return self.header.get("generation", 0)
+
+    @property
+    def spec(self) -> dict:
+        return self.header["index"]
+
+    @property
+    def index(self):
+        """The FAISS index, read on first use (memory-mapped, read-only)."""
+        if self._index is None:
+            index_path = os.path.join(self.path, INDEX_FILE)
+            try:
+                self._index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                self._index = faiss.read_index(index_path)
+                self._index_writable = True
+        return self._index
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """All stored vectors as a read-only (count, dim) memory map."""
+        if self._vectors is None or len(self._vectors) != self.count:
+            if self.count == 0:
+                return np.zeros((0, self.dim), dtype="float32")
+            self._vectors = np.memmap(
+                os.path.join(self.path, VECTORS_FILE), dtype="float32", mode="r", shape=(self.count, self.dim)
+            )
+        return self._vectors
+
+    def _recover(self):
+        """Drop rows written after the last saved header (an interrupted add)."""
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        expected = self.count * self.dim * 4
+        if os.path.getsize(vectors_path) > expected:
+            with open(vectors_path, "r+b") as f:
+                f.truncate(expected)
+        with self._db:
+            self._db.execute("DELETE FROM chunks WHERE id >= ?", (self.count,))
+
+    def _writable_index(self):
+        """Memory-mapped IVF lists are read-only; read the index fully before modifying it."""
+        if self._index is None or not self._index_writable:
+            self._index = faiss.read_index(os.path.join(self.path, INDEX_FILE))
+            self._index_writable = True
+        return self._index
+
+    def add(self, vectors: np.ndarray, documents: List[Document], save: bool = True):
+        """
+        Append vectors and their chunks, then save.
+
+        Args:
+            vectors (np.ndarray): float32 matrix of shape (len(documents), dim).
+            documents (List[Document]): Chunks matching the vectors row for row.
+            save (bool): Write the index and header now. Streaming ingestion passes False
+                and calls save() once at the end; rows added since the last save are
+                dropped on open if the process dies first.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        if len(vectors) != len(documents):
+            raise ValueError("vectors and documents must have the same length")
+        with self._lock:
+            start = self.count
+            with open(os.path.join(self.path, VECTORS_FILE), "ab") as f:
+                f.write(vectors.tobytes())
+            self._insert_chunks(start, documents)
+            if start == 0:
+                self._index = rag_index.build_index(vectors, self.spec)
+                self._index_writable = True
+            self._writable_index().add(vectors)
+            self.header["count"] = start + len(vectors)
+            self.header["generation"] = self.generation + 1
+            if save:
+                self.save()
+
+    def _insert_chunks(self, start: int, documents: List[Document]):
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO chunks (id, content, metadata, source, page, language, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (start + i, doc.page_content, json.dumps(doc.metadata, default=str))
+                    + tuple(doc.metadata.get(column) for column in FILTER_COLUMNS)
+                    for i, doc in enumerate(documents)
+                ],
+            )
+
+    def rebuild(self, spec: dict):
+        """Re-create the index with a new layout from the stored vectors, in bounded batches."""
+        with self._lock:
+            # The old index is rebuilt from vectors.f32, not read; release it before building the new one
+            self._index = None
+            vectors = self.vectors
+            index = rag_index.build_index(vectors, spec)
+            for start in range(0, self.count, REBUILD_BATCH):
+                index.add(np.ascontiguousarray(vectors[start:start + REBUILD_BATCH]))
+            self._index = index
+            self._index_writable = True
+            self.header["index"] = spec
+            self.header["generation"] = self.generation + 1
+            self.save()
+
+    def save(self):
+        """Write the index and then the header, each atomically (header last marks a complete save)."""
+        with self._lock:
+            if self._index is not None and self._index_writable:
+                tmp_path = os.path.join(self.path, INDEX_FILE + ".tmp")
+                faiss.write_index(self._index, tmp_path)
+                os.replace(tmp_path, os.path.join(self.path, INDEX_FILE))
+            tmp_path = os.path.join(self.path, HEADER_FILE + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.header, f, indent=2)
+            os.replace(tmp_path, os.path.join(self.path, HEADER_FILE))
+
+    def filter_ids(self, filters: dict) -> np.ndarray:
+        """
+        Row ids whose metadata matches every filter.
+
+        Args:
+            filters (dict): Any of source (substring of the file path), page, language,
+                ingested_after / ingested_before (ISO dates, inclusive).
+
+        Returns:
+            np.ndarray: Matching row ids (int64), ascending.
+        """
+        clauses, params = [], []
+        for key, value in filters.items():
+            if value is None or value == "":
+                continue
+            if key == "source":
+                clauses.append("source LIKE ?")
+                params.append(f"%{value}%")
+            elif key in ("page", "language"):
+                clauses.append(f"{key} = ?")
+                params.append(value)
+            elif key == "ingested_after":
+                clauses.append("ingested_at >= ?")
+                params.append(value)
+            elif key == "ingested_before":
+                clauses.append("ingested_at <= ?")
+                params.append(value + "~")  # "~" sorts after any time suffix, keeping the whole day
+            else:
+                raise ValueError(f"Unknown RAG filter '{key}'")
+        sql = "SELECT id FROM chunks" + (" WHERE " + " AND ".join(clauses) if clauses else "") + " ORDER BY id"
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return np.fromiter((row[0] for row in rows), dtype="int64", count=len(rows))
+
+    def search(
+        self,
+        query_vector,
+        k: int,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        filters: Optional[dict] = None,
+    ):
+        """
+        Nearest chunks for one query vector.
+
+        Quantized indexes (SQ8/PQ) over-fetch and re-rank the candidates with
+        their exact vectors, which recovers most of the recall lost to the codes.
+
+        With filters, matching rows are selected in SQLite first. Small matches are
+        scored exactly on just those rows; large ones search the index restricted to
+        them, so rows outside the filter are never considered.
+
+        Returns:
+            List[tuple]: (row id, L2 distance) pairs, closest first.
+        """
+        if self.count == 0:
+            return []
+        query = np.asarray(query_vector, dtype="float32").reshape(1, -1)
+        selected = None
+        filters = {key: value for key, value in (filters or {}).items() if value is not None and value != ""}
+        if filters:
+            selected = self.filter_ids(filters)
+            if len(selected) == 0:
+                return []
+            if len(selected) <= EXACT_FILTER_MAX:
+                distances = ((self.vectors[selected] - query) ** 2).sum(axis=1)
+                order = np.argsort(distances)[:k]
+                return [(int(selected[i]), float(distances[i])) for i in order]
+
+        refine = self.spec["type"] in rag_index.QUANTIZED_TYPES
+        fetch_k = min(k * REFINE_FACTOR if refine else k, self.count)
+        with self._lock:
+            index = self.index
+            nprobe = nprobe or self.spec.get("nprobe")
+            ef_search = ef_search or self.spec.get("ef_search")
+            if selected is None:
+                rag_index.set_search_params(index, nprobe, ef_search)
+                distances, ids = index.search(query, fetch_k)
+            else:
+                params = rag_index.selector_params(index, faiss.IDSelectorBatch(selected), nprobe, ef_search)
+                distances, ids = index.search(query, fetch_k, params=params)
+            found = ids[0] >= 0
+            ids, distances = ids[0][found], distances[0][found]
+            if refine and len(ids):
+                distances = ((self.vectors[ids] - query) ** 2).sum(axis=1)
+                order = np.argsort(distances)[:k]
+                ids, distances = ids[order], distances[order]
+        return [(int(i), float(d)) for i, d in zip(ids, distances)]
+
+    def get_documents(self, ids: Iterable[int]) -> List[Document]:
+        """Materialize the chunks for the given row ids, in the order given."""
+        ids = list(ids)
+        if not ids:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT id, content, metadata FROM chunks WHERE id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall()
+        by_id = {row[0]: Document(page_content=row[1], metadata=json.loads(row[2] or "{}")) for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def close(self):
+        self._db.close()
+
+
+def is_legacy_store(path: str) -> bool:
+    """
+    Whether path holds a LangChain FAISS.save_local store (index.faiss + pickled index.pkl).
+    The pickle is only deleted once a migration has been saved, so a folder that still has it
+    is legacy even if an interrupted migration already wrote a header.
+    """
+    return os.path.exists(os.path.join(path, "index.pkl"))
+
+
+def migrate_legacy_store(path: str, embeddings) -> RagStore:
+    """
+    Convert a LangChain FAISS.save_local folder into the native layout, in place.
+
+    This is the only place the old pickle is read, once, and it is deleted afterwards.
+    Vectors are read back from the index, which is exact for flat/HNSW/IVF-Flat stores.
+    """
+    from langchain_community.vectorstores import FAISS
+
+    print(f"Migrating FAISS DB at {path} to the native RAG store format...")
+    legacy = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+    index = legacy.index
+    spec = rag_index.load_index_params(path)
+    if spec is None:
+        spec = rag_index.choose_index_spec(index.ntotal, index.d, "flat")
+        spec["built_for"] = index.ntotal
+
+    vectors = rag_index.reconstruct_vectors(index)
+    documents = [legacy.docstore.search(legacy.index_to_docstore_id[i]) for i in range(index.ntotal)]
+
+    store = RagStore.create(path, spec, name=os.path.basename(os.path.normpath(path)))
+    store._index = index
+    store._index_writable = True
+    with open(os.path.join(path, VECTORS_FILE), "wb") as f:
+        f.write(np.ascontiguousarray(vectors, dtype="float32").tobytes())
+    store._insert_chunks(0, documents)
+    store.header["count"] = index.ntotal
+    store.save()
+
+    os.remove(os.path.join(path, "index.pkl"))
+    params_path = os.path.join(path, rag_index.INDEX_PARAMS_FILE)
+    if os.path.exists(params_path):
+        os.remove(params_path)
+    print(f"Migrated {index.ntotal} chunks.")
+    return store
@@ -1,20 +1,82 @@
 # RubyRAG class for document processing and retrieval using FAISS.
+import hashlib
 import os
+import re
+import time
+from datetime import datetime
 from dotenv import load_dotenv
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+import numpy as np
+
+from utiles import rag_index
+from utiles.rag_context import pack_context
+from utiles.cache_utiles import LRUCache
+from utiles.rag_store import RagStore, is_legacy_store, migrate_legacy_store
 
 load_dotenv()
 
+# Named collections live in <db_path>/collections/<name>; the default one is db_path itself
+DEFAULT_COLLECTION = "default"
+COLLECTIONS_DIR = "collections"
+_COLLECTION_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+# Ingestion works on bounded batches so memory stays flat however large the file is:
+# chunks embedded and written per batch, and text files read this many characters at a time
+INGEST_BATCH = 256
+TEXT_BLOCK_CHARS = 1_000_000
+
+# Unicode blocks of the Indic scripts Ruby speaks; anything else is tagged English
+_SCRIPT_LANGUAGES = (
+    ("ta", 0x0B80, 0x0BFF),
+    ("ml", 0x0D00, 0x0D7F),
+    ("hi", 0x0900, 0x097F),
+)
+
+
+def detect_language(text: str) -> str:
+    """Language code of the dominant script in text ("ta", "ml", "hi", else "en")."""
+    counts = {code: 0 for code, _, _ in _SCRIPT_LANGUAGES}
+    letters = 0
+    for ch in text:
+        if not ch.isalpha():
+            continue
+        letters += 1
+        point = ord(ch)
+        for code, low, high in _SCRIPT_LANGUAGES:
+            if low <= point <= high:
+                counts[code] += 1
+                break
+    code, hits = max(counts.items(), key=lambda item: item[1])
+    return code if letters and hits * 2 >= letters else "en"
+
+
 class RubyRAG:
     """
     RubyRAG class for document processing and retrieval using FAISS.
     Updated to use Free Google Gemini Embeddings.
+
+    The FAISS index layout is picked from the corpus size (flat, HNSW, IVF-SQ8
+    or IVF-PQ, see utiles/rag_index.py) and rebuilt when the corpus grows into
+    the next tier. Data lives in a pickle-free RagStore (utiles/rag_store.py).
+
+    Query embeddings are cached by normalized text, and retrieval results by
+    (query vector, k, search settings, store generation), so adding documents
+    invalidates cached results automatically.
+
+    query() packs the retrieved chunks with utiles/rag_context.py: overlapping
+    neighbours are merged, near-duplicates dropped and the result fitted to an
+    optional token budget.
+
+    Chunks can be kept in named collections (e.g. "manuals", "timetables"), each
+    with its own store and index, so a query only searches the collection it names.
+    Every chunk records source, page, language and ingested_at, which can be used
+    as search filters (see RagStore.filter_ids).
     """
     def __init__(
         self,
@@ -22,30 +84,175 @@ class RubyRAG:
         embedding_model: str = "models/embedding-001",
         chunk_size: int = 600,
         chunk_overlap: int = 80,
+        index_type: str = "auto",
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        query_cache_size: int = 512,
+        result_cache_size: int = 256,
+        embeddings: Optional[Embeddings] = None,
     ):
-        self.db_path = db_path 
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        self.embedding_model = GoogleGenerativeAIEmbeddings(
-            model=embedding_model, 
-            google_api_key=google_api_key
-        )
+        """
+        Args:
+            db_path (str): Folder of the RAG store.
+            embedding_model (str): Gemini embedding model name.
+            chunk_size (int): Characters per chunk.
+            chunk_overlap (int): Characters shared by neighbouring chunks.
+            index_type (str): "auto" or a fixed type from rag_index.INDEX_TYPES.
+            nprobe (int, optional): IVF cells visited per query (overrides the saved default).
+            ef_search (int, optional): HNSW search breadth (overrides the saved default).
+            query_cache_size (int): Query embeddings kept in the LRU cache.
+            result_cache_size (int): Retrieval results kept in the LRU cache.
+            embeddings (Embeddings, optional): Embedder to use instead of Gemini, e.g.
+                rag_embeddings.HashingEmbeddings for offline runs.
+        """
+        self.db_path = db_path
+        self.index_type = index_type
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        if embeddings is not None:
+            self.embedding_model = embeddings
+        else:
+            google_api_key = os.getenv("GOOGLE_API_KEY")
+            self.embedding_model = GoogleGenerativeAIEmbeddings(
+                model=embedding_model, 
+                google_api_key=google_api_key
+            )
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size, 
-            chunk_overlap=chunk_overlap)
+            chunk_overlap=chunk_overlap,
+            add_start_index=True)  # offsets let pack_context merge overlapping neighbours
+        self.last_context_stats = None
+        self.embedding_cache = LRUCache(maxsize=query_cache_size)
+        self.result_cache = LRUCache(maxsize=result_cache_size)
         
-        self.vectorstore = None
-        # Load existing DB if present
-        if os.path.exists(db_path):
-            print(f"Loading FAISS DB from {db_path}")
-            self.vectorstore = FAISS.load_local(
-                db_path,
-                self.embedding_model,
-                allow_dangerous_deserialization=True,
-            )
-        else:
+        # Open stores by collection name; named collections are opened on first use
+        self.stores = {}
+        if self._get_store(DEFAULT_COLLECTION) is None:
             print("No existing DB found. New DB will be created.")
-    
 
+    @property
+    def vectorstore(self) -> Optional[RagStore]:
+        """Store of the default collection (None until documents are added)."""
+        return self.stores.get(DEFAULT_COLLECTION)
+
+    def _collection_path(self, collection: Optional[str]) -> str:
+        name = collection or DEFAULT_COLLECTION
+        if name == DEFAULT_COLLECTION:
+            return self.db_path
+        if not _COLLECTION_NAME.match(name):
+            raise ValueError(f"Invalid collection name '{name}' (use lowercase letters, digits, '-' and '_')")
+        return os.path.join(self.db_path, COLLECTIONS_DIR, name)
+
+    def _get_store(self, collection: Optional[str]) -> Optional[RagStore]:
+        """Open store of a collection, or None if nothing has been added to it yet."""
+        name = collection or DEFAULT_COLLECTION
+        if name in self.stores:
+            return self.stores[name]
+        path = self._collection_path(name)
+        store = None
+        if name == DEFAULT_COLLECTION and is_legacy_store(path):
+            # One-time conversion of an old FAISS.save_local (pickle) folder
+            store = migrate_legacy_store(path, self.embedding_model)
+        elif RagStore.exists(path):
+            print(f"Loading RAG store from {path}")
+            store = RagStore.open(path)
+        if store is None:
+            return None
+        self.stores[name] = store
+        if rag_index.needs_rebuild(store.spec, store.count, self.index_type):
+            self._rebuild_index(store)
+        return store
+
+    def _rebuild_index(self, store: RagStore):
+        """Rebuild the FAISS index for the current corpus size and persist it."""
+        spec = rag_index.choose_index_spec(store.count, store.dim, self.index_type)
+        print(f"Rebuilding FAISS index: {store.spec['type']} -> {spec['type']} ({store.count} vectors)")
+        store.rebuild(spec)
+
+    def list_collections(self) -> List[dict]:
+        """
+        Collections in this database.
+
+        Returns:
+            List[dict]: name, chunks, index type and created_at of each collection.
+        """
+        names = [DEFAULT_COLLECTION] if RagStore.exists(self.db_path) or DEFAULT_COLLECTION in self.stores else []
+        collections_dir = os.path.join(self.db_path, COLLECTIONS_DIR)
+        if os.path.isdir(collections_dir):
+            names += sorted(
+                name for name in os.listdir(collections_dir)
+                if RagStore.exists(os.path.join(collections_dir, name))
+            )
+        collections = []
+        for name in names:
+            store = self._get_store(name)
+            collections.append({
+                "name": name,
+                "chunks": store.count,
+                "index": store.spec["type"],
+                "created_at": store.header.get("created_at"),
+            })
+        return collections
+
+    def close(self):
+        """Close every open store."""
+        for store in self.stores.values():
+            store.close()
+        self.stores.clear()
+
+    @staticmethod
+    def _iter_pages(file_path: str) -> Iterator[Document]:
+        """
+        Yield a file one page (PDF) or one block of text at a time, never the whole file.
+
+        Text blocks end on a paragraph break where possible, else a line break or a space,
+        and carry their character offset in metadata["offset"].
+        """
+        if os.path.splitext(file_path)[-1].lower() == ".pdf":
+            yield from PyPDFLoader(file_path).lazy_load()
+            return
+
+        offset, pending = 0, ""
+        with open(file_path, encoding="utf-8") as f:
+            while True:
+                block = f.read(TEXT_BLOCK_CHARS)
+                text = pending + block
+                if not block:
+                    if text:
+                        yield Document(page_content=text, metadata={"source": file_path, "offset": offset})
+                    return
+                cut = text.rfind("\n\n")
+                if cut <= 0:
+                    cut = text.rfind("\n")
+                if cut <= 0:
+                    # No line break in a whole block (minified or one-line text): cut at a space,
+                    # or mid-word, so a block never holds more than two reads
+                    cut = text.rfind(" ")
+                if cut <= 0:
+                    cut = len(text)
+                yield Document(page_content=text[:cut], metadata={"source": file_path, "offset": offset})
+                offset += cut
+                pending = text[cut:]
+
+    def _iter_chunks(self, file_path: str) -> Iterator[Document]:
+        """
+        Split a file into tagged chunks, page by page.
+
+        Args:
+            file_path (str): Path to the document file.
+
+        Yields:
+            Document: Chunks with source, page (PDF), language, ingested_at and start_index.
+        """
+        ingested_at = datetime.now().isoformat(timespec="seconds")
+        for page in self._iter_pages(file_path):
+            offset = page.metadata.pop("offset", 0)
+            page.metadata["source"] = file_path
+            page.metadata["language"] = detect_language(page.page_content)
+            page.metadata["ingested_at"] = ingested_at
+            for chunk in self.text_splitter.split_documents([page]):
+                chunk.metadata["start_index"] = chunk.metadata.get("start_index", 0) + offset
+                yield chunk
 
     def _load_documents(self, file_path: str) -> List[Document]:
         """
@@ -57,56 +264,123 @@ class RubyRAG:
         Returns:
             List[Document]: List of documents loaded from the file.
         """
-        ext = os.path.splitext(file_path)[-1].lower()
-
-        if ext == ".pdf":
-            loader = PyPDFLoader(file_path)
-        else:
-            loader = TextLoader(file_path, encoding="utf-8")
+        return list(self._iter_chunks(file_path))
 
-        docs = loader.load()
-        return self.text_splitter.split_documents(docs)
-    
-    def add_documents(self, file_path: str):
+    def add_documents(self, file_path: str, collection: Optional[str] = None, batch_size: int = INGEST_BATCH):
         """
-        Add documents to the FAISS vector store.
+        Add documents to the RAG store.
+
+        The file is streamed: pages are parsed, split, embedded and appended to the
+        store batch_size chunks at a time, and the index is saved once at the end,
+        so peak memory does not grow with the size of the file.
 
         Args:
             file_path (str): Path to the document file.
+            collection (str, optional): Collection to add to; created on first use.
+            batch_size (int): Chunks embedded and written per batch.
         """
-        docs = self._load_documents(file_path)
-        if self.vectorstore is None:
-            print("Creating new FAISS DB")
-            self.vectorstore = FAISS.from_documents(
-                docs,
-                self.embedding_model,
+        path = self._collection_path(collection)
+        store = self._get_store(collection)
+        created = False
+        added = 0
+        chunks = self._iter_chunks(file_path)
+        while True:
+            batch = []
+            for chunk in chunks:
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    break
+            if not batch:
+                break
+            vectors = np.asarray(
+                self.embedding_model.embed_documents([doc.page_content for doc in batch]), dtype="float32"
             )
+            if store is None:
+                print(f"Creating new RAG store at {path}")
+                spec = rag_index.choose_index_spec(len(vectors), vectors.shape[1], self.index_type)
+                store = RagStore.create(path, spec, name=collection or DEFAULT_COLLECTION)
+                self.stores[collection or DEFAULT_COLLECTION] = store
+                created = True
+            elif added == 0:
+                print("Adding documents to existing RAG store")
+            store.add(vectors, batch, save=False)
+            added += len(batch)
+
+        if added == 0:
+            print(f"No text found in {file_path}")
+            return
+        final_spec = rag_index.choose_index_spec(store.count, store.dim, self.index_type)
+        if created and (final_spec["type"], final_spec["nlist"]) != (store.spec["type"], store.spec["nlist"]):
+            # The index was laid out for the first batch only; size it for the whole file
+            self._rebuild_index(store)
+        elif rag_index.needs_rebuild(store.spec, store.count, self.index_type):
+            self._rebuild_index(store)
         else:
-            print("Adding documents to existing FAISS DB")
-            self.vectorstore.add_documents(docs)
-        
-        self.vectorstore.save_local(self.db_path)
-        print(f"Documents added to FAISS DB at {self.db_path}")
+            store.save()
+        print(f"Documents added to RAG store at {path} ({added} chunks)")
+
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
 
-    def query(self, query: str, k: int = 3, use_hf_rerank: bool = True) -> str:
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a query, reusing the vector of any earlier query with the same normalized text."""
+        return self.embedding_cache.get_or_compute(
+            self._normalize_query(query),
+            lambda: np.asarray(self.embedding_model.embed_query(query), dtype="float32"),
+        )
+
+    def retrieve(
+        self,
+        query: str,
+        k: int = 3,
+        use_hf_rerank: bool = True,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        collection: Optional[str] = None,
+        filters: Optional[dict] = None,
+    ) -> List[Document]:
         """
-        Query the FAISS vector store.
-        If use_hf_rerank is True, fetches more results and reranks them using Hugging Face model.
+        Retrieve the top chunks for a query (cached, see the class docstring).
 
-        Args:
-            query (str): Query to search for.
-            k (int): Number of documents to return.
-            use_hf_rerank (bool): Whether to use HF model for reranking.
+        Args: see query().
 
         Returns:
-            str: Query response.
+            List[Document]: Up to k chunks, best first, with metadata["score"] (higher is better).
         """
-        if self.vectorstore is None:
+        store = self._get_store(collection)
+        if store is None:
+            if collection:
+                raise RuntimeError(f"No collection named '{collection}'.")
             raise RuntimeError("No existing DB found.")
 
+        query_vector = self._embed_query(query)
+        nprobe = nprobe or self.nprobe
+        ef_search = ef_search or self.ef_search
+        key = (
+            hashlib.sha1(query_vector.tobytes()).hexdigest(),
+            k,
+            use_hf_rerank,
+            nprobe,
+            ef_search,
+            collection or DEFAULT_COLLECTION,
+            tuple(sorted((filters or {}).items())),
+            store.generation,
+        )
+        docs = self.result_cache.get(key)
+        if docs is None:
+            start = time.perf_counter()
+            docs = self._search(store, query, query_vector, k, use_hf_rerank, nprobe, ef_search, filters)
+            self.result_cache.put(key, docs, cost=time.perf_counter() - start)
+        return docs
+
+    def _search(self, store, query, query_vector, k, use_hf_rerank, nprobe, ef_search, filters) -> List[Document]:
         # If reranking, fetch more candidates
         fetch_k = k * 3 if use_hf_rerank else k
-        docs = self.vectorstore.similarity_search(query, k=fetch_k)
+        hits = store.search(query_vector, fetch_k, nprobe=nprobe, ef_search=ef_search, filters=filters)
+        docs = store.get_documents([row_id for row_id, _ in hits])
+        for doc, (_, distance) in zip(docs, hits):
+            doc.metadata["score"] = -distance
 
         if use_hf_rerank and len(docs) > 1:
             hf_token = os.getenv("HF_TOKEN")
@@ -127,6 +401,8 @@ class RubyRAG:
                     # Sort docs by similarity scores
                     scored_docs = sorted(zip(docs, similarities), key=lambda x: x[1], reverse=True)
                     docs = [doc for doc, score in scored_docs[:k]]
+                    for doc, score in scored_docs[:k]:
+                        doc.metadata["score"] = float(score)
                     print(f"RAG: Reranked using HF model. Top score: {scored_docs[0][1]}")
                 except Exception as e:
                     print(f"RAG: HF Reranking Error: {e}")
@@ -135,11 +411,56 @@ class RubyRAG:
                 docs = docs[:k]
         else:
             docs = docs[:k]
+        return docs
 
-        context = []
-        for i, doc in enumerate(docs, 1):
-            context.append(
-                f"[Context {i}]\n{doc.page_content}"
-            )
+    def query(
+        self,
+        query: str,
+        k: int = 3,
+        use_hf_rerank: bool = True,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        collection: Optional[str] = None,
+        filters: Optional[dict] = None,
+    ) -> str:
+        """
+        Query the RAG store.
+        If use_hf_rerank is True, fetches more results and reranks them using Hugging Face model.
+        Token usage of the packed context is kept in self.last_context_stats.
+
+        Args:
+            query (str): Query to search for.
+            k (int): Number of documents to return.
+            use_hf_rerank (bool): Whether to use HF model for reranking.
+            nprobe (int, optional): IVF cells to visit for this query.
+            ef_search (int, optional): HNSW search breadth for this query.
+            token_budget (int, optional): Maximum tokens of returned context.
+            collection (str, optional): Collection to search; the default collection if omitted.
+            filters (dict, optional): Metadata filters: source (path substring), page,
+                language, ingested_after / ingested_before (ISO dates).
+
+        Returns:
+            str: Query response.
+        """
+        docs = self.retrieve(query, k, use_hf_rerank, nprobe, ef_search, collection, filters)
+        packed = pack_context(docs, token_budget=token_budget)
+        self.last_context_stats = {key: value for key, value in packed.items() if key != "context"}
+        return packed["context"]
+
+    def cache_stats(self) -> dict:
+        """Hit ratios and time saved by the query-embedding and result caches."""
+        return {
+            "query_embeddings": self.embedding_cache.stats(),
+            "results": self.result_cache.stats(),
+        }
+
+
+# Shared instance so the store is opened once and the caches survive between tool calls
+_rag = None
 
-        return "\n\n---\n\n".join(context)
+def get_rag() -> RubyRAG:
+    global _rag
+    if _rag is None:
+        _rag = RubyRAG()
+    return _rag
@@ -2,8 +2,15 @@
 
 from langchain.tools import BaseTool
 from pydantic import PrivateAttr
+from typing import List, Optional
+import re
 import subprocess
-import yt_dlp
+from datetime import datetime
+
+from utiles.news_store import DEFAULT_TOPICS, get_news_prefetcher
+from utiles.search_client import get_search_client
+from utiles.tool_cache import cache_policy
+from utiles.youtube_resolver import get_youtube_resolver
 
 
 class YouTubeVideoPlayerTool(BaseTool):
@@ -27,34 +34,15 @@ class YouTubeVideoPlayerTool(BaseTool):
             query (str): The search query for the video.
         """
         self._ruby.ruby_state = "Searching Video"
-        # Options for yt_dlp to get the video stream url 
-        ydl_opts = {
-            "quiet": True,
-            "default_search": "ytsearch1",
-            "format": "best[ext=mp4]/best",
-            "noplaylist": True,
-            "skip_download": True,
-            "extract_flat": False,
-            "js_runtimes": {"node": {}},
-            "youtube_include_dash_manifest": False,
-            "extractor_args": {
-                "youtube": {
-                    "player_client": ["android"]
-                }
-            },
-            "quiet": True,
-            "no_warnings": True,
-        }
+        # Flat search on the shared, cached resolver: only the watch URL and title are needed
+        video = get_youtube_resolver().resolve(query)
+        if video is None:
+            self._ruby.ruby_state = "Idle"
+            return f"No YouTube video found for '{query}'."
         import webbrowser
-        # Get the video stream url from youtube using yt_dlp
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # Extract the video info from youtube
-            info = ydl.extract_info(query, download=False)
-            video = info["entries"][0]
-            stream_url = video["original_url"]
-        
+
         # Open in default browser
-        webbrowser.open(stream_url)
+        webbrowser.open(video["url"])
         
         self._ruby.ruby_state = "Playing Video"
         return f"Now playing: {video['title']} in your browser."
@@ -109,36 +97,64 @@ class GetLatestNewsTool(BaseTool):
         "Fetches the top 5 trending world news headlines. "
         "Use this when the user asks for 'the news' or 'what is happening in the world'."
     )
+    # Not in the tool cache: the news store is already a local read and has newer headlines
 
     def _run(self, query: str = "") -> str:
         try:
-            # Use DuckDuckGo to search for latest news (FREE, no API key)
-            from duckduckgo_search import DDGS
-            search_query = query if query else "latest technology news India today"
-            with DDGS() as ddgs:
-                results = list(ddgs.news(search_query, max_results=5))
-            if results:
-                headlines = [f"- {r.get('title', 'Unknown')}: {r.get('body', '')[:100]}" for r in results]
-                return "Top News Headlines:\n" + "\n".join(headlines)
+            # Prefetched DuckDuckGo news (FREE, no API key); fetched live only when stale
+            search_query = query if query else DEFAULT_TOPICS[0]
+            result = get_news_prefetcher().headlines(search_query, 5)
+            if result["stories"]:
+                headlines = [f"- {r['title']}: {r['body'][:100]}" for r in result["stories"]]
+                heading = "Top News Headlines"
+                if result["source"] == "stale":
+                    heading += f" (as of {datetime.fromtimestamp(result['refreshed_at']).strftime('%H:%M')})"
+                return heading + ":\n" + "\n".join(headlines)
             return "No news found at the moment."
         except Exception as e:
             print(f"News Fetch Error: {e}")
             return "Could not fetch news right now."
 
 
+def _search_queries(query: str = "", queries=None) -> List[str]:
+    """The searches a web_search call asks for: query plus queries (a list, or one string of them)."""
+    if isinstance(queries, str):
+        # Some models send the list as one string
+        queries = re.split(r"[;|\n]", queries.strip("[]"))
+    return [q.strip(" '\"") for q in [query] + list(queries or []) if q and q.strip(" '\"")]
+
+
 class DuckDuckGoSearchTool(BaseTool):
     name: str = "web_search"
     description: str = (
         "Search the web using DuckDuckGo. Completely FREE, no API key needed. "
         "Use this to answer questions about current events, facts, or any topic. "
-        "Input should be the search query string."
+        "Input should be the search query string. "
+        "To compare several things, pass one search per item in `queries` "
+        "(e.g. [\"iphone 15 price\", \"pixel 8 price\"]) instead of calling this tool repeatedly; "
+        "they run at the same time."
     )
+    metadata: Optional[dict] = {"cache": cache_policy(
+        ttl=3600, stale_ttl=86400,
+        key=lambda args: sorted({" ".join(q.lower().split())
+                                 for q in _search_queries(str(args.get("query") or ""), args.get("queries"))}),
+    )}
 
-    def _run(self, query: str) -> str:
+    def _run(self, query: str = "", queries: Optional[List[str]] = None) -> str:
+        """
+        Args:
+            query (str): The search query.
+            queries (List[str], optional): Several searches to run at once (merged, duplicates removed).
+        """
         try:
-            from duckduckgo_search import DDGS
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=4))
+            all_queries = _search_queries(query, queries)
+            if not all_queries:
+                return "Please give me something to search for."
+            client = get_search_client()
+            if len(all_queries) == 1:
+                results = client.text(all_queries[0], max_results=4)
+            else:
+                results = client.multi_search(all_queries, max_results=4)
             if not results:
                 return "No search results found for that query."
             snippets = []
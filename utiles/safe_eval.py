@@ -0,0 +1,606 @@
+# Safe arithmetic for the calculator tool (replaces eval on model output).
+#
+# An expression is parsed with ast and checked against a whitelist: numbers,
+# + - * / // % **, unary +/-, list literals and calls of the functions in
+# FUNCTIONS. Names, attributes, subscripts, strings, lambdas and everything
+# else are rejected before anything runs. The checked tree is then rewritten
+# (** and * become bounded helper calls, list literals become numpy arrays, a
+# list of plain numbers is converted once at compile time) and compiled to
+# bytecode that runs with no builtins. Compiled expressions are kept in an LRU,
+# so a repeated expression only pays for the evaluation.
+#
+# Lists are numpy arrays: "[1, 2, 3] * 2" is element-wise and sum/mean/median/
+# std/... of 10,000 numbers is one vectorized call. Integer results are capped
+# at MAX_INT_BITS, exponents at MAX_EXPONENT, arrays at MAX_ELEMENTS, and the
+# helpers stop an evaluation that runs past its time limit. Long flat chains
+# ("0 + 1 + ... + 9999") are split into terms before parsing and folded by
+# _chain(), since one nested tree would exceed Python's recursion limits.
+#
+# calculate() also accepts what people and models actually type: "18% of 4500",
+# "250 + 10%", "2^10", "3 × 4", and unit conversions ("5 km to miles",
+# "98.6 F in C").
+import ast
+import math
+import operator
+import re
+import string
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from utiles.cache_utiles import LRUCache
+
+MAX_LENGTH = 1_000_000
+MAX_EXPONENT = 10_000
+MAX_INT_BITS = 4096 * 4
+MAX_ELEMENTS = 1_000_000
+MAX_FACTORIAL = 1000
+TIME_LIMIT = 1.0
+CACHE_ENTRIES = 512
+# Array elements shown in a result
+SHOW_ELEMENTS = 20
+# Operator chains with more terms are split before parsing ("0+1+...+9999" would
+# exceed Python's parser and compiler recursion limits as one nested tree)
+CHAIN_TERMS = 100
+
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf}
+
+_state = threading.local()
+
+
+class CalculationError(ValueError):
+    pass
+
+
+def _check_time():
+    deadline = getattr(_state, "deadline", None)
+    if deadline is not None and time.perf_counter() > deadline:
+        raise CalculationError("The calculation took too long")
+
+
+def _is_array(value) -> bool:
+    return isinstance(value, np.ndarray)
+
+
+def _check_int(value):
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise CalculationError(f"The result is too large (more than {MAX_INT_BITS} bits)")
+    return value
+
+
+def _check_size(array: np.ndarray) -> np.ndarray:
+    if array.size > MAX_ELEMENTS:
+        raise CalculationError(f"Too many values (more than {MAX_ELEMENTS:,})")
+    return array
+
+
+def _pow(base, exponent):
+    _check_time()
+    for value in np.ravel(exponent) if _is_array(exponent) else (exponent,):
+        if abs(value) > MAX_EXPONENT:
+            raise CalculationError(f"Exponent {value} is larger than {MAX_EXPONENT}")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        if exponent * math.log2(abs(base)) > MAX_INT_BITS:
+            raise CalculationError(f"The result is too large (more than {MAX_INT_BITS} bits)")
+    if _is_array(base) or _is_array(exponent):
+        return np.power(np.asarray(base, dtype=float), exponent)
+    value = base ** exponent
+    if isinstance(value, complex):
+        # (-8) ** (1/3): Python answers with a complex root
+        raise CalculationError("A negative number to a fractional power has no real result (try cbrt)")
+    return _check_int(value)
+
+
+def _mul(left, right):
+    _check_time()
+    if isinstance(left, int) and isinstance(right, int) and left.bit_length() + right.bit_length() > MAX_INT_BITS:
+        raise CalculationError(f"The result is too large (more than {MAX_INT_BITS} bits)")
+    return left * right
+
+
+_CHAIN_OPS = {"+": operator.add, "-": operator.sub, "*": _mul, "/": operator.truediv,
+              "//": operator.floordiv, "%": operator.mod}
+
+
+def _chain(ops, first, *rest):
+    """Left-to-right fold of a split operator chain: _chain(("+", "-"), a, b, c) == a + b - c."""
+    value = first
+    for i, (op, term) in enumerate(zip(ops, rest)):
+        if i % 1000 == 0:
+            _check_time()
+        value = _CHAIN_OPS[op](value, term)
+    return value
+
+
+def _array(*values):
+    _check_time()
+    parts = [np.ravel(np.asarray(v, dtype=float)) for v in values]
+    return _check_size(np.concatenate(parts) if parts else np.zeros(0))
+
+
+def _values(args) -> np.ndarray:
+    """All arguments flattened into one array: sum(1, 2, 3) == sum([1, 2, 3])."""
+    return _array(*args)
+
+
+def _aggregate(fn):
+    def apply(*args):
+        _check_time()
+        values = _values(args)
+        if values.size == 0:
+            raise CalculationError("No values given")
+        return fn(values)
+    return apply
+
+
+def _elementwise(scalar_fn, array_fn):
+    # math on plain numbers (domain errors raise), numpy on arrays
+    def apply(*args):
+        _check_time()
+        if any(_is_array(a) for a in args):
+            return array_fn(*args)
+        return scalar_fn(*args)
+    return apply
+
+
+def _factorial(n):
+    if isinstance(n, float) and n.is_integer():
+        n = int(n)
+    if not isinstance(n, int) or n < 0:
+        raise CalculationError("factorial() needs a non-negative whole number")
+    if n > MAX_FACTORIAL:
+        raise CalculationError(f"factorial() is limited to {MAX_FACTORIAL}")
+    return math.factorial(n)
+
+
+def _range(*args):
+    _check_time()
+    if not 1 <= len(args) <= 3:
+        raise CalculationError("range() takes 1 to 3 arguments")
+    start, stop, step = (0, args[0], 1) if len(args) == 1 else (args[0], args[1], args[2] if len(args) == 3 else 1)
+    if step == 0:
+        raise CalculationError("range() step cannot be 0")
+    if math.ceil((stop - start) / step) > MAX_ELEMENTS:
+        raise CalculationError(f"Too many values (more than {MAX_ELEMENTS:,})")
+    return np.arange(start, stop, step, dtype=float)
+
+
+def _percentile(values, q):
+    return float(np.percentile(_values((values,)), q))
+
+
+def _log(x, base=None):
+    if base is None:
+        return np.log(x) if _is_array(x) else math.log(x)
+    return np.log(x) / math.log(base) if _is_array(x) else math.log(x, base)
+
+
+def _round(x, digits=0):
+    if _is_array(x):
+        return np.round(x, int(digits))
+    return round(x, int(digits)) if digits else round(x)
+
+
+def _bounded_int_fn(fn, name, limit):
+    def apply(*args):
+        _check_time()
+        if any(abs(a) > limit for a in args):
+            raise CalculationError(f"{name}() is limited to arguments up to {limit:,}")
+        return _check_int(fn(*(int(a) for a in args)))
+    return apply
+
+
+FUNCTIONS = {
+    # Scalars (element-wise on lists)
+    "sqrt": _elementwise(math.sqrt, np.sqrt),
+    "cbrt": _elementwise(lambda x: math.copysign(abs(x) ** (1 / 3), x), np.cbrt),
+    "exp": _elementwise(math.exp, np.exp),
+    "log": _log,
+    "ln": _elementwise(math.log, np.log),
+    "log10": _elementwise(math.log10, np.log10),
+    "log2": _elementwise(math.log2, np.log2),
+    "sin": _elementwise(math.sin, np.sin),
+    "cos": _elementwise(math.cos, np.cos),
+    "tan": _elementwise(math.tan, np.tan),
+    "asin": _elementwise(math.asin, np.arcsin),
+    "acos": _elementwise(math.acos, np.arccos),
+    "atan": _elementwise(math.atan, np.arctan),
+    "atan2": _elementwise(math.atan2, np.arctan2),
+    "sinh": _elementwise(math.sinh, np.sinh),
+    "cosh": _elementwise(math.cosh, np.cosh),
+    "tanh": _elementwise(math.tanh, np.tanh),
+    "degrees": _elementwise(math.degrees, np.degrees),
+    "radians": _elementwise(math.radians, np.radians),
+    "abs": _elementwise(abs, np.abs),
+    "floor": _elementwise(math.floor, np.floor),
+    "ceil": _elementwise(math.ceil, np.ceil),
+    "round": _round,
+    "hypot": _elementwise(math.hypot, np.hypot),
+    "factorial": _factorial,
+    "gcd": _bounded_int_fn(math.gcd, "gcd", 10 ** 18),
+    "lcm": _bounded_int_fn(math.lcm, "lcm", 10 ** 18),
+    "comb": _bounded_int_fn(math.comb, "comb", 10_000),
+    "perm": _bounded_int_fn(math.perm, "perm", 10_000),
+    # Aggregates over all arguments (numbers or lists)
+    "sum": _aggregate(np.sum),
+    "prod": _aggregate(np.prod),
+    "mean": _aggregate(np.mean),
+    "avg": _aggregate(np.mean),
+    "average": _aggregate(np.mean),
+    "median": _aggregate(np.median),
+    "std": _aggregate(np.std),
+    "var": _aggregate(np.var),
+    "min": _aggregate(np.min),
+    "max": _aggregate(np.max),
+    "count": _aggregate(lambda values: values.size),
+    "len": _aggregate(lambda values: values.size),
+    "percentile": _percentile,
+    "range": _range,
+}
+
+_BINARY_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPS = (ast.UAdd, ast.USub)
+
+
+def _number_list(node) -> Optional[list]:
+    """The values of a list/tuple of plain (optionally negated) numbers, else None."""
+    values = []
+    for e in node.elts:
+        sign = 1
+        if type(e) is ast.UnaryOp and type(e.op) in (ast.USub, ast.UAdd):
+            sign = -1 if type(e.op) is ast.USub else 1
+            e = e.operand
+        if type(e) is not ast.Constant or type(e.value) not in (int, float):
+            return None
+        values.append(sign * e.value)
+    return values
+
+
+def _validate(node):
+    """Reject anything outside the whitelist (raises CalculationError)."""
+    if isinstance(node, (ast.List, ast.Tuple)) and _number_list(node) is not None:
+        return
+    if isinstance(node, ast.Expression):
+        _validate(node.body)
+    elif isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise CalculationError(f"Unsupported value: {node.value!r}")
+    elif isinstance(node, ast.BinOp):
+        if not isinstance(node.op, _BINARY_OPS):
+            raise CalculationError(f"Unsupported operator: {type(node.op).__name__}")
+        _validate(node.left)
+        _validate(node.right)
+    elif isinstance(node, ast.UnaryOp):
+        if not isinstance(node.op, _UNARY_OPS):
+            raise CalculationError(f"Unsupported operator: {type(node.op).__name__}")
+        _validate(node.operand)
+    elif isinstance(node, (ast.List, ast.Tuple)):
+        for element in node.elts:
+            _validate(element)
+    elif isinstance(node, ast.Name):
+        if node.id not in CONSTANTS:
+            raise CalculationError(f"Unknown name: {node.id}")
+    elif isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            name = node.func.id if isinstance(node.func, ast.Name) else ast.unparse(node.func)
+            raise CalculationError(f"Unknown function: {name}")
+        if node.keywords:
+            raise CalculationError("Keyword arguments are not supported")
+        for arg in node.args:
+            _validate(arg)
+    else:
+        raise CalculationError(f"Unsupported syntax: {type(node).__name__}")
+
+
+def _operand_end(text: str, i: int) -> bool:
+    """Whether text[:i] ends with an operand, so a +/- at i is binary (not a sign or an exponent like 1e-5)."""
+    j = i - 1
+    while j >= 0 and text[j].isspace():
+        j -= 1
+    if j < 0 or not (text[j].isalnum() or text[j] in "_.)]"):
+        return False
+    if text[j] in "eE" and j == i - 1:
+        k = j - 1
+        while k >= 0 and (text[k].isdigit() or text[k] == "."):
+            k -= 1
+        # "2e-1" is a number; "e-1" and "x2e-1" are not
+        if k < j - 1 and any(c.isdigit() for c in text[k + 1:j]) and (k < 0 or not (text[k].isalnum() or text[k] == "_")):
+            return False
+    return True
+
+
+def split_chain(text: str, level: str):
+    """
+    Terms and operators of the top-level chain of one precedence level.
+
+    Args:
+        text (str): Expression text.
+        level (str): "+" for + and -, "*" for *, /, // and % (not **).
+
+    Returns:
+        (terms, ops): len(terms) == len(ops) + 1.
+    """
+    terms, ops = [], []
+    depth, start, i = 0, 0, 0
+    while i < len(text):
+        c = text[i]
+        width, op = 1, None
+        if c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+        elif depth == 0 and level == "+" and c in "+-" and _operand_end(text, i):
+            op = c
+        elif depth == 0 and level == "*":
+            if c == "*":
+                if text[i + 1:i + 2] == "*":
+                    width = 2
+                else:
+                    op = "*"
+            elif c == "/":
+                op, width = ("//", 2) if text[i + 1:i + 2] == "/" else ("/", 1)
+            elif c == "%":
+                op = "%"
+        if op is not None:
+            terms.append(text[start:i])
+            ops.append(op)
+            start = i + width
+        i += width
+    terms.append(text[start:])
+    return terms, ops
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Routes ** and * through the bounded helpers and turns lists into arrays."""
+    def __init__(self):
+        self.constants = {}
+
+    def _name(self, name: str, node) -> ast.Name:
+        return ast.copy_location(ast.Name(id=name, ctx=ast.Load()), node)
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        helper = {ast.Pow: "_pow", ast.Mult: "_mul"}.get(type(node.op))
+        if helper is None:
+            return node
+        return ast.copy_location(ast.Call(func=self._name(helper, node), args=[node.left, node.right], keywords=[]), node)
+
+    def visit_List(self, node):
+        values = _number_list(node)
+        if values is not None:
+            # A list of plain numbers is converted once, at compile time
+            values = np.array(values, dtype=float)
+            values.flags.writeable = False
+            name = f"_c{len(self.constants)}"
+            self.constants[name] = _check_size(values)
+            return self._name(name, node)
+        self.generic_visit(node)
+        return ast.copy_location(ast.Call(func=self._name("_array", node), args=node.elts, keywords=[]), node)
+
+    visit_Tuple = visit_List
+
+    def visit_Call(self, node):
+        node.args = [self.visit(arg) for arg in node.args]
+        node.func = self._name(f"_f_{node.func.id}", node.func)
+        return node
+
+    def visit_Name(self, node):
+        return self._name(f"_k_{node.id}", node)
+
+
+_BASE_NAMESPACE = {"__builtins__": {}, "_pow": _pow, "_mul": _mul, "_array": _array, "_chain": _chain,
+                   **{f"_f_{name}": fn for name, fn in FUNCTIONS.items()},
+                   **{f"_k_{name}": value for name, value in CONSTANTS.items()}}
+
+
+class SafeEvaluator:
+    """Whitelisted, compiled and cached arithmetic expressions."""
+    def __init__(self, cache_entries: int = CACHE_ENTRIES, time_limit: float = TIME_LIMIT):
+        """
+        Args:
+            cache_entries (int): Compiled expressions kept (least recently used dropped first).
+            time_limit (float): Seconds one evaluation may take.
+        """
+        self.time_limit = time_limit
+        self._cache = LRUCache(cache_entries)
+
+    def compile(self, expression: str):
+        """
+        Parse, check and compile an expression (cached).
+
+        Returns:
+            (code, namespace) for eval().
+
+        Raises:
+            CalculationError: Not a supported expression.
+        """
+        key = expression.strip()
+        compiled = self._cache.get(key)
+        if compiled is None:
+            start = time.perf_counter()
+            if len(key) > MAX_LENGTH:
+                raise CalculationError(f"The expression is longer than {MAX_LENGTH:,} characters")
+            try:
+                rewriter = _Rewriter()
+                tree = ast.Expression(body=self._parse(key, rewriter, "+"))
+                tree = ast.fix_missing_locations(tree)
+                code = compile(tree, "<calculator>", "eval")
+            except SyntaxError as e:
+                raise CalculationError(f"Invalid expression: {e.msg}")
+            except RecursionError:
+                raise CalculationError("The expression is nested too deeply")
+            compiled = (code, {**_BASE_NAMESPACE, **rewriter.constants})
+            self._cache.put(key, compiled, cost=time.perf_counter() - start)
+        return compiled
+
+    def _parse(self, text: str, rewriter: _Rewriter, level: Optional[str]) -> ast.expr:
+        """Checked and rewritten tree of text; long +/- and * / // % chains are parsed term by term."""
+        if level is not None:
+            inner = "*" if level == "+" else None
+            terms, ops = split_chain(text, level)
+            if len(terms) > CHAIN_TERMS or (inner and any(len(split_chain(t, inner)[0]) > CHAIN_TERMS for t in terms)):
+                parts = [self._parse(t, rewriter, inner) for t in terms]
+                if len(parts) == 1:
+                    return parts[0]
+                name = f"_c{len(rewriter.constants)}"
+                rewriter.constants[name] = tuple(ops)
+                return ast.Call(func=ast.Name(id="_chain", ctx=ast.Load()),
+                                args=[ast.Name(id=name, ctx=ast.Load())] + parts, keywords=[])
+        tree = ast.parse(text.strip(), mode="eval")
+        _validate(tree)
+        return rewriter.visit(tree).body
+
+    def evaluate(self, expression: str):
+        """
+        Value of an expression: an int, a float or a numpy array.
+
+        Raises:
+            CalculationError: Unsupported, too large or too slow.
+            ArithmeticError / ValueError: Division by zero, math domain errors, ...
+        """
+        code, namespace = self.compile(expression)
+        _state.deadline = time.perf_counter() + self.time_limit
+        try:
+            with np.errstate(all="ignore"):
+                value = eval(code, namespace)
+        finally:
+            _state.deadline = None
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, complex) or (isinstance(value, np.ndarray) and np.iscomplexobj(value)):
+            raise CalculationError("The result is not a real number")
+        if isinstance(value, float) and value.is_integer() and abs(value) < 2 ** 53:
+            value = int(value)
+        return value
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+def format_number(value) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isfinite(value) and value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.12g}"
+    return str(value)
+
+
+def format_result(value) -> str:
+    if isinstance(value, np.ndarray):
+        values = value.ravel().tolist()
+        shown = ", ".join(format_number(v) for v in values[:SHOW_ELEMENTS])
+        more = f", ... ({len(values):,} values)" if len(values) > SHOW_ELEMENTS else ""
+        return f"[{shown}{more}]"
+    return format_number(value)
+
+
+# Units: (dimension, factor to the dimension's base unit); temperatures are converted separately
+_UNITS = {}
+for _dimension, _table in {
+    "length": {("m", "meter", "meters", "metre", "metres"): 1.0, ("km", "kilometer", "kilometers", "kilometre", "kilometres"): 1000.0,
+               ("cm", "centimeter", "centimeters"): 0.01, ("mm", "millimeter", "millimeters"): 0.001,
+               ("mi", "mile", "miles"): 1609.344, ("yd", "yard", "yards"): 0.9144, ("ft", "foot", "feet"): 0.3048,
+               ("in", "inch", "inches"): 0.0254},
+    "mass": {("kg", "kilogram", "kilograms", "kilo", "kilos"): 1.0, ("g", "gram", "grams"): 0.001,
+             ("mg", "milligram", "milligrams"): 1e-6, ("lb", "lbs", "pound", "pounds"): 0.45359237,
+             ("oz", "ounce", "ounces"): 0.028349523125, ("t", "tonne", "tonnes", "ton", "tons"): 1000.0},
+    "volume": {("l", "liter", "liters", "litre", "litres"): 1.0, ("ml", "milliliter", "milliliters", "millilitre", "millilitres"): 0.001,
+               ("gal", "gallon", "gallons"): 3.785411784, ("cup", "cups"): 0.2365882365},
+    "time": {("s", "sec", "secs", "second", "seconds"): 1.0, ("min", "mins", "minute", "minutes"): 60.0,
+             ("h", "hr", "hrs", "hour", "hours"): 3600.0, ("day", "days"): 86400.0, ("week", "weeks"): 604800.0},
+    "data": {("b", "byte", "bytes"): 1.0, ("kb", "kilobyte", "kilobytes"): 1024.0, ("mb", "megabyte", "megabytes"): 1024.0 ** 2,
+             ("gb", "gigabyte", "gigabytes"): 1024.0 ** 3, ("tb", "terabyte", "terabytes"): 1024.0 ** 4},
+    "speed": {("m/s", "mps"): 1.0, ("km/h", "kmh", "kmph", "kph"): 1 / 3.6, ("mph",): 0.44704},
+    "temperature": {("c", "°c", "celsius"): "C", ("f", "°f", "fahrenheit"): "F", ("k", "kelvin"): "K"},
+}.items():
+    for _names, _factor in _table.items():
+        for _name in _names:
+            _UNITS[_name] = (_dimension, _factor)
+
+_CONVERSION_WORDS = ("to", "in", "into", "as")
+_UNIT_CHARS = string.ascii_letters + "°/"
+_UNIT = re.compile(r"[a-zA-Z°/]+$")
+# Numbers only start after a non-digit, so a long run of digits is scanned once, not once per position
+_PERCENT_OF = re.compile(r"(?<!\d)(\d+(?:\.\d+)?)\s*%\s*of\b", re.IGNORECASE)
+# "250 + 10%": a percentage added to or taken from the number before it
+_PLUS_PERCENT = re.compile(r"(?<!\d)(\d+(?:\.\d+)?)\s*([+-])\s*(\d+(?:\.\d+)?)\s*%(?!\s*[\d(.])")
+_PERCENT = re.compile(r"(?<!\d)(\d+(?:\.\d+)?)\s*%(?!\s*[\d(.])")
+_REPLACEMENTS = {"×": "*", "÷": "/", "^": "**", "−": "-"}
+
+
+def _to_kelvin(value: float, unit: str) -> float:
+    return {"C": value + 273.15, "F": (value - 32) * 5 / 9 + 273.15, "K": value}[unit]
+
+
+def _from_kelvin(value: float, unit: str) -> float:
+    return {"C": value - 273.15, "F": (value - 273.15) * 9 / 5 + 32, "K": value}[unit]
+
+
+def split_conversion(text: str) -> Optional[Tuple[str, str, str]]:
+    """
+    (expression, source unit, target unit) of "5 km to miles" or "72°F in C", else None.
+
+    Splits once from the right instead of matching the whole text with a regex, so
+    the cost stays linear in the input length.
+    """
+    parts = text.rsplit(None, 2)
+    if len(parts) != 3 or parts[1].lower() not in _CONVERSION_WORDS or not _UNIT.match(parts[2]):
+        return None
+    head = parts[0].rstrip()
+    expr = head.rstrip(_UNIT_CHARS).rstrip()
+    src = head[len(head.rstrip(_UNIT_CHARS)):]
+    if not expr or not src:
+        return None
+    return expr, src, parts[2]
+
+
+def prepare(text: str) -> str:
+    """Rewrite everyday notation (×, ÷, ^, percentages) into the expression syntax."""
+    for old, new in _REPLACEMENTS.items():
+        text = text.replace(old, new)
+    text = _PERCENT_OF.sub(r"(\1/100)*", text)
+    text = _PLUS_PERCENT.sub(lambda m: f"({m.group(1)}*(1{m.group(2)}{m.group(3)}/100))", text)
+    return _PERCENT.sub(r"(\1/100)", text)
+
+
+def calculate(text: str, evaluator: Optional[SafeEvaluator] = None) -> str:
+    """
+    Tool-facing result of an expression or a unit conversion.
+
+    Raises:
+        CalculationError / ArithmeticError / ValueError: see SafeEvaluator.evaluate.
+    """
+    evaluator = evaluator or get_evaluator()
+    if len(text) > MAX_LENGTH:
+        raise CalculationError(f"The expression is longer than {MAX_LENGTH:,} characters")
+    text = text.strip().rstrip("=?").strip()
+    conversion = split_conversion(text)
+    if conversion:
+        expr, src_name, dst_name = conversion
+        src, dst = _UNITS.get(src_name.lower()), _UNITS.get(dst_name.lower())
+        if src and dst:
+            if src[0] != dst[0]:
+                raise CalculationError(f"Cannot convert {src[0]} to {dst[0]}")
+            value = evaluator.evaluate(prepare(expr))
+            if src[0] == "temperature":
+                converted = _from_kelvin(_to_kelvin(value, src[1]), dst[1])
+            else:
+                converted = value * src[1] / dst[1]
+            return f"{format_result(value)} {src_name} = {format_result(converted)} {dst_name}"
+    return format_result(evaluator.evaluate(prepare(text)))
+
+
+# Singleton instance
+_evaluator = None
+_evaluator_lock = threading.Lock()
+
+def get_evaluator() -> SafeEvaluator:
+    global _evaluator
+    with _evaluator_lock:
+        if _evaluator is None:
+            _evaluator = SafeEvaluator()
+    return _evaluator
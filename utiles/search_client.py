@@ -0,0 +1,295 @@
+# Shared DuckDuckGo client for web_search, get_latest_news and the Groq fallbacks.
+#
+# Every caller used to open its own DDGS() for one request. Here:
+#   sessions      one DDGS (its HTTP client, cookies and connection pool) per
+#                 thread, kept for the life of the process
+#   cache         text and news results are kept in TTL LRU caches keyed by
+#                 the normalized query, so a repeated question costs nothing
+#   rate limit    a token bucket spaces requests to DuckDuckGo (it replaces the
+#                 fixed 0.75 s pause DDGS puts between calls on one instance);
+#                 after a rate-limit error, requests fail fast for a cool-down
+#   multi_search  several queries run at once on a small pool; results are
+#                 merged rank by rank and deduplicated by canonical URL
+#
+# The backend is pluggable: RecordedBackend replays saved responses (with an
+# optional artificial latency) for tests and benchmarks, without the network.
+import json
+import re
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from utiles.cache_utiles import LRUCache
+
+TEXT_TTL = 3600
+NEWS_TTL = 600
+CACHE_ENTRIES = 256
+# Token bucket: sustained requests per second and burst size
+RATE = 2.0
+BURST = 4
+RATE_LIMIT_COOLDOWN = 30.0
+SEARCH_WORKERS = 4
+# Query-string parameters that don't change the page
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|ref|ref_src)$", re.IGNORECASE)
+
+
+class SearchError(Exception):
+    pass
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(str(query).lower().split())
+
+
+def canonical_url(url: str) -> str:
+    """URL used to spot duplicates: no scheme, "www.", fragment, tracking parameters or trailing slash."""
+    parts = urllib.parse.urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    params = [(k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+              if not _TRACKING_PARAMS.match(k)]
+    query = urllib.parse.urlencode(params)
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{query}" if query else "")
+
+
+def result_url(result: dict) -> str:
+    # Text results carry "href", news results "url"
+    return result.get("href") or result.get("url") or ""
+
+
+class RateLimiter:
+    """Token bucket; acquire() blocks until a request may be sent."""
+    def __init__(self, rate: float = RATE, burst: int = BURST, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+                self.waited += wait
+            self.sleep(wait)
+
+
+class DDGSBackend:
+    """Live DuckDuckGo requests, one long-lived DDGS session per thread."""
+    def __init__(self, timeout: int = 10):
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            from duckduckgo_search import DDGS
+            session = self._local.session = DDGS(timeout=self.timeout)
+        # Spacing requests is the RateLimiter's job, not DDGS's fixed pause
+        session.sleep_timestamp = 0.0
+        return session
+
+    def text(self, query: str, max_results: int) -> List[dict]:
+        return list(self._session().text(query, max_results=max_results))
+
+    def news(self, query: str, max_results: int) -> List[dict]:
+        return list(self._session().news(query, max_results=max_results))
+
+    def chat(self, query: str, model: str) -> str:
+        # DDGS.chat is missing from newer duckduckgo_search releases (AttributeError)
+        return self._session().chat(query, model=model)
+
+    @staticmethod
+    def is_rate_limit(error: Exception) -> bool:
+        return type(error).__name__ == "RatelimitException"
+
+
+class RecordedBackend:
+    """
+    Replays recorded responses instead of calling DuckDuckGo (tests and benchmarks).
+
+    The recording is a JSON object {"text": {query: [results]}, "news": {...},
+    "chat": {query: answer}} keyed by normalized query; unknown queries return
+    no results.
+    """
+    def __init__(self, recording, latency: float = 0.0):
+        """
+        Args:
+            recording (str | dict): Path of the JSON recording, or the recording itself.
+            latency (float): Seconds each request sleeps, to stand in for the network.
+        """
+        if isinstance(recording, str):
+            with open(recording, "r", encoding="utf-8") as f:
+                recording = json.load(f)
+        self.responses = {kind: {normalize_query(q): r for q, r in entries.items()}
+                          for kind, entries in recording.items()}
+        self.latency = latency
+        self.calls = []  # (kind, query)
+        self._lock = threading.Lock()
+
+    def _reply(self, kind: str, query: str):
+        with self._lock:
+            self.calls.append((kind, query))
+        if self.latency:
+            time.sleep(self.latency)
+        return self.responses.get(kind, {}).get(normalize_query(query))
+
+    def text(self, query: str, max_results: int) -> List[dict]:
+        return [dict(r) for r in (self._reply("text", query) or [])[:max_results]]
+
+    def news(self, query: str, max_results: int) -> List[dict]:
+        return [dict(r) for r in (self._reply("news", query) or [])[:max_results]]
+
+    def chat(self, query: str, model: str) -> str:
+        return self._reply("chat", query) or ""
+
+    @staticmethod
+    def is_rate_limit(error: Exception) -> bool:
+        return False
+
+
+class SearchClient:
+    """Cached, rate-limited DuckDuckGo searches shared by all tools."""
+    def __init__(self, backend=None, text_ttl: float = TEXT_TTL, news_ttl: float = NEWS_TTL,
+                 cache_entries: int = CACHE_ENTRIES, limiter: Optional[RateLimiter] = None,
+                 workers: int = SEARCH_WORKERS):
+        """
+        Args:
+            backend: DDGSBackend (default) or RecordedBackend.
+            text_ttl / news_ttl (float): Seconds text and news results stay cached.
+            cache_entries (int): Results kept per kind.
+            limiter (RateLimiter, optional): Request spacing (default RATE per second, BURST burst).
+            workers (int): Queries multi_search runs at once.
+        """
+        self.backend = backend or DDGSBackend()
+        self.limiter = limiter or RateLimiter()
+        self._caches = {"text": LRUCache(cache_entries, ttl=text_ttl), "news": LRUCache(cache_entries, ttl=news_ttl)}
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="search")
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def _request(self, call: Callable, *args):
+        remaining = self._cooldown_until - time.monotonic()
+        if remaining > 0:
+            raise SearchError(f"DuckDuckGo rate limit, retrying in {remaining:.0f} s")
+        self.limiter.acquire()
+        with self._lock:
+            self.requests += 1
+        try:
+            return call(*args)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            if self.backend.is_rate_limit(e):
+                self._cooldown_until = time.monotonic() + RATE_LIMIT_COOLDOWN
+            raise
+
+    def _search(self, kind: str, query: str, max_results: int) -> List[dict]:
+        cache = self._caches[kind]
+        key = (normalize_query(query), max_results)
+        call = self.backend.text if kind == "text" else self.backend.news
+        results = cache.get_or_compute(key, lambda: self._request(call, query, max_results))
+        return [dict(r) for r in results]
+
+    def text(self, query: str, max_results: int = 5) -> List[dict]:
+        """
+        Web results (title, href, body) for a query.
+
+        Raises:
+            SearchError: Rate limited by DuckDuckGo (during the cool-down).
+            Exception: Whatever the backend raised.
+        """
+        return self._search("text", query, max_results)
+
+    def news(self, query: str, max_results: int = 5) -> List[dict]:
+        """News results (date, title, body, url, source) for a query; raises like text()."""
+        return self._search("news", query, max_results)
+
+    def chat(self, query: str, model: str = "gpt-4o-mini") -> str:
+        """DuckDuckGo AI Chat answer (not cached)."""
+        return self._request(self.backend.chat, query, model)
+
+    def multi_search(self, queries: List[str], kind: str = "text", max_results: int = 4) -> List[dict]:
+        """
+        Run several searches at once and merge them.
+
+        Results are interleaved rank by rank (every query's first result, then every
+        second result, ...) and duplicates are dropped by canonical URL.
+
+        Args:
+            queries (List[str]): Search queries (repeats are searched once).
+            kind (str): "text" or "news".
+            max_results (int): Results per query.
+
+        Returns:
+            List[dict]: Results, each with a "queries" list of the queries that found it.
+
+        Raises:
+            Exception: The first error, if every query failed.
+        """
+        unique = {}
+        for q in queries:
+            if q and q.strip():
+                unique.setdefault(normalize_query(q), q)
+        unique = list(unique.values())
+        futures = [self._pool.submit(self._search, kind, q, max_results) for q in unique]
+        per_query, first_error = [], None
+        for query, future in zip(unique, futures):
+            try:
+                per_query.append((query, future.result()))
+            except Exception as e:
+                print(f"Search Error ({query}): {e}")
+                first_error = first_error or e
+        if first_error is not None and not per_query:
+            raise first_error
+
+        merged, by_url = [], {}
+        for rank in range(max((len(r) for _, r in per_query), default=0)):
+            for query, results in per_query:
+                if rank >= len(results):
+                    continue
+                result = results[rank]
+                url = canonical_url(result_url(result)) or f"{query}#{rank}"
+                if url in by_url:
+                    by_url[url]["queries"].append(query)
+                    continue
+                result["queries"] = [query]
+                by_url[url] = result
+                merged.append(result)
+        return merged
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limit_wait": round(self.limiter.waited, 3),
+            "text_cache": self._caches["text"].stats(),
+            "news_cache": self._caches["news"].stats(),
+        }
+
+
+# Singleton instance
+_client = None
+_client_lock = threading.Lock()
+
+def get_search_client() -> SearchClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SearchClient()
+    return _client
@@ -0,0 +1,317 @@
+# Persistent serial connection to the Arduino for arduino_serial_communication.
+#
+# The port is opened once (the board resets when the port opens, so that wait is
+# paid once, not per command) and found automatically by USB vendor id unless
+# ARDUINO_PORT is set. Protocol: one command per line ("LED ON\n"); a sketch may
+# answer each command with one line, in order. Sketches that never answer (the
+# original fire-and-forget protocol) are detected on the first command: it waits
+# only PROBE_TIMEOUT, and later commands on that connection don't wait at all.
+#
+#   writer thread   commands queued within BATCH_WINDOW are written in one write()
+#   reader thread   splits incoming bytes into lines; each line answers the oldest
+#                   waiting command (FIFO), lines nobody waits for go to listeners
+#   reconnect       on unplug the reader fails all waiting commands, then reopens
+#                   the port (re-detecting it) every RECONNECT_INTERVAL seconds
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import serial
+
+BAUDRATE = 9600
+# Boards reset when the port opens; wait this long for the sketch (less if it prints a line)
+RESET_WAIT = 2.0
+REPLY_TIMEOUT = 2.0
+# How long the first command of a connection waits to learn whether the sketch replies
+PROBE_TIMEOUT = 0.3
+BATCH_WINDOW = 0.005
+RECONNECT_INTERVAL = 1.0
+# USB vendor ids of Arduino boards and the usual USB-serial chips on clones
+ARDUINO_VIDS = {
+    0x2341: "Arduino",
+    0x2A03: "Arduino (.org)",
+    0x1A86: "CH340",
+    0x0403: "FTDI",
+    0x10C4: "CP210x",
+    0x239A: "Adafruit",
+}
+
+
+def find_arduino_port() -> Optional[str]:
+    """ARDUINO_PORT if set, else the first serial port with a known Arduino / USB-serial vendor id."""
+    if os.environ.get("ARDUINO_PORT"):
+        return os.environ["ARDUINO_PORT"]
+    from serial.tools import list_ports
+    ports = sorted(list_ports.comports(), key=lambda p: p.vid != 0x2341)  # genuine boards first
+    for port in ports:
+        if port.vid in ARDUINO_VIDS:
+            return port.device
+    return None
+
+
+class SerialConnectionManager:
+    """
+    Keeps one serial connection open and correlates each command with its reply line.
+
+    Thread-safe: any number of callers can send() at once.
+    """
+    def __init__(
+        self,
+        port: Optional[str] = None,
+        baudrate: int = BAUDRATE,
+        reset_wait: float = RESET_WAIT,
+        reply_timeout: float = REPLY_TIMEOUT,
+        probe_timeout: float = PROBE_TIMEOUT,
+        batch_window: float = BATCH_WINDOW,
+        port_finder: Callable[[], Optional[str]] = find_arduino_port,
+    ):
+        """
+        Args:
+            port (str, optional): Fixed port; None detects it with port_finder on every (re)connect.
+            baudrate (int): Must match Serial.begin() in the sketch.
+            reset_wait (float): Max seconds to wait for the board after opening the port.
+            reply_timeout (float): Default seconds to wait for a reply.
+            probe_timeout (float): Seconds the first auto-mode command waits for a reply.
+            batch_window (float): Commands arriving within this many seconds share one write.
+            port_finder (Callable): Returns the port to use when none is fixed.
+        """
+        self.port = port
+        self.baudrate = baudrate
+        self.reset_wait = reset_wait
+        self.reply_timeout = reply_timeout
+        self.probe_timeout = probe_timeout
+        self.batch_window = batch_window
+        self.port_finder = port_finder
+        self.line_listeners: List[Callable[[str], None]] = []  # lines that answer no command
+
+        self.serial = None
+        self.connected_port = None
+        self.sketch_replies = None  # whether the sketch answers commands; None until a command tells
+        self._lock = threading.RLock()
+        self._pending = deque()  # (future, deadline) in send order
+        self._outbox = queue.Queue()
+        self._closed = threading.Event()
+        self._connected = threading.Event()
+        self._reader = None
+        self.stats = {"commands": 0, "writes": 0, "replies": 0, "timeouts": 0, "unsolicited": 0, "reconnects": 0}
+        threading.Thread(target=self._write_loop, name="serial-writer", daemon=True).start()
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def connect(self) -> str:
+        """
+        Open the port (detecting it if needed) and wait for the board to come up.
+
+        Returns:
+            str: The port in use.
+        """
+        with self._lock:
+            if self.connected:
+                return self.connected_port
+            port = self.port or self.port_finder()
+            if not port:
+                raise serial.SerialException("No Arduino found (set ARDUINO_PORT to choose the port)")
+            ser = serial.Serial(port, self.baudrate, timeout=0.1, write_timeout=2)
+            # Sketches usually print a banner from setup(); stop waiting once anything arrives
+            deadline = time.monotonic() + self.reset_wait
+            banner = b""
+            while time.monotonic() < deadline and not banner.endswith(b"\n"):
+                banner += ser.read(ser.in_waiting or 1)
+            # The banner answers no command; hand it to listeners before any command can be waiting
+            *lines, rest = banner.split(b"\n")
+            for raw in lines:
+                line = raw.decode("utf-8", "replace").strip()
+                if line:
+                    self._dispatch(line)
+            self.serial = ser
+            self.connected_port = port
+            self.sketch_replies = None  # a new connection may run a different sketch
+            self._connected.set()
+            self._reader = threading.Thread(target=self._read_loop, args=(ser, rest), name="serial-reader", daemon=True)
+            self._reader.start()
+            print(f"✅ Arduino connected on {port}")
+            return port
+
+    def _disconnect(self, ser, reason: Exception):
+        with self._lock:
+            if self.serial is not ser:
+                return
+            self._connected.clear()
+            self.serial = None
+            try:
+                ser.close()
+            except Exception:
+                pass
+            while self._pending:
+                future, _ = self._pending.popleft()
+                if not future.done():
+                    future.set_exception(serial.SerialException(f"Arduino disconnected: {reason}"))
+        print(f"Arduino on {self.connected_port} disconnected: {reason}")
+        if not self._closed.is_set():
+            threading.Thread(target=self._reconnect_loop, name="serial-reconnect", daemon=True).start()
+
+    def _reconnect_loop(self):
+        while not self._closed.is_set() and not self.connected:
+            try:
+                self.connect()
+                self.stats["reconnects"] += 1
+                return
+            except Exception:
+                self._closed.wait(RECONNECT_INTERVAL)
+
+    def _read_loop(self, ser, buffer: bytes):
+        while not self._closed.is_set():
+            try:
+                chunk = ser.read(ser.in_waiting or 1)
+            except (serial.SerialException, OSError, TypeError, AttributeError) as e:
+                self._disconnect(ser, e)
+                return
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for raw in lines:
+                line = raw.decode("utf-8", "replace").strip()
+                if line:
+                    self._dispatch(line)
+            self._expire()
+
+    def _dispatch(self, line: str):
+        with self._lock:
+            future = self._pending.popleft()[0] if self._pending else None
+        if future is None:
+            self.stats["unsolicited"] += 1
+            for listener in list(self.line_listeners):
+                try:
+                    listener(line)
+                except Exception as e:
+                    print(f"Serial line listener error: {e}")
+            return
+        self.stats["replies"] += 1
+        self.sketch_replies = True
+        if not future.done():
+            future.set_result(line)
+        # A reply to a command that already timed out is consumed here, so it can't
+        # be mistaken for the answer to a later command
+
+    def _expire(self):
+        """Fail commands whose reply is overdue (they stay queued to absorb a late reply)."""
+        now = time.monotonic()
+        with self._lock:
+            for future, deadline in self._pending:
+                if now >= deadline and not future.done():
+                    self.stats["timeouts"] += 1
+                    if getattr(future, "probe", False) and self.sketch_replies is None:
+                        self.sketch_replies = False
+                    future.set_exception(TimeoutError("No reply from the Arduino"))
+            # Forget expired commands after a second timeout period; the sketch didn't answer them
+            while self._pending and self._pending[0][0].done() and now >= self._pending[0][1] + self.reply_timeout:
+                self._pending.popleft()
+
+    def _write_loop(self):
+        while not self._closed.is_set():
+            try:
+                first = self._outbox.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._outbox.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            with self._lock:
+                ser = self.serial
+                if ser is None:
+                    for _, future, _ in batch:
+                        future.set_exception(serial.SerialException("Arduino is not connected"))
+                    continue
+                now = time.monotonic()
+                for _, future, timeout in batch:
+                    if timeout is not None:
+                        self._pending.append((future, now + timeout))
+                try:
+                    ser.write(b"".join(data for data, _, _ in batch))
+                    self.stats["writes"] += 1
+                except (serial.SerialException, OSError) as e:
+                    for _, future, _ in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+            for _, future, timeout in batch:
+                if timeout is None:
+                    future.set_result(None)
+
+    def send_async(self, command: str, expect_reply: Optional[bool] = True, timeout: Optional[float] = None) -> Future:
+        """
+        Queue a command; the Future resolves to its reply line (None if no reply is expected).
+
+        expect_reply=None waits for a reply only if the sketch is known to send them,
+        and for at most probe_timeout while that is not known yet.
+        """
+        if not self.connected:
+            self.connect()
+        future = Future()
+        if expect_reply is None:
+            expect_reply = self.sketch_replies is not False
+            if self.sketch_replies is None:
+                future.probe = True
+                timeout = min(timeout or self.reply_timeout, self.probe_timeout)
+        data = (command.strip() + "\n").encode("utf-8")
+        self.stats["commands"] += 1
+        self._outbox.put((data, future, (timeout or self.reply_timeout) if expect_reply else None))
+        return future
+
+    def send(self, command: str, expect_reply: Optional[bool] = True, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Send one command line and wait for the reply.
+
+        Args:
+            command (str): Command text (a newline is added).
+            expect_reply (bool, optional): Whether the sketch answers this command with a
+                line; None decides from what the connection has learned (see send_async).
+            timeout (float, optional): Seconds to wait for the reply (default reply_timeout).
+
+        Returns:
+            str: The reply line, or None when no reply is expected (or the probe got none).
+
+        Raises:
+            TimeoutError: No reply in time.
+            serial.SerialException: No device, or it was unplugged.
+        """
+        future = self.send_async(command, expect_reply, timeout)
+        wait = (timeout or self.reply_timeout) + 1.0
+        try:
+            return future.result(wait)
+        except TimeoutError:
+            if getattr(future, "probe", False):
+                return None  # a sketch that doesn't reply; the command was still written
+            raise
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            ser, self.serial = self.serial, None
+            self._connected.clear()
+        if ser is not None:
+            ser.close()
+
+
+# Singleton instance
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_serial_manager() -> SerialConnectionManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = SerialConnectionManager()
+    return _manager
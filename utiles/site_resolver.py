@@ -0,0 +1,211 @@
+# Site resolution for web_navigation: spoken site name -> the URL to open.
+#
+# Sites, aliases, search URL templates and keyword rules (English and Tamil /
+# Tanglish) live in utiles/data/sites.json. They are compiled once into a single
+# Aho-Corasick automaton, so one pass over the request finds every alias and
+# keyword in it. Each match votes for a candidate:
+#   site      the site's name or an alias was said                  priority 100 (or the site's own)
+#   rule      a keyword (and, if the rule has one, a context word)   the rule's priority
+#             was said, e.g. "bus" + "ticket" -> redbus
+#   search    an official-website / rate request -> Google search   the search's priority
+# The highest priority wins (longer matched text breaks ties), so a specific rule
+# like "bus ticket" beats a generic one like "search" no matter the word order.
+import json
+import os
+import threading
+import unicodedata
+import urllib.parse
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SITES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sites.json")
+SITE_PRIORITY = 100
+GOOGLE_SEARCH = "https://www.google.com/search?q={q}"
+
+
+def normalize(text: str) -> str:
+    """Lowercase, NFC-normalized text with single spaces."""
+    return " ".join(unicodedata.normalize("NFC", text).lower().split())
+
+
+def _is_word_char(ch: str) -> bool:
+    # Tamil vowel signs and viramas are combining marks, not alphanumerics
+    return ch.isalnum() or ch == "_" or unicodedata.category(ch).startswith("M")
+
+
+def load_config(path: str = SITES_FILE) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class AhoCorasick:
+    """Finds every occurrence of a set of patterns in one pass over the text."""
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for pattern in patterns:
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            if pattern not in self._out[state]:
+                self._out[state].append(pattern)
+
+        # Breadth-first: each state's failure link points to its longest proper suffix in the trie
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt].extend(self._out[self._fail[nxt]])
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """(start, end, pattern) for every occurrence, overlapping ones included."""
+        hits = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pattern in self._out[state]:
+                hits.append((i + 1 - len(pattern), i + 1, pattern))
+        return hits
+
+
+class SiteResolver:
+    """Compiled matcher over the sites config; resolve() returns a scored decision."""
+    def __init__(self, config: Optional[dict] = None):
+        """
+        Args:
+            config (dict, optional): Parsed sites config. Defaults to SITES_FILE.
+
+        Raises:
+            ValueError: A rule names a site that is not defined.
+        """
+        config = load_config() if config is None else config
+        self.sites = {name: dict(site) for name, site in config["sites"].items()}
+        self.searches = config.get("searches", {})
+        # Candidates: (kind, target, priority, keyword terms, context terms)
+        self._candidates = []
+        for name, site in self.sites.items():
+            terms = [name] + list(site.get("aliases", []))
+            self._candidates.append(("site", name, site.get("priority", SITE_PRIORITY), terms, []))
+        for rule in config.get("rules", []):
+            if rule["site"] not in self.sites:
+                raise ValueError(f"Rule for unknown site '{rule['site']}'")
+            self._candidates.append(("rule", rule["site"], rule["priority"], rule["keywords"], rule.get("context", [])))
+        for name, search in self.searches.items():
+            self._candidates.append(("search", name, search["priority"], search["keywords"], []))
+
+        # term ("cloth*") -> [(candidate index, is_context)]
+        self._term_index: Dict[str, List[Tuple[int, bool]]] = {}
+        for i, (_, _, _, keywords, context) in enumerate(self._candidates):
+            for terms, is_context in ((keywords, False), (context, True)):
+                for term in terms:
+                    key = normalize(term.rstrip("*")) + ("*" if term.endswith("*") else "")
+                    self._term_index.setdefault(key, []).append((i, is_context))
+        self._prefix = {term[:-1] for term in self._term_index if term.endswith("*")}
+        self._exact = {term for term in self._term_index if not term.endswith("*")}
+        self._matcher = AhoCorasick(self._prefix | self._exact)
+
+    def match(self, text: str) -> Dict[str, str]:
+        """Terms found in text as whole words (prefix terms keep their '*'), mapped to the matched text."""
+        text = normalize(text)
+        found = {}
+        for start, end, pattern in self._matcher.find(text):
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if pattern in self._exact and (end == len(text) or not _is_word_char(text[end])):
+                found[pattern] = pattern
+            if pattern in self._prefix:
+                word_end = end
+                while word_end < len(text) and _is_word_char(text[word_end]):
+                    word_end += 1
+                found[pattern + "*"] = text[start:word_end]
+        return found
+
+    def _score(self, found: Dict[str, str], kinds: Tuple[str, ...]) -> List[dict]:
+        keyword_hits: Dict[int, List[str]] = {}
+        context_hits: Dict[int, List[str]] = {}
+        for term, matched in found.items():
+            for i, is_context in self._term_index.get(term, ()):
+                (context_hits if is_context else keyword_hits).setdefault(i, []).append(matched)
+        scored = []
+        for i, matched in keyword_hits.items():
+            kind, target, priority, _, context = self._candidates[i]
+            if kind not in kinds or (context and i not in context_hits):
+                continue
+            matched = matched + context_hits.get(i, [])
+            length = sum(len(m) for m in matched)
+            scored.append({"kind": kind, "target": target, "score": priority + min(length, 99) / 100, "matched": matched})
+        return sorted(scored, key=lambda c: -c["score"])
+
+    def site_url(self, site: str, search_query: str = "") -> str:
+        """The site's search URL for the query, or its home page."""
+        config = self.sites[site]
+        if search_query and config.get("search"):
+            return config["search"].replace("{q}", urllib.parse.quote(search_query))
+        return config["base"]
+
+    def resolve(self, site_name: str, search_query: str = "") -> dict:
+        """
+        Decide where a web_navigation request goes.
+
+        Args:
+            site_name (str): Site as spoken ("amazon", "book a bus ticket", a URL).
+            search_query (str): Optional query to search on the site.
+
+        Returns:
+            dict: kind ("url", "site", "search" or "fallback"), site (the site, or the
+                search name for kind "search"), url, score, matched (the words that
+                decided it) and search_term (for Google searches).
+        """
+        clean = normalize(site_name)
+        if "." in clean and " " not in clean:
+            url = clean if clean.startswith(("http://", "https://")) else f"https://{clean}"
+            return {"kind": "url", "site": None, "url": url, "score": float(SITE_PRIORITY), "matched": [clean], "search_term": None}
+
+        found = self.match(clean)
+        candidates = self._score(found, ("site", "rule"))
+        # Official-website and rate requests may be phrased in the query as well
+        candidates += self._score({**self.match(search_query), **found} if search_query else found, ("search",))
+        candidates.sort(key=lambda c: -c["score"])
+        if candidates:
+            best = candidates[0]
+            if best["kind"] == "search":
+                search = self.searches[best["target"]]
+                search_term = f"{site_name} {search_query}".strip()
+                if not any(s in search_term.lower() for s in search.get("skip_if", [])):
+                    search_term += f" {search['suffix']}"
+                url = GOOGLE_SEARCH.replace("{q}", urllib.parse.quote(search_term))
+                return {"kind": "search", "site": best["target"], "url": url, "score": best["score"],
+                        "matched": best["matched"], "search_term": search_term}
+            return {"kind": "site", "site": best["target"], "url": self.site_url(best["target"], search_query),
+                    "score": best["score"], "matched": best["matched"], "search_term": None}
+
+        search_term = f"{search_query} on {site_name}" if search_query else site_name
+        return {"kind": "fallback", "site": None, "url": GOOGLE_SEARCH.replace("{q}", urllib.parse.quote(search_term)),
+                "score": 0.0, "matched": [], "search_term": search_term}
+
+
+# Singleton instance
+_resolver = None
+_resolver_lock = threading.Lock()
+
+def get_site_resolver() -> SiteResolver:
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = SiteResolver()
+    return _resolver
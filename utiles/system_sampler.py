@@ -0,0 +1,233 @@
+# Background system metrics for the health tools.
+#
+# A daemon thread samples CPU (overall and per core), RAM, disk and network
+# throughput and battery every `interval` seconds into fixed-size numpy ring
+# buffers, and the process table every `process_interval` seconds. Tools read the
+# latest sample or aggregate a time window without ever blocking on psutil's
+# cpu_percent(interval=...).
+import math
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+import psutil
+
+SAMPLE_INTERVAL = 2.0
+PROCESS_INTERVAL = 5.0
+# Samples kept (one hour at the default interval)
+HISTORY = 1800
+
+METRICS = ("cpu", "ram", "disk_read", "disk_write", "net_sent", "net_recv", "battery")
+# Units of each metric, for formatting
+UNITS = {"cpu": "%", "ram": "%", "disk_read": "B/s", "disk_write": "B/s", "net_sent": "B/s", "net_recv": "B/s", "battery": "%"}
+
+
+def format_rate(value: float) -> str:
+    for unit in ("B/s", "KB/s", "MB/s", "GB/s"):
+        if abs(value) < 1024 or unit == "GB/s":
+            return f"{value:.1f} {unit}"
+        value /= 1024
+
+
+class SystemSampler:
+    """
+    Samples system metrics on a background thread into a ring buffer.
+
+    Call start() once; latest(), trend() and top_processes() then answer from
+    memory. Missing sensors (no battery, no disk counters) read as NaN.
+    """
+    def __init__(self, interval: float = SAMPLE_INTERVAL, history: int = HISTORY,
+                 process_interval: float = PROCESS_INTERVAL):
+        """
+        Args:
+            interval (float): Seconds between metric samples.
+            history (int): Samples kept in the ring buffer.
+            process_interval (float): Seconds between process table scans.
+        """
+        self.interval = interval
+        self.history = history
+        self.process_interval = process_interval
+        self.cores = psutil.cpu_count() or 1
+
+        self._times = np.zeros(history, dtype="float64")
+        self._values = np.full((history, len(METRICS)), np.nan, dtype="float32")
+        self._per_core = np.full((history, self.cores), np.nan, dtype="float32")
+        self._count = 0  # samples written so far; the newest is at (_count - 1) % history
+        self._lock = threading.Lock()
+        self._first_sample = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._last_io = None
+        self.battery_plugged = None
+        self._procs = {}  # pid -> psutil.Process, kept so cpu_percent() has a previous reading
+        self._process_table = []
+        self._last_process_scan = 0.0
+        self.scan_listeners = []  # called with the process table after each scan
+
+    def start(self) -> "SystemSampler":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            psutil.cpu_percent(percpu=True)  # prime: the first reading is measured from here
+            self._last_io = (time.monotonic(), psutil.disk_io_counters(), psutil.net_io_counters())
+            self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _run(self):
+        # First sample after a short wait so the tools have data quickly
+        wait = min(self.interval, 0.5)
+        while not self._stop.wait(wait):
+            try:
+                self.sample()
+                if time.monotonic() - self._last_process_scan >= self.process_interval:
+                    self.scan_processes()
+            except Exception as e:
+                print(f"System sampler error: {e}")
+            wait = self.interval
+
+    def sample(self):
+        """Take one sample now (normally called by the background thread)."""
+        per_core = psutil.cpu_percent(percpu=True)
+        ram = psutil.virtual_memory().percent
+        now = time.monotonic()
+        disk, net = psutil.disk_io_counters(), psutil.net_io_counters()
+        rates = [math.nan] * 4
+        if self._last_io is not None:
+            then, last_disk, last_net = self._last_io
+            elapsed = max(now - then, 1e-6)
+            if disk is not None and last_disk is not None:
+                rates[0] = (disk.read_bytes - last_disk.read_bytes) / elapsed
+                rates[1] = (disk.write_bytes - last_disk.write_bytes) / elapsed
+            if net is not None and last_net is not None:
+                rates[2] = (net.bytes_sent - last_net.bytes_sent) / elapsed
+                rates[3] = (net.bytes_recv - last_net.bytes_recv) / elapsed
+        self._last_io = (now, disk, net)
+        battery = psutil.sensors_battery()
+        self.battery_plugged = battery.power_plugged if battery else None
+
+        with self._lock:
+            row = self._count % self.history
+            self._times[row] = time.time()
+            self._values[row] = [sum(per_core) / len(per_core), ram, *rates, battery.percent if battery else math.nan]
+            self._per_core[row, :len(per_core)] = per_core[:self.cores]
+            self._count += 1
+        self._first_sample.set()
+
+    def scan_processes(self):
+        """Refresh the process table (CPU % since the previous scan, RSS)."""
+        table = []
+        seen = set()
+        for proc in psutil.process_iter(["pid", "ppid", "name", "exe", "cmdline", "memory_info"]):
+            pid = proc.info["pid"]
+            try:
+                cached = self._procs.get(pid)
+                if cached is None or cached.create_time() != proc.create_time():
+                    cached = self._procs[pid] = proc  # new process, or the pid was reused
+                cpu = cached.cpu_percent(None)
+                create_time = cached.create_time()
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                continue
+            except psutil.AccessDenied:
+                cpu, create_time = 0.0, 0.0
+            seen.add(pid)
+            memory = proc.info["memory_info"]
+            table.append({
+                "pid": pid,
+                "ppid": proc.info["ppid"],
+                "name": proc.info["name"] or "",
+                "exe": proc.info["exe"] or "",
+                "cmdline": proc.info["cmdline"] or [],
+                "cpu": cpu,
+                "rss": memory.rss if memory else 0,
+                "create_time": create_time,
+            })
+        for pid in set(self._procs) - seen:
+            del self._procs[pid]
+        self._process_table = table
+        self._last_process_scan = time.monotonic()
+        for listener in list(self.scan_listeners):
+            try:
+                listener(table)
+            except Exception as e:
+                print(f"Process scan listener error: {e}")
+
+    def _window(self, seconds: Optional[float] = None):
+        """(times, values, per_core) of the samples in the last `seconds`, oldest first."""
+        with self._lock:
+            n = min(self._count, self.history)
+            order = (np.arange(self._count - n, self._count)) % self.history
+            times, values, per_core = self._times[order], self._values[order], self._per_core[order]
+        if seconds is not None:
+            keep = times >= time.time() - seconds
+            times, values, per_core = times[keep], values[keep], per_core[keep]
+        return times, values, per_core
+
+    def latest(self, wait: float = 2.0) -> Optional[dict]:
+        """
+        The newest sample, or None if none was taken within `wait` seconds.
+
+        Returns:
+            dict: time, one key per METRICS entry and per_core (list of %).
+        """
+        if not self._first_sample.wait(wait):
+            return None
+        with self._lock:
+            row = (self._count - 1) % self.history
+            sample = {"time": float(self._times[row]), "per_core": [round(float(v), 1) for v in self._per_core[row]]}
+            sample.update({m: float(v) for m, v in zip(METRICS, self._values[row])})
+        sample["battery_plugged"] = self.battery_plugged
+        return sample
+
+    def trend(self, metric: str = "cpu", seconds: float = 600) -> dict:
+        """
+        Aggregate of one metric over the last `seconds`.
+
+        Returns:
+            dict: metric, samples, seconds covered, avg, min, max and latest (NaN-free; None when empty).
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}' (expected one of {', '.join(METRICS)})")
+        times, values, _ = self._window(seconds)
+        column = values[:, METRICS.index(metric)]
+        valid = ~np.isnan(column)
+        result = {"metric": metric, "samples": int(valid.sum()), "seconds": 0.0,
+                  "avg": None, "min": None, "max": None, "latest": None}
+        if valid.any():
+            column, times = column[valid], times[valid]
+            result.update(
+                seconds=float(times[-1] - times[0]),
+                avg=float(column.mean()), min=float(column.min()), max=float(column.max()), latest=float(column[-1]),
+            )
+        return result
+
+    def processes(self) -> List[dict]:
+        """The last process table, scanning now if there is none yet."""
+        if not self._process_table:
+            self.scan_processes()
+        return self._process_table
+
+    def top_processes(self, n: int = 5, by: str = "cpu") -> List[dict]:
+        """The n processes using the most CPU ("cpu") or memory ("rss")."""
+        if by not in ("cpu", "rss"):
+            raise ValueError("by must be 'cpu' or 'rss'")
+        return sorted(self.processes(), key=lambda p: p[by], reverse=True)[:n]
+
+
+# Singleton instance
+_sampler = None
+_sampler_lock = threading.Lock()
+
+def get_sampler() -> SystemSampler:
+    """Shared, started sampler."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = SystemSampler().start()
+    return _sampler
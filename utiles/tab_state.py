@@ -0,0 +1,140 @@
+# Live Chrome tab table, fed by the Ruby Chrome extension (extensions/chrome).
+#
+# The extension's service worker keeps a WebSocket open to /ws/tabs on the web
+# server and sends JSON messages:
+#   {"type": "snapshot", "seq": n, "tabs": [tab, ...]}       full state (on connect / resync)
+#   {"type": "upsert",   "seq": n, "tab": {...}}              created or changed fields of one tab
+#   {"type": "remove",   "seq": n, "tab_id": id}
+#   {"type": "activate", "seq": n, "tab_id": id, "window_id": w}
+#   {"type": "media",    "seq": n, "tab_id": id, "media": {"playing": bool, "title": str, ...}}
+#   {"type": "ping"}
+# Tabs carry tab_id, window_id, url, title, active, audible, muted and media.
+# seq increases by one per delta; on a gap the server replies {"type": "resync"}
+# and the extension sends a fresh snapshot, so the table never silently drifts.
+import json
+import threading
+import time
+from typing import List, Optional
+
+TAB_FIELDS = ("tab_id", "window_id", "url", "title", "active", "audible", "muted", "media")
+
+
+class TabTable:
+    """In-memory table of Chrome tabs, updated by extension messages."""
+    def __init__(self):
+        self._tabs = {}
+        self._lock = threading.Lock()
+        self.seq = None
+        self.connections = 0
+        self.updated_at = 0.0
+
+    @property
+    def connected(self) -> bool:
+        """Whether an extension is connected (the table is live)."""
+        return self.connections > 0
+
+    def _upsert(self, tab: dict):
+        tab_id = tab["tab_id"]
+        entry = self._tabs.setdefault(tab_id, {"tab_id": tab_id, "media": {}})
+        entry.update({k: v for k, v in tab.items() if k in TAB_FIELDS})
+
+    def apply(self, message: dict) -> Optional[dict]:
+        """
+        Apply one extension message.
+
+        Returns:
+            dict: Reply to send back ({"type": "resync"} after a missed delta), or None.
+        """
+        kind = message.get("type")
+        if kind == "ping":
+            return {"type": "pong"}
+        seq = message.get("seq")
+        with self._lock:
+            if kind == "snapshot":
+                self._tabs = {}
+                for tab in message.get("tabs", []):
+                    self._upsert(tab)
+                self.seq = seq
+                self.updated_at = time.time()
+                return None
+            if self.seq is None or seq != self.seq + 1:
+                self.seq = None  # ignore deltas until the snapshot arrives
+                return {"type": "resync"}
+            self.seq = seq
+
+            if kind == "upsert":
+                self._upsert(message["tab"])
+            elif kind == "remove":
+                self._tabs.pop(message["tab_id"], None)
+            elif kind == "activate":
+                for tab in self._tabs.values():
+                    if tab.get("window_id") == message.get("window_id"):
+                        tab["active"] = tab["tab_id"] == message["tab_id"]
+                if message["tab_id"] in self._tabs:
+                    self._tabs[message["tab_id"]]["active"] = True
+            elif kind == "media":
+                if message["tab_id"] in self._tabs:
+                    self._tabs[message["tab_id"]]["media"] = message.get("media") or {}
+            else:
+                print(f"Unknown tab message type: {kind}")
+            self.updated_at = time.time()
+        return None
+
+    def serve(self, ws):
+        """
+        Read messages from a connected extension until it disconnects.
+
+        Args:
+            ws: WebSocket with receive() and send(str) (flask-sock / simple-websocket).
+        """
+        with self._lock:
+            self.connections += 1
+            self.seq = None
+        try:
+            ws.send(json.dumps({"type": "resync"}))
+            while True:
+                raw = ws.receive()
+                if raw is None:
+                    break
+                try:
+                    reply = self.apply(json.loads(raw))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    print(f"Bad tab message: {e}")
+                    reply = {"type": "resync"}
+                if reply is not None:
+                    ws.send(json.dumps(reply))
+        finally:
+            with self._lock:
+                self.connections -= 1
+                if not self.connections:
+                    self._tabs = {}
+                    self.seq = None
+
+    def tabs(self) -> List[dict]:
+        with self._lock:
+            return [dict(tab) for tab in self._tabs.values()]
+
+    def active_tabs(self) -> List[dict]:
+        """The selected tab of each window."""
+        return [tab for tab in self.tabs() if tab.get("active")]
+
+    def playing(self) -> List[dict]:
+        """Tabs playing media (a playing media element, or audible)."""
+        return [tab for tab in self.tabs() if (tab.get("media") or {}).get("playing") or tab.get("audible")]
+
+    def find(self, text: str) -> List[dict]:
+        """Tabs whose title or URL contains text (case-insensitive)."""
+        text = text.lower()
+        return [tab for tab in self.tabs() if text in (tab.get("title") or "").lower() or text in (tab.get("url") or "").lower()]
+
+
+# Singleton instance
+_table = None
+_table_lock = threading.Lock()
+
+def get_tab_table() -> TabTable:
+    global _table
+    with _table_lock:
+        if _table is None:
+            _table = TabTable()
+    return _table
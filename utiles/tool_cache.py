@@ -0,0 +1,202 @@
+# Result cache for read-only tools, applied where the brains execute tool calls.
+#
+# Caching is opt-in and declared on the tool itself, in tool.metadata["cache"]:
+#
+#   @cacheable(ttl=600, stale_ttl=3600, key=lambda args: args.get("city", "").lower())
+#   @tool
+#   def get_weather(city: str = "") -> str: ...
+#
+# Tools without a policy (everything with side effects: opening apps, deleting
+# files, serial commands, ...) are executed on every call.
+#
+#   fresh   (age < ttl)               the cached result is returned
+#   stale   (age < ttl + stale_ttl)   the cached result is returned at once and the
+#                                     tool re-runs in the background (stale-while-revalidate)
+#   miss                              the tool runs; concurrent calls with the same key
+#                                     wait for that one run instead of starting their own
+#
+# Results that look like errors ("Weather Error: ...", "Could not ...") are not
+# stored. Entries live in an in-process LRU. Every execution is recorded for the
+# calling thread's current turn, so Ruby can show cache hits in last_turn_trace.
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+MAX_ENTRIES = 256
+REFRESH_WORKERS = 2
+# Tool output that must not be cached
+ERROR_RESULT = re.compile(r"^\s*([\w ]*\berror\b|could not\b|search failed\b)", re.IGNORECASE)
+
+
+def cache_policy(ttl: float, stale_ttl: float = 0.0, key: Optional[Callable[[dict], Any]] = None,
+                 cache_if: Optional[Callable[[Any], bool]] = None) -> dict:
+    """
+    A tool's cache declaration (stored as tool.metadata["cache"]).
+
+    Args:
+        ttl (float): Seconds a result is served as fresh.
+        stale_ttl (float): Further seconds it is served while being refreshed in the background.
+        key (Callable, optional): Tool arguments -> cache key (JSON-serializable). Default: all arguments.
+        cache_if (Callable, optional): Result -> whether to store it. Default: not an error message.
+    """
+    return {"ttl": float(ttl), "stale_ttl": float(stale_ttl), "key": key, "cache_if": cache_if}
+
+
+def cacheable(ttl: float, stale_ttl: float = 0.0, key: Optional[Callable[[dict], Any]] = None,
+              cache_if: Optional[Callable[[Any], bool]] = None):
+    """Decorator for @tool functions (put it above @tool) that declares a cache policy."""
+    def apply(tool):
+        tool.metadata = {**(tool.metadata or {}), "cache": cache_policy(ttl, stale_ttl, key, cache_if)}
+        return tool
+    return apply
+
+
+def _normalize_args(args) -> dict:
+    if isinstance(args, dict):
+        return args
+    return {"query": args}  # single-string tool input
+
+
+class ToolCache:
+    """TTL + LRU cache of tool results with stale-while-revalidate refresh."""
+    def __init__(self, max_entries: int = MAX_ENTRIES, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_entries (int): Results kept; the least recently used is dropped first.
+            clock (Callable): Time source (seconds).
+        """
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (value, stored_at, policy)
+        self._inflight = {}  # key -> Future of the running execution
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(REFRESH_WORKERS, thread_name_prefix="tool-cache-refresh")
+        self._turn = threading.local()
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "uncached": 0, "refreshes": 0, "errors_not_cached": 0}
+
+    @staticmethod
+    def policy_of(tool) -> Optional[dict]:
+        return (getattr(tool, "metadata", None) or {}).get("cache")
+
+    def key_for(self, tool, args) -> str:
+        policy = self.policy_of(tool)
+        args = _normalize_args(args)
+        part = policy["key"](args) if policy.get("key") else args
+        return f"{tool.name}:{json.dumps(part, sort_keys=True, default=str)}"
+
+    def _store(self, key: str, value, policy: dict):
+        if not (policy.get("cache_if") or (lambda r: not ERROR_RESULT.match(str(r))))(value):
+            self.stats["errors_not_cached"] += 1
+            return
+        with self._lock:
+            self._entries[key] = (value, self.clock(), policy)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _run_once(self, tool, args, key: str, policy: dict):
+        """Execute the tool, sharing the run with concurrent callers of the same key."""
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            value = tool.invoke(args)
+            self._store(key, value, policy)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh(self, tool, args, key: str, policy: dict):
+        try:
+            self._run_once(tool, args, key, policy)
+            self.stats["refreshes"] += 1
+        except Exception as e:
+            print(f"Background refresh of {tool.name} failed: {e}")
+
+    def execute(self, tool, args):
+        """
+        Run a tool call through the cache.
+
+        Args:
+            tool: LangChain tool (BaseTool / @tool).
+            args: Tool input (dict of arguments, or a string).
+
+        Returns:
+            The tool's result (possibly cached).
+        """
+        start = time.perf_counter()
+        policy = self.policy_of(tool)
+        if policy is None:
+            self.stats["uncached"] += 1
+            status, value = "uncached", tool.invoke(args)
+        else:
+            key = self.key_for(tool, args)
+            now = self.clock()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+            age = None if entry is None else now - entry[1]
+            if age is not None and age < policy["ttl"]:
+                self.stats["hits"] += 1
+                status, value = "hit", entry[0]
+            elif age is not None and age < policy["ttl"] + policy["stale_ttl"]:
+                self.stats["stale"] += 1
+                status, value = "stale", entry[0]
+                with self._lock:
+                    refreshing = key in self._inflight
+                if not refreshing:
+                    self._refresher.submit(self._refresh, tool, args, key, policy)
+            else:
+                self.stats["misses"] += 1
+                status, value = "miss", self._run_once(tool, args, key, policy)
+        calls = getattr(self._turn, "calls", None)
+        if calls is not None:
+            calls.append({"tool": tool.name, "cache": status, "ms": round((time.perf_counter() - start) * 1000, 2)})
+        return value
+
+    def begin_turn(self):
+        """Start recording this thread's tool calls."""
+        self._turn.calls = []
+
+    def end_turn(self) -> List[dict]:
+        """Stop recording and return this thread's calls: tool, cache (hit/stale/miss/uncached) and ms."""
+        calls = getattr(self._turn, "calls", None) or []
+        self._turn.calls = None
+        return calls
+
+    def invalidate(self, tool_name: Optional[str] = None):
+        """Drop cached results of one tool (or all)."""
+        with self._lock:
+            for key in [k for k in self._entries if tool_name is None or k.startswith(f"{tool_name}:")]:
+                del self._entries[key]
+
+
+# Singleton instance
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_tool_cache() -> ToolCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ToolCache()
+    return _cache
+
+
+def run_tool(tool, args):
+    """Execute a tool call through the shared cache (what the brains call)."""
+    return get_tool_cache().execute(tool, args)
@@ -0,0 +1,229 @@
+# Per-turn tool pre-selection: send the LLM only the tools an utterance can plausibly need.
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utiles.intent_fallback import load_seed
+from utiles.rag_embeddings import HashingEmbeddings
+
+# Tools each intent (see utiles/data/intent_seed.tsv) usually ends up calling
+INTENT_TOOLS: Dict[str, Sequence[str]] = {
+    "play_media": ("youtube_video_player", "web_navigation", "get_chrome_activity"),
+    "news": ("get_latest_news",),
+    "web_search": ("web_search",),
+    "calculate": ("calculator",),
+    "document_query": ("query_document",),
+    "hardware": ("arduino_serial_communication",),
+    "location": ("get_current_location",),
+    "open_app": ("open_system_app", "web_navigation"),
+    "close_app": ("close_application", "list_open_windows"),
+    "system_control": ("system_control", "pc_automation"),
+    "window_info": ("list_open_windows", "get_chrome_activity"),
+    "system_health": ("get_system_health", "get_system_trend", "get_top_processes"),
+    "terminal": ("run_terminal_command",),
+    "file_ops": ("file_operation", "file_search"),
+    "weather": ("get_weather", "get_current_location"),
+    "automation": ("pc_automation", "system_control"),
+    "language": ("switch_language", "get_available_languages"),
+    "activity": ("get_frequently_used", "record_user_activity"),
+    "web_navigation": ("web_navigation",),
+    "small_talk": (),
+}
+
+# Labels of other intent models (e.g. the transformer classifier's scenario_intent
+# labels) whose words don't point at the right intent on their own
+LABEL_ALIASES: Dict[str, str] = {
+    "qa_maths": "calculate",
+    "qa_currency": "calculate",
+    "qa_factoid": "web_search",
+    "qa_definition": "web_search",
+    "general_quirky": "small_talk",
+    "general_joke": "small_talk",
+    "recommendation_events": "web_search",
+    "transport_query": "web_search",
+    "audio_volume_mute": "system_control",
+}
+# Label words that name an intent; the last matching word of a label wins, so
+# "play_music" is play_media and "iot_hue_lightoff" is hardware
+LABEL_KEYWORDS: Dict[str, str] = {
+    "play": "play_media", "music": "play_media", "video": "play_media", "podcasts": "play_media",
+    "radio": "play_media", "audiobook": "play_media", "youtube": "play_media", "song": "play_media",
+    "news": "news",
+    "search": "web_search", "factoid": "web_search", "question": "web_search", "qa": "web_search",
+    "math": "calculate", "maths": "calculate", "calculate": "calculate", "calculator": "calculate",
+    "document": "document_query", "pdf": "document_query",
+    "iot": "hardware", "arduino": "hardware", "hardware": "hardware", "light": "hardware",
+    "location": "location",
+    "open": "open_app", "launch": "open_app", "app": "open_app",
+    "close": "close_app", "kill": "close_app",
+    "volume": "system_control", "brightness": "system_control", "system": "system_control",
+    "window": "window_info", "tab": "window_info",
+    "health": "system_health", "battery": "system_health", "cpu": "system_health",
+    "terminal": "terminal", "command": "terminal",
+    "file": "file_ops", "files": "file_ops", "folder": "file_ops",
+    "weather": "weather",
+    "automation": "automation", "screenshot": "automation",
+    "language": "language", "translate": "language",
+    "activity": "activity", "history": "activity",
+    "website": "web_navigation", "browse": "web_navigation", "navigate": "web_navigation",
+    "greet": "small_talk", "greeting": "small_talk", "chitchat": "small_talk", "goodbye": "small_talk",
+    "thanks": "small_talk", "hello": "small_talk",
+}
+
+# Always offered, so the model can still look things up when the selection misses
+SAFETY_TOOLS = ("web_search",)
+# Tools picked per turn on top of the safety set
+TOP_N = 5
+# Intent confidence below which the classifier is ignored
+MIN_INTENT_CONFIDENCE = 0.35
+# Without a confident intent, send every tool unless some tool matches at least this well
+MIN_SIMILARITY = 0.2
+# Score added to the tools of the predicted intent, times its confidence
+INTENT_WEIGHT = 0.6
+# Tools scoring below this fraction of the best tool are left out even if top_n has room
+RELATIVE_CUTOFF = 0.5
+# Utterances of at most this many words ("yes please", "the second one") are treated as
+# follow-ups and keep the tools of the last longer turn
+FOLLOW_UP_WORDS = 3
+
+
+def map_intent(label: str) -> Optional[str]:
+    """
+    INTENT_TOOLS intent a classifier label stands for, or None.
+
+    Labels of the seed set map to themselves; labels of other models go through
+    LABEL_ALIASES, then the last word of the label found in LABEL_KEYWORDS.
+    """
+    key = label.strip().lower()
+    if key in INTENT_TOOLS:
+        return key
+    if key in LABEL_ALIASES:
+        return LABEL_ALIASES[key]
+    for word in reversed(re.split(r"[\W_]+", key)):
+        if word in LABEL_KEYWORDS:
+            return LABEL_KEYWORDS[word]
+    return None
+
+
+class ToolSelector:
+    """
+    Picks the tools to send to the brain for one utterance.
+
+    Each tool is scored by the similarity of the utterance to its name, description
+    and the seed utterances of the intents mapped to it (HashingEmbeddings, so no
+    network call), plus a bonus when the intent classifier's label maps to it.
+    The top_n tools and SAFETY_TOOLS are sent; with neither a confident intent nor
+    a good match, all tools are sent. Small talk only keeps tools matching at least
+    MIN_SIMILARITY. Short follow-ups ("yes please", "the second one") also get the
+    tools of the last longer turn, so a confirmation can still call the tool that was
+    offered.
+    """
+    def __init__(
+        self,
+        tools: List,
+        top_n: int = TOP_N,
+        safety: Sequence[str] = SAFETY_TOOLS,
+        classifier=None,
+        min_confidence: float = MIN_INTENT_CONFIDENCE,
+    ):
+        """
+        Args:
+            tools (List): LangChain tools (anything with .name and .description).
+            top_n (int): Tools picked per turn besides the safety set.
+            safety (Sequence[str]): Tool names always included.
+            classifier: Object with classify(text) -> {"label", "confidence"}, e.g.
+                classifier.get_classifier(). None uses similarity only.
+            min_confidence (float): Intent confidence needed to use its label.
+        """
+        self.tools = list(tools)
+        self.top_n = top_n
+        self.safety = set(safety)
+        self.classifier = classifier
+        self.min_confidence = min_confidence
+        self.embeddings = HashingEmbeddings()
+        self.last_selection = None
+        self._previous = set()
+
+        index = {t.name: i for i, t in enumerate(self.tools)}
+        docs = defaultdict(list)
+        for t in self.tools:
+            docs[t.name].append(t.name.replace("_", " "))
+            docs[t.name].append(t.description)
+        texts, labels = load_seed()
+        for text, label in zip(texts, labels):
+            for name in INTENT_TOOLS.get(label, ()):
+                if name in index:
+                    docs[name].append(text)
+        self._doc_owner = np.array([index[name] for name in docs for _ in docs[name]])
+        self._doc_vectors = np.asarray(
+            self.embeddings.embed_documents([text for name in docs for text in docs[name]]), dtype="float32"
+        )
+
+    def scores(self, text: str) -> np.ndarray:
+        """Best similarity of text to each tool's documents (index aligned with self.tools)."""
+        sims = self._doc_vectors @ np.asarray(self.embeddings.embed_query(text), dtype="float32")
+        best = np.full(len(self.tools), -1.0, dtype="float32")
+        np.maximum.at(best, self._doc_owner, sims)
+        return best
+
+    def select(self, text: str) -> List:
+        """
+        Tools to send for this utterance, in their original order.
+
+        Details of the decision are kept in self.last_selection.
+        """
+        start = time.perf_counter()
+        intent = {"label": "unknown", "confidence": 0.0}
+        if self.classifier is not None:
+            try:
+                intent = self.classifier.classify(text)
+            except Exception as e:
+                print(f"Tool selection: intent classification failed: {e}")
+        # Labels that map to no intent carry no signal
+        mapped = map_intent(intent["label"])
+        confident = mapped is not None and intent["confidence"] >= self.min_confidence
+
+        similarity = self.scores(text)
+        scores = similarity.copy()
+        if confident:
+            for i, t in enumerate(self.tools):
+                if t.name in INTENT_TOOLS[mapped]:
+                    scores[i] += INTENT_WEIGHT * intent["confidence"]
+
+        fallback = False
+        if confident and mapped == "small_talk":
+            # Chit-chat often carries a request ("hi, what's the weather"): keep the tools it clearly matches
+            picked = {int(i) for i in np.argsort(-similarity)[:self.top_n] if similarity[i] >= MIN_SIMILARITY}
+        elif not confident and similarity.max(initial=-1.0) < MIN_SIMILARITY:
+            fallback = True
+            picked = set(range(len(self.tools)))
+        else:
+            cutoff = RELATIVE_CUTOFF * scores.max()
+            picked = {int(i) for i in np.argsort(-scores)[:self.top_n] if scores[i] > 0 and scores[i] >= cutoff}
+        picked |= {i for i, t in enumerate(self.tools) if t.name in self.safety}
+        follow_up = len(text.split()) <= FOLLOW_UP_WORDS and bool(self._previous)
+        if follow_up:
+            # Keep the tools of the request being followed up, without piling up a chain of follow-ups
+            picked |= self._previous
+        else:
+            self._previous = picked
+
+        selected = [t for i, t in enumerate(self.tools) if i in picked]
+        self.last_selection = {
+            "intent": mapped if confident else intent["label"],
+            "label": intent["label"],
+            "confidence": round(float(intent["confidence"]), 3),
+            "intent_source": intent.get("source"),
+            "fallback": fallback,
+            "follow_up": follow_up,
+            "tools": [t.name for t in selected],
+            "ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+        return selected
+
+    def reset(self):
+        """Forget the last turn (new conversation)."""
+        self._previous = set()
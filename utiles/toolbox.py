@@ -1,36 +1,44 @@
 from langchain_core.tools import tool
-import serial
-import time
 from utiles import rag_utiles
+from utiles.safe_eval import calculate
+from utiles.serial_manager import get_serial_manager
 
 @tool
 def calculator(query: str) -> str:
-    """Evaluates a basic mathematical expression provided as a string. 
-    Supports arithmetic operations like addition, subtraction, multiplication, division, and parentheses."""
+    """Evaluates a mathematical expression provided as a string.
+    Supports + - * / // % ** (or ^), parentheses, percentages ('18% of 4500', '250 + 10%'),
+    math functions (sqrt, log, sin, factorial, round, ...), lists with aggregates
+    ('sum([1, 2, 3])', 'mean(...)', 'median', 'std', 'max', 'range(1, 101)') and
+    unit conversions ('5 km to miles', '98.6 F in C', '2 GB to MB')."""
     try:
-        return str(eval(query))
+        # Whitelisted AST evaluation, never eval() of the raw text
+        return calculate(query)
     except Exception as e:
-        return str(e)
+        return f"Calculator Error: {str(e)}"
 
 @tool
 def arduino_serial_communication(query: str) -> str:
     """Communicates with an Arduino device via serial connection."""
-    import platform
+    manager = get_serial_manager()
     try:
-        # Check OS for default port
-        port = 'COM3' if platform.system() == 'Windows' else '/dev/ttyUSB0'
-        ser = serial.Serial(port, 9600, timeout=1)
-        time.sleep(2)
-        ser.write(query.encode())
-        ser.close()
-        return f"Arduino Serial Communication Successful on {port}"
+        # The connection stays open between commands; only the first one waits for the board.
+        # Replies are waited for only if the sketch sends them
+        reply = manager.send(query, expect_reply=None)
+        if reply is None:
+            return f"Command sent to the Arduino on {manager.connected_port}."
+        return f"Arduino replied on {manager.connected_port}: {reply}"
+    except TimeoutError:
+        return f"Command sent to the Arduino on {manager.connected_port}, but it did not reply."
     except Exception as e:
-        return f"Serial Error on {port if 'port' in locals() else 'unknown port'}: {str(e)}"
+        return f"Serial Error on {manager.connected_port or 'unknown port'}: {str(e)}"
 
 @tool
-def query_document(query: str) -> str:
-    """Queries a document using the RubyRAG class."""
+def query_document(query: str, collection: str = "", max_tokens: int = 1000) -> str:
+    """Queries a document using the RubyRAG class.
+    collection limits the search to one document collection (e.g. "manuals", "timetables");
+    leave it empty to search the default collection.
+    max_tokens limits the size of the returned context."""
     try:
-        return rag_utiles.RubyRAG().query(query)
+        return rag_utiles.get_rag().query(query, token_budget=max_tokens, collection=collection or None)
     except Exception as e:
         return str(e)
\ No newline at end of file
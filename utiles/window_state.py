@@ -0,0 +1,449 @@
+# Cached list of open windows for list_open_windows / get_chrome_activity.
+#
+# WindowStateService keeps the window list in memory and answers tools from it.
+# A platform backend lists the windows; when it can also deliver change events
+# (window created/destroyed/renamed) the cache is refreshed on those, with a slow
+# timer as a safety net, otherwise it is refreshed on a short timer.
+#
+# Backends (chosen by detect_backend()):
+#   Win32Backend    EnumWindows + SetWinEventHook (pywin32)
+#   X11Backend      _NET_CLIENT_LIST + PropertyNotify (python-xlib), or `wmctrl -lp` without events
+#   WaylandBackend  compositor IPC (`swaymsg -t get_tree`, `hyprctl clients -j`); no events
+#   FakeBackend     in-memory list for tests
+# Platform modules are imported inside the backends, so this module imports anywhere.
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, List, Optional
+
+REFRESH_INTERVAL = 1.0
+# Timer refresh when the backend delivers events (catches anything the events miss)
+EVENT_SAFETY_INTERVAL = 15.0
+# Events within this window are coalesced into one refresh
+DEBOUNCE = 0.1
+
+
+def window(handle, title: str, pid: Optional[int] = None, process: str = "") -> dict:
+    return {"handle": handle, "title": title, "pid": pid, "process": process}
+
+
+class WindowBackend:
+    """Lists the visible, titled top-level windows of one windowing system."""
+    name = "none"
+
+    def list_windows(self) -> List[dict]:
+        raise NotImplementedError
+
+    def watch(self, on_change: Callable[[], None]) -> bool:
+        """
+        Call on_change whenever the window list or a title may have changed.
+
+        Returns:
+            bool: False if the backend cannot deliver events (the service polls instead).
+        """
+        return False
+
+
+class FakeBackend(WindowBackend):
+    """In-memory windows for tests; set_windows() notifies watchers like a real event."""
+    name = "fake"
+
+    def __init__(self, windows: Optional[List[dict]] = None, events: bool = True):
+        self.windows = list(windows or [])
+        self.events = events
+        self.calls = 0
+        self._watchers = []
+
+    def list_windows(self) -> List[dict]:
+        self.calls += 1
+        return list(self.windows)
+
+    def set_windows(self, windows: List[dict]):
+        self.windows = list(windows)
+        for on_change in self._watchers:
+            on_change()
+
+    def watch(self, on_change: Callable[[], None]) -> bool:
+        if self.events:
+            self._watchers.append(on_change)
+        return self.events
+
+
+class Win32Backend(WindowBackend):
+    name = "win32"
+
+    # SetWinEventHook events: window shown/hidden/destroyed, title changed, foreground switched
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_DESTROY = 0x8001
+    EVENT_OBJECT_SHOW = 0x8002
+    EVENT_OBJECT_HIDE = 0x8003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    OBJID_WINDOW = 0
+    GA_ROOT = 2
+    GWL_EXSTYLE = -20
+    WS_EX_TOOLWINDOW = 0x00000080
+
+    def __init__(self):
+        import win32gui
+        import win32process
+        self._gui = win32gui
+        self._process = win32process
+        self._listed_handles = set()  # handles of the last list_windows(), for hide/destroy events
+
+    def _listed(self, hwnd) -> bool:
+        """Whether a top-level window belongs in the list: visible, titled and not a tool window (tooltips, palettes)."""
+        gui = self._gui
+        return (bool(gui.IsWindowVisible(hwnd)) and bool(gui.GetWindowText(hwnd))
+                and not gui.GetWindowLong(hwnd, self.GWL_EXSTYLE) & self.WS_EX_TOOLWINDOW)
+
+    def _root(self, hwnd):
+        import ctypes
+        return ctypes.windll.user32.GetAncestor(hwnd, self.GA_ROOT)
+
+    def _relevant(self, event: int, hwnd, id_object: int, id_child: int) -> bool:
+        """
+        Whether a WinEvent can change the window list.
+
+        Child windows and controls are ignored, and so are top-level windows the list
+        leaves out, unless they were in the last list (hidden, destroyed or untitled since).
+        """
+        if id_object != self.OBJID_WINDOW or id_child != 0 or not hwnd:
+            return False
+        if event == self.EVENT_SYSTEM_FOREGROUND or hwnd in self._listed_handles:
+            return True
+        try:
+            return self._root(hwnd) == hwnd and self._listed(hwnd)
+        except Exception:
+            return False  # the window is already gone
+
+    def list_windows(self) -> List[dict]:
+        import psutil
+        gui = self._gui
+        windows = []
+
+        def callback(hwnd, _):
+            if self._listed(hwnd):
+                windows.append((hwnd, gui.GetWindowText(hwnd)))
+            return True
+
+        gui.EnumWindows(callback, None)
+        self._listed_handles = {hwnd for hwnd, _ in windows}
+        out = []
+        for hwnd, title in windows:
+            pid, name = None, ""
+            try:
+                pid = self._process.GetWindowThreadProcessId(hwnd)[1]
+                name = psutil.Process(pid).name()
+            except Exception:
+                pass
+            out.append(window(hwnd, title, pid, name))
+        return out
+
+    def watch(self, on_change: Callable[[], None]) -> bool:
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG, wintypes.LONG,
+            wintypes.DWORD, wintypes.DWORD,
+        )
+
+        def handler(hook, event, hwnd, id_object, id_child, thread, time_ms):
+            # NAMECHANGE/SHOW/HIDE also fire for tooltips and child windows; only listed windows count
+            if self._relevant(event, hwnd, id_object, id_child):
+                on_change()
+
+        self._proc = WinEventProc(handler)  # keep a reference, or the callback is collected
+        ready = threading.Event()
+        hooked = []
+
+        def loop():
+            # Out-of-context hooks deliver events to this thread's message loop
+            for first, last in (
+                (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_FOREGROUND),
+                (self.EVENT_OBJECT_DESTROY, self.EVENT_OBJECT_HIDE),
+                (self.EVENT_OBJECT_NAMECHANGE, self.EVENT_OBJECT_NAMECHANGE),
+            ):
+                hook = user32.SetWinEventHook(first, last, 0, self._proc, 0, 0, self.WINEVENT_OUTOFCONTEXT)
+                if hook:
+                    hooked.append(hook)
+            ready.set()
+            msg = wintypes.MSG()
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+
+        threading.Thread(target=loop, name="win-event-hook", daemon=True).start()
+        ready.wait(2)
+        return bool(hooked)
+
+
+class X11Backend(WindowBackend):
+    """EWMH window list via python-xlib, or the wmctrl command when python-xlib is missing."""
+    name = "x11"
+
+    def __init__(self):
+        try:
+            from Xlib import display
+            self._display = display.Display()
+            self._xlib = True
+        except ImportError:
+            if not shutil.which("wmctrl"):
+                raise RuntimeError("X11 window listing needs python-xlib or wmctrl")
+            self._xlib = False
+        if self._xlib:
+            d = self._display
+            self._atoms = {name: d.intern_atom(name) for name in (
+                "_NET_CLIENT_LIST", "_NET_ACTIVE_WINDOW", "_NET_WM_NAME", "_NET_WM_PID", "UTF8_STRING", "WM_NAME",
+            )}
+            self._lock = threading.Lock()
+
+    def _title(self, win) -> str:
+        from Xlib import X
+        prop = win.get_full_property(self._atoms["_NET_WM_NAME"], self._atoms["UTF8_STRING"])
+        if prop is None:
+            prop = win.get_full_property(self._atoms["WM_NAME"], X.AnyPropertyType)
+        if prop is None:
+            return ""
+        value = prop.value
+        return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+
+    def list_windows(self) -> List[dict]:
+        if not self._xlib:
+            return self._list_wmctrl()
+        import psutil
+        from Xlib import X
+        with self._lock:
+            d = self._display
+            root = d.screen().root
+            prop = root.get_full_property(self._atoms["_NET_CLIENT_LIST"], X.AnyPropertyType)
+            out = []
+            for wid in (prop.value if prop else []):
+                try:
+                    win = d.create_resource_object("window", wid)
+                    title = self._title(win)
+                    if not title:
+                        continue
+                    pid_prop = win.get_full_property(self._atoms["_NET_WM_PID"], X.AnyPropertyType)
+                    pid = int(pid_prop.value[0]) if pid_prop else None
+                except Exception:
+                    continue  # window closed while listing
+                name = ""
+                if pid:
+                    try:
+                        name = psutil.Process(pid).name()
+                    except psutil.Error:
+                        pass
+                out.append(window(wid, title, pid, name))
+            return out
+
+    def _list_wmctrl(self) -> List[dict]:
+        import psutil
+        output = subprocess.run(["wmctrl", "-lp"], capture_output=True, text=True, timeout=5).stdout
+        out = []
+        for line in output.splitlines():
+            # <id> <desktop> <pid> <host> <title>
+            parts = line.split(None, 4)
+            if len(parts) < 5:
+                continue
+            pid = int(parts[2]) if parts[2].isdigit() and parts[2] != "0" else None
+            name = ""
+            if pid:
+                try:
+                    name = psutil.Process(pid).name()
+                except psutil.Error:
+                    pass
+            out.append(window(parts[0], parts[4], pid, name))
+        return out
+
+    def watch(self, on_change: Callable[[], None]) -> bool:
+        if not self._xlib:
+            return False
+        from Xlib import X, display
+
+        def loop():
+            # Own connection: next_event() blocks
+            d = display.Display()
+            root = d.screen().root
+            root.change_attributes(event_mask=X.PropertyChangeMask)
+            client_list, active, wm_name = (
+                self._atoms["_NET_CLIENT_LIST"], self._atoms["_NET_ACTIVE_WINDOW"], self._atoms["_NET_WM_NAME"]
+            )
+
+            def subscribe_clients():
+                prop = root.get_full_property(client_list, X.AnyPropertyType)
+                for wid in (prop.value if prop else []):
+                    try:
+                        d.create_resource_object("window", wid).change_attributes(event_mask=X.PropertyChangeMask)
+                    except Exception:
+                        pass
+
+            subscribe_clients()
+            while True:
+                event = d.next_event()
+                if event.type != X.PropertyNotify:
+                    continue
+                if event.atom == client_list:
+                    subscribe_clients()  # new windows need their own title subscription
+                    on_change()
+                elif event.atom in (active, wm_name):
+                    on_change()
+
+        threading.Thread(target=loop, name="x11-window-events", daemon=True).start()
+        return True
+
+
+class WaylandBackend(WindowBackend):
+    """Wayland has no generic window list; this asks sway or Hyprland over their IPC."""
+    name = "wayland"
+
+    def __init__(self):
+        if os.environ.get("SWAYSOCK") and shutil.which("swaymsg"):
+            self._kind = "sway"
+        elif os.environ.get("HYPRLAND_INSTANCE_SIGNATURE") and shutil.which("hyprctl"):
+            self._kind = "hyprland"
+        else:
+            raise RuntimeError("Window listing on Wayland needs sway or Hyprland")
+
+    def list_windows(self) -> List[dict]:
+        if self._kind == "hyprland":
+            clients = json.loads(subprocess.run(["hyprctl", "clients", "-j"], capture_output=True, text=True, timeout=5).stdout)
+            return [window(c.get("address"), c.get("title", ""), c.get("pid"), c.get("class", ""))
+                    for c in clients if c.get("title") and c.get("mapped", True)]
+
+        tree = json.loads(subprocess.run(["swaymsg", "-t", "get_tree"], capture_output=True, text=True, timeout=5).stdout)
+        out, stack = [], [tree]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.get("nodes", []) + node.get("floating_nodes", []))
+            if node.get("pid") and node.get("name"):
+                out.append(window(node["id"], node["name"], node["pid"], node.get("app_id") or ""))
+        return out
+
+
+def detect_backend() -> Optional[WindowBackend]:
+    """The backend for this platform, or None if windows cannot be listed here."""
+    candidates = []
+    if sys.platform == "win32":
+        candidates.append(Win32Backend)
+    else:
+        if os.environ.get("WAYLAND_DISPLAY"):
+            candidates.append(WaylandBackend)
+        if os.environ.get("DISPLAY"):
+            candidates.append(X11Backend)  # also covers XWayland apps
+    for backend in candidates:
+        try:
+            return backend()
+        except Exception as e:
+            print(f"Window backend {backend.name} unavailable: {e}")
+    return None
+
+
+class WindowStateService:
+    """
+    In-memory window list, refreshed on backend events or a timer.
+
+    windows() never enumerates: it returns the cached list (filling it once on
+    first use). A background thread refreshes the cache.
+    """
+    def __init__(self, backend: WindowBackend, refresh_interval: float = REFRESH_INTERVAL,
+                 safety_interval: float = EVENT_SAFETY_INTERVAL):
+        """
+        Args:
+            backend (WindowBackend): Source of the window list.
+            refresh_interval (float): Seconds between refreshes when the backend has no events.
+            safety_interval (float): Seconds between refreshes when it does.
+        """
+        self.backend = backend
+        self.refresh_interval = refresh_interval
+        self.safety_interval = safety_interval
+        self.events = False
+        self.refreshes = 0
+        self.updated_at = 0.0
+        self._windows = None
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> "WindowStateService":
+        if self._thread is None:
+            self.events = self.backend.watch(self._dirty.set)
+            self._thread = threading.Thread(target=self._run, name="window-state", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._dirty.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            interval = self.safety_interval if self.events else self.refresh_interval
+            if self._dirty.wait(interval):
+                time.sleep(DEBOUNCE)  # let a burst of events settle
+            if self._stop.is_set():
+                break
+            self._dirty.clear()
+            self.refresh()
+
+    def refresh(self):
+        """Re-list the windows now."""
+        try:
+            windows = self.backend.list_windows()
+        except Exception as e:
+            print(f"Window refresh failed: {e}")
+            return
+        with self._lock:
+            self._windows = windows
+            self.refreshes += 1
+            self.updated_at = time.monotonic()
+
+    def windows(self) -> List[dict]:
+        """The cached windows (listed once now if the cache is still empty)."""
+        if self._windows is None:
+            self.refresh()
+        with self._lock:
+            return list(self._windows or [])
+
+    def titles(self) -> List[str]:
+        """Distinct window titles, in listing order."""
+        return list(dict.fromkeys(w["title"] for w in self.windows()))
+
+    def chrome_windows(self) -> List[dict]:
+        """Windows of Google Chrome (by title suffix or process name)."""
+        return [
+            w for w in self.windows()
+            if "google chrome" in w["title"].lower() or w["process"].lower().startswith(("chrome", "google-chrome"))
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "events": self.events,
+            "refreshes": self.refreshes,
+            "age_s": round(time.monotonic() - self.updated_at, 2) if self.updated_at else None,
+        }
+
+
+# Singleton instance
+_service = None
+_service_checked = False
+_service_lock = threading.Lock()
+
+def get_window_service() -> Optional[WindowStateService]:
+    """Shared, started service for this platform, or None if windows cannot be listed here."""
+    global _service, _service_checked
+    with _service_lock:
+        if not _service_checked:
+            _service_checked = True
+            backend = detect_backend()
+            if backend is not None:
+                _service = WindowStateService(backend).start()
+    return _service
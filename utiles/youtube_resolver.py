@@ -0,0 +1,227 @@
+# Query -> YouTube video for youtube_video_player.
+#
+# The tool only needs a watch URL and a title to open in the browser, so the
+# search runs yt-dlp's flat extraction: "ytsearchN:" returns the result list's
+# metadata (id, title, channel, duration) without resolving formats or player
+# clients for the top video. One YoutubeDL instance is kept for the life of the
+# process (it is not thread-safe, so calls are serialized), and query -> results
+# are cached with a TTL, so playing the same song again skips the search.
+#
+# Queries are cached under their words minus a trailing platform phrase ("Believer
+# song on YouTube" and "believer" share an entry). A leading "play"/"watch" is kept,
+# since it can be part of a title ("Watch Me", "Play Date"). prefetch() starts the
+# search from the user's request ("can you play Believer") while the model is still
+# asking for confirmation, and also files the results under the request's title
+# ("believer") for a few minutes, for the one tool call that follows.
+# RecordedExtractor replays saved search results with artificial latencies, for
+# tests and benchmarks without the network.
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from utiles.cache_utiles import LRUCache
+
+SEARCH_RESULTS = 5
+CACHE_TTL = 6 * 3600
+CACHE_ENTRIES = 512
+PREFETCH_TTL = 120  # seconds a prefetched request waits for its tool call
+FLAT_OPTIONS = {
+    "quiet": True,
+    "no_warnings": True,
+    "skip_download": True,
+    "extract_flat": "in_playlist",
+    "noplaylist": True,
+}
+WATCH_URL = "https://www.youtube.com/watch?v={}"
+# Request around the title, matched on the lowercased words joined by single spaces
+_REQUEST_PREFIX = re.compile(r"^(?:(?:hey|ok) )?(?:ruby )?(?:(?:can|could|would|will) you )?(?:please )?(?:play|watch) ")
+_PLATFORM_SUFFIX = re.compile(r"(?:(?: songs?| videos?)? (?:on|in|from) (?:youtube|yt)| youtube| yt)?(?: please)?$")
+_VIDEO_URL = re.compile(
+    r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/)|youtu\.be/)([A-Za-z0-9_-]{11})")
+
+
+def query_key(query: str) -> str:
+    """Cache key of a query: "Believer song on YouTube" and "believer" share one."""
+    text = " ".join(re.findall(r"\w+", query.lower()))
+    return _PLATFORM_SUFFIX.sub("", text, count=1) or text
+
+
+def title_key(request: str) -> str:
+    """The title a spoken request asks for: "can you play Believer song on YouTube" -> "believer"."""
+    key = query_key(request)
+    return _REQUEST_PREFIX.sub("", key, count=1) or key
+
+
+def video_id_from_url(text: str) -> Optional[str]:
+    """The video id of a YouTube watch/shorts/youtu.be URL, or None."""
+    match = _VIDEO_URL.search(text.strip())
+    return match.group(1) if match else None
+
+
+def _video(entry: dict) -> dict:
+    video_id = entry.get("id")
+    return {
+        "id": video_id,
+        "title": entry.get("title") or video_id,
+        "url": WATCH_URL.format(video_id),
+        "channel": entry.get("channel") or entry.get("uploader"),
+        "duration": entry.get("duration"),
+    }
+
+
+def default_extractor():
+    import yt_dlp
+    return yt_dlp.YoutubeDL(FLAT_OPTIONS)
+
+
+class RecordedExtractor:
+    """
+    Stand-in for yt_dlp.YoutubeDL that replays recorded search results (tests and benchmarks).
+
+    The recording maps queries to lists of flat entries (id, title, channel,
+    duration). extract_info sleeps flat_latency with extract_flat set and
+    full_latency without it, to stand in for the network and format resolution.
+    """
+    def __init__(self, recording, params: Optional[dict] = None, init_cost: float = 0.0,
+                 flat_latency: float = 0.0, full_latency: float = 0.0):
+        """
+        Args:
+            recording (str | dict): Path of the JSON recording, or the recording itself.
+            params (dict, optional): YoutubeDL options (only extract_flat is looked at).
+            init_cost / flat_latency / full_latency (float): Seconds slept on construction
+                and per flat / full extraction.
+        """
+        if isinstance(recording, str):
+            with open(recording, "r", encoding="utf-8") as f:
+                recording = json.load(f)
+        self.recording = {title_key(q): entries for q, entries in recording.items()}
+        self.params = params or {}
+        self.flat_latency = flat_latency
+        self.full_latency = full_latency
+        self.calls = []
+        if init_cost:
+            time.sleep(init_cost)
+
+    def extract_info(self, url: str, download: bool = False) -> dict:
+        self.calls.append(url)
+        count, _, query = url.partition(":")
+        limit = int(count[len("ytsearch"):] or 1)
+        time.sleep(self.flat_latency if self.params.get("extract_flat") else self.full_latency)
+        entries = [dict(e) for e in self.recording.get(title_key(query), [])[:limit]]
+        if not self.params.get("extract_flat"):
+            for e in entries:
+                e["original_url"] = WATCH_URL.format(e["id"])
+        return {"_type": "playlist", "id": query, "entries": entries}
+
+
+class YouTubeResolver:
+    """Cached YouTube searches on one long-lived, flat-extracting YoutubeDL."""
+    def __init__(self, extractor_factory: Callable = default_extractor, ttl: float = CACHE_TTL,
+                 cache_entries: int = CACHE_ENTRIES, results: int = SEARCH_RESULTS):
+        """
+        Args:
+            extractor_factory (Callable): Builds the extractor (a YoutubeDL with FLAT_OPTIONS).
+            ttl (float): Seconds a query's results stay cached.
+            cache_entries (int): Queries kept.
+            results (int): Results fetched per search (all of them are cached).
+        """
+        self.extractor_factory = extractor_factory
+        self.results = results
+        self._cache = LRUCache(cache_entries, ttl=ttl)
+        self._prefetched = {}  # title_key of a prefetched request -> (expiry, results), used once
+        self._extractor = None
+        self._lock = threading.Lock()
+        self._prefetcher = ThreadPoolExecutor(1, thread_name_prefix="youtube-prefetch")
+        self.searches = 0
+
+    def _extract(self, query: str) -> List[dict]:
+        # Called with self._lock held
+        if self._extractor is None:
+            self._extractor = self.extractor_factory()
+        try:
+            info = self._extractor.extract_info(f"ytsearch{self.results}:{query}", download=False)
+        except Exception:
+            self._extractor = None  # start from a clean instance next time
+            raise
+        self.searches += 1
+        return [_video(e) for e in (info or {}).get("entries") or [] if e and e.get("id")]
+
+    def search(self, query: str) -> List[dict]:
+        """
+        Top results for a query: id, title, url (watch page), channel and duration.
+
+        Raises:
+            Exception: yt-dlp errors (not cached).
+        """
+        key = query_key(query)
+        results = self._cache.get(key)
+        if results is None:
+            with self._lock:
+                results = self._cache.get(key)  # a prefetch of the same query may have just finished
+                if results is None:
+                    expiry, results = self._prefetched.pop(key, (0, None))
+                    if results is not None and expiry > time.monotonic():
+                        self._cache.put(key, results)
+                    else:
+                        results = self._search_locked(query)
+        self._prefetched.pop(title_key(query), None)  # the request's own tool call uses up its title
+        return [dict(v) for v in results]
+
+    def _search_locked(self, query: str) -> List[dict]:
+        # Called with self._lock held
+        start = time.perf_counter()
+        results = self._extract(query)
+        self._cache.put(query_key(query), results, cost=time.perf_counter() - start)
+        return results
+
+    def resolve(self, query: str) -> Optional[dict]:
+        """The video to play for a query (or a YouTube URL), or None if the search found nothing."""
+        video_id = video_id_from_url(query)
+        if video_id:
+            return {"id": video_id, "title": query.strip(), "url": WATCH_URL.format(video_id),
+                    "channel": None, "duration": None}
+        results = self.search(query)
+        return results[0] if results else None
+
+    def prefetch(self, queries: List[str]):
+        """
+        Search the queries in the background so later resolve() calls hit the cache.
+
+        A whole request works ("play believer song on youtube"): it is searched as
+        given, and the next search for its title_key ("believer") within
+        PREFETCH_TTL seconds is answered from it.
+        """
+        for query in queries:
+            if (query and query.strip() and not video_id_from_url(query)
+                    and query_key(query) not in self._cache and title_key(query) not in self._cache):
+                self._prefetcher.submit(self._prefetch_one, query)
+
+    def _prefetch_one(self, query: str):
+        try:
+            with self._lock:
+                if query_key(query) in self._cache:
+                    return  # its tool call came first
+                results = self._search_locked(query)
+                now = time.monotonic()
+                self._prefetched = {k: v for k, v in self._prefetched.items() if v[0] > now}
+                self._prefetched[title_key(query)] = (now + PREFETCH_TTL, results)
+        except Exception as e:
+            print(f"YouTube prefetch error ({query}): {e}")
+
+    def stats(self) -> dict:
+        return {"searches": self.searches, "cache": self._cache.stats()}
+
+
+# Singleton instance
+_resolver = None
+_resolver_lock = threading.Lock()
+
+def get_youtube_resolver() -> YouTubeResolver:
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = YouTubeResolver()
+    return _resolver